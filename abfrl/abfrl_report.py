@@ -10,33 +10,35 @@ Pantaloons/StyleUp. Madura brands (LP, VH, AS, PE) went to ABLBL.
 This is a LOSS-MAKING company. Valuation uses P/S and EV/Sales, NOT P/E.
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
+import functools
 import os
+import sys
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch, cm
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
-)
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# Register SFNS for INR symbol
-pdfmetrics.registerFont(TTFont('SFNS', '/System/Library/Fonts/SFNS.ttf'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stocklib import profiling
+
+import numpy as np
+
+from stocklib.datastore import open_store
+from stocklib.enterprise import bridge_rows, reprice, ticker_bridge
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, parse_args, render_charts, save_figure
+from stocklib.runway import describe as describe_runway, months_text, runway_chart, ticker_runway, waterfall_rows
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, ticker_grid
+from stocklib.technicals import fill_rows
+from stocklib.valuation import ev_rows, growth_cells, multiple_cells, step_cells, ticker_valuation, upside
+profiling.mark('imports')
 
 # --- Configuration ---
 OUTPUT_DIR = "/Users/arpitvyas/Desktop/stock-analysis/abfrl"
 FINAL_PDF = "/Users/arpitvyas/Desktop/stock-analysis/abfrl/ABFRL_Research_Report_Feb2026.pdf"
+TICKER = 'ABFRL'
+DATA = open_store().ticker(TICKER)
+PRICES = PriceHistory(TICKER)
+VALUATION = ticker_valuation(DATA)
 
 # Colors
 PRIMARY = '#1a365d'
@@ -48,17 +50,33 @@ ORANGE = '#dd6b20'
 PURPLE = '#805ad5'
 LOSS_RED = '#c53030'
 
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 10,
-    'axes.titlesize': 12,
-    'axes.labelsize': 10,
-    'figure.facecolor': 'white',
-    'axes.facecolor': '#f8f9fa',
-    'axes.grid': True,
-    'grid.alpha': 0.3,
-    'grid.color': '#cccccc',
-})
+
+# ========== Model Outputs ==========
+# Computed on first use and cached, so importing the script for its data
+# (batch, bench, template) runs no simulation or grid
+@functools.lru_cache(maxsize=None)
+def simulation():
+    """Monte Carlo value distribution (stocklib.montecarlo)."""
+    return ticker_simulation(DATA)
+
+
+@functools.lru_cache(maxsize=None)
+def sensitivity(table=False):
+    """Target grid for the heatmap, or the coarse one for the table (stocklib.sensitivity)."""
+    return ticker_grid(DATA, table=table)
+
+
+@functools.lru_cache(maxsize=None)
+def ev_bridge(at_cmp=False):
+    """Enterprise value bridge as typed, or repriced at the valuation price (stocklib.enterprise)."""
+    b = ticker_bridge(DATA)
+    return reprice(b, VALUATION.price) if at_cmp else b
+
+
+@functools.lru_cache(maxsize=None)
+def runway():
+    """Simulated cash runway and next-year burn waterfall (stocklib.runway)."""
+    return ticker_runway(DATA)
 
 
 # ========== CHART 1: Quarterly Revenue & Profit/Loss Bars ==========
@@ -70,11 +88,15 @@ def create_revenue_chart():
     - Q2 FY26: Post-demerger, Rs 1,982 Cr revenue, Rs -295 Cr loss (ScanX, Alpha Spread)
     Note: FY25 data is for COMBINED entity, FY26 is post-demerger ABFRL only.
     """
-    quarters = ['Q1\nFY25*', 'Q2\nFY25*', 'Q3\nFY25*', 'Q4\nFY25*', 'Q1\nFY26', 'Q2\nFY26']
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') + ('*' if b == 'combined' else '')
+                for p, b in zip(q.periods, q['basis'])]
     # Revenue in Cr (* = combined pre-demerger entity)
-    revenue = [3082, 3198, 4167, 3549, 1831, 1982]
+    revenue = q['revenue']
     # Net Profit/Loss in Cr
-    pat = [-215, -215, -108, -24, -234, -295]
+    pat = q['pat']
 
     fig, ax1 = plt.subplots(figsize=(9, 5))
     x = np.arange(len(quarters))
@@ -118,10 +140,7 @@ def create_revenue_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=7)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_revenue.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_revenue.png'))
 
 
 # ========== CHART 2: EBITDA Margin Trend ==========
@@ -134,8 +153,12 @@ def create_margin_chart():
     - FY25 quarterly: Derived from Trendlyne, Business Standard
     Note: FY25 = combined entity, FY26 = post-demerger
     """
-    quarters = ['Q1\nFY25*', 'Q2\nFY25*', 'Q3\nFY25*', 'Q4\nFY25*', 'Q1\nFY26', 'Q2\nFY26']
-    ebitda_margin = [4.5, 4.8, 8.5, 6.2, 9.2, 5.9]  # %
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') + ('*' if b == 'combined' else '')
+                for p, b in zip(q.periods, q['basis'])]
+    ebitda_margin = q['ebitda_margin']  # %
 
     fig, ax = plt.subplots(figsize=(8, 4))
     x = np.arange(len(quarters))
@@ -163,10 +186,7 @@ def create_margin_chart():
                     xytext=(0, 12), fontsize=8, ha='center', color=ACCENT, fontweight='bold')
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_margins.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_margins.png'))
 
 
 # ========== CHART 3: Brand/Segment Revenue Pie ==========
@@ -180,6 +200,8 @@ def create_segment_chart():
     - StyleUp / Others ~4%
     - Based on Q2 FY26 earnings call segment disclosures
     """
+    import matplotlib.pyplot as plt
+
     labels = ['Pantaloons\n(59%)', 'Ethnic Wear\n(Sabyasachi, Tasva,\nTCNS, Jaypore)\n(27%)',
               'TMRW\n(Digital-first)\n(6%)', 'The Collective\n(Luxury)\n(4%)',
               'StyleUp &\nOthers\n(4%)']
@@ -197,10 +219,7 @@ def create_segment_chart():
                  fontweight='bold', fontsize=10, pad=15)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_segments.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_segments.png'))
 
 
 # ========== CHART 4: Price Action with Moving Averages ==========
@@ -214,6 +233,16 @@ def create_price_chart():
     - Resistance: Rs 95, Rs 105-107 (TradingView)
     - Monthly prices approximate from NSE/Yahoo Finance
     """
+    import matplotlib.pyplot as plt
+
+    if len(PRICES):
+        return daily_price_chart(
+            PRICES, 'ABFRL - Post-Demerger Price Action & Moving Averages',
+            os.path.join(OUTPUT_DIR, 'chart_price.png'), currency='Rs ',
+            sma=(200,), ema=(50,), figsize=(9, 5),
+            zones=[(66, 72, 'green', 'Support Zone (Rs 66-72)'),
+                   (105, 108, 'red', 'Resistance Zone (Rs 105-108)')])
+
     months = ['Jun\n2025', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan\n2026', 'Feb']
     prices = [95, 102, 107, 98, 88, 80, 74, 77, 84]
 
@@ -263,10 +292,7 @@ def create_price_chart():
             transform=ax.transAxes, fontsize=6, ha='center', color='#999999', style='italic')
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_price.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_price.png'))
 
 
 # ========== CHART 5: Peer Comparison (P/S and EV/Sales) ==========
@@ -279,6 +305,8 @@ def create_peer_chart():
     - Shoppers Stop: P/S ~0.4x estimated (MarketsMojo)
     - Note: ABFRL has no P/E (loss-making), hence P/S used for comparison
     """
+    import matplotlib.pyplot as plt
+
     companies = ['ABFRL', 'Vedant\nFashions', 'Trent', 'Shoppers\nStop']
 
     fig, axes = plt.subplots(1, 3, figsize=(10, 4))
@@ -315,14 +343,49 @@ def create_peer_chart():
                  'Sources: Yahoo Finance, Alpha Spread, Smart-Investing.in, MarketsMojo',
                  fontweight='bold', fontsize=10, y=1.06)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_peers.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_peers.png'))
+
+
+# ========== CHART 6: Monte Carlo Value Distribution ==========
+def create_simulation_chart():
+    """Distribution of 12-month values around the scenario EV (stocklib.montecarlo)."""
+    return histogram_chart(simulation(), 'ABFRL - Monte Carlo Value Distribution',
+                           os.path.join(OUTPUT_DIR, 'chart_simulation.png'), currency='Rs ',
+                           expected=VALUATION.expected)
+
+
+# ========== CHART 7: Sensitivity Grid ==========
+def create_sensitivity_chart():
+    """Target price over the revenue growth x EV/Sales plane (stocklib.sensitivity)."""
+    grid = sensitivity()
+    return heatmap_chart(grid, 'ABFRL - Target Sensitivity: Revenue Growth x EV/Sales',
+                         os.path.join(OUTPUT_DIR, 'chart_sensitivity.png'), currency='Rs ',
+                         row_label='Revenue growth (CAGR)', multiple_label='EV/Sales',
+                         marker=(grid.base_growth, grid.base_multiple, 'Base case'))
+
+
+# ========== CHART 8: Cash Burn Waterfall and Runway ==========
+def create_runway_chart():
+    """Next-year cash burn waterfall and the simulated runway distribution (stocklib.runway)."""
+    return runway_chart(runway(), 'ABFRL - Cash Burn Waterfall and Runway',
+                        os.path.join(OUTPUT_DIR, 'chart_runway.png'), currency='Rs ')
 
 
 # ========== PDF GENERATION ==========
 def build_pdf(chart_paths):
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    from stocklib.fonts import register_fonts
+    from stocklib.styles import paragraph_style, table_style
+
+    # Register SFNS for INR symbol
+    register_fonts()
+
     doc = SimpleDocTemplate(
         FINAL_PDF,
         pagesize=A4,
@@ -332,69 +395,18 @@ def build_pdf(chart_paths):
         rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Title'],
-        fontSize=18, textColor=HexColor(PRIMARY),
-        spaceAfter=6, alignment=TA_CENTER, fontName='SFNS'
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle', parent=styles['Normal'],
-        fontSize=11, textColor=HexColor('#4a5568'),
-        spaceAfter=12, alignment=TA_CENTER, fontName='SFNS'
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading', parent=styles['Heading1'],
-        fontSize=14, textColor=HexColor(PRIMARY),
-        spaceBefore=16, spaceAfter=8, fontName='SFNS',
-        borderWidth=0, borderPadding=0,
-    )
-    subheading_style = ParagraphStyle(
-        'CustomSubheading', parent=styles['Heading2'],
-        fontSize=11, textColor=HexColor(ACCENT),
-        spaceBefore=10, spaceAfter=4, fontName='SFNS'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=9, leading=13,
-        textColor=HexColor('#2d3748'),
-        spaceAfter=6, alignment=TA_JUSTIFY, fontName='SFNS'
-    )
-    bullet_style = ParagraphStyle(
-        'CustomBullet', parent=body_style,
-        leftIndent=15, bulletIndent=5, spaceAfter=3, fontSize=9
-    )
-    source_style = ParagraphStyle(
-        'SourceStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#718096'),
-        spaceAfter=4, fontName='SFNS'
-    )
-    disclaimer_style = ParagraphStyle(
-        'DisclaimerStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#a0aec0'),
-        spaceBefore=8, spaceAfter=4,
-        fontName='SFNS', alignment=TA_CENTER
-    )
-    callout_green = ParagraphStyle(
-        'CalloutGreen', parent=body_style,
-        backColor=HexColor('#f0fff4'), borderWidth=1,
-        borderColor=HexColor(GREEN), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_red = ParagraphStyle(
-        'CalloutRed', parent=body_style,
-        backColor=HexColor('#fff5f5'), borderWidth=1,
-        borderColor=HexColor(HIGHLIGHT), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_orange = ParagraphStyle(
-        'CalloutOrange', parent=body_style,
-        backColor=HexColor('#fffaf0'), borderWidth=1,
-        borderColor=HexColor(ORANGE), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
+    # Shared styles (stocklib.styles)
+    title_style = paragraph_style('title', fontSize=18)
+    subtitle_style = paragraph_style('subtitle')
+    heading_style = paragraph_style('heading')
+    subheading_style = paragraph_style('subheading')
+    body_style = paragraph_style('body')
+    bullet_style = paragraph_style('bullet')
+    source_style = paragraph_style('source')
+    disclaimer_style = paragraph_style('disclaimer')
+    callout_green = paragraph_style('callout_green')
+    callout_red = paragraph_style('callout_red')
+    callout_orange = paragraph_style('callout_orange', backColor=HexColor('#fffaf0'))
 
     story = []
 
@@ -407,10 +419,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.3*cm))
     story.append(HRFlowable(width="80%", thickness=2, color=HexColor(PRIMARY)))
     story.append(Spacer(1, 0.3*cm))
-    story.append(Paragraph('1-Year Stock Research Report', ParagraphStyle(
-        'BigSub', parent=subtitle_style, fontSize=15, textColor=HexColor(ACCENT),
-        fontName='SFNS'
-    )))
+    story.append(Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle', fontSize=15)))
     story.append(Paragraph('Outlook: February 2026 - February 2027', subtitle_style))
     story.append(Spacer(1, 0.3*cm))
 
@@ -429,31 +438,22 @@ def build_pdf(chart_paths):
 
     # Key metrics box
     metrics_data = [
-        ['Current Price', 'Rs 83.92 (Feb 3, 2026)', 'Market Cap', 'Rs 8,176 Cr'],
+        ['Current Price', 'Rs 83.92 (Feb 3, 2026)', 'Market Cap', f'Rs {ev_bridge().market_cap[-1]:,.0f} Cr'],
         ['P/E (Trailing)', 'N/A (Loss-making)', 'P/B Ratio', '~2.5x'],
-        ['52-Week Range', 'Rs 70.55 - Rs 107.75', 'P/S (TTM)', '1.11x'],
-        ['Revenue (TTM)', 'Rs 7,355 Cr (cont. ops)', 'EV/Sales (TTM)', '2.06x'],
+        ['52-Week Range', 'Rs 70.55 - Rs 107.75', 'P/S (TTM)', f'{ev_bridge().ps[-1]:.2f}x'],
+        ['Revenue (TTM)', 'Rs 7,355 Cr (cont. ops)', 'EV/Sales (TTM)', f'{ev_bridge().ev_sales[-1]:.2f}x'],
         ['Gross Cash', 'Rs 2,150 Cr (Sep 2025)', 'Promoter Holding', '46.6%'],
         ['EBITDA (H1 FY26)', 'Rs 286 Cr', 'ROE (3Y Avg)', '-11.0%'],
     ]
     metrics_table = Table(metrics_data, colWidths=[3.2*cm, 4*cm, 3.2*cm, 4*cm])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#edf2f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor(PRIMARY)),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    metrics_table.setStyle(table_style('metrics_table', font_size=8, padding=5))
     story.append(metrics_table)
     story.append(Spacer(1, 0.3*cm))
 
     # Executive Summary Verdict Box
     verdict_data = [
-        ['VERDICT: SPECULATIVE HOLD | Expected Value: around CMP', '', ''],
+        [f'VERDICT: SPECULATIVE HOLD | Expected Value: Rs {VALUATION.expected:,.0f} '
+         f'({upside(VALUATION.expected_return, 0)} from CMP Rs {VALUATION.price:,.0f})', '', ''],
         ['Key Bull: Post-demerger focus on ethnic/luxury brands + Sabyasachi premium', '', ''],
         ['Key Bear: Persistent losses, high debt (Rs 3,500+ Cr), cash burn risk', '', ''],
     ]
@@ -575,13 +575,16 @@ def build_pdf(chart_paths):
     story.append(Paragraph('Screener.in Key Metrics (Consolidated)', subheading_style))
     screener_data = [
         ['Metric', 'Value', 'Source'],
-        ['Market Cap', 'Rs 8,176 Cr', 'Screener.in (Feb 2026); 122.03 Cr shares x Rs 67'],
+        ['Market Cap', f'Rs {ev_bridge().market_cap[-1]:,.0f} Cr',
+         f'Screener.in (Feb 2026); {ev_bridge().shares[-1]:.2f} Cr shares x Rs {ev_bridge().price[-1]:.0f}'],
         ['Revenue (TTM)', 'Rs 7,355 Cr (cont. ops)', 'Screener.in (restated per Ind AS 105)'],
         ['Net Profit (TTM)', 'Rs -595 Cr (LOSS)', 'Screener.in'],
         ['P/E Ratio', 'N/A (Loss-making)', 'Screener.in'],
         ['Shares Outstanding', '122.03 Cr', 'Screener.in (Equity Capital Rs 1,220 Cr at FV Rs 10)'],
-        ['P/S (TTM)', '1.11x', '8,176 / 7,355 (cont. ops basis)'],
-        ['EV/Sales (TTM)', '2.06x', 'EV Rs 15,176 Cr / Revenue Rs 7,355 Cr'],
+        ['P/S (TTM)', f'{ev_bridge().ps[-1]:.2f}x',
+         f'{ev_bridge().market_cap[-1]:,.0f} / {ev_bridge().revenue[-1]:,.0f} (cont. ops basis)'],
+        ['EV/Sales (TTM)', f'{ev_bridge().ev_sales[-1]:.2f}x',
+         f'EV Rs {ev_bridge().ev[-1]:,.0f} Cr / Revenue Rs {ev_bridge().revenue[-1]:,.0f} Cr'],
         ['ROE (3Y Avg)', '-11.0%', 'Screener.in'],
         ['ROCE', '-2.87%', 'Screener.in'],
         ['Debt-to-Equity', '0.17', 'Alpha Spread'],
@@ -589,18 +592,7 @@ def build_pdf(chart_paths):
         ['Other Income', 'Rs 450 Cr (included in earnings)', 'Screener.in'],
     ]
     screener_table = Table(screener_data, colWidths=[4*cm, 5*cm, 5.5*cm])
-    screener_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    screener_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(screener_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -614,17 +606,8 @@ def build_pdf(chart_paths):
         ['H1 FY26', '3,813', '-529 (est.)', 'Post-demerger ABFRL only'],
     ]
     annual_table = Table(annual_data, colWidths=[2*cm, 3.5*cm, 3.5*cm, 5.5*cm])
+    annual_table.setStyle(table_style('header_grid_table'))
     annual_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
         ('TEXTCOLOR', (2, 1), (2, -1), HexColor(LOSS_RED)),
     ]))
     story.append(annual_table)
@@ -639,7 +622,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.2*cm))
 
     story.append(Paragraph('Quarterly Revenue & Loss Trend', subheading_style))
-    story.append(Image(chart_paths['revenue'], width=16*cm, height=8.5*cm))
+    story.append(chart_image(chart_paths['revenue'], width=16*cm, height=8.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('EBITDA Margin Trend', subheading_style))
@@ -650,11 +633,11 @@ def build_pdf(chart_paths):
         'margin improvement YoY, indicating the ethnic segment is on a clear path to profitability.',
         body_style
     ))
-    story.append(Image(chart_paths['margins'], width=14*cm, height=7*cm))
+    story.append(chart_image(chart_paths['margins'], width=14*cm, height=7*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Segment Performance', subheading_style))
-    story.append(Image(chart_paths['segments'], width=12*cm, height=8.5*cm))
+    story.append(chart_image(chart_paths['segments'], width=12*cm, height=8.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Balance Sheet & Cash Position', subheading_style))
@@ -682,18 +665,7 @@ def build_pdf(chart_paths):
         ['FY25', '1,644', 'Est. ~450', 'Est. ~1,194', 'N/M'],
     ]
     cf_table = Table(cf_data, colWidths=[2*cm, 3*cm, 3*cm, 3*cm, 3.5*cm])
-    cf_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    cf_table.setStyle(table_style('header_grid_table'))
     story.append(cf_table)
     story.append(Paragraph(
         'Note: CFO is positive and growing despite net losses — this is because of high '
@@ -705,6 +677,31 @@ def build_pdf(chart_paths):
     ))
     story.append(Spacer(1, 0.3*cm))
 
+    story.append(Paragraph('Cash Burn Waterfall and Runway', subheading_style))
+    story.append(Paragraph(
+        'CFO above is before lease payments: under Ind AS 116 rent is repaid as lease liabilities in '
+        'financing cash flow, so the cash that actually leaves the business each year is EBITDA less '
+        'interest and tax, less lease payments, less capex. The runway below projects that quarterly '
+        'from the Sep 2025 gross cash, sampling revenue growth, EBITDA margin, capex and lease payments '
+        'per path.',
+        body_style
+    ))
+    runway_data = [['Next 12 Months (mean of simulated paths)', 'Amount']] + waterfall_rows(runway(), 'Rs ')
+    runway_table = Table(runway_data, colWidths=[8.5*cm, 6*cm])
+    runway_table.setStyle(table_style('header_grid_table'))
+    runway_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ]))
+    story.append(runway_table)
+    story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['runway'], width=16*cm, height=6.7*cm))
+    story.append(Paragraph(
+        describe_runway(runway(), 'Rs ') + ' Lease payments and capex are estimates (about Rs 600 Cr and '
+        'Rs 360 Cr a year); the H1 FY26 fall in gross cash (Rs 200 Cr) anchors the burn.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
     story.append(Paragraph('Shareholding Pattern (Sep 2025)', subheading_style))
     sh_data = [
         ['Category', 'Holding (%)', 'Details'],
@@ -714,18 +711,9 @@ def build_pdf(chart_paths):
         ['Public / Retail', '~26.7%', 'Flipkart (6% holder) sold Rs 755 Cr block deal'],
     ]
     sh_table = Table(sh_data, colWidths=[3*cm, 2.5*cm, 9*cm])
+    sh_table.setStyle(table_style('header_grid_table'))
     sh_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (1, -1), 'CENTER'),
         ('ALIGN', (2, 0), (2, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(sh_table)
     story.append(Spacer(1, 0.3*cm))
@@ -737,8 +725,10 @@ def build_pdf(chart_paths):
         'Rs 736 Cr (FY24), Rs 456 Cr (FY25), and Rs 529 Cr estimated for H1 FY26. ROE is -11% '
         'over 3 years (Screener.in).<br/>'
         '  <b>2. Cash Burn:</b> Gross cash declined from Rs 2,350 Cr (Mar 2025) to Rs 2,150 Cr '
-        '(Sep 2025) - burning Rs 200 Cr in 6 months. At this rate, the cash runway is approximately '
-        '5-6 years without additional fundraising.<br/>'
+        f'(Sep 2025) - burning Rs 200 Cr in 6 months. At the projected next-year burn of '
+        f'Rs {-runway().waterfall["net"]:,.0f} Cr the cash lasts {months_text(runway().simple)}; the simulated '
+        f'median runway is {months_text(runway().percentiles[50])} (10th percentile '
+        f'{months_text(runway().percentiles[10])}) without additional fundraising.<br/>'
         '  <b>3. Lease Liabilities:</b> True debt including lease obligations could be Rs 7,000-8,000 Cr '
         '(Nuvama), far exceeding the headline D/E of 0.17.<br/>'
         '  <b>4. Promoter Dilution:</b> Promoter holding fell 8.86% over 3 years (Trendlyne). '
@@ -775,7 +765,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['price'], width=16*cm, height=9*cm))
+    story.append(chart_image(chart_paths['price'], width=16*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Key Technical Signals', subheading_style))
@@ -790,19 +780,9 @@ def build_pdf(chart_paths):
         ['Support Zone', 'Rs 70-72 (major), Rs 66', 'Strong floor near 52W low'],
         ['Resistance Zone', 'Rs 95 (immediate), Rs 105-107', 'Need volume breakout above Rs 95'],
     ]
+    tech_data = fill_rows(tech_data, PRICES, currency='Rs ')
     tech_table = Table(tech_data, colWidths=[3.5*cm, 3.5*cm, 8.5*cm])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    tech_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(tech_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -849,8 +829,8 @@ def build_pdf(chart_paths):
     story.append(Paragraph('Peer Valuation Comparison (Jan 2026)', subheading_style))
     peer_data = [
         ['Metric', 'ABFRL', 'Vedant Fashions\n(Manyavar)', 'Trent Ltd', 'Shoppers Stop'],
-        ['P/S (TTM)', '1.11x', '10.49x', '~12x (est.)', '~0.4x'],
-        ['EV/Sales', '2.06x', '10.47x', '~13x (est.)', '~0.7x'],
+        ['P/S (TTM)', f'{ev_bridge().ps[-1]:.2f}x', '10.49x', '~12x (est.)', '~0.4x'],
+        ['EV/Sales', f'{ev_bridge().ev_sales[-1]:.2f}x', '10.47x', '~13x (est.)', '~0.7x'],
         ['P/E (TTM)', 'N/A (Loss)', '38.7x', 'Very high', 'N/A'],
         ['EBITDA Margin', '7.5% (H1)', '43.2%', '~14%', '~5%'],
         ['Revenue (TTM)', 'Rs 7,355 Cr', 'Rs 1,421 Cr', 'Rs 16,000+ Cr', 'Rs 4,500+ Cr'],
@@ -858,24 +838,16 @@ def build_pdf(chart_paths):
         ['1Y Return', '-34%', '~-10%', '~0%', '~-20%'],
     ]
     peer_table = Table(peer_data, colWidths=[2.5*cm, 2.8*cm, 2.8*cm, 2.8*cm, 2.8*cm])
+    peer_table.setStyle(table_style('header_grid_table', font_size=7.5, banded=False))
     peer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('BACKGROUND', (0, 0), (0, -1), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
         ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
         ('TEXTCOLOR', (1, 4), (1, 4), HexColor(LOSS_RED)),
     ]))
     story.append(peer_table)
     story.append(Spacer(1, 0.3*cm))
 
-    story.append(Image(chart_paths['peers'], width=16*cm, height=6.5*cm))
+    story.append(chart_image(chart_paths['peers'], width=16*cm, height=6.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph(
@@ -932,17 +904,7 @@ def build_pdf(chart_paths):
         ['Alpha Spread', '183 (intrinsic)', 'Undervalued', 'Jan 2026', '61% undervalued vs intrinsic'],
     ]
     analyst_table = Table(analyst_data, colWidths=[2.8*cm, 2*cm, 2.2*cm, 2*cm, 5.5*cm])
-    analyst_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    analyst_table.setStyle(table_style('header_grid_table', valign=False))
     story.append(analyst_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -966,42 +928,48 @@ def build_pdf(chart_paths):
     # ======================================================================
     # SECTION 6: VALUATION MATH (P/S METHODOLOGY)
     # ======================================================================
+    b = ev_bridge()
     story.append(Paragraph('Valuation Methodology: EV/Sales (Primary) & P/S (Secondary)', subheading_style))
     story.append(Paragraph(
         'Since ABFRL is <b>loss-making</b> (ROCE: -2.87%, Screener.in), traditional P/E valuation is NOT applicable. '
         'Instead, we use <b>EV/Sales</b> as the primary valuation metric and <b>P/S</b> as secondary, '
         'anchored to peer comparisons. This is a heuristic, not a DCF. Limitations are disclosed at the end.<br/><br/>'
-        '<b>EV = Market Cap + Net Debt = Rs 8,176 Cr + Rs 7,000 Cr (estimated lease liabilities + debt - cash) '
-        '= Rs 15,176 Cr</b><br/>'
-        '<b>EV/Sales = Rs 15,176 / Rs 7,355 = 2.06x</b><br/>'
+        f'<b>EV = Market Cap + Net Debt = Rs {b.market_cap[-1]:,.0f} Cr + Rs {b.net_debt[-1]:,.0f} Cr '
+        f'(estimated lease liabilities + debt - cash) = Rs {b.ev[-1]:,.0f} Cr</b><br/>'
+        f'<b>EV/Sales = Rs {b.ev[-1]:,.0f} / Rs {b.revenue[-1]:,.0f} = {b.ev_sales[-1]:.2f}x</b><br/>'
         'Note: EV/Sales is more appropriate than P/S for ABFRL given significant lease liabilities under Ind AS 116. '
-        'P/S of 1.11x understates true valuation because it ignores the Rs 7,000 Cr in lease obligations and debt.',
+        f'P/S of {b.ps[-1]:.2f}x understates true valuation because it ignores the Rs {b.net_debt[-1]:,.0f} Cr '
+        'in lease obligations and debt.',
         body_style
     ))
+    cmp = ev_bridge(at_cmp=True)
+    bridge_data = [['EV Bridge', 'Value', 'Working']] + bridge_rows(b, currency='Rs ') + [
+        [f'EV/Sales at Rs {cmp.price[-1]:.2f}', f'{cmp.ev_sales[-1]:.2f}x',
+         f'Market cap Rs {cmp.market_cap[-1]:,.0f} Cr; EV Rs {cmp.ev[-1]:,.0f} Cr'],
+    ]
+    bridge_table = Table(bridge_data, colWidths=[4.5*cm, 3*cm, 7*cm])
+    bridge_table.setStyle(table_style('header_grid_table', align='LEFT'))
+    story.append(bridge_table)
+    story.append(Paragraph(
+        f'Inputs: {DATA["enterprise"]["basis"][-1]} ({b.periods[-1]}). At the Rs {cmp.price[-1]:.2f} '
+        f'used for the targets below, EV/Sales is {cmp.ev_sales[-1]:.2f}x and P/S {cmp.ps[-1]:.2f}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.2*cm))
 
     story.append(Paragraph('<b>Step 1: Current Revenue Per Share</b>', body_style))
     rps_data = [
         ['Metric', 'Value', 'Source'],
-        ['TTM Revenue (cont. ops)', 'Rs 7,355 Cr', 'Screener.in (restated per Ind AS 105)'],
-        ['Market Cap', 'Rs 8,176 Cr', '122.03 Cr shares x Rs 67'],
-        ['Price', 'Rs 83.92', 'NSE (Feb 3, 2026)'],
-        ['Shares Outstanding', '122.03 Cr', 'Screener.in, Equity Capital Rs 1,220 Cr at FV Rs 10'],
-        ['Revenue Per Share (RPS)', 'Rs 60.3', 'Rs 7,355 Cr / 122.03 Cr shares'],
-        ['Current P/S', '8,176 / 7,355 = 1.11x', 'Market Cap / Revenue'],
+        ['TTM Revenue (cont. ops)', f'Rs {b.revenue[-1]:,.0f} Cr', 'Screener.in (restated per Ind AS 105)'],
+        ['Market Cap', f'Rs {b.market_cap[-1]:,.0f} Cr', f'{b.shares[-1]:.2f} Cr shares x Rs {b.price[-1]:.0f}'],
+        ['Price', f'Rs {cmp.price[-1]:.2f}', 'NSE (Feb 3, 2026)'],
+        ['Shares Outstanding', f'{b.shares[-1]:.2f} Cr', 'Screener.in, Equity Capital Rs 1,220 Cr at FV Rs 10'],
+        ['Revenue Per Share (RPS)', f'Rs {b.revenue[-1] / b.shares[-1]:.1f}',
+         f'Rs {b.revenue[-1]:,.0f} Cr / {b.shares[-1]:.2f} Cr shares'],
+        ['Current P/S', f'{b.market_cap[-1]:,.0f} / {b.revenue[-1]:,.0f} = {b.ps[-1]:.2f}x', 'Market Cap / Revenue'],
     ]
     rps_table = Table(rps_data, colWidths=[4*cm, 4.5*cm, 6*cm])
-    rps_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    rps_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(rps_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1013,30 +981,17 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    v = VALUATION
     proj_data = [
         ['', 'Bull', 'Base', 'Bear'],
-        ['FY26E Revenue Growth', '12% (H2 wedding boost)', '10% (moderate)', '5% (Pantaloons drag)'],
-        ['FY26E Revenue (Rs Cr)', '7,355 x 1.12 = 8,238', '7,355 x 1.10 = 8,091', '7,355 x 1.05 = 7,723'],
-        ['FY27E Revenue Growth', '15% (ethnic + OWND)', '12%', '8%'],
-        ['FY27E Revenue (Rs Cr)', '8,238 x 1.15 = 9,474', '8,091 x 1.12 = 9,062', '7,723 x 1.08 = 8,341'],
-        ['FY27E RPS', 'Rs 77.6', 'Rs 74.3', 'Rs 68.4'],
+        ['FY26E Revenue Growth'] + growth_cells(v, 0, ['H2 wedding boost', 'moderate', 'Pantaloons drag']),
+        ['FY26E Revenue (Rs Cr)'] + step_cells(v.path, v.steps, 0, digits=0),
+        ['FY27E Revenue Growth'] + growth_cells(v, 1, ['ethnic + OWND', '', '']),
+        ['FY27E Revenue (Rs Cr)'] + step_cells(v.path, v.steps, 1, digits=0),
+        ['FY27E RPS'] + [f'Rs {rps:.1f}' for rps in v.per_share[:, -1]],
     ]
     proj_table = Table(proj_data, colWidths=[3.5*cm, 4*cm, 4*cm, 4*cm])
-    proj_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (1, 0), (1, -1), HexColor('#f0fff4')),
-        ('BACKGROUND', (2, 0), (2, -1), HexColor('#fffff0')),
-        ('BACKGROUND', (3, 0), (3, -1), HexColor('#fff5f5')),
-        ('TEXTCOLOR', (1, 0), (3, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    proj_table.setStyle(table_style('projection_table', font_size=7.5))
     story.append(proj_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1057,25 +1012,14 @@ def build_pdf(chart_paths):
 
     scenario_data = [
         ['Scenario', 'FY27E Rev (Cr)', 'EV/Sales', 'Implied EV', 'Equity Value', 'Target Price', 'Prob.'],
-        ['Bull', 'Rs 9,474', '2.5x', 'Rs 23,685 Cr', 'Rs 16,685 Cr', 'Rs 137', '15%'],
-        ['Base', 'Rs 9,062', '1.8x', 'Rs 16,312 Cr', 'Rs 9,312 Cr', 'Rs 76', '45%'],
-        ['Bear', 'Rs 8,341', '0.4x', 'Rs 3,336 Cr', 'Rs -3,664 Cr*', 'Rs 27**', '40%'],
-    ]
+    ] + [[name, f'Rs {revenue:,.0f}', multiple, f'Rs {ev:,.0f} Cr',
+          f'Rs {equity:,.0f} Cr' + ('*' if equity < 0 else ''),
+          f'Rs {target:,.0f}' + ('**' if floored else ''), f'{p:.0%}']
+         for name, revenue, multiple, ev, equity, target, floored, p in zip(
+             ['Bull', 'Base', 'Bear'], v.path[:, -1], multiple_cells(v), v.value_low, v.equity_low,
+             v.low, v.floored, v.probability)]
     scenario_table = Table(scenario_data, colWidths=[1.5*cm, 2.2*cm, 1.8*cm, 2.5*cm, 2.5*cm, 2.2*cm, 1.5*cm])
-    scenario_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    scenario_table.setStyle(table_style('scenario_table', font_size=8))
     story.append(scenario_table)
     story.append(Paragraph(
         '* Negative equity value implies debt exceeds enterprise value at 0.4x EV/Sales.<br/>'
@@ -1086,8 +1030,9 @@ def build_pdf(chart_paths):
     ))
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
-        '<b>P/S Cross-Reference (Secondary):</b> Bull: Rs 77.6 RPS x 1.5x P/S = Rs 116 | '
-        'Base: Rs 74.3 RPS x 1.1x P/S = Rs 82 | Bear: Rs 68.4 RPS x 0.4x P/S = Rs 27. '
+        '<b>P/S Cross-Reference (Secondary):</b> ' + ' | '.join(
+            f'{name}: Rs {rps:.1f} RPS x {ps}x P/S = Rs {rps * ps:.0f}'
+            for name, rps, ps in zip(['Bull', 'Base', 'Bear'], v.per_share[:, -1], [1.5, 1.1, 0.4])) + '. '
         'P/S-based targets are directionally consistent but understate risk by ignoring lease liabilities.',
         source_style
     ))
@@ -1120,32 +1065,36 @@ def build_pdf(chart_paths):
 
     ev_data = [
         ['Scenario', 'Target Price', 'Probability', 'Weighted Value'],
-        ['Bull', 'Rs 137', '15%', 'Rs 20.6'],
-        ['Base', 'Rs 76', '45%', 'Rs 34.2'],
-        ['Bear', 'Rs 27', '40%', 'Rs 10.8'],
-        ['', '', 'Expected Value', 'Rs 66'],
-    ]
+    ] + ev_rows(v, 'Rs ', 'Expected Value', digits=1)
     ev_table = Table(ev_data, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    ev_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('BACKGROUND', (0, 4), (-1, 4), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    ev_table.setStyle(table_style('scenario_table', font_size=9, total=True))
     story.append(ev_table)
     story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['simulation'], width=16*cm, height=8*cm))
+    story.append(Paragraph(describe(simulation(), 'Rs '), source_style))
+    story.append(Spacer(1, 0.3*cm))
 
+    # Sensitivity grid
+    grid, coarse = sensitivity(), sensitivity(table=True)
+    story.append(Paragraph('<b>Sensitivity: Revenue Growth x EV/Sales</b>', body_style))
+    story.append(chart_image(chart_paths['sensitivity'], width=15*cm, height=8.4*cm))
+    sens_data = table_rows(coarse, 'Rs ', corner='Revenue growth / EV/Sales')
+    sens_table = Table(sens_data, colWidths=[3*cm] + [2.4*cm] * (len(sens_data[0]) - 1))
+    sens_table.setStyle(table_style('sensitivity_table'))
+    sens_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(coarse)]))
+    story.append(sens_table)
     story.append(Paragraph(
-        '<b>Probability-weighted expected price: Rs 66</b> -- implying ~21% DOWNSIDE from Rs 84. '
+        f'Green cells are above the current price of Rs {v.price:,.0f}. Rows compound Revenue growth '
+        f'for {grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
+    story.append(Paragraph(
+        f'<b>Probability-weighted expected price: Rs {v.expected:,.0f}</b> -- implying '
+        f'~{upside(v.expected_return, 0).upper()} from Rs {v.price:,.0f}. '
         'Using EV/Sales (which properly accounts for Rs 7,000 Cr in lease liabilities and debt), '
         'the expected value is BELOW current market price. The high bear probability (40%) combined with '
         'the severe bear case (0.4x EV/Sales, Shoppers Stop level) drags expected value significantly lower. '
@@ -1214,8 +1163,9 @@ def build_pdf(chart_paths):
         '<b>Wedding Season H2 Boost:</b> Ethnic and luxury segments see disproportionate H2 '
         'revenue, which could improve full-year numbers.',
         '<b>Cotton Price Tailwind:</b> Soft input costs support margin improvement in FY27.',
-        '<b>Cash Cushion:</b> Rs 2,150 Cr gross cash provides runway for 5+ years even with '
-        'current burn rate.',
+        f'<b>Cash Cushion:</b> Rs 2,150 Cr gross cash gives a median simulated runway of '
+        f'{months_text(runway().percentiles[50])}; only {runway().p_within(24):.0%} of paths run out '
+        f'within two years.',
         '<b>Low P/S Multiple:</b> At 1.11x P/S (2.06x EV/Sales), ABFRL is cheap relative to peers IF profitability '
         'emerges. Even a modest re-rating to 1.5x P/S implies significant upside.',
     ]
@@ -1255,7 +1205,8 @@ def build_pdf(chart_paths):
     ))
     story.append(Paragraph(
         'However, the <b>fundamental reality is that ABFRL has never been consistently profitable</b>. '
-        'The probability-weighted expected price of <b>Rs 66 implies ~21% DOWNSIDE</b> when using '
+        f'The probability-weighted expected price of <b>Rs {VALUATION.expected:,.0f} implies '
+        f'~{upside(VALUATION.expected_return, 0).upper()}</b> when using '
         'EV/Sales (which properly accounts for Rs 7,000 Cr in lease liabilities). This comes '
         'with a 40% bear probability reflecting very real risks: persistent losses, stagnating '
         'Pantaloons, hidden lease leverage, and smart money exiting.',
@@ -1322,20 +1273,28 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    doc.build(story)
+    profiling.build(doc, story)
     print(f"PDF generated successfully: {FINAL_PDF}")
 
 
 # --- Main ---
+CHARTS = {
+    'revenue': create_revenue_chart,
+    'margins': create_margin_chart,
+    'segments': create_segment_chart,
+    'price': create_price_chart,
+    'peers': create_peer_chart,
+    'simulation': create_simulation_chart,
+    'sensitivity': create_sensitivity_chart,
+    'runway': create_runway_chart,
+}
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Generating charts...")
-    charts = {
-        'revenue': create_revenue_chart(),
-        'margins': create_margin_chart(),
-        'segments': create_segment_chart(),
-        'price': create_price_chart(),
-        'peers': create_peer_chart(),
-    }
+    charts = render_charts(CHARTS, jobs=args.jobs, cache=args.cache, in_memory=args.in_memory,
+                           vector=args.vector)
+    profiling.mark('charts')
     print(f"Charts created: {len(charts)} charts")
     print("Building PDF...")
     build_pdf(charts)
@@ -4,33 +4,38 @@ Aditya Birla Lifestyle Brands Limited (ABLBL) -- 1-Year Stock Research Report
 Generated: February 4, 2026
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
+import functools
 import os
+import sys
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch, cm
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
-)
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# Register SFNS (San Francisco) for proper INR symbol support
-pdfmetrics.registerFont(TTFont('SFNS', '/System/Library/Fonts/SFNS.ttf'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stocklib import profiling
+
+import numpy as np
+
+from stocklib.datastore import open_store
+from stocklib.enterprise import bridge_rows, ticker_bridge
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, parse_args, render_charts, save_figure
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, target_grid, ticker_grid
+from stocklib.technicals import fill_rows
+from stocklib.valuation import (ev_rows, multiple_cells, return_cells, target_cells, ticker_valuation,
+                                upside)
+profiling.mark('imports')
 
 # --- Configuration ---
 OUTPUT_DIR = "/Users/arpitvyas/Desktop/stock-analysis/ablbl"
 FINAL_PDF = "/Users/arpitvyas/Desktop/stock-analysis/ablbl/ABLBL_Research_Report_Feb2026.pdf"
+TICKER = 'ABLBL'
+DATA = open_store().ticker(TICKER)
+PRICES = PriceHistory(TICKER)
+VALUATION = ticker_valuation(DATA)
+# EV/EBITDA cross-check (Morgan Stanley methodology): FY27E EBITDA range and
+# FY27E net debt in Rs Cr, shares in Cr
+EBITDA_FY27E, NET_DEBT, SHARES = (1600, 1700), 500, 122.03
 
 # Colors
 PRIMARY = '#1a365d'      # Dark navy
@@ -41,27 +46,49 @@ LIGHT_BG = '#f7fafc'     # Light background
 ORANGE = '#dd6b20'
 PURPLE = '#805ad5'
 
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 10,
-    'axes.titlesize': 12,
-    'axes.labelsize': 10,
-    'figure.facecolor': 'white',
-    'axes.facecolor': '#f8f9fa',
-    'axes.grid': True,
-    'grid.alpha': 0.3,
-    'grid.color': '#cccccc',
-})
+
+# ========== Model Outputs ==========
+# Computed on first use and cached, so importing the script for its data
+# (batch, bench, template) runs no simulation or grid
+@functools.lru_cache(maxsize=None)
+def simulation():
+    """Monte Carlo value distribution (stocklib.montecarlo)."""
+    return ticker_simulation(DATA)
+
+
+@functools.lru_cache(maxsize=None)
+def sensitivity(table=False):
+    """Target grid for the heatmap, or the coarse one for the table (stocklib.sensitivity)."""
+    return ticker_grid(DATA, table=table)
+
+
+@functools.lru_cache(maxsize=None)
+def ev_bridge():
+    """Today's EV and trailing multiples at the valuation price (stocklib.enterprise)."""
+    return ticker_bridge(DATA, VALUATION.price)
+
+
+@functools.lru_cache(maxsize=None)
+def ev_ebitda(table=False):
+    """EV/EBITDA cross-check grid for the heatmap, or the coarse one for the table."""
+    if table:
+        return target_grid([1500, 1600, 1700, 1800], [8, 10, 13, 15, 20, 25], -NET_DEBT, SHARES,
+                           price=VALUATION.price)
+    return target_grid(np.linspace(1400, 1900, 41), np.linspace(6, 26, 41), -NET_DEBT, SHARES,
+                       price=VALUATION.price)
 
 
 # ========== Chart 1: Quarterly Revenue & Net Profit ==========
 def create_revenue_chart():
     """Q1-Q3 FY26 quarterly revenue and net profit (consolidated)."""
-    quarters = ['Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26', 'Q3\nFY26']
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
     # Revenue in Cr (sourced from quarterly results / Business Standard / Screener.in)
-    revenue = [1942, 1841, 2037, 2341]
+    revenue = q['revenue']
     # Net Profit in Cr (reported consolidated PAT)
-    pat = [52, 24, 23, 66]
+    pat = q['pat']
 
     fig, ax1 = plt.subplots(figsize=(8, 4.5))
     x = np.arange(len(quarters))
@@ -94,15 +121,14 @@ def create_revenue_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_revenue.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_revenue.png'))
 
 
 # ========== Chart 2: EBITDA Margin Trend ==========
 def create_margin_chart():
     """EBITDA margin trend showing the 20.6% Q3 FY26 achievement."""
+    import matplotlib.pyplot as plt
+
     quarters = ['Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26', 'Q3\nFY26']
     # EBITDA margin % (consolidated, from company press releases)
     # Q4 FY25: ~17% (200bps higher YoY per Aditya Birla Group press release)
@@ -135,15 +161,14 @@ def create_margin_chart():
                     fontsize=8, ha='center', color=ACCENT, fontweight='bold')
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_margins.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_margins.png'))
 
 
 # ========== Chart 3: Brand Revenue Pie ==========
 def create_brand_chart():
     """Approximate brand revenue mix based on segment reporting."""
+    import matplotlib.pyplot as plt
+
     # Lifestyle Brands segment: Rs 2,002 Cr in Q3 (85.4% of total Q3 revenue)
     # Emerging Businesses: Rs 355 Cr in Q3 (15.2% of total)
     # Note: Individual brand breakdowns not disclosed; pie shows segment + illustrative sub-split
@@ -170,15 +195,22 @@ def create_brand_chart():
             color='red', alpha=0.35, fontweight='bold', rotation=30)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_brands.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_brands.png'))
 
 
 # ========== Chart 4: Price Action with MAs ==========
 def create_price_chart():
     """Price action since listing (June 2025) with support/resistance zones."""
+    import matplotlib.pyplot as plt
+
+    if len(PRICES):
+        return daily_price_chart(
+            PRICES, 'ABLBL \u2014 Price Action Since Listing',
+            os.path.join(OUTPUT_DIR, 'chart_price.png'), currency='\u20b9',
+            sma=(50, 100), ema=(),
+            zones=[(100, 110, 'green', 'Support Zone (\u20b9100\u2013110)'),
+                   (160, 175, 'red', 'Resistance Zone (\u20b9160\u2013175)')])
+
     # Monthly closing prices (approximate from known data points)
     # Listed June 23, 2025 at Rs 167.75; 52W high 175 (Jun 23); 52W low 100.86 (Jan 27, 2026)
     months = ['Jun\n2025', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan\n2026']
@@ -222,15 +254,14 @@ def create_price_chart():
                 fontsize=9, fontweight='bold', color=HIGHLIGHT)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_price.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_price.png'))
 
 
 # ========== Chart 5: Peer Comparison ==========
 def create_peer_chart():
     """Peer comparison: P/E, revenue, margins vs branded apparel peers."""
+    import matplotlib.pyplot as plt
+
     companies = ['ABLBL', 'Trent', 'Page Ind.', 'Raymond', 'Vedant\nFashions']
 
     # P/E ratios (TTM, Jan 2026 sources)
@@ -263,15 +294,14 @@ def create_peer_chart():
     fig.suptitle('ABLBL vs Branded Apparel Peers \u2014 Valuation & Scale',
                  fontweight='bold', fontsize=11, y=1.02)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_peers.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_peers.png'))
 
 
 # ========== Chart 6 (Bonus): Store Expansion Trajectory ==========
 def create_store_chart():
     """Store count trajectory and FY30 target."""
+    import matplotlib.pyplot as plt
+
     periods = ['Jun\n2025', 'Sep\n2025', 'Dec\n2025', 'FY27E', 'FY28E', 'FY30E']
     stores = [3095, 3225, 3315, 3565, 3815, 4500]
     area = [4.3, 4.5, 4.8, 5.3, 5.8, 7.3]  # Million sq ft
@@ -311,14 +341,51 @@ def create_store_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=7)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_stores.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_stores.png'))
+
+
+# ========== Chart 7: Monte Carlo Value Distribution ==========
+def create_simulation_chart():
+    """Distribution of 12-month values around the scenario EV (stocklib.montecarlo)."""
+    return histogram_chart(simulation(), 'ABLBL \u2014 Monte Carlo Value Distribution',
+                           os.path.join(OUTPUT_DIR, 'chart_simulation.png'), currency='\u20b9',
+                           expected=VALUATION.expected)
+
+
+# ========== Chart 8: Sensitivity Grid ==========
+def create_sensitivity_chart():
+    """Target price over the PAT growth x P/E plane (stocklib.sensitivity)."""
+    grid = sensitivity()
+    return heatmap_chart(grid, 'ABLBL \u2014 Target Sensitivity: PAT Growth x P/E',
+                         os.path.join(OUTPUT_DIR, 'chart_sensitivity.png'), currency='\u20b9',
+                         row_label='PAT growth', multiple_label='P/E',
+                         marker=(grid.base_growth, grid.base_multiple, 'Base case'))
+
+
+def create_ev_ebitda_chart():
+    """Target price over the FY27E EBITDA x EV/EBITDA plane for the cross-check."""
+    return heatmap_chart(ev_ebitda(), 'ABLBL \u2014 EV/EBITDA Cross-Check Sensitivity',
+                         os.path.join(OUTPUT_DIR, 'chart_ev_ebitda.png'), currency='\u20b9',
+                         row_label='FY27E EBITDA (\u20b9 Cr)', multiple_label='EV/EBITDA',
+                         percent_rows=False, marker=(sum(EBITDA_FY27E) / 2, 13, 'Morgan Stanley (13x)'))
 
 
 # ========== PDF Generation ==========
 def build_pdf(chart_paths):
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    from stocklib.fonts import register_fonts
+    from stocklib.styles import paragraph_style, table_style
+
+    # Register SFNS (San Francisco) for proper INR symbol support
+    register_fonts()
+
     doc = SimpleDocTemplate(
         FINAL_PDF,
         pagesize=A4,
@@ -328,75 +395,18 @@ def build_pdf(chart_paths):
         rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Title'],
-        fontSize=20, textColor=HexColor(PRIMARY),
-        spaceAfter=6, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle', parent=styles['Normal'],
-        fontSize=11, textColor=HexColor('#4a5568'),
-        spaceAfter=12, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading', parent=styles['Heading1'],
-        fontSize=14, textColor=HexColor(PRIMARY),
-        spaceBefore=16, spaceAfter=8,
-        fontName='SFNS',
-        borderWidth=0, borderPadding=0,
-    )
-    subheading_style = ParagraphStyle(
-        'CustomSubheading', parent=styles['Heading2'],
-        fontSize=11, textColor=HexColor(ACCENT),
-        spaceBefore=10, spaceAfter=4,
-        fontName='SFNS'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=9, leading=13,
-        textColor=HexColor('#2d3748'),
-        spaceAfter=6, alignment=TA_JUSTIFY,
-        fontName='SFNS'
-    )
-    bullet_style = ParagraphStyle(
-        'CustomBullet', parent=body_style,
-        leftIndent=15, bulletIndent=5,
-        spaceAfter=3, fontSize=9
-    )
-    source_style = ParagraphStyle(
-        'SourceStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#718096'),
-        spaceAfter=4, fontName='SFNS'
-    )
-    disclaimer_style = ParagraphStyle(
-        'DisclaimerStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#a0aec0'),
-        spaceBefore=8, spaceAfter=4,
-        fontName='SFNS', alignment=TA_CENTER
-    )
-    callout_green = ParagraphStyle(
-        'CalloutGreen', parent=body_style,
-        backColor=HexColor('#f0fff4'), borderWidth=1,
-        borderColor=HexColor(GREEN), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_red = ParagraphStyle(
-        'CalloutRed', parent=body_style,
-        backColor=HexColor('#fff5f5'), borderWidth=1,
-        borderColor=HexColor(HIGHLIGHT), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_orange = ParagraphStyle(
-        'CalloutOrange', parent=body_style,
-        backColor=HexColor('#fffff0'), borderWidth=1,
-        borderColor=HexColor(ORANGE), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
+    # Shared styles (stocklib.styles)
+    title_style = paragraph_style('title')
+    subtitle_style = paragraph_style('subtitle')
+    heading_style = paragraph_style('heading')
+    subheading_style = paragraph_style('subheading')
+    body_style = paragraph_style('body')
+    bullet_style = paragraph_style('bullet')
+    source_style = paragraph_style('source')
+    disclaimer_style = paragraph_style('disclaimer')
+    callout_green = paragraph_style('callout_green')
+    callout_red = paragraph_style('callout_red')
+    callout_orange = paragraph_style('callout_orange')
 
     story = []
 
@@ -409,16 +419,12 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.5*cm))
     story.append(HRFlowable(width="80%", thickness=2, color=HexColor(PRIMARY)))
     story.append(Spacer(1, 0.5*cm))
-    story.append(Paragraph('1-Year Stock Research Report', ParagraphStyle(
-        'BigSub', parent=subtitle_style, fontSize=16, textColor=HexColor(ACCENT),
-        fontName='SFNS'
-    )))
+    story.append(Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle')))
     story.append(Paragraph('Outlook: February 2026 \u2192 February 2027', subtitle_style))
     story.append(Spacer(1, 0.3*cm))
     story.append(Paragraph(
         '<b>NEWLY LISTED (June 23, 2025)</b> \u2014 Demerged from ABFRL. Heritage lifestyle brands entity.',
-        ParagraphStyle('NewlyListed', parent=body_style, alignment=TA_CENTER,
-                       textColor=HexColor(ORANGE), fontSize=10, fontName='SFNS')
+        paragraph_style('body', alignment=TA_CENTER, textColor=HexColor(ORANGE), fontSize=10)
     ))
     story.append(Spacer(1, 0.8*cm))
 
@@ -433,23 +439,14 @@ def build_pdf(chart_paths):
         ['Shares Outstanding', '122.03 Cr', 'Listing Date', 'June 23, 2025'],
     ]
     metrics_table = Table(metrics_data, colWidths=[3.3*cm, 3.8*cm, 3.3*cm, 3.8*cm])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#edf2f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor(PRIMARY)),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    metrics_table.setStyle(table_style('metrics_table', font_size=8.5, padding=5))
     story.append(metrics_table)
     story.append(Spacer(1, 0.4*cm))
 
     # FIX 6: Executive Summary / Verdict Box on Page 1
     verdict_data = [
-        ['VERDICT: HOLD | Expected Value: Rs ~105 (in line with CMP)', '', ''],
+        [f'VERDICT: HOLD | Expected Value: Rs ~{VALUATION.expected:,.0f} '
+         f'({upside(VALUATION.expected_return, 0)} from CMP Rs {VALUATION.price:,.0f})', '', ''],
         ['Key Bull: Premium brand portfolio (LP, VH, AS, PE) + 3,300 stores', '', ''],
         ['Key Bear: P/B 10.8x demanding, margins under pressure, newly listed', '', ''],
     ]
@@ -586,18 +583,7 @@ def build_pdf(chart_paths):
         ['Stores (cumulative)', '~3,095', '~3,130', '~3,225', '3,315'],
     ]
     qr_table = Table(qr_data, colWidths=[3.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
-    qr_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    qr_table.setStyle(table_style('header_grid_table'))
     story.append(qr_table)
     story.append(Spacer(1, 0.2*cm))
 
@@ -611,7 +597,7 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('Revenue & Profit Trend', subheading_style))
-    story.append(Image(chart_paths['revenue'], width=16*cm, height=8.5*cm))
+    story.append(chart_image(chart_paths['revenue'], width=16*cm, height=8.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('EBITDA Margin Improvement', subheading_style))
@@ -622,7 +608,7 @@ def build_pdf(chart_paths):
         'scale. Management has guided for overall EBITDA margins exceeding 18% by FY30.',
         body_style
     ))
-    story.append(Image(chart_paths['margins'], width=14*cm, height=7.5*cm))
+    story.append(chart_image(chart_paths['margins'], width=14*cm, height=7.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Segment Performance (Q3 FY26)', subheading_style))
@@ -632,17 +618,7 @@ def build_pdf(chart_paths):
         ['Emerging Businesses', '355', '+13.4% (19% ex-F21)', '790 bps expansion', 'Reebok, AE, VH Innerwear'],
     ]
     seg_table = Table(seg_data, colWidths=[3*cm, 2.5*cm, 2.5*cm, 2.5*cm, 4*cm])
-    seg_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    seg_table.setStyle(table_style('header_grid_table', valign=False))
     story.append(seg_table)
     story.append(Spacer(1, 0.2*cm))
 
@@ -653,7 +629,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['brands'], width=13*cm, height=9*cm))
+    story.append(chart_image(chart_paths['brands'], width=13*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Balance Sheet & Cash Flow', subheading_style))
@@ -691,18 +667,7 @@ def build_pdf(chart_paths):
         ['Source', 'Screener.in (only FY25 available \u2014 company incorporated 2025)'],
     ]
     cf_table = Table(cf_data, colWidths=[4.5*cm, 6*cm])
-    cf_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    cf_table.setStyle(table_style('header_grid_table'))
     story.append(cf_table)
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
@@ -723,18 +688,9 @@ def build_pdf(chart_paths):
         ['Public / Retail', '19.58%', '122.03 Cr shares outstanding (1:1 from ABFRL demerger)'],
     ]
     sh_table = Table(sh_data, colWidths=[4*cm, 2.5*cm, 9*cm])
+    sh_table.setStyle(table_style('header_grid_table'))
     sh_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (1, -1), 'CENTER'),
         ('ALIGN', (2, 0), (2, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(sh_table)
     story.append(Spacer(1, 0.2*cm))
@@ -804,7 +760,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['price'], width=16*cm, height=9*cm))
+    story.append(chart_image(chart_paths['price'], width=16*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Key Technical Signals', subheading_style))
@@ -820,19 +776,9 @@ def build_pdf(chart_paths):
         ['Resistance Zone', '\u20b9130\u2013135', 'Falling trendline resistance'],
         ['Key Breakout Level', '\u20b9135\u2013140', 'Would signal trend reversal'],
     ]
+    tech_data = fill_rows(tech_data, PRICES, currency='\u20b9')
     tech_table = Table(tech_data, colWidths=[3.5*cm, 3.5*cm, 8.5*cm])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    tech_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(tech_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -886,18 +832,10 @@ def build_pdf(chart_paths):
         ['Vedant Fashions', '31x', '~28x', '~1,450', 'Negative'],
     ]
     peer_table = Table(peer_data, colWidths=[2.8*cm, 2*cm, 2*cm, 2.5*cm, 3.5*cm])
+    peer_table.setStyle(table_style('header_grid_table', banded=False))
     peer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('BACKGROUND', (0, 1), (-1, 1), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
         ('ROWBACKGROUNDS', (0, 2), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(peer_table)
     story.append(Spacer(1, 0.2*cm))
@@ -908,7 +846,7 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    story.append(Image(chart_paths['peers'], width=16*cm, height=7*cm))
+    story.append(chart_image(chart_paths['peers'], width=16*cm, height=7*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Nifty Consumer Durables Index', subheading_style))
@@ -935,7 +873,7 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('Store Expansion Trajectory', subheading_style))
-    story.append(Image(chart_paths['stores'], width=14*cm, height=7*cm))
+    story.append(chart_image(chart_paths['stores'], width=14*cm, height=7*cm))
 
     story.append(Paragraph(
         'Sources: Market Research Future (apparel market), Smart-Investing.in (P/E data Jan 2026), '
@@ -963,17 +901,7 @@ def build_pdf(chart_paths):
         ['Consensus (9 analysts)', 'Buy', '160\u2013164', 'Avg target', 'Range: \u20b9138\u2013\u20b9180'],
     ]
     analyst_table = Table(analyst_data, colWidths=[2.8*cm, 2*cm, 1.5*cm, 3*cm, 5.5*cm])
-    analyst_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    analyst_table.setStyle(table_style('header_grid_table', valign=False))
     story.append(analyst_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1105,18 +1033,7 @@ def build_pdf(chart_paths):
         ['Sanity Check: Fwd P/E', '105 / 1.7 = ~62x', 'Roughly matches reported ~61x fwd PE'],
     ]
     eps_table = Table(eps_data, colWidths=[3.5*cm, 3.5*cm, 7.5*cm])
-    eps_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 3),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-    ]))
+    eps_table.setStyle(table_style('header_grid_table', font_size=7.5, align='LEFT', padding=3))
     story.append(eps_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1135,29 +1052,18 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    v = VALUATION
     proj_data = [
         ['', 'Bull', 'Base', 'Bear'],
-        ['FY26E PAT', '\u20b9200 Cr (strong H2)', '\u20b9170 Cr (norm.)', '\u20b9140 Cr (weak H2)'],
-        ['FY26E EPS', '\u20b91.64', '\u20b91.39', '\u20b91.15'],
-        ['FY27E PAT Growth', '+25% (HDFC CAGR)', '+15% (Morgan Stanley)', '+5% (margin compression)'],
-        ['FY27E EPS', '\u20b92.05', '\u20b91.60', '\u20b91.21'],
+        ['FY26E PAT'] + [f'\u20b9{pat:,.0f} Cr ({note})'
+                         for pat, note in zip(v.path[:, 1], ['strong H2', 'norm.', 'weak H2'])],
+        ['FY26E EPS'] + [f'\u20b9{eps:.2f}' for eps in v.per_share[:, 1]],
+        ['FY27E PAT Growth'] + [f'{g:+.0%} ({note})' for g, note in zip(
+            v.growth[:, 1], ['HDFC CAGR', 'Morgan Stanley', 'margin compression'])],
+        ['FY27E EPS'] + [f'\u20b9{eps:.2f}' for eps in v.per_share[:, 2]],
     ]
     proj_table = Table(proj_data, colWidths=[3.5*cm, 4*cm, 4*cm, 4*cm])
-    proj_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (1, 0), (1, -1), HexColor('#f0fff4')),
-        ('BACKGROUND', (2, 0), (2, -1), HexColor('#fffff0')),
-        ('BACKGROUND', (3, 0), (3, -1), HexColor('#fff5f5')),
-        ('TEXTCOLOR', (1, 0), (3, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    proj_table.setStyle(table_style('projection_table', font_size=7.5))
     story.append(proj_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1170,29 +1076,13 @@ def build_pdf(chart_paths):
     ))
 
     scenario_data = [
-        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', 'Return from \u20b9105', 'Probability'],
-        ['Bull', '\u20b92.05', '75\u201385x',
-         '\u20b9154\u2013174', '+47% to +66%', '20%'],
-        ['Base', '\u20b91.60', '60\u201370x',
-         '\u20b996\u2013112', '-9% to +7%', '50%'],
-        ['Bear', '\u20b91.21', '30\u201340x',
-         '\u20b936\u201348', '-54% to -65%', '30%'],
-    ]
+        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', f'Return from \u20b9{v.price:,.0f}', 'Probability'],
+    ] + [[name, f'\u20b9{eps:.2f}', multiple, target, ret, f'{p:.0%}']
+         for name, eps, multiple, target, ret, p in zip(
+             ['Bull', 'Base', 'Bear'], v.per_share[:, -1], multiple_cells(v, '\u2013'),
+             target_cells(v, '\u20b9', '\u2013'), return_cells(v), v.probability)]
     scenario_table = Table(scenario_data, colWidths=[1.8*cm, 2.2*cm, 2.2*cm, 2.8*cm, 3.3*cm, 2.5*cm])
-    scenario_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    scenario_table.setStyle(table_style('scenario_table'))
     story.append(scenario_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1222,32 +1112,36 @@ def build_pdf(chart_paths):
 
     ev_data = [
         ['Scenario', 'Midpoint Price', 'Probability', 'Weighted Value'],
-        ['Bull', '\u20b9164', '20%', '\u20b932.80'],
-        ['Base', '\u20b9104', '50%', '\u20b952.00'],
-        ['Bear', '\u20b942', '30%', '\u20b912.60'],
-        ['', '', 'Expected Value \u2192', '\u20b997'],
-    ]
+    ] + ev_rows(v, '\u20b9', 'Expected Value \u2192', digits=2)
     ev_table = Table(ev_data, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    ev_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('BACKGROUND', (0, 4), (-1, 4), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    ev_table.setStyle(table_style('scenario_table', font_size=9, total=True))
     story.append(ev_table)
     story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['simulation'], width=16*cm, height=8*cm))
+    story.append(Paragraph(describe(simulation(), '\u20b9'), source_style))
+    story.append(Spacer(1, 0.3*cm))
 
+    # Sensitivity grid
+    grid, coarse = sensitivity(), sensitivity(table=True)
+    story.append(Paragraph('<b>Sensitivity: PAT Growth x P/E</b>', body_style))
+    story.append(chart_image(chart_paths['sensitivity'], width=15*cm, height=8.4*cm))
+    sens_data = table_rows(coarse, '\u20b9', corner='PAT growth / P/E')
+    sens_table = Table(sens_data, colWidths=[3*cm] + [2.4*cm] * (len(sens_data[0]) - 1))
+    sens_table.setStyle(table_style('sensitivity_table'))
+    sens_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(coarse)]))
+    story.append(sens_table)
     story.append(Paragraph(
-        '<b>Probability-weighted expected price: \u20b997</b> \u2014 implying ~8% downside from \u20b9105. '
+        f'Green cells are above the current price of \u20b9{v.price:,.0f}. Rows compound PAT growth '
+        f'for {grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
+    story.append(Paragraph(
+        f'<b>Probability-weighted expected price: \u20b9{v.expected:,.0f}</b> \u2014 implying '
+        f'~{upside(v.expected_return, 0)} from \u20b9{v.price:,.0f}. '
         'This is essentially a <b>hold/fair value</b> signal, suggesting the stock is approximately '
         'fairly priced at current levels when risk-adjusted. The analyst targets of \u20b9159\u2013190 '
         'are significantly more optimistic, reflecting their base/bull case views without probability weighting.',
@@ -1258,20 +1152,52 @@ def build_pdf(chart_paths):
 
     # EV/EBITDA Cross-Check
     story.append(Paragraph('EV/EBITDA Cross-Check (Morgan Stanley Methodology)', subheading_style))
+    lo_ebitda, hi_ebitda = EBITDA_FY27E
+    at = lambda m: ev_ebitda(table=True).target[[1, 2], ev_ebitda(table=True).multiple.tolist().index(m)]
     story.append(Paragraph(
         'Morgan Stanley values ABLBL at <b>13x FY27E EV/EBITDA</b>, arriving at a target of \u20b9175. '
         'Let us validate this:\n'
-        '\u2022 FY27E EBITDA estimate (at 10% CAGR on TTM rev + improving margins): ~\u20b91,600\u20131,700 Cr.\n'
-        '\u2022 At 13x EV/EBITDA: EV = \u20b920,800\u201322,100 Cr.\n'
-        '\u2022 Less net debt (~\u20b9500 Cr by FY27E): Equity value = \u20b920,300\u201321,600 Cr.\n'
-        '\u2022 Per share (122 Cr shares): \u20b9166\u2013177/share.\n'
+        '\u2022 FY27E EBITDA estimate (at 10% CAGR on TTM rev + improving margins): '
+        f'~\u20b9{lo_ebitda:,}\u2013{hi_ebitda:,} Cr.\n'
+        f'\u2022 At 13x EV/EBITDA: EV = \u20b9{lo_ebitda * 13:,}\u2013{hi_ebitda * 13:,} Cr.\n'
+        f'\u2022 Less net debt (~\u20b9{NET_DEBT} Cr by FY27E): Equity value = '
+        f'\u20b9{lo_ebitda * 13 - NET_DEBT:,}\u2013{hi_ebitda * 13 - NET_DEBT:,} Cr.\n'
+        f'\u2022 Per share ({SHARES:.0f} Cr shares): \u20b9{at(13)[0]:.0f}\u2013{at(13)[1]:.0f}/share.\n'
         '\u2022 This is close to Morgan Stanley\'s target of \u20b9175. \u2713\n\n'
         'However, 13x EV/EBITDA is well below the 37x average for discretionary retail peers in Morgan '
         'Stanley\'s coverage. If the market values ABLBL closer to peers (20\u201325x), the target would be '
-        '\u20b9250\u2013300+. Conversely, if execution disappoints and the stock trades at 8\u201310x, '
-        'fair value would be \u20b990\u2013120.',
+        f'\u20b9{at(20)[0]:.0f}\u2013{at(25)[1]:.0f}. Conversely, if execution disappoints and the stock '
+        f'trades at 8\u201310x, fair value would be \u20b9{at(8)[0]:.0f}\u2013{at(10)[1]:.0f}.',
+        body_style
+    ))
+    b = ev_bridge()
+    story.append(Paragraph(
+        f'<b>Where it trades today:</b> at \u20b9{b.price[-1]:,.0f}, EV is \u20b9{b.ev[-1]:,.0f} Cr, '
+        f'{b.ev_ebitda[-1]:.1f}x trailing EBITDA of \u20b9{b.ebitda[-1]:,.0f} Cr and {b.ev_sales[-1]:.2f}x '
+        f'trailing sales. The 13x above applies to FY27E EBITDA; on trailing EBITDA the stock trades '
+        f'{"above" if b.ev_ebitda[-1] > 13 else "below"} that multiple today.',
         body_style
     ))
+    bridge_data = [['EV Bridge', 'Value', 'Working']] + bridge_rows(b, currency='\u20b9')
+    bridge_table = Table(bridge_data, colWidths=[4.5*cm, 3*cm, 7*cm])
+    bridge_table.setStyle(table_style('header_grid_table', align='LEFT'))
+    story.append(bridge_table)
+    story.append(Paragraph(
+        f'Inputs: {DATA["enterprise"]["basis"][-1]} ({b.periods[-1]}); trailing revenue and EBITDA are '
+        'the four quarters to Q3 FY26. With lease liabilities excluded, EV/EBITDA (EBITDA is before rent '
+        'under Ind AS 116) is understated.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.2*cm))
+    story.append(chart_image(chart_paths['ev_ebitda'], width=15*cm, height=8.4*cm))
+    cross_data = table_rows(ev_ebitda(table=True), '\u20b9', row_format='\u20b9{:,.0f} Cr',
+                            corner='EBITDA / EV/EBITDA')
+    cross_table = Table(cross_data, colWidths=[3.4*cm] + [2.1*cm] * (len(cross_data[0]) - 1))
+    cross_table.setStyle(table_style('sensitivity_table'))
+    cross_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(ev_ebitda(table=True))]))
+    story.append(cross_table)
+    story.append(Spacer(1, 0.3*cm))
 
     # Methodology limitations
     story.append(Paragraph('Methodology Limitations (Transparency Note)', subheading_style))
@@ -1305,7 +1231,8 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        '<b>However, our probability-weighted expected value of \u20b997 is below the CMP of \u20b9105, '
+        f'<b>However, our probability-weighted expected value of \u20b9{VALUATION.expected:,.0f} is below '
+        f'the CMP of \u20b9{VALUATION.price:,.0f}, '
         'which does not support an ACCUMULATE rating.</b> Verdict: <b>HOLD / NEUTRAL.</b> '
         'The analyst consensus target of \u20b9159\u2013164 (\u20b9138\u2013190 range) suggests meaningful '
         'upside (50%+) if execution sustains, and HDFC Securities targets \u20b9180 using 25x Sep-27 '
@@ -1355,21 +1282,29 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    doc.build(story)
+    profiling.build(doc, story)
     print(f"PDF generated successfully: {FINAL_PDF}")
 
 
 # --- Main ---
+CHARTS = {
+    'revenue': create_revenue_chart,
+    'margins': create_margin_chart,
+    'brands': create_brand_chart,
+    'price': create_price_chart,
+    'peers': create_peer_chart,
+    'stores': create_store_chart,
+    'simulation': create_simulation_chart,
+    'sensitivity': create_sensitivity_chart,
+    'ev_ebitda': create_ev_ebitda_chart,
+}
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Generating charts...")
-    charts = {
-        'revenue': create_revenue_chart(),
-        'margins': create_margin_chart(),
-        'brands': create_brand_chart(),
-        'price': create_price_chart(),
-        'peers': create_peer_chart(),
-        'stores': create_store_chart(),
-    }
+    charts = render_charts(CHARTS, jobs=args.jobs, cache=args.cache, in_memory=args.in_memory,
+                           vector=args.vector)
+    profiling.mark('charts')
     print(f"Charts created ({len(charts)} total). Building PDF...")
     build_pdf(charts)
     print("Done!")
@@ -4,33 +4,34 @@ Bikaji Foods International — 1-Year Stock Research Report
 Generated: February 3, 2026
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
+import functools
 import os
+import sys
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch, cm
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
-)
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# Register SFNS (San Francisco) for ₹ symbol support
-pdfmetrics.registerFont(TTFont('SFNS', '/System/Library/Fonts/SFNS.ttf'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stocklib import profiling
+
+import numpy as np
+
+from stocklib.datastore import open_store
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, parse_args, render_charts, save_figure
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, ticker_grid
+from stocklib.technicals import fill_rows
+from stocklib.valuation import (ev_rows, growth_cells, multiple_cells, return_cells, step_cells,
+                                target_cells, ticker_valuation, upside)
+profiling.mark('imports')
 
 # ─── Configuration ───
 OUTPUT_DIR = "/private/tmp/claude-501/-Users-arpitvyas-Desktop/5d9dbbf9-1c21-45f2-abcc-034b23508d8c/scratchpad"
 FINAL_PDF = "/Users/arpitvyas/Desktop/Bikaji_Foods_Research_Report_Feb2026.pdf"
+TICKER = 'BIKAJI'
+DATA = open_store().ticker(TICKER)
+PRICES = PriceHistory(TICKER)
+VALUATION = ticker_valuation(DATA, multiple_low=(55, 50, 40))
 
 # Colors
 PRIMARY = '#1a365d'      # Dark navy
@@ -40,25 +41,31 @@ GREEN = '#38a169'        # Green for positive
 LIGHT_BG = '#f7fafc'     # Light background
 ORANGE = '#dd6b20'
 
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 10,
-    'axes.titlesize': 12,
-    'axes.labelsize': 10,
-    'figure.facecolor': 'white',
-    'axes.facecolor': '#f8f9fa',
-    'axes.grid': True,
-    'grid.alpha': 0.3,
-    'grid.color': '#cccccc',
-})
+# ─── Model Outputs ───
+# Computed on first use and cached, so importing the script for its data
+# (batch, bench, template) runs no simulation or grid
+@functools.lru_cache(maxsize=None)
+def simulation():
+    """Monte Carlo value distribution (stocklib.montecarlo)."""
+    return ticker_simulation(DATA, multiple_low=(55, 50, 40))
+
+
+@functools.lru_cache(maxsize=None)
+def sensitivity(table=False):
+    """Target grid for the heatmap, or the coarse one for the table (stocklib.sensitivity)."""
+    return ticker_grid(DATA, multiple_low=(55, 50, 40), table=table)
+
 
 # ─── Chart 1: Quarterly Revenue & PAT Trend ───
 def create_revenue_chart():
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26', 'Q3\nFY26']
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
     # Revenue in Cr (sourced from quarterly results)
-    revenue = [608, 635, 704, 741, 653, 815, 776]
+    revenue = q['revenue']
     # PAT in Cr
-    pat = [44, 52, 28, 54, 55, 78, 62]
+    pat = q['pat']
 
     fig, ax1 = plt.subplots(figsize=(8, 4))
     x = np.arange(len(quarters))
@@ -92,14 +99,13 @@ def create_revenue_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_revenue.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_revenue.png'))
 
 
 # ─── Chart 2: Segment Revenue Pie Chart ───
 def create_segment_chart():
+    import matplotlib.pyplot as plt
+
     labels = ['Ethnic Snacks\n(67.4%)', 'Packaged Sweets\n(11.5%)', 'Western Snacks\n(8.0%)',
               'Retail/Other\n(7.1%)', 'Papad\n(6.0%)']
     sizes = [67.4, 11.5, 8.0, 7.1, 6.0]
@@ -114,14 +120,21 @@ def create_segment_chart():
     ax.set_title('Q3 FY26 Revenue Mix by Segment', fontweight='bold', pad=15)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_segments.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_segments.png'))
 
 
 # ─── Chart 3: Price Action with Moving Averages ───
 def create_price_chart():
+    import matplotlib.pyplot as plt
+
+    if len(PRICES):
+        return daily_price_chart(
+            PRICES, 'Bikaji Foods — 1-Year Price Action & Key Moving Averages',
+            os.path.join(OUTPUT_DIR, 'chart_price.png'), currency='₹',
+            sma=(200,), ema=(50,),
+            zones=[(558, 600, 'green', 'Support Zone (₹558–600)'),
+                   (825, 864, 'red', 'Resistance Zone (₹825–864)')])
+
     # Monthly closing prices (approximate from known data points)
     months = ['Feb\n2025', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan\n2026']
     prices = [720, 690, 650, 580, 560, 620, 710, 780, 860, 820, 757, 660]
@@ -154,14 +167,13 @@ def create_price_chart():
                 fontsize=9, fontweight='bold', color=PRIMARY)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_price.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_price.png'))
 
 
 # ─── Chart 4: Peer Comparison ───
 def create_peer_chart():
+    import matplotlib.pyplot as plt
+
     categories = ['Revenue\n(₹ Cr)', 'EBITDA\nMargin (%)', 'Revenue\nGrowth (%)']
     bikaji = [2887, 12.5, 13]
     prataap = [1688, 2, -2]
@@ -196,17 +208,17 @@ def create_peer_chart():
 
     fig.suptitle('Bikaji vs Prataap Snacks — Listed Peer Comparison', fontweight='bold', fontsize=11, y=1.02)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_peers.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_peers.png'))
 
 
 # ─── Chart 5: EBITDA Margin Trend ───
 def create_margin_chart():
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26', 'Q3\nFY26']
-    ebitda_margin = [10.5, 11.0, 8.2, 10.8, 11.5, 13.0, 12.5]
-    gross_margin = [33.5, 34.0, 32.5, 34.5, 35.0, 35.5, 35.0]
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
+    ebitda_margin = q['ebitda_margin']
+    gross_margin = q['gross_margin']
 
     fig, ax = plt.subplots(figsize=(7, 3.5))
     x = np.arange(len(quarters))
@@ -227,14 +239,42 @@ def create_margin_chart():
         ax.annotate(f'{em}%', (i, em), textcoords="offset points", xytext=(0, 8), fontsize=7, ha='center', color=GREEN)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_margins.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_margins.png'))
+
+
+# ─── Chart 6: Monte Carlo Value Distribution ───
+def create_simulation_chart():
+    """Distribution of 12-month values around the scenario EV (stocklib.montecarlo)."""
+    return histogram_chart(simulation(), 'Bikaji Foods — Monte Carlo Value Distribution',
+                           os.path.join(OUTPUT_DIR, 'chart_simulation.png'), currency='₹',
+                           expected=VALUATION.expected)
+
+
+# ─── Chart 7: Sensitivity Grid ───
+def create_sensitivity_chart():
+    """Target price over the EPS growth x P/E plane (stocklib.sensitivity)."""
+    grid = sensitivity()
+    return heatmap_chart(grid, 'Bikaji Foods — Target Sensitivity: EPS Growth x P/E',
+                         os.path.join(OUTPUT_DIR, 'chart_sensitivity.png'), currency='₹',
+                         row_label='EPS growth (CAGR)', multiple_label='P/E',
+                         marker=(grid.base_growth, grid.base_multiple, 'Base case'))
 
 
 # ─── PDF Generation ───
 def build_pdf(chart_paths):
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    from stocklib.fonts import register_fonts
+    from stocklib.styles import paragraph_style, table_style
+
+    # Register SFNS (San Francisco) for ₹ symbol support
+    register_fonts()
+
     doc = SimpleDocTemplate(
         FINAL_PDF,
         pagesize=A4,
@@ -244,69 +284,17 @@ def build_pdf(chart_paths):
         rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Title'],
-        fontSize=20, textColor=HexColor(PRIMARY),
-        spaceAfter=6, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle', parent=styles['Normal'],
-        fontSize=11, textColor=HexColor('#4a5568'),
-        spaceAfter=12, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading', parent=styles['Heading1'],
-        fontSize=14, textColor=HexColor(PRIMARY),
-        spaceBefore=16, spaceAfter=8,
-        fontName='SFNS',
-        borderWidth=0, borderPadding=0,
-    )
-    subheading_style = ParagraphStyle(
-        'CustomSubheading', parent=styles['Heading2'],
-        fontSize=11, textColor=HexColor(ACCENT),
-        spaceBefore=10, spaceAfter=4,
-        fontName='SFNS'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=9, leading=13,
-        textColor=HexColor('#2d3748'),
-        spaceAfter=6, alignment=TA_JUSTIFY,
-        fontName='SFNS'
-    )
-    bullet_style = ParagraphStyle(
-        'CustomBullet', parent=body_style,
-        leftIndent=15, bulletIndent=5,
-        spaceAfter=3, fontSize=9
-    )
-    source_style = ParagraphStyle(
-        'SourceStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#718096'),
-        spaceAfter=4, fontName='SFNS'
-    )
-    disclaimer_style = ParagraphStyle(
-        'DisclaimerStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#a0aec0'),
-        spaceBefore=8, spaceAfter=4,
-        fontName='SFNS', alignment=TA_CENTER
-    )
-    callout_green = ParagraphStyle(
-        'CalloutGreen', parent=body_style,
-        backColor=HexColor('#f0fff4'), borderWidth=1,
-        borderColor=HexColor(GREEN), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_red = ParagraphStyle(
-        'CalloutRed', parent=body_style,
-        backColor=HexColor('#fff5f5'), borderWidth=1,
-        borderColor=HexColor(HIGHLIGHT), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
+    # Shared styles (stocklib.styles)
+    title_style = paragraph_style('title')
+    subtitle_style = paragraph_style('subtitle')
+    heading_style = paragraph_style('heading')
+    subheading_style = paragraph_style('subheading')
+    body_style = paragraph_style('body')
+    bullet_style = paragraph_style('bullet')
+    source_style = paragraph_style('source')
+    disclaimer_style = paragraph_style('disclaimer')
+    callout_green = paragraph_style('callout_green')
+    callout_red = paragraph_style('callout_red')
 
     story = []
 
@@ -317,10 +305,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.5*cm))
     story.append(HRFlowable(width="80%", thickness=2, color=HexColor(PRIMARY)))
     story.append(Spacer(1, 0.5*cm))
-    story.append(Paragraph('1-Year Stock Research Report', ParagraphStyle(
-        'BigSub', parent=subtitle_style, fontSize=16, textColor=HexColor(ACCENT),
-        fontName='SFNS'
-    )))
+    story.append(Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle')))
     story.append(Paragraph('Outlook: February 2026 → February 2027', subtitle_style))
     story.append(Spacer(1, 1*cm))
 
@@ -333,19 +318,7 @@ def build_pdf(chart_paths):
         ['Borrowings', '₹171 Cr', 'Promoter Holding', '73.92%'],
     ]
     metrics_table = Table(metrics_data, colWidths=[3.5*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#edf2f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor(PRIMARY)),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTNAME', (1, 0), (1, -1), 'SFNS'),
-        ('FONTNAME', (3, 0), (3, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    metrics_table.setStyle(table_style('metrics_table'))
     story.append(metrics_table)
     story.append(Spacer(1, 1*cm))
 
@@ -423,18 +396,8 @@ def build_pdf(chart_paths):
         ['ROE', '17%', '17%', '19%', '16%'],
     ]
     growth_table = Table(growth_data, colWidths=[3.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
+    growth_table.setStyle(table_style('header_grid_table'))
     growth_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
         ('TEXTCOLOR', (4, 1), (4, 1), HexColor(GREEN)),
         ('TEXTCOLOR', (4, 2), (4, 2), HexColor(HIGHLIGHT)),
     ]))
@@ -456,7 +419,7 @@ def build_pdf(chart_paths):
         body_style
     ))
     # Revenue chart
-    story.append(Image(chart_paths['revenue'], width=16*cm, height=8*cm))
+    story.append(chart_image(chart_paths['revenue'], width=16*cm, height=8*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Margin Improvement', subheading_style))
@@ -466,7 +429,7 @@ def build_pdf(chart_paths):
         'at ~35% including PLI benefits. Management guides for sustained EBITDA margins in the 12-14% range.',
         body_style
     ))
-    story.append(Image(chart_paths['margins'], width=14*cm, height=7*cm))
+    story.append(chart_image(chart_paths['margins'], width=14*cm, height=7*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Segment Performance', subheading_style))
@@ -477,7 +440,7 @@ def build_pdf(chart_paths):
         'timing shift (early Diwali fell in Q2 this year vs Q3 last year).',
         body_style
     ))
-    story.append(Image(chart_paths['segments'], width=12*cm, height=9*cm))
+    story.append(chart_image(chart_paths['segments'], width=12*cm, height=9*cm))
 
     story.append(Paragraph('Balance Sheet & Cash Flow', subheading_style))
     story.append(Paragraph(
@@ -512,19 +475,9 @@ def build_pdf(chart_paths):
         ['Public / Retail', '4.54%', '1,19,954 shareholders'],
     ]
     sh_table = Table(sh_data, colWidths=[4*cm, 2.5*cm, 9*cm])
+    sh_table.setStyle(table_style('header_grid_table'))
     sh_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (1, -1), 'CENTER'),
         ('ALIGN', (2, 0), (2, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(sh_table)
     story.append(Spacer(1, 0.3*cm))
@@ -571,7 +524,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['price'], width=16*cm, height=9*cm))
+    story.append(chart_image(chart_paths['price'], width=16*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Key Technical Signals', subheading_style))
@@ -587,20 +540,9 @@ def build_pdf(chart_paths):
         ['Support Zone', '₹558.80–600', 'Strong floor from 52-week low'],
         ['Resistance Zone', '₹818–864', 'Previous highs, needs volume to break'],
     ]
+    tech_data = fill_rows(tech_data, PRICES, currency='₹')
     tech_table = Table(tech_data, colWidths=[3.5*cm, 3*cm, 9*cm])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    tech_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(tech_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -646,25 +588,15 @@ def build_pdf(chart_paths):
         ['Key Strength', 'Scale + brand', 'Bhujia + growth', 'Chips category'],
     ]
     peer_table = Table(peer_data, colWidths=[3.2*cm, 3.8*cm, 3.8*cm, 3.8*cm])
+    peer_table.setStyle(table_style('header_grid_table', padding=5, banded=False))
     peer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('BACKGROUND', (0, 0), (0, -1), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 0), (0, -1), 'SFNS'),
-        ('FONTNAME', (1, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
         ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
     ]))
     story.append(peer_table)
     story.append(Spacer(1, 0.3*cm))
 
-    story.append(Image(chart_paths['peers'], width=16*cm, height=6.5*cm))
+    story.append(chart_image(chart_paths['peers'], width=16*cm, height=6.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph(
@@ -687,19 +619,9 @@ def build_pdf(chart_paths):
         ['FMCG Sector Avg', '~48x', '—', '—', 'Nifty FMCG index avg'],
     ]
     pe_table = Table(pe_data, colWidths=[3*cm, 2.2*cm, 2.8*cm, 2.2*cm, 5*cm])
+    pe_table.setStyle(table_style('header_grid_table', font_size=7.5))
     pe_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
         ('BACKGROUND', (0, 2), (-1, 2), HexColor('#edf2f7')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(pe_table)
     story.append(Spacer(1, 0.3*cm))
@@ -762,18 +684,7 @@ def build_pdf(chart_paths):
         ['Range (all sources)', '₹800 – ₹1,018', '—', 'Investing.com, Alpha Spread, TradingView'],
     ]
     analyst_table = Table(analyst_data, colWidths=[3.8*cm, 2.2*cm, 2.2*cm, 6.5*cm])
-    analyst_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    analyst_table.setStyle(table_style('header_grid_table', font_size=9, padding=5, valign=False))
     story.append(analyst_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -944,19 +855,7 @@ def build_pdf(chart_paths):
         ['Sanity Check: P/E', '660 ÷ 9.50 = 69.5x', 'Matches reported 67-69x ✓'],
     ]
     eps_table = Table(eps_data, colWidths=[3.5*cm, 4.5*cm, 6.5*cm])
-    eps_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    eps_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(eps_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -967,31 +866,16 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    v = VALUATION
     proj_data = [
         ['', 'Bull', 'Base', 'Bear'],
-        ['FY26E Profit Growth', '43% (Trendlyne est.)', '27% (Emkay CAGR)', '10% (slowdown)'],
-        ['FY26E EPS', '₹9.50 × 1.43 = ₹13.57', '₹9.50 × 1.27 = ₹12.07', '₹9.50 × 1.10 = ₹10.45'],
-        ['FY27E Profit Growth', '27% (sustained)', '27% (Emkay CAGR)', '10% (continued)'],
-        ['FY27E EPS', '₹13.57 × 1.27 = ₹17.23', '₹12.07 × 1.27 = ₹15.33', '₹10.45 × 1.10 = ₹11.50'],
+        ['FY26E Profit Growth'] + growth_cells(v, 0, ['Trendlyne est.', 'Emkay CAGR', 'slowdown']),
+        ['FY26E EPS'] + step_cells(v.per_share, v.steps, 0, '₹', '×'),
+        ['FY27E Profit Growth'] + growth_cells(v, 1, ['sustained', 'Emkay CAGR', 'continued']),
+        ['FY27E EPS'] + step_cells(v.per_share, v.steps, 1, '₹', '×'),
     ]
     proj_table = Table(proj_data, colWidths=[3.5*cm, 4.5*cm, 4.5*cm, 4*cm])
-    proj_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (1, 0), (1, -1), HexColor('#f0fff4')),
-        ('BACKGROUND', (2, 0), (2, -1), HexColor('#fffff0')),
-        ('BACKGROUND', (3, 0), (3, -1), HexColor('#fff5f5')),
-        ('TEXTCOLOR', (1, 0), (3, 0), white),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 0), (0, -1), 'SFNS'),
-        ('FONTNAME', (1, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    proj_table.setStyle(table_style('projection_table', font_size=7.5))
     story.append(proj_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1004,31 +888,13 @@ def build_pdf(chart_paths):
 
     # Scenario boxes with full math
     scenario_data = [
-        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', 'Return from ₹660', 'Probability'],
-        ['Bull', '₹17.23', '55–60x',
-         '₹948–1,034', '+44% to +57%', '20%'],
-        ['Base', '₹15.33', '50–55x',
-         '₹767–843', '+16% to +28%', '55%'],
-        ['Bear', '₹11.50', '40–45x',
-         '₹460–518', '-22% to -30%', '25%'],
-    ]
+        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', f'Return from ₹{v.price:,.0f}', 'Probability'],
+    ] + [[name, f'₹{eps:.2f}', multiple, target, ret, f'{p:.0%}']
+         for name, eps, multiple, target, ret, p in zip(
+             ['Bull', 'Base', 'Bear'], v.per_share[:, -1], multiple_cells(v, '–'),
+             target_cells(v, '₹', '–'), return_cells(v), v.probability)]
     scenario_table = Table(scenario_data, colWidths=[1.8*cm, 2.3*cm, 2.3*cm, 2.8*cm, 3.3*cm, 2.5*cm])
-    scenario_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 1), (0, -1), 'SFNS'),
-        ('FONTNAME', (1, 1), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    scenario_table.setStyle(table_style('scenario_table'))
     story.append(scenario_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1056,35 +922,36 @@ def build_pdf(chart_paths):
 
     ev_data = [
         ['Scenario', 'Midpoint Price', 'Probability', 'Weighted Value'],
-        ['Bull', '₹991', '20%', '₹198'],
-        ['Base', '₹805', '55%', '₹443'],
-        ['Bear', '₹489', '25%', '₹122'],
-        ['', '', 'Expected Value →', '₹763'],
-    ]
+    ] + ev_rows(v, '₹', 'Expected Value →')
     ev_table = Table(ev_data, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    ev_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('BACKGROUND', (0, 4), (-1, 4), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, 0), 'SFNS'),
-        ('FONTNAME', (0, 4), (-1, 4), 'SFNS'),
-        ('FONTNAME', (0, 1), (0, 3), 'SFNS'),
-        ('FONTNAME', (1, 1), (-1, 3), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    ev_table.setStyle(table_style('scenario_table', font_size=9, total=True))
     story.append(ev_table)
     story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['simulation'], width=16*cm, height=8*cm))
+    story.append(Paragraph(describe(simulation(), '₹'), source_style))
+    story.append(Spacer(1, 0.3*cm))
 
+    # Sensitivity grid
+    grid, coarse = sensitivity(), sensitivity(table=True)
+    story.append(Paragraph('<b>Sensitivity: EPS Growth x P/E</b>', body_style))
+    story.append(chart_image(chart_paths['sensitivity'], width=15*cm, height=8.4*cm))
+    sens_data = table_rows(coarse, '₹', corner='EPS growth / P/E')
+    sens_table = Table(sens_data, colWidths=[3*cm] + [2.4*cm] * (len(sens_data[0]) - 1))
+    sens_table.setStyle(table_style('sensitivity_table'))
+    sens_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(coarse)]))
+    story.append(sens_table)
     story.append(Paragraph(
-        '<b>Probability-weighted expected price: ₹763</b> — implying ~15.6% upside from ₹660. '
+        f'Green cells are above the current price of ₹{v.price:,.0f}. Rows compound EPS growth '
+        f'for {grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
+    story.append(Paragraph(
+        f'<b>Probability-weighted expected price: ₹{v.expected:,.0f}</b> — implying ~{upside(v.expected_return)} '
+        f'from ₹{v.price:,.0f}. '
         'This is a moderate expected return that reflects genuine upside potential tempered by '
         'non-trivial downside risks.',
         callout_green
@@ -1127,7 +994,8 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        'The <b>probability-weighted expected value of ₹763 implies ~15.6% upside</b> over 12 months. '
+        f'The <b>probability-weighted expected value of ₹{VALUATION.expected:,.0f} implies '
+        f'~{upside(VALUATION.expected_return)}</b> over 12 months. '
         'This is supported by 6/6 analyst Buy ratings (avg target ₹900) but tempered by a 25% bear '
         'probability driven by cash flow concerns, commodity risk, and Haldiram\'s IPO overhang. '
         'The key variable remains whether Bikaji can sustain 14-16% revenue growth while improving '
@@ -1171,20 +1039,27 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    doc.build(story)
+    profiling.build(doc, story)
     print(f"PDF generated successfully: {FINAL_PDF}")
 
 
 # ─── Main ───
+CHARTS = {
+    'revenue': create_revenue_chart,
+    'segments': create_segment_chart,
+    'price': create_price_chart,
+    'peers': create_peer_chart,
+    'margins': create_margin_chart,
+    'simulation': create_simulation_chart,
+    'sensitivity': create_sensitivity_chart,
+}
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Generating charts...")
-    charts = {
-        'revenue': create_revenue_chart(),
-        'segments': create_segment_chart(),
-        'price': create_price_chart(),
-        'peers': create_peer_chart(),
-        'margins': create_margin_chart(),
-    }
+    charts = render_charts(CHARTS, jobs=args.jobs, cache=args.cache, in_memory=args.in_memory,
+                           vector=args.vector)
+    profiling.mark('charts')
     print("Charts created. Building PDF...")
     build_pdf(charts)
     print("Done!")
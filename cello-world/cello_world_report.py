@@ -4,33 +4,36 @@ Cello World Limited — 1-Year Stock Research Report
 Generated: February 4, 2026
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
+import functools
 import os
+import sys
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch, cm
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
-)
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# Register SFNS (San Francisco) for rupee symbol support
-pdfmetrics.registerFont(TTFont('SFNS', '/System/Library/Fonts/SFNS.ttf'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stocklib import profiling
+
+import numpy as np
+
+from stocklib.datastore import open_store
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, parse_args, render_charts, save_figure
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, ticker_grid
+from stocklib.technicals import fill_rows
+from stocklib.valuation import (ev_rows, growth_cells, multiple_cells, return_cells, step_cells,
+                                target_cells, ticker_valuation, upside)
+from stocklib.workingcapital import cash_flow_rows, days_rows, red_flags, ticker_metrics
+profiling.mark('imports')
 
 # --- Configuration ---
 OUTPUT_DIR = "/Users/arpitvyas/Desktop/stock-analysis/cello-world"
 FINAL_PDF = "/Users/arpitvyas/Desktop/stock-analysis/cello-world/Cello_World_Research_Report_Feb2026.pdf"
+TICKER = 'CELLO'
+DATA = open_store().ticker(TICKER)
+PRICES = PriceHistory(TICKER)
+VALUATION = ticker_valuation(DATA)
+CASH = ticker_metrics(DATA)
 
 # Colors
 PRIMARY = '#1a365d'      # Dark navy
@@ -41,27 +44,33 @@ LIGHT_BG = '#f7fafc'     # Light background
 ORANGE = '#dd6b20'
 PURPLE = '#805ad5'
 
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 10,
-    'axes.titlesize': 12,
-    'axes.labelsize': 10,
-    'figure.facecolor': 'white',
-    'axes.facecolor': '#f8f9fa',
-    'axes.grid': True,
-    'grid.alpha': 0.3,
-    'grid.color': '#cccccc',
-})
+
+# === Model Outputs ===
+# Computed on first use and cached, so importing the script for its data
+# (batch, bench, template) runs no simulation or grid
+@functools.lru_cache(maxsize=None)
+def simulation():
+    """Monte Carlo value distribution (stocklib.montecarlo)."""
+    return ticker_simulation(DATA)
+
+
+@functools.lru_cache(maxsize=None)
+def sensitivity(table=False):
+    """Target grid for the heatmap, or the coarse one for the table (stocklib.sensitivity)."""
+    return ticker_grid(DATA, table=table)
 
 
 # === Chart 1: Quarterly Revenue & PAT Trend ===
 def create_revenue_chart():
     """Q1 FY25 through Q2 FY26 (latest available). Q3 FY26 not yet reported."""
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26']
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
     # Revenue in Cr (consolidated, sourced from Business Standard / Screener.in / Trendlyne)
-    revenue = [500.66, 490.06, 556.86, 588.82, 529.01, 587.44]
+    revenue = q['revenue']
     # PAT in Cr
-    pat = [82.58, 81.64, 86.61, 88.19, 73.02, 91.00]
+    pat = q['pat']
 
     fig, ax1 = plt.subplots(figsize=(8, 4))
     x = np.arange(len(quarters))
@@ -94,22 +103,22 @@ def create_revenue_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_revenue.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_revenue.png'))
 
 
 # === Chart 2: Margin Trend Lines (OPM contraction story) ===
 def create_margin_chart():
     """Operating margin contraction is the key story. Source: Screener.in / ICICI Direct / MarketsMojo."""
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26']
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
     # EBITDA margin (%) - consolidated
-    ebitda_margin = [26.0, 26.9, 25.5, 26.0, 22.2, 24.0]
+    ebitda_margin = q['ebitda_margin']
     # OPM excl other income (%)
-    opm_excl = [24.5, 24.2, 23.8, 24.0, 20.4, 21.7]
+    opm_excl = q['opm']
     # PAT margin (%)
-    pat_margin = [16.5, 16.7, 15.6, 15.0, 13.8, 14.6]
+    pat_margin = q['pat_margin']
 
     fig, ax = plt.subplots(figsize=(7, 4))
     x = np.arange(len(quarters))
@@ -136,15 +145,14 @@ def create_margin_chart():
                 fontsize=9, fontweight='bold', color=HIGHLIGHT)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_margins.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_margins.png'))
 
 
 # === Chart 3: Segment Revenue Pie Chart ===
 def create_segment_chart():
     """Q2 FY26 segment breakdown. Source: Earnings call, Trendlyne."""
+    import matplotlib.pyplot as plt
+
     labels = ['Consumerware\n(Houseware+Glass)\n(72%)', 'Writing\nInstruments\n(14%)',
               'Moulded\nFurniture\n(14%)']
     sizes = [72, 14, 14]
@@ -168,16 +176,23 @@ def create_segment_chart():
              ha='center', fontsize=7, style='italic', color='#666666')
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_segments.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_segments.png'))
 
 
 # === Chart 4: Price Action with Moving Averages ===
 def create_price_chart():
     """Monthly closing prices approximated from known data points.
     Sources: Yahoo Finance, Investing.com, NSE India."""
+    import matplotlib.pyplot as plt
+
+    if len(PRICES):
+        return daily_price_chart(
+            PRICES, 'Cello World \u2014 1-Year Price Action & Key Moving Averages',
+            os.path.join(OUTPUT_DIR, 'chart_price.png'), currency='\u20b9',
+            sma=(200,), ema=(50,),
+            zones=[(490, 510, 'green', 'Support Zone (\u20b9490\u2013510)'),
+                   (690, 710, 'red', 'Resistance Zone (\u20b9690\u2013710)')])
+
     months = ['Feb\n2025', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan\n2026']
     # Approximate monthly close prices
     prices = [590, 620, 650, 680, 700, 660, 620, 570, 550, 565, 540, 505]
@@ -217,15 +232,14 @@ def create_price_chart():
                 fontsize=8, color=HIGHLIGHT)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_price.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_price.png'))
 
 
 # === Chart 5: Peer Comparison Bars ===
 def create_peer_chart():
     """Listed peer comparison. Source: Screener.in, Smart-Investing.in, Kotak Securities, Motilal Oswal."""
+    import matplotlib.pyplot as plt
+
     companies = ['Cello\nWorld', 'Borosil\nLtd', 'Flair\nWriting', 'Linc\nLtd', 'La Opala\nRG']
 
     fig, axes = plt.subplots(1, 3, figsize=(10, 3.5))
@@ -263,14 +277,42 @@ def create_peer_chart():
 
     fig.suptitle('Cello World vs Listed Peers \u2014 Valuation & Returns Comparison', fontweight='bold', fontsize=11, y=1.02)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_peers.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_peers.png'))
+
+
+# === Chart 6: Monte Carlo Value Distribution ===
+def create_simulation_chart():
+    """Distribution of 12-month values around the scenario EV (stocklib.montecarlo)."""
+    return histogram_chart(simulation(), 'Cello World \u2014 Monte Carlo Value Distribution',
+                           os.path.join(OUTPUT_DIR, 'chart_simulation.png'), currency='\u20b9',
+                           expected=VALUATION.expected)
+
+
+# === Chart 7: Sensitivity Grid ===
+def create_sensitivity_chart():
+    """Target price over the EPS growth x P/E plane (stocklib.sensitivity)."""
+    grid = sensitivity()
+    return heatmap_chart(grid, 'Cello World \u2014 Target Sensitivity: EPS Growth x P/E',
+                         os.path.join(OUTPUT_DIR, 'chart_sensitivity.png'), currency='\u20b9',
+                         row_label='EPS growth (CAGR)', multiple_label='P/E',
+                         marker=(grid.base_growth, grid.base_multiple, 'Base case'))
 
 
 # === PDF Generation ===
 def build_pdf(chart_paths):
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    from stocklib.fonts import register_fonts
+    from stocklib.styles import paragraph_style, table_style
+
+    # Register SFNS (San Francisco) for rupee symbol support
+    register_fonts()
+
     doc = SimpleDocTemplate(
         FINAL_PDF,
         pagesize=A4,
@@ -280,69 +322,17 @@ def build_pdf(chart_paths):
         rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Title'],
-        fontSize=20, textColor=HexColor(PRIMARY),
-        spaceAfter=6, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle', parent=styles['Normal'],
-        fontSize=11, textColor=HexColor('#4a5568'),
-        spaceAfter=12, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading', parent=styles['Heading1'],
-        fontSize=14, textColor=HexColor(PRIMARY),
-        spaceBefore=16, spaceAfter=8,
-        fontName='SFNS',
-        borderWidth=0, borderPadding=0,
-    )
-    subheading_style = ParagraphStyle(
-        'CustomSubheading', parent=styles['Heading2'],
-        fontSize=11, textColor=HexColor(ACCENT),
-        spaceBefore=10, spaceAfter=4,
-        fontName='SFNS'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=9, leading=13,
-        textColor=HexColor('#2d3748'),
-        spaceAfter=6, alignment=TA_JUSTIFY,
-        fontName='SFNS'
-    )
-    bullet_style = ParagraphStyle(
-        'CustomBullet', parent=body_style,
-        leftIndent=15, bulletIndent=5,
-        spaceAfter=3, fontSize=9
-    )
-    source_style = ParagraphStyle(
-        'SourceStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#718096'),
-        spaceAfter=4, fontName='SFNS'
-    )
-    disclaimer_style = ParagraphStyle(
-        'DisclaimerStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#a0aec0'),
-        spaceBefore=8, spaceAfter=4,
-        fontName='SFNS', alignment=TA_CENTER
-    )
-    callout_green = ParagraphStyle(
-        'CalloutGreen', parent=body_style,
-        backColor=HexColor('#f0fff4'), borderWidth=1,
-        borderColor=HexColor(GREEN), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_red = ParagraphStyle(
-        'CalloutRed', parent=body_style,
-        backColor=HexColor('#fff5f5'), borderWidth=1,
-        borderColor=HexColor(HIGHLIGHT), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
+    # Shared styles (stocklib.styles)
+    title_style = paragraph_style('title')
+    subtitle_style = paragraph_style('subtitle')
+    heading_style = paragraph_style('heading')
+    subheading_style = paragraph_style('subheading')
+    body_style = paragraph_style('body')
+    bullet_style = paragraph_style('bullet')
+    source_style = paragraph_style('source')
+    disclaimer_style = paragraph_style('disclaimer')
+    callout_green = paragraph_style('callout_green')
+    callout_red = paragraph_style('callout_red')
 
     story = []
 
@@ -355,10 +345,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.5*cm))
     story.append(HRFlowable(width="80%", thickness=2, color=HexColor(PRIMARY)))
     story.append(Spacer(1, 0.5*cm))
-    story.append(Paragraph('1-Year Stock Research Report', ParagraphStyle(
-        'BigSub', parent=subtitle_style, fontSize=16, textColor=HexColor(ACCENT),
-        fontName='SFNS'
-    )))
+    story.append(Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle')))
     story.append(Paragraph('Outlook: February 2026 \u2192 February 2027', subtitle_style))
     story.append(Spacer(1, 1*cm))
 
@@ -371,23 +358,14 @@ def build_pdf(chart_paths):
         ['Debt', 'Nearly Debt-Free', 'Promoter Holding', '75.0%'],
     ]
     metrics_table = Table(metrics_data, colWidths=[3.5*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#edf2f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor(PRIMARY)),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    metrics_table.setStyle(table_style('metrics_table'))
     story.append(metrics_table)
     story.append(Spacer(1, 0.5*cm))
 
     # Executive Summary Verdict Box
     verdict_data = [
-        ['VERDICT: ACCUMULATE | Expected Value: Rs 617 (approx 22% upside from CMP Rs 505)', '', ''],
+        [f'VERDICT: ACCUMULATE | Expected Value: Rs {VALUATION.expected:,.0f} '
+         f'(approx {upside(VALUATION.expected_return, 0)} from CMP Rs {VALUATION.price:,.0f})', '', ''],
         ['Key Bull: Nearly debt-free, ROCE 23.7%, capacity expansion in glass', '', ''],
         ['Key Bear: High working capital (245 days CCC), premium valuation at 33.6x P/E', '', ''],
     ]
@@ -496,18 +474,7 @@ def build_pdf(chart_paths):
         ['ROE (3Y Avg)', '35.7%', '\u2014', '\u2014', '\u2014'],
     ]
     growth_table = Table(growth_data, colWidths=[3.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
-    growth_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    growth_table.setStyle(table_style('header_grid_table'))
     story.append(growth_table)
     story.append(Spacer(1, 0.2*cm))
 
@@ -529,7 +496,7 @@ def build_pdf(chart_paths):
         'and PAT of \u20b9159 Cr (margin 14%). Q3 FY26 results (Dec 2025) are not yet published as of report date.',
         body_style
     ))
-    story.append(Image(chart_paths['revenue'], width=16*cm, height=8*cm))
+    story.append(chart_image(chart_paths['revenue'], width=16*cm, height=8*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Operating Margin Contraction \u2014 The Key Concern', subheading_style))
@@ -543,7 +510,7 @@ def build_pdf(chart_paths):
         'previous 26%+ margins may not return soon.',
         body_style
     ))
-    story.append(Image(chart_paths['margins'], width=14*cm, height=8*cm))
+    story.append(chart_image(chart_paths['margins'], width=14*cm, height=8*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Segment Performance (Q2 FY26)', subheading_style))
@@ -555,7 +522,7 @@ def build_pdf(chart_paths):
         '+8% YoY) but shows limited growth potential with contracting margins.',
         body_style
     ))
-    story.append(Image(chart_paths['segments'], width=12*cm, height=9*cm))
+    story.append(chart_image(chart_paths['segments'], width=12*cm, height=9*cm))
 
     story.append(Paragraph('Cash Flow Analysis \u2014 Standalone vs Consolidated Discrepancy', subheading_style))
     story.append(Paragraph(
@@ -586,25 +553,10 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.3*cm))
     story.append(Paragraph('Free Cash Flow (FCF) Analysis \u2014 Consolidated', subheading_style))
     cf_data = [
-        ['Year', 'CFO (Rs Cr)', 'Capex est (Rs Cr)', 'FCF est (Rs Cr)', 'Cash Conv.'],
-        ['FY22', '187', '~262', '-75', 'Low'],
-        ['FY23', '227', '~557', '-330', 'Low'],
-        ['FY24', '231', '~256', '-25', 'Low'],
-        ['FY25', '262', '~553', '-291', 'Low'],
-    ]
+        ['Year', 'CFO (Rs Cr)', 'Capex est (Rs Cr)', 'FCF est (Rs Cr)', 'CFO / PAT'],
+    ] + cash_flow_rows(CASH, capex_prefix='~')
     cf_table = Table(cf_data, colWidths=[2*cm, 2.8*cm, 2.8*cm, 2.8*cm, 4*cm])
-    cf_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    cf_table.setStyle(table_style('header_grid_table'))
     story.append(cf_table)
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
@@ -625,34 +577,26 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('Working Capital Days Decomposition', subheading_style))
-    wc_data = [
-        ['Metric', 'Mar 2025', 'Trend'],
-        ['Debtor Days', '112', 'Rising (concern)'],
-        ['Inventory Days', '186', 'Elevated'],
-        ['Days Payable', '53', 'Low'],
-        ['Cash Conversion Cycle', '~245 days', 'Elevated for consumer products (112+186-53)'],
-        ['Working Capital Days', '184', 'Up from 127 (significant deterioration)'],
-    ]
+    wc_data = [['Metric', 'Mar 2025', 'Trend']] + days_rows(CASH, notes={
+        'Debtor Days': 'Rising (concern)',
+        'Inventory Days': 'Elevated',
+        'Days Payable': 'Low',
+    })
     wc_table = Table(wc_data, colWidths=[4*cm, 3*cm, 8.5*cm])
-    wc_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    wc_table.setStyle(table_style('header_grid_table'))
     story.append(wc_table)
     story.append(Spacer(1, 0.2*cm))
+    wc = CASH[-1]
+    story.append(Paragraph(
+        f'<b>Working capital efficiency has deteriorated significantly</b> \u2014 WC days increased from '
+        f'{wc.wc_days - wc.wc_days_change:.0f} to {wc.wc_days:.0f} days. Cash Conversion Cycle is ~{wc.ccc:.0f} days '
+        f'(Debtor Days {wc.debtor_days:.0f} + Inventory Days {wc.inventory_days:.0f} - Days Payable {wc.payable_days:.0f}), '
+        f'which is elevated for consumer products. Rising debtor days ({wc.debtor_days:.0f}) suggest potential channel '
+        'stuffing or collection issues. Source: Screener.in (consolidated).',
+        callout_red
+    ))
     story.append(Paragraph(
-        '<b>Working capital efficiency has deteriorated significantly</b> \u2014 WC days increased from 127 to 184 days. '
-        'Cash Conversion Cycle is ~245 days (Debtor Days 112 + Inventory Days 186 - Days Payable 53), '
-        'which is elevated for consumer products. Rising debtor days (112) suggest potential channel stuffing or collection issues. '
-        'Source: Screener.in (consolidated).',
+        '<b>SOP red flags (cash conversion):</b><br/>' + '<br/>'.join(f'\u2022 {flag}' for flag in red_flags(CASH)),
         callout_red
     ))
     story.append(Spacer(1, 0.3*cm))
@@ -666,18 +610,9 @@ def build_pdf(chart_paths):
         ['Public / Retail', '6.22%', 'Low free float'],
     ]
     sh_table = Table(sh_data, colWidths=[4*cm, 2.5*cm, 9*cm])
+    sh_table.setStyle(table_style('header_grid_table'))
     sh_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (1, -1), 'CENTER'),
         ('ALIGN', (2, 0), (2, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(sh_table)
     story.append(Spacer(1, 0.3*cm))
@@ -729,7 +664,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['price'], width=16*cm, height=9*cm))
+    story.append(chart_image(chart_paths['price'], width=16*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Key Technical Signals', subheading_style))
@@ -745,19 +680,9 @@ def build_pdf(chart_paths):
         ['52-Week High', '\u20b9706', 'Would need 40%+ rally to retest'],
         ['Beta', '~0.8', 'Slightly less volatile than market'],
     ]
+    tech_data = fill_rows(tech_data, PRICES, currency='\u20b9')
     tech_table = Table(tech_data, colWidths=[3.5*cm, 3*cm, 9*cm])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    tech_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(tech_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -818,23 +743,15 @@ def build_pdf(chart_paths):
         ['Key Segment', 'Multi-category', 'Glassware', 'Writing instr.', 'Writing instr.', 'Opalware'],
     ]
     peer_table = Table(peer_data, colWidths=[2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
+    peer_table.setStyle(table_style('header_grid_table', font_size=7.5, banded=False))
     peer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('BACKGROUND', (0, 0), (0, -1), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
         ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(peer_table)
     story.append(Spacer(1, 0.3*cm))
 
-    story.append(Image(chart_paths['peers'], width=16*cm, height=6.5*cm))
+    story.append(chart_image(chart_paths['peers'], width=16*cm, height=6.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph(
@@ -886,17 +803,7 @@ def build_pdf(chart_paths):
         ['Investing.com (6 analysts)', '705', '\u2014', 'Low: N/A, High: \u20b9950'],
     ]
     analyst_table = Table(analyst_data, colWidths=[4*cm, 2*cm, 2*cm, 7.5*cm])
-    analyst_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    analyst_table.setStyle(table_style('header_grid_table', padding=5, valign=False))
     story.append(analyst_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1067,18 +974,7 @@ def build_pdf(chart_paths):
         ['Sanity Check: P/E', '505 / 16.52 = 30.6x', 'vs reported 33.6x (diff. due to trailing period) \u2713'],
     ]
     eps_table = Table(eps_data, colWidths=[3.5*cm, 4.5*cm, 6.5*cm])
-    eps_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    eps_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(eps_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1098,29 +994,17 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    v = VALUATION
     proj_data = [
         ['', 'Bull', 'Base', 'Bear'],
-        ['FY26E PAT Growth', '20% (Cello brand + recovery)', '12% (in-line with H1 trend)', '-5% (revenue decline + margin compression)'],
-        ['FY26E EPS', '\u20b916.52 x 1.20 = \u20b919.82', '\u20b916.52 x 1.12 = \u20b918.50', '\u20b916.52 x 0.95 = \u20b915.69'],
-        ['FY27E PAT Growth', '20% (sustained)', '18% (Motilal CAGR)', '0% (no recovery)'],
-        ['FY27E EPS', '\u20b919.82 x 1.20 = \u20b923.79', '\u20b918.50 x 1.18 = \u20b921.83', '\u20b915.69 x 1.00 = \u20b915.69'],
+        ['FY26E PAT Growth'] + growth_cells(v, 0, ['Cello brand + recovery', 'in-line with H1 trend',
+                                                   'revenue decline + margin compression']),
+        ['FY26E EPS'] + step_cells(v.per_share, v.steps, 0, '\u20b9'),
+        ['FY27E PAT Growth'] + growth_cells(v, 1, ['sustained', 'Motilal CAGR', 'no recovery']),
+        ['FY27E EPS'] + step_cells(v.per_share, v.steps, 1, '\u20b9'),
     ]
     proj_table = Table(proj_data, colWidths=[3.2*cm, 4.5*cm, 4.5*cm, 4*cm])
-    proj_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (1, 0), (1, -1), HexColor('#f0fff4')),
-        ('BACKGROUND', (2, 0), (2, -1), HexColor('#fffff0')),
-        ('BACKGROUND', (3, 0), (3, -1), HexColor('#fff5f5')),
-        ('TEXTCOLOR', (1, 0), (3, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    proj_table.setStyle(table_style('projection_table'))
     story.append(proj_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1133,29 +1017,13 @@ def build_pdf(chart_paths):
     ))
 
     scenario_data = [
-        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', 'Return from \u20b9505', 'Probability'],
-        ['Bull', '\u20b923.79', '35\u201338x',
-         '\u20b9833\u2013904', '+65% to +79%', '20%'],
-        ['Base', '\u20b921.83', '30\u201333x',
-         '\u20b9655\u2013720', '+30% to +43%', '50%'],
-        ['Bear', '\u20b915.69', '18\u201324x',
-         '\u20b9282\u2013377', '-25% to -44%', '30%'],
-    ]
+        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', f'Return from \u20b9{v.price:,.0f}', 'Probability'],
+    ] + [[name, f'\u20b9{eps:.2f}', multiple, target, ret, f'{p:.0%}']
+         for name, eps, multiple, target, ret, p in zip(
+             ['Bull', 'Base', 'Bear'], v.per_share[:, -1], multiple_cells(v, '\u2013'),
+             target_cells(v, '\u20b9', '\u2013'), return_cells(v), v.probability)]
     scenario_table = Table(scenario_data, colWidths=[1.8*cm, 2.3*cm, 2.3*cm, 2.8*cm, 3.3*cm, 2.5*cm])
-    scenario_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    scenario_table.setStyle(table_style('scenario_table'))
     story.append(scenario_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1187,33 +1055,39 @@ def build_pdf(chart_paths):
 
     ev_data = [
         ['Scenario', 'Midpoint Price', 'Probability', 'Weighted Value'],
-        ['Bull', '\u20b9869', '20%', '\u20b9174'],
-        ['Base', '\u20b9688', '50%', '\u20b9344'],
-        ['Bear', '\u20b9330', '30%', '\u20b999'],
-        ['', '', 'Expected Value \u2192', '\u20b9617'],
-    ]
+    ] + ev_rows(v, '\u20b9', 'Expected Value \u2192')
     ev_table = Table(ev_data, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    ev_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('BACKGROUND', (0, 4), (-1, 4), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    ev_table.setStyle(table_style('scenario_table', font_size=9, total=True))
     story.append(ev_table)
     story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['simulation'], width=16*cm, height=8*cm))
+    story.append(Paragraph(describe(simulation(), '\u20b9'), source_style))
+    story.append(Spacer(1, 0.3*cm))
 
+    # Sensitivity grid
+    grid, coarse = sensitivity(), sensitivity(table=True)
+    story.append(Paragraph('<b>Sensitivity: EPS Growth x P/E</b>', body_style))
+    story.append(chart_image(chart_paths['sensitivity'], width=15*cm, height=8.4*cm))
+    sens_data = table_rows(coarse, '\u20b9', corner='EPS growth / P/E')
+    sens_table = Table(sens_data, colWidths=[3*cm] + [2.4*cm] * (len(sens_data[0]) - 1))
+    sens_table.setStyle(table_style('sensitivity_table'))
+    sens_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(coarse)]))
+    story.append(sens_table)
     story.append(Paragraph(
-        '<b>Probability-weighted expected price: \u20b9617</b> \u2014 implying ~22% upside from \u20b9505. '
-        'However, the severe bear case (\u20b9282\u2013377, or -25% to -44%) with 30% probability '
+        f'Green cells are above the current price of \u20b9{v.price:,.0f}. Rows compound EPS growth '
+        f'for {grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
+    bear_target, bear_return = target_cells(v, '\u20b9', '\u2013')[2], return_cells(v)[2]
+    story.append(Paragraph(
+        f'<b>Probability-weighted expected price: \u20b9{v.expected:,.0f}</b> \u2014 implying '
+        f'~{upside(v.expected_return, 0)} from \u20b9{v.price:,.0f}. '
+        f'However, the severe bear case ({bear_target}, or {bear_return}) '
+        f'with {v.probability[2]:.0%} probability '
         'is a material risk. The lower bear P/E (18-24x, reflecting commodity/durables cyclical bottom '
         'multiples) and -5% revenue decline scenario reflect the real possibility of further de-rating.',
         callout_green
@@ -1260,7 +1134,8 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        'The <b>probability-weighted expected value of \u20b9617 implies ~22% upside</b> over 12 months. '
+        f'The <b>probability-weighted expected value of \u20b9{VALUATION.expected:,.0f} implies '
+        f'~{upside(VALUATION.expected_return, 0)}</b> over 12 months. '
         'This is supported by unanimous analyst Buy ratings (avg target \u20b9705\u2013730) but tempered '
         'by a 30% bear probability driven by working capital deterioration, margin pressure, negative FCF, '
         'and glass plant execution risk. The bear case (P/E 18-24x at cyclical bottom) implies -25% to -44% '
@@ -1270,8 +1145,9 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        '<b>On balance, the stock offers a moderate expected return (~22%) with a severe bear case '
-        '(-25% to -44% in the downside scenario). The high promoter holding (75%), debt-free balance '
+        f'<b>On balance, the stock offers a moderate expected return (~{VALUATION.expected_return:.0%}) '
+        f'with a severe bear case ({return_cells(VALUATION)[2]} in the downside scenario). '
+        'The high promoter holding (75%), debt-free balance '
         'sheet, and strong 3Y ROE (35.7%) provide downside protection, while the Cello brand relaunch '
         'and glass plant maturation offer upside optionality. Suited for investors with a 12+ month '
         'horizon who are comfortable with consumer mid-cap volatility and can monitor the quarterly '
@@ -1304,20 +1180,27 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    doc.build(story)
+    profiling.build(doc, story)
     print(f"PDF generated successfully: {FINAL_PDF}")
 
 
 # --- Main ---
+CHARTS = {
+    'revenue': create_revenue_chart,
+    'margins': create_margin_chart,
+    'segments': create_segment_chart,
+    'price': create_price_chart,
+    'peers': create_peer_chart,
+    'simulation': create_simulation_chart,
+    'sensitivity': create_sensitivity_chart,
+}
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Generating charts...")
-    charts = {
-        'revenue': create_revenue_chart(),
-        'margins': create_margin_chart(),
-        'segments': create_segment_chart(),
-        'price': create_price_chart(),
-        'peers': create_peer_chart(),
-    }
+    charts = render_charts(CHARTS, jobs=args.jobs, cache=args.cache, in_memory=args.in_memory,
+                           vector=args.vector)
+    profiling.mark('charts')
     print(f"Charts created: {len(charts)} charts")
     print("Building PDF...")
     build_pdf(charts)
@@ -5,33 +5,41 @@ Generated: February 4, 2026
 Banking-specific metrics: NIM, NPA, CASA, ROA, ROE, P/B
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
+import functools
 import os
+import sys
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch, cm
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
-)
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# Register SFNS (San Francisco) for currency symbol support
-pdfmetrics.registerFont(TTFont('SFNS', '/System/Library/Fonts/SFNS.ttf'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stocklib import profiling
+
+import numpy as np
+
+from stocklib.bankvalue import COE, FADE, GROWTH, ticker_bank_value, ticker_residual_grid, value_rows
+from stocklib.banks import metric_rows, ticker_metrics, year_ends
+from stocklib.datastore import open_store
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, parse_args, render_charts, save_figure
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, ticker_grid
+from stocklib.technicals import fill_rows
+from stocklib.valuation import (ev_rows, multiple_cells, return_cells, step_cells, target_cells,
+                                ticker_valuation, upside)
+profiling.mark('imports')
 
 # --- Configuration ---
 OUTPUT_DIR = "/Users/arpitvyas/Desktop/stock-analysis/idfc-first-bank"
 FINAL_PDF = "/Users/arpitvyas/Desktop/stock-analysis/idfc-first-bank/IDFC_First_Bank_Research_Report_Feb2026.pdf"
+TICKER = 'IDFCFIRSTB'
+DATA = open_store().ticker(TICKER)
+PRICES = PriceHistory(TICKER)
+BANK = ticker_metrics(DATA)
+VALUATION = ticker_valuation(DATA)
+# The published HOLD rested on a ~Rs 88 expected value from P/B midpoints
+# above the scenario table's ranges; on those ranges the expected value is
+# far below CMP, so the rating is withheld until an analyst reconciles them.
+RATING = 'UNDER REVIEW'
 
 # Colors
 PRIMARY = '#1a365d'      # Dark navy
@@ -42,26 +50,44 @@ LIGHT_BG = '#f7fafc'     # Light background
 ORANGE = '#dd6b20'
 PURPLE = '#805ad5'
 
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 10,
-    'axes.titlesize': 12,
-    'axes.labelsize': 10,
-    'figure.facecolor': 'white',
-    'axes.facecolor': '#f8f9fa',
-    'axes.grid': True,
-    'grid.alpha': 0.3,
-    'grid.color': '#cccccc',
-})
+
+# --- Model Outputs ---
+# Computed on first use and cached, so importing the script for its data
+# (batch, bench, template) runs no simulation or grid
+@functools.lru_cache(maxsize=None)
+def simulation():
+    """Monte Carlo value distribution (stocklib.montecarlo)."""
+    return ticker_simulation(DATA)
+
+
+@functools.lru_cache(maxsize=None)
+def sensitivity(table=False):
+    """Target grid for the heatmap, or the coarse one for the table (stocklib.sensitivity)."""
+    return ticker_grid(DATA, table=table)
+
+
+@functools.lru_cache(maxsize=None)
+def bank_value():
+    """Justified P/B, Gordon and residual-income values per scenario (stocklib.bankvalue)."""
+    return ticker_bank_value(DATA)
+
+
+@functools.lru_cache(maxsize=None)
+def residual_grid():
+    """Residual-income value over the ROE x cost-of-equity plane (stocklib.bankvalue)."""
+    return ticker_residual_grid(DATA)
 
 
 # --- Chart 1: Quarterly NII & Net Profit Trend ---
 def create_nii_chart():
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26', 'Q3\nFY26']
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
     # NII in Cr (from press releases and quarterly results)
-    nii = [4695, 4788, 4902, 4907, 4933, 5167, 5492]
+    nii = q['nii']
     # Net Profit in Cr
-    pat = [681, 212, 340, 732, 453, 348, 479]
+    pat = q['pat']
 
     fig, ax1 = plt.subplots(figsize=(8, 4))
     x = np.arange(len(quarters))
@@ -94,19 +120,18 @@ def create_nii_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_nii_profit.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_nii_profit.png'))
 
 
 # --- Chart 2: NIM and Cost-to-Income Ratio Trend ---
 def create_nim_cti_chart():
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26', 'Q3\nFY26']
-    # NIM % (from quarterly results)
-    nim = [6.20, 6.10, 6.04, 5.95, 5.71, 5.59, 5.76]
-    # Cost-to-Income % (approximated from data)
-    cti = [76.5, 75.0, 74.0, 73.5, 73.0, 74.5, 74.0]
+    import matplotlib.pyplot as plt
+
+    # quarters with a full P&L: NIM on earning assets, opex over NII + other income
+    rows = np.flatnonzero(np.isfinite(BANK.nim) & np.isfinite(BANK.cti))
+    quarters = [p.replace(' ', '\n') for p in BANK.periods[rows]]
+    nim = BANK.nim[rows]
+    cti = BANK.cti[rows]
 
     fig, ax = plt.subplots(figsize=(7, 4))
     x = np.arange(len(quarters))
@@ -133,14 +158,13 @@ def create_nim_cti_chart():
     ax.legend([line1, line2], ['NIM (%)', 'Cost-to-Income (%)'], loc='upper right', fontsize=8)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_nim_cti.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_nim_cti.png'))
 
 
 # --- Chart 3: Loan Book Composition Pie ---
 def create_loan_pie_chart():
+    import matplotlib.pyplot as plt
+
     labels = ['Mortgage\n(Home+LAP)\n29%', 'Consumer\n& Personal\n25%', 'MSME &\nBusiness\n18%',
               'Vehicle\nFinance\n12%', 'Corporate\n& Wholesale\n8%', 'MFI\n4%', 'Others\n4%']
     sizes = [29, 25, 18, 12, 8, 4, 4]
@@ -155,14 +179,21 @@ def create_loan_pie_chart():
     ax.set_title('Loan Book Composition (FY25)', fontweight='bold', pad=15)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_loan_mix.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_loan_mix.png'))
 
 
 # --- Chart 4: Price Action with MAs + Support/Resistance ---
 def create_price_chart():
+    import matplotlib.pyplot as plt
+
+    if len(PRICES):
+        return daily_price_chart(
+            PRICES, 'IDFC First Bank - 1-Year Price Action & Key Moving Averages',
+            os.path.join(OUTPUT_DIR, 'chart_price.png'), currency='Rs ',
+            sma=(200,), ema=(50,), legend_loc='upper left',
+            zones=[(55, 62, 'green', 'Support Zone (Rs 57-62)'),
+                   (95, 100, 'red', 'Resistance Zone (Rs 95-100)')])
+
     months = ['Feb\n2025', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan\n2026']
     # Monthly closing prices (approximate from known data: 52w high 98, 52w low ~57, current ~84)
     prices = [72, 68, 63, 57, 60, 65, 70, 76, 85, 98, 87, 84]
@@ -194,14 +225,13 @@ def create_price_chart():
                 fontsize=9, fontweight='bold', color=PRIMARY)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_price.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_price.png'))
 
 
 # --- Chart 5: Peer P/B Comparison ---
 def create_peer_chart():
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(1, 3, figsize=(10, 3.5))
 
     # P/B comparison
@@ -242,17 +272,17 @@ def create_peer_chart():
 
     fig.suptitle('IDFC First Bank vs Peer Banks - Key Metrics Comparison', fontweight='bold', fontsize=11, y=1.02)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_peers.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_peers.png'))
 
 
 # --- Chart 6: Asset Quality Trend ---
 def create_asset_quality_chart():
-    periods = ['FY22', 'FY23', 'FY24', 'FY25', 'Q3\nFY26']
-    gnpa = [3.70, 2.50, 1.90, 1.90, 1.69]
-    nnpa = [1.30, 0.69, 0.60, 0.55, 0.53]
+    import matplotlib.pyplot as plt
+
+    periods, rows = year_ends(BANK)
+    periods = [p.replace(' ', '\n') for p in periods]
+    gnpa = BANK.gnpa[rows]
+    nnpa = BANK.nnpa[rows]
 
     fig, ax = plt.subplots(figsize=(7, 3.5))
     x = np.arange(len(periods))
@@ -271,18 +301,56 @@ def create_asset_quality_chart():
     ax.set_ylim(0, 5)
 
     for i, (g, n) in enumerate(zip(gnpa, nnpa)):
-        ax.annotate(f'{g}%', (i, g), textcoords="offset points", xytext=(0, 10), fontsize=8, ha='center', color=HIGHLIGHT, fontweight='bold')
-        ax.annotate(f'{n}%', (i, n), textcoords="offset points", xytext=(0, -14), fontsize=8, ha='center', color=GREEN, fontweight='bold')
+        ax.annotate(f'{g:.2f}%', (i, g), textcoords="offset points", xytext=(0, 10), fontsize=8, ha='center', color=HIGHLIGHT, fontweight='bold')
+        ax.annotate(f'{n:.2f}%', (i, n), textcoords="offset points", xytext=(0, -14), fontsize=8, ha='center', color=GREEN, fontweight='bold')
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_asset_quality.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_asset_quality.png'))
+
+
+# --- Chart 7: Monte Carlo Value Distribution ---
+def create_simulation_chart():
+    """Distribution of 12-month values around the scenario EV (stocklib.montecarlo)."""
+    return histogram_chart(simulation(), 'IDFC First Bank - Monte Carlo Value Distribution',
+                           os.path.join(OUTPUT_DIR, 'chart_simulation.png'), currency='Rs ',
+                           expected=VALUATION.expected)
+
+
+# --- Chart 8: Sensitivity Grid ---
+def create_sensitivity_chart():
+    """Target price over the ROE x P/B plane (stocklib.sensitivity)."""
+    grid = sensitivity()
+    return heatmap_chart(grid, 'IDFC First Bank - Target Sensitivity: ROE x P/B',
+                         os.path.join(OUTPUT_DIR, 'chart_sensitivity.png'), currency='Rs ',
+                         row_label='ROE', multiple_label='P/B',
+                         marker=(grid.base_growth, grid.base_multiple, 'Base case'))
+
+
+# --- Chart 9: Residual-Income Value Grid ---
+def create_residual_income_chart():
+    """Residual-income value over the sustainable ROE x cost of equity plane (stocklib.bankvalue)."""
+    return heatmap_chart(residual_grid(), 'IDFC First Bank - Residual-Income Value: ROE x Cost of Equity',
+                         os.path.join(OUTPUT_DIR, 'chart_residual_income.png'), currency='Rs ',
+                         row_label='Sustainable ROE', multiple_label='Cost of equity', percent_columns=True,
+                         marker=(bank_value().roe[1], COE, 'Base case'))
 
 
 # --- PDF Generation ---
 def build_pdf(chart_paths):
+    from reportlab.lib import colors
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    from stocklib.fonts import register_fonts
+    from stocklib.styles import paragraph_style, table_style
+
+    # Register SFNS (San Francisco) for currency symbol support
+    register_fonts()
+
     doc = SimpleDocTemplate(
         FINAL_PDF,
         pagesize=A4,
@@ -292,69 +360,17 @@ def build_pdf(chart_paths):
         rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Title'],
-        fontSize=20, textColor=HexColor(PRIMARY),
-        spaceAfter=6, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle', parent=styles['Normal'],
-        fontSize=11, textColor=HexColor('#4a5568'),
-        spaceAfter=12, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading', parent=styles['Heading1'],
-        fontSize=14, textColor=HexColor(PRIMARY),
-        spaceBefore=16, spaceAfter=8,
-        fontName='SFNS',
-        borderWidth=0, borderPadding=0,
-    )
-    subheading_style = ParagraphStyle(
-        'CustomSubheading', parent=styles['Heading2'],
-        fontSize=11, textColor=HexColor(ACCENT),
-        spaceBefore=10, spaceAfter=4,
-        fontName='SFNS'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=9, leading=13,
-        textColor=HexColor('#2d3748'),
-        spaceAfter=6, alignment=TA_JUSTIFY,
-        fontName='SFNS'
-    )
-    bullet_style = ParagraphStyle(
-        'CustomBullet', parent=body_style,
-        leftIndent=15, bulletIndent=5,
-        spaceAfter=3, fontSize=9
-    )
-    source_style = ParagraphStyle(
-        'SourceStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#718096'),
-        spaceAfter=4, fontName='SFNS'
-    )
-    disclaimer_style = ParagraphStyle(
-        'DisclaimerStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#a0aec0'),
-        spaceBefore=8, spaceAfter=4,
-        fontName='SFNS', alignment=TA_CENTER
-    )
-    callout_green = ParagraphStyle(
-        'CalloutGreen', parent=body_style,
-        backColor=HexColor('#f0fff4'), borderWidth=1,
-        borderColor=HexColor(GREEN), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_red = ParagraphStyle(
-        'CalloutRed', parent=body_style,
-        backColor=HexColor('#fff5f5'), borderWidth=1,
-        borderColor=HexColor(HIGHLIGHT), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
+    # Shared styles (stocklib.styles)
+    title_style = paragraph_style('title')
+    subtitle_style = paragraph_style('subtitle')
+    heading_style = paragraph_style('heading')
+    subheading_style = paragraph_style('subheading')
+    body_style = paragraph_style('body')
+    bullet_style = paragraph_style('bullet')
+    source_style = paragraph_style('source')
+    disclaimer_style = paragraph_style('disclaimer')
+    callout_green = paragraph_style('callout_green')
+    callout_red = paragraph_style('callout_red')
 
     story = []
 
@@ -365,10 +381,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.5*cm))
     story.append(HRFlowable(width="80%", thickness=2, color=HexColor(PRIMARY)))
     story.append(Spacer(1, 0.5*cm))
-    story.append(Paragraph('1-Year Stock Research Report', ParagraphStyle(
-        'BigSub', parent=subtitle_style, fontSize=16, textColor=HexColor(ACCENT),
-        fontName='SFNS'
-    )))
+    story.append(Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle')))
     story.append(Paragraph('Outlook: February 2026 to February 2027', subtitle_style))
     story.append(Spacer(1, 1*cm))
 
@@ -377,29 +390,20 @@ def build_pdf(chart_paths):
         ['Current Price', 'Rs 85.1 (Feb 4, 2026)', 'Market Cap', 'Rs 72,952 Cr'],
         ['P/B Ratio', '1.56x (BV Rs 54.5, Screener.in)', 'P/E (TTM)', '46.5x'],
         ['Book Value/Share', 'Rs 54.5 (Screener.in, Dec 2025)', 'NIM (Q3 FY26)', '5.76%'],
-        ['GNPA / NNPA', '1.69% / 0.53%', 'CASA Ratio', '51.64%'],
+        ['GNPA / NNPA', f'{BANK.gnpa[-1]:.2f}% / {BANK.nnpa[-1]:.2f}%', 'CASA Ratio', f'{BANK.casa[-1]:.2f}%'],
         ['ROA (FY25)', '0.43%', 'ROE', '4%'],
         ['52-Week Range', 'Rs 57 - Rs 98', 'Shares Outstanding', '~860 Cr (post-CCPS conversion Oct 2025; Warburg +81 Cr, ADIA +44 Cr shares)'],
         ['Capital Adequacy', '16.22%', 'Promoter Holding', '0% (post-merger)'],
     ]
     metrics_table = Table(metrics_data, colWidths=[3.2*cm, 4*cm, 3.2*cm, 4*cm])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#edf2f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor(PRIMARY)),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    metrics_table.setStyle(table_style('metrics_table', font_size=8, padding=5))
     story.append(metrics_table)
 
     # Add executive summary verdict box
     story.append(Spacer(1, 10))
     verdict_data = [
-        ['VERDICT: HOLD | Expected Value: Rs ~88 (approx 4% upside from CMP Rs 85)'],
+        [f'VERDICT: {RATING} | Expected Value: Rs ~{VALUATION.expected:.0f} '
+         f'(approx {upside(VALUATION.expected_return, 0)} from CMP Rs {VALUATION.price:.0f})'],
         ['Key Bull: Deposit growth 10% HoH, NII improving, turnaround thesis'],
         ['Key Bear: Promoter at 0%, ROE 4%, P/E 46.5x, UBS SELL target Rs 75']
     ]
@@ -506,18 +510,7 @@ def build_pdf(chart_paths):
         ['CAR (%)', '16.7%', '16.8%', '16.1%', '15.5%'],
     ]
     annual_table = Table(annual_data, colWidths=[3.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm])
-    annual_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    annual_table.setStyle(table_style('header_grid_table'))
     story.append(annual_table)
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
@@ -529,7 +522,7 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('Quarterly NII & Net Profit Trend', subheading_style))
-    story.append(Image(chart_paths['nii_profit'], width=16*cm, height=8*cm))
+    story.append(chart_image(chart_paths['nii_profit'], width=16*cm, height=8*cm))
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
         'NII has grown steadily from Rs 4,695 Cr (Q1 FY25) to Rs 5,492 Cr (Q3 FY26), reflecting '
@@ -539,7 +532,7 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('NIM & Cost-to-Income Trend', subheading_style))
-    story.append(Image(chart_paths['nim_cti'], width=14*cm, height=8*cm))
+    story.append(chart_image(chart_paths['nim_cti'], width=14*cm, height=8*cm))
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
         '<b>NIM compression is the key concern.</b> NIM declined from 6.20% (Q1 FY25) to 5.59% (Q2 FY26) '
@@ -613,7 +606,7 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('Loan Book Composition', subheading_style))
-    story.append(Image(chart_paths['loan_pie'], width=12*cm, height=9*cm))
+    story.append(chart_image(chart_paths['loan_pie'], width=12*cm, height=9*cm))
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
         'The bank has dramatically shifted from wholesale to retail: mortgage-backed loans (Home + LAP) '
@@ -625,7 +618,7 @@ def build_pdf(chart_paths):
     ))
 
     story.append(Paragraph('Asset Quality Trend', subheading_style))
-    story.append(Image(chart_paths['asset_quality'], width=14*cm, height=7*cm))
+    story.append(chart_image(chart_paths['asset_quality'], width=14*cm, height=7*cm))
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
         'GNPA has improved from 3.70% (FY22) to 1.69% (Q3 FY26), a significant achievement. NNPA is '
@@ -637,31 +630,10 @@ def build_pdf(chart_paths):
 
     # Banking Quality Metrics Table
     story.append(Paragraph('Banking Quality Metrics (Q3 FY26, Dec 2025)', subheading_style))
-    bqm_data = [
-        ['Metric', 'Q3 FY26', 'Trend'],
-        ['GNPA (%)', '1.69%', 'Improving'],
-        ['NNPA (%)', '0.53%', 'Improving'],
-        ['PCR (%)', '72.2%', 'Stable'],
-        ['Credit Cost (%)', '2.05%', 'Improving (19 bps QoQ)'],
-        ['NIM (%)', '~6.0%', 'Stable'],
-        ['CASA (%)', '~46%', 'Stable'],
-        ['Cost-to-Income (%)', '~74%', 'High'],
-        ['ROA (%)', '~0.41%', 'Below benchmark'],
-        ['ROE (%)', '4%', 'Below benchmark'],
-        ['CAR (%)', '~16%', 'Adequate'],
-    ]
+    # derived from the quarter's reported balances and flows (stocklib.banks); PCR excludes technical write-offs
+    bqm_data = [['Metric', BANK.periods[-1], 'Trend']] + metric_rows(BANK)
     bqm_table = Table(bqm_data, colWidths=[4*cm, 3*cm, 5*cm])
-    bqm_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    bqm_table.setStyle(table_style('header_grid_table', valign=False))
     story.append(bqm_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -676,17 +648,9 @@ def build_pdf(chart_paths):
         ['Government', '7.80%', 'Government holding'],
     ]
     sh_table = Table(sh_data, colWidths=[3*cm, 2.5*cm, 10*cm])
+    sh_table.setStyle(table_style('header_grid_table', valign=False))
     sh_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (1, -1), 'CENTER'),
         ('ALIGN', (2, 0), (2, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(sh_table)
     story.append(Spacer(1, 0.3*cm))
@@ -702,11 +666,15 @@ def build_pdf(chart_paths):
         'completion. This is a structural governance risk — the bank has no promoter anchor.',
         callout_red
     ))
+    bv = bank_value()
+    pb_now = (bv.roe_now - GROWTH) / (COE - GROWTH)
     story.append(Paragraph(
-        '<b>Valuation Sanity Check (Gordon Growth Model):</b> At ROE of 4% and P/B of 1.56x, the stock prices in '
-        'significant improvement. Gordon Growth justified P/B at 4% ROE with 12% CoE and 5% growth = '
-        '(4%-5%)/(12%-5%) = negative — stock trades at premium to fundamentals. The market is pricing in a '
-        'substantial ROE recovery that has not yet materialized.',
+        f'<b>Valuation Sanity Check (Gordon Growth Model):</b> At ROE of {bv.roe_now:.1%} and P/B of '
+        f'{bv.market_pb:.2f}x, the stock prices in significant improvement. Gordon Growth justified P/B at '
+        f'{bv.roe_now:.1%} ROE with {COE:.0%} CoE and {GROWTH:.0%} growth = ({bv.roe_now:.1%}-{GROWTH:.0%})/'
+        f'({COE:.0%}-{GROWTH:.0%}) = {f"{pb_now:.2f}x" if pb_now > 0 else "negative"} — stock trades at premium to '
+        f'fundamentals. The market is pricing in a substantial ROE recovery that has not yet materialized: '
+        f'the residual-income model needs a sustainable ROE of {bv.implied_roe:.1%} to justify the current price.',
         body_style
     ))
 
@@ -730,7 +698,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['price'], width=16*cm, height=9*cm))
+    story.append(chart_image(chart_paths['price'], width=16*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Key Technical Signals', subheading_style))
@@ -744,18 +712,9 @@ def build_pdf(chart_paths):
         ['Support Zone', 'Rs 57-62', 'Strong floor from 52-week low area'],
         ['Resistance Zone', 'Rs 95-100', 'Previous highs; needs volume to break'],
     ]
+    tech_data = fill_rows(tech_data, PRICES, currency='Rs ')
     tech_table = Table(tech_data, colWidths=[3.5*cm, 3*cm, 9*cm])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    tech_table.setStyle(table_style('header_grid_table', align='LEFT', valign=False))
     story.append(tech_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -811,22 +770,15 @@ def build_pdf(chart_paths):
         ['Bandhan Bank', '1.02', '0.90', '7.50', '3.90', '39.0'],
     ]
     peer_table = Table(peer_data, colWidths=[3.5*cm, 1.8*cm, 1.8*cm, 1.8*cm, 1.8*cm, 1.8*cm])
+    peer_table.setStyle(table_style('header_grid_table', banded=False, valign=False))
     peer_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('BACKGROUND', (0, 3), (-1, 3), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
         ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(peer_table)
     story.append(Spacer(1, 0.3*cm))
 
-    story.append(Image(chart_paths['peers'], width=16*cm, height=6.5*cm))
+    story.append(chart_image(chart_paths['peers'], width=16*cm, height=6.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph(
@@ -863,17 +815,7 @@ def build_pdf(chart_paths):
         ['Consensus (20)', '81.86', 'Buy', 'Range Rs 53-100; majority Buy', 'Feb 2026'],
     ]
     analyst_table = Table(analyst_data, colWidths=[2.8*cm, 2*cm, 1.8*cm, 5.5*cm, 2.2*cm])
-    analyst_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    analyst_table.setStyle(table_style('header_grid_table', valign=False))
     story.append(analyst_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1016,17 +958,7 @@ def build_pdf(chart_paths):
         ['ROCE / ROE', '6.22% / 4%', 'Screener.in'],
     ]
     bv_table = Table(bv_data, colWidths=[4*cm, 5*cm, 5.5*cm])
-    bv_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    bv_table.setStyle(table_style('header_grid_table', align='LEFT', valign=False))
     story.append(bv_table)
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
@@ -1044,27 +976,21 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    v = VALUATION
     proj_data = [
         ['', 'Bull', 'Base', 'Bear'],
-        ['FY26E ROE', '8%', '5%', '3%'],
-        ['FY27E ROE', '12%', '8%', '4%'],
-        ['FY26E BV/share', 'Rs 54.5 x 1.072 = Rs 58.4', 'Rs 54.5 x 1.045 = Rs 57.0', 'Rs 54.5 x 1.027 = Rs 56.0'],
-        ['FY27E BV/share', 'Rs 58.4 x 1.108 = Rs 64.7', 'Rs 57.0 x 1.072 = Rs 61.1', 'Rs 56.0 x 1.036 = Rs 58.0'],
+        ['FY26E ROE'] + [f'{g:.0%}' for g in v.growth[:, 0]],
+        ['FY27E ROE'] + [f'{g:.0%}' for g in v.growth[:, 1]],
+        ['FY26E BV/share'] + step_cells(v.per_share, v.steps, 0, 'Rs ', digits=1, step_digits=3),
+        ['FY27E BV/share'] + step_cells(v.per_share, v.steps, 1, 'Rs ', digits=1, step_digits=3),
     ]
     proj_table = Table(proj_data, colWidths=[3.2*cm, 4.5*cm, 4.5*cm, 4.3*cm])
+    proj_table.setStyle(table_style('header_grid_table', font_size=7.5, banded=False, valign=False))
     proj_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
         ('BACKGROUND', (1, 0), (1, -1), HexColor('#f0fff4')),
         ('BACKGROUND', (2, 0), (2, -1), HexColor('#fffff0')),
         ('BACKGROUND', (3, 0), (3, -1), HexColor('#fff5f5')),
         ('TEXTCOLOR', (1, 0), (3, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(proj_table)
     story.append(Spacer(1, 0.2*cm))
@@ -1084,32 +1010,44 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    multiples, targets = multiple_cells(v, digits=1), target_cells(v, 'Rs ')
     scenario_data = [
-        ['Scenario', 'FY27E BV/sh', 'P/B Assumed', 'Target Price', 'Return from Rs 85.1', 'Probability'],
-        ['Bull', 'Rs 64.7', '1.4-1.6x',
-         'Rs 91-103', '+7% to +21%', '20%'],
-        ['Base', 'Rs 61.1', '1.0-1.2x',
-         'Rs 61-73', '-28% to -14%', '50%'],
-        ['Bear', 'Rs 58.0', '0.7-0.9x',
-         'Rs 41-52', '-52% to -39%', '30%'],
-    ]
+        ['Scenario', 'FY27E BV/sh', 'P/B Assumed', 'Target Price', f'Return from Rs {v.price:.1f}',
+         'Probability'],
+    ] + [[name, f'Rs {bv:.1f}', pb, target, ret, f'{p:.0%}']
+         for name, bv, pb, target, ret, p in zip(['Bull', 'Base', 'Bear'], v.per_share[:, -1], multiples, targets,
+                                                 return_cells(v), v.probability)]
     scenario_table = Table(scenario_data, colWidths=[1.8*cm, 2.2*cm, 2.2*cm, 2.8*cm, 3.3*cm, 2.2*cm])
-    scenario_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    scenario_table.setStyle(table_style('scenario_table', valign=False))
     story.append(scenario_table)
     story.append(Spacer(1, 0.3*cm))
 
+    # Cross-check against the bank's economics
+    story.append(Paragraph('<b>Cross-Check: Justified P/B and Residual Income</b>', body_style))
+    story.append(Paragraph(
+        f'The peer-anchored multiples above are a judgment call. Valuing each scenario\'s ROE on the bank\'s '
+        f'own economics at a {COE:.0%} cost of equity and {GROWTH:.0%} terminal growth: the Gordon Growth justified '
+        f'P/B is (ROE - g)/(CoE - g), and the residual-income value adds {bv.years} years of (ROE - CoE) x book, '
+        f'with ROE moving from today\'s {bv.roe_now:.1%} to the scenario level over {FADE} years, plus a terminal '
+        f'value.',
+        body_style
+    ))
+    ri_data = [['Scenario', 'ROE', 'Justified P/B', 'Gordon Value', 'Residual Income', 'vs CMP']] + \
+        value_rows(bv, 'Rs ')
+    ri_table = Table(ri_data, colWidths=[1.8*cm, 1.8*cm, 2.6*cm, 2.8*cm, 3.2*cm, 2.2*cm])
+    ri_table.setStyle(table_style('scenario_table', valign=False))
+    story.append(ri_table)
+    story.append(Spacer(1, 0.2*cm))
+    story.append(chart_image(chart_paths['residual_income'], width=15*cm, height=8.4*cm))
+    story.append(Paragraph(
+        f'Residual-income value per share across sustainable ROE and cost of equity; the contour marks the '
+        f'current price of Rs {v.price:,.0f}, reached at {bv.implied_roe:.1%} ROE at a {COE:.0%} cost of equity. '
+        f'{(bv.residual > bv.price).sum()} of {len(bv.residual)} scenarios value the bank above the price on '
+        f'these fundamentals.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
     # Step 4
     story.append(Paragraph('<b>Step 4: Probability-Weighted Expected Value</b>', body_style))
     story.append(Paragraph(
@@ -1119,13 +1057,13 @@ def build_pdf(chart_paths):
 
     prob_points = [
         '<b>Bull (20%):</b> Requires Nomura\'s thesis to play out: ROA 1.2%, ROE 12%, operating leverage '
-        'kicks in, no further dilution. Achievable but ambitious. P/B re-rates to 2.0-2.2x (in line with Federal Bank).',
+        'kicks in, no further dilution. Achievable but ambitious. P/B re-rates to ' + multiples[0] + ' (toward Federal Bank).',
         '<b>Base (50%):</b> Most likely. ROA recovers to 0.8-1.0%, ROE reaches 8%, C/I declines to 68%. '
-        'P/B stays at 1.5-1.7x. The bank executes on its plan but slowly. Stock returns are modest.',
+        'P/B settles at ' + multiples[1] + '. The bank executes on its plan but slowly. Stock returns are modest.',
         '<b>Bear (30%):</b> Higher-than-normal bear weight because: (a) ROA is worst in peer set, '
         '(b) 2.4x share dilution history makes further raises plausible, (c) no promoter = governance risk, '
-        '(d) Warburg exit overhang. If ROA stays at 0.5% and P/B compresses to 1.0-1.2x, stock could '
-        'fall to Rs 41-52.',
+        '(d) Warburg exit overhang. If ROA stays at 0.5% and P/B compresses to ' + multiples[2] + ', stock could '
+        'fall to ' + targets[2] + '.',
     ]
     for pp in prob_points:
         story.append(Paragraph(f'  {pp}', bullet_style))
@@ -1133,39 +1071,45 @@ def build_pdf(chart_paths):
 
     ev_data = [
         ['Scenario', 'Midpoint Price', 'Probability', 'Weighted Value'],
-        ['Bull', 'Rs 115', '20%', 'Rs 23.0'],
-        ['Base', 'Rs 95', '50%', 'Rs 47.5'],
-        ['Bear', 'Rs 55', '30%', 'Rs 16.5'],
-        ['', '', 'Expected Value ->', 'Rs ~88'],
-    ]
+    ] + ev_rows(v, 'Rs ', 'Expected Value ->', digits=1)
     ev_table = Table(ev_data, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    ev_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('BACKGROUND', (0, 4), (-1, 4), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    ev_table.setStyle(table_style('scenario_table', font_size=9, total=True, valign=False))
     story.append(ev_table)
     story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['simulation'], width=16*cm, height=8*cm))
+    story.append(Paragraph(describe(simulation(), 'Rs '), source_style))
+    story.append(Spacer(1, 0.3*cm))
 
+    # Sensitivity grid
+    grid, coarse = sensitivity(), sensitivity(table=True)
+    story.append(Paragraph('<b>Sensitivity: ROE x P/B</b>', body_style))
+    story.append(chart_image(chart_paths['sensitivity'], width=15*cm, height=8.4*cm))
+    sens_data = table_rows(coarse, 'Rs ', corner='ROE / P/B')
+    sens_table = Table(sens_data, colWidths=[3*cm] + [2.4*cm] * (len(sens_data[0]) - 1))
+    sens_table.setStyle(table_style('sensitivity_table'))
+    sens_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(coarse)]))
+    story.append(sens_table)
     story.append(Paragraph(
-        '<b>Probability-weighted expected price: ~Rs 88</b> - implying approx 4% upside from CMP Rs 85. '
+        f'Green cells are above the current price of Rs {v.price:,.0f}. Rows compound ROE '
+        f'for {grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
+    story.append(Paragraph(
+        f'<b>Probability-weighted expected price: ~Rs {v.expected:.0f}</b> - implying approx '
+        f'{upside(v.expected_return, 0)} from CMP Rs {v.price:.0f}. '
         'This reflects the genuine turnaround potential balanced against '
         'significant dilution risk and the bank\'s weak current profitability.',
         callout_green
     ))
 
     story.append(Paragraph(
-        '<b>Risk-Free Rate Context:</b> Expected ~4% return (Rs ~88 vs CMP Rs 85) barely exceeds '
-        'the 1Y G-Sec yield of ~7%, offering negative risk premium for a turnaround banking bet. '
+        f'<b>Risk-Free Rate Context:</b> Expected {v.expected_return:+.0%} return (Rs ~{v.expected:.0f} vs '
+        f'CMP Rs {v.price:.0f}) against the 1Y G-Sec yield of ~7% is a {v.expected_return - 0.07:+.0%} '
+        'risk premium for a turnaround banking bet. '
         'Investors should weigh whether the risk-reward justifies the equity risk, dilution history, '
         'and execution uncertainty inherent in this stock, when risk-free alternatives yield 7%+.',
         callout_red
@@ -1174,9 +1118,10 @@ def build_pdf(chart_paths):
     # Methodology limitations
     story.append(Paragraph('Methodology Limitations (Transparency Note)', subheading_style))
     limit_points = [
-        '<b>Not a DCF:</b> A proper bank valuation requires a multi-year income model with detailed '
-        'NIM, credit cost, and opex assumptions. This P/B heuristic is a shorthand.',
-        '<b>P/B assumptions are subjective:</b> The choice of 1.5-1.7x for base vs 1.0-1.2x for bear '
+        '<b>Not a full income model:</b> A proper bank valuation requires detailed NIM, credit cost, and opex '
+        'assumptions. This P/B heuristic is a shorthand, and the residual-income cross-check holds ROE flat '
+        'after its fade rather than modelling those lines.',
+        '<b>P/B assumptions are subjective:</b> The choice of ' + multiples[1] + ' for base vs ' + multiples[2] + ' for bear '
         'is anchored to peer comps but remains a judgment call. Small changes in assumed P/B have large '
         'impacts on target price.',
         '<b>BV projections depend on ROE assumptions:</b> If ROE recovers faster (as Nomura expects) '
@@ -1202,14 +1147,22 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        'The <b>probability-weighted expected value of ~Rs 88 implies approx 4% upside</b> over 12 months. '
-        'This is below the analyst consensus bull case (Nomura Rs 105, +24%) but above the bearish view '
-        '(Nuvama Rs 68, -20%). The modest expected return reflects two offsetting forces: '
+        f'The <b>probability-weighted expected value of ~Rs {v.expected:.0f} implies approx '
+        f'{upside(v.expected_return, 0)}</b> over 12 months. '
+        'For reference, analyst targets range from the bull case (Nomura Rs 105, +24%) to the bearish view '
+        '(Nuvama Rs 68, -20%). The expected return reflects two offsetting forces: '
         '(1) the bank is genuinely improving (NII +12%, GNPA declining, CASA rising), and '
         '(2) the 2.4x dilution, 0.43% ROA, and 74% C/I ratio mean the stock must prove itself before '
         'the market grants a premium multiple.',
         body_style
     ))
+    story.append(Paragraph(
+        f'<b>Rating: {RATING}.</b> The HOLD published on February 4, 2026 rested on an expected value of '
+        f'~Rs 88 (+4%), built from P/B midpoints above the ranges in the scenario table. On the table\'s own '
+        f'ranges the expected value is Rs {v.expected:.0f} ({upside(v.expected_return, 0)}), which does not '
+        'support a HOLD. The rating is withheld until the scenario multiples are reconciled.',
+        callout_red
+    ))
     story.append(Paragraph(
         '<b>Key inflection points to watch:</b> (a) ROA crossing 1.0% (would trigger P/B re-rating to 2.0x+), '
         '(b) Cost-to-Income declining below 70% (confirms operating leverage), (c) No further equity raises '
@@ -1217,7 +1170,7 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        '<b>On balance, the stock offers a marginally positive expected return (~4%) with high variance. '
+        f'<b>On balance, the stock offers an expected return of {v.expected_return:+.0%} with high variance. '
         'It is suited for conviction investors who believe in the V. Vaidyanathan turnaround thesis '
         'and have a 2-3 year horizon. The stock is not suitable for value investors (limited margin of safety '
         'at 1.56x P/B with 0.43% ROA) or income investors (minimal dividend). UBS has a Sell rating with '
@@ -1249,21 +1202,29 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    doc.build(story)
+    profiling.build(doc, story)
     print(f"PDF generated successfully: {FINAL_PDF}")
 
 
 # --- Main ---
+CHARTS = {
+    'nii_profit': create_nii_chart,
+    'nim_cti': create_nim_cti_chart,
+    'loan_pie': create_loan_pie_chart,
+    'price': create_price_chart,
+    'peers': create_peer_chart,
+    'asset_quality': create_asset_quality_chart,
+    'simulation': create_simulation_chart,
+    'sensitivity': create_sensitivity_chart,
+    'residual_income': create_residual_income_chart,
+}
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Generating charts...")
-    charts = {
-        'nii_profit': create_nii_chart(),
-        'nim_cti': create_nim_cti_chart(),
-        'loan_pie': create_loan_pie_chart(),
-        'price': create_price_chart(),
-        'peers': create_peer_chart(),
-        'asset_quality': create_asset_quality_chart(),
-    }
+    charts = render_charts(CHARTS, jobs=args.jobs, cache=args.cache, in_memory=args.in_memory,
+                           vector=args.vector)
+    profiling.mark('charts')
     print(f"Charts created ({len(charts)} charts). Building PDF...")
     build_pdf(charts)
     print("Done!")
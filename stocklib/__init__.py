@@ -0,0 +1,3 @@
+"""
+Shared building blocks for the *_report.py research report scripts.
+"""
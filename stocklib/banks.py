@@ -0,0 +1,212 @@
+"""
+Bank metrics: asset quality, profitability and capital ratios from raw quarterly figures.
+
+The bank reports used to hand-type their GNPA, PCR, credit cost, CASA and
+ROA series. The store's bank_quarterly table holds the figures the banks
+publish instead (Rs Cr, quarter-end balances and quarterly flows):
+
+    advances, deposits, casa, gnpa, nnpa     balances
+    provisions, nii, other_income, opex, pat flows for the quarter
+    earning_assets, assets, equity           balances (earning assets: the NIM base)
+    capital, rwa                             regulatory capital and risk-weighted assets
+
+and metrics() turns any number of rows -- every quarter of every bank --
+into the ratios in one vectorised pass. Flows are annualised (x4); ROA,
+ROE and credit cost use the average of the quarter's opening and closing
+balances when the previous row is the same bank's previous quarter, else
+the closing balance. A figure a row lacks leaves its ratios NaN.
+
+    m = ticker_metrics(store.ticker('IDFCFIRSTB'))
+    m.periods[-1], m.gnpa[-1], m.pcr[-1], m.credit_cost[-1]
+
+    python3 -m stocklib.banks            # latest quarter of every bank in the store
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+from stocklib.datastore import TABLES
+
+# (attribute, label, lower is better) in table order; ratios are in percent
+METRICS = [
+    ('gnpa', 'GNPA', True),
+    ('nnpa', 'NNPA', True),
+    ('pcr', 'PCR', False),
+    ('credit_cost', 'Credit Cost', True),
+    ('nim', 'NIM', False),
+    ('casa', 'CASA', False),
+    ('cti', 'Cost-to-Income', True),
+    ('roa', 'ROA', False),
+    ('roe', 'ROE', False),
+    ('car', 'CAR', False),
+]
+# a quarter-on-quarter move smaller than this (relative) reads as 'Stable'
+STABLE = 0.02
+
+_QUARTER = re.compile(r'Q([1-4]) FY(\d+)$')
+
+
+class BankMetrics:
+    """Result arrays of metrics(), one entry per row."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __getitem__(self, index):
+        """The metrics of a subset of rows (a slice or an index array)."""
+        return BankMetrics(**{k: (v[index] if isinstance(v, np.ndarray) else v)
+                              for k, v in self.__dict__.items()})
+
+    def fingerprint(self):
+        """Content hash of every metric array, for chart cache keys."""
+        h = hashlib.sha256()
+        for name in sorted(self.__dict__):
+            array = np.asarray(self.__dict__[name])
+            h.update(f'{name}:{array.dtype.str}:{array.shape};'.encode())
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+
+def quarter_index(periods):
+    """Quarters since FY00 Q1 for 'Qn FYyy' labels (NaN for anything else)."""
+    out = np.full(len(periods), np.nan)
+    for i, period in enumerate(periods):
+        match = _QUARTER.match(str(period))
+        if match:
+            out[i] = int(match.group(2)) * 4 + int(match.group(1)) - 1
+    return out
+
+
+def _ratio(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b != 0, a / b, np.nan) * 100
+
+
+def metrics(columns, ticker, periods):
+    """Every ratio for rows given as {column: array}; rows are grouped by ticker, oldest first."""
+    col = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+    ticker = np.asarray(ticker, dtype=str)
+    periods = np.asarray(periods, dtype=str)
+    index = quarter_index(periods)
+
+    # a balance's opening value is the previous row's, if that row is the bank's previous quarter
+    follows = np.zeros(len(ticker), dtype=bool)
+    follows[1:] = (ticker[1:] == ticker[:-1]) & (index[1:] == index[:-1] + 1)
+
+    def average(balance):
+        opening = np.concatenate([[np.nan], balance[:-1]])
+        return np.where(follows & np.isfinite(opening), (opening + balance) / 2, balance)
+
+    advances, gnpa, nnpa = col['advances'], col['gnpa'], col['nnpa']
+    income = col['nii'] + col['other_income']
+    return BankMetrics(
+        ticker=ticker, periods=periods, quarter=index,
+        gnpa=_ratio(gnpa, advances),
+        # net NPA is quoted against net advances: gross advances less provisions held on NPAs
+        nnpa=_ratio(nnpa, advances - gnpa + nnpa),
+        pcr=_ratio(gnpa - nnpa, gnpa),
+        credit_cost=_ratio(col['provisions'] * 4, average(advances)),
+        nim=_ratio(col['nii'] * 4, col['earning_assets']),
+        casa=_ratio(col['casa'], col['deposits']),
+        cti=_ratio(col['opex'], income),
+        ppop=income - col['opex'],
+        roa=_ratio(col['pat'] * 4, average(col['assets'])),
+        roe=_ratio(col['pat'] * 4, average(col['equity'])),
+        car=_ratio(col['capital'], col['rwa']),
+        cd_ratio=_ratio(advances, col['deposits']),
+        advances=advances, deposits=col['deposits'],
+    )
+
+
+def ticker_metrics(data):
+    """BankMetrics for every quarter of one ticker (a Store.ticker() view)."""
+    frame = data['bank_quarterly']
+    return metrics({name: frame[name] for name in TABLES['bank_quarterly'][1]}, frame['ticker'], frame.periods)
+
+
+def universe_metrics(store):
+    """(tickers, BankMetrics over every row of every bank) in one pass over the table."""
+    table = store.table('bank_quarterly')
+    columns = {name: np.asarray(table.column(name)) for name in TABLES['bank_quarterly'][1]}
+    return table.tickers(), metrics(columns, table.column('ticker'), table.column('period'))
+
+
+def latest(m):
+    """Row index of each bank's most recent quarter."""
+    last = np.ones(len(m.ticker), dtype=bool)
+    last[:-1] = m.ticker[1:] != m.ticker[:-1]
+    return np.flatnonzero(last)
+
+
+def year_ends(m):
+    """(labels, rows): each fiscal year's Q4 as 'FY24', then the latest quarter if it is not a Q4."""
+    rows = [i for i, period in enumerate(m.periods) if period.startswith('Q4 ')]
+    labels = [str(m.periods[i]).split()[1] for i in rows]
+    if len(m) and (not rows or rows[-1] != len(m) - 1):
+        rows.append(len(m) - 1)
+        labels.append(str(m.periods[-1]))
+    return labels, np.asarray(rows, dtype=int)
+
+
+# --- Table cells ---
+
+def trend(m, name, i=-1, lower_is_better=None):
+    """'Improving (-17 bps QoQ)', 'Stable' or 'Deteriorating (...)' for metric `name` at row `i`."""
+    if lower_is_better is None:
+        lower_is_better = {attr: lower for attr, _, lower in METRICS}[name]
+    values = getattr(m, name)
+    i = i % len(values)
+    if i == 0 or m.quarter[i - 1] != m.quarter[i] - 1 or not np.isfinite(values[i - 1:i + 1]).all():
+        return ''
+    change = values[i] - values[i - 1]
+    if abs(change) < STABLE * abs(values[i - 1]):
+        return 'Stable'
+    better = (change < 0) == lower_is_better
+    return f"{'Improving' if better else 'Deteriorating'} ({change * 100:+.0f} bps QoQ)"
+
+
+def metric_rows(m, i=-1, suffix=' (%)', digits=2):
+    """[label, '1.69%', trend] per metric the row has, for a quality metrics table."""
+    rows = []
+    for attr, label, lower in METRICS:
+        value = getattr(m, attr)[i]
+        if np.isfinite(value):
+            rows.append([f'{label}{suffix}', f'{value:.{digits}f}%', trend(m, attr, i, lower)])
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+
+    parser = argparse.ArgumentParser(description="Asset quality and profitability ratios for every bank's latest quarter")
+    parser.add_argument('--sort', choices=[attr for attr, _, _ in METRICS], help='order the banks by this metric')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    start = time.perf_counter()
+    tickers, m = universe_metrics(store)
+    elapsed = time.perf_counter() - start
+
+    rows = latest(m)
+    if args.sort:
+        lower = {attr: lower for attr, _, lower in METRICS}[args.sort]
+        values = getattr(m, args.sort)[rows]
+        rows = rows[np.argsort(values if lower else -values, kind='stable')]
+    widths = [max(len(label) + 2, 8) for _, label, _ in METRICS]
+    print(f"{'Ticker':<12}{'Quarter':>9}" + ''.join(f'{label:>{w}}' for (_, label, _), w in zip(METRICS, widths)))
+    for i in rows:
+        print(f"{m.ticker[i]:<12}{m.periods[i]:>9}"
+              + ''.join(f'{getattr(m, attr)[i]:>{w}.2f}' for (attr, _, _), w in zip(METRICS, widths)))
+    print(f"{len(tickers)} bank(s), {len(m)} quarter(s) in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
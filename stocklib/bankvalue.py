@@ -0,0 +1,246 @@
+"""
+Bank valuation: Gordon-growth justified P/B and residual-income value.
+
+A bank is worth its book value plus the present value of the returns it
+earns above its cost of equity. With a constant ROE that is the Gordon
+growth justified P/B, (ROE - g) / (CoE - g); residual_income() runs the
+multi-year version -- ROE fading from the latest quarter's to a target
+over `fade` years, book compounding at ROE x retention, then a terminal
+value of the next year's residual income growing at g. With years=0 the
+two agree.
+
+Every function broadcasts, so one call values a ROE x cost-of-equity
+plane for every bank at once (banks on the leading axis):
+
+    justified_pb(roe=0.08, coe=0.12, growth=0.05)          # 0.43
+    g = residual_grid(book=54.5, price=85.1, roe_now=0.044, retention=0.9)
+    g.target                                                # (ROE, CoE) values per share
+    tickers, g = universe_residual_grid(store)              # (banks, ROE, CoE)
+
+Banks are the tickers with both scenario rows and bank_quarterly rows;
+their scenarios' growth columns are ROE and their base is book value per
+share, as in the P/B scenario tables. The screen:
+
+    python3 -m stocklib.bankvalue [--points N] [--coe K] [--growth G] [--live]
+"""
+
+import numpy as np
+
+from stocklib.banks import latest, ticker_metrics, universe_metrics
+from stocklib.sensitivity import Grid
+from stocklib.valuation import SCENARIOS, ticker_inputs, universe_inputs
+
+COE = 0.12
+GROWTH = 0.05
+YEARS = 10
+FADE = 3
+POINTS = 50
+ROE_RANGE = (0.02, 0.20)
+COE_RANGE = (0.10, 0.16)
+# rounded axes of the report tables
+TABLE_ROE = (0.04, 0.08, 0.12, 0.16, 0.20)
+TABLE_COE = (0.10, 0.11, 0.12, 0.13, 0.14)
+
+
+class BankValue:
+    """Result arrays of bank_value(); the last axis of the per-scenario arrays is the scenario."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __getitem__(self, index):
+        """The values of one bank (or a slice) of a universe result."""
+        return BankValue(**{k: (v[index] if isinstance(v, np.ndarray) and v.ndim else v)
+                            for k, v in self.__dict__.items()})
+
+
+def _floats(*arrays):
+    return [np.asarray(a, dtype=np.float64) for a in arrays]
+
+
+def justified_pb(roe, coe=COE, growth=GROWTH):
+    """(ROE - g) / (CoE - g); NaN where the cost of equity does not exceed growth."""
+    roe, coe, growth = _floats(roe, coe, growth)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(coe > growth, (roe - growth) / (coe - growth), np.nan)
+
+
+def residual_income(book, roe, coe=COE, growth=GROWTH, years=YEARS, retention=1.0, roe_now=np.nan,
+                    fade=FADE):
+    """Value per share: `book` plus discounted residual income over `years` and a terminal value.
+
+    ROE moves linearly from `roe_now` (where given) to `roe` over `fade`
+    years and holds there; NaN where the cost of equity does not exceed
+    growth.
+    """
+    book, roe, coe, growth, retention, roe_now = _floats(book, roe, coe, growth, retention, roe_now)
+    start = np.where(np.isnan(roe_now), roe, roe_now)
+    opening, discount, value = book, 1.0, 0.0
+    for year in range(1, years + 1):
+        step = roe + (start - roe) * max(1.0 - year / fade, 0.0) if fade else roe
+        discount = discount / (1.0 + coe)
+        value = value + (step - coe) * opening * discount
+        opening = opening * (1.0 + step * retention)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal = np.where(coe > growth, (roe - coe) * opening / (coe - growth), np.nan)
+    return book + value + terminal * discount
+
+
+def implied_roe(book, price, coe=COE, growth=GROWTH, years=YEARS, retention=1.0, roe_now=np.nan,
+                fade=FADE, low=-0.2, high=0.6, steps=40):
+    """The sustainable ROE at which residual_income() equals `price` (bisection, elementwise)."""
+    price = np.asarray(price, dtype=np.float64)
+    shape = np.broadcast(*_floats(book, price, coe, growth, retention, roe_now)).shape
+    low, high = np.full(shape, low), np.full(shape, high)
+    for _ in range(steps):
+        mid = (low + high) / 2.0
+        above = residual_income(book, mid, coe, growth, years, retention, roe_now, fade) > price
+        low, high = np.where(above, low, mid), np.where(above, mid, high)
+    return (low + high) / 2.0
+
+
+def bank_value(book, roe, price, coe=COE, growth=GROWTH, years=YEARS, retention=1.0, roe_now=np.nan,
+               fade=FADE):
+    """Justified P/B and residual-income value for scenario ROEs (last axis) against `price`."""
+    book, roe, price = _floats(book, roe, price)
+    pb = justified_pb(roe, coe, growth)
+    residual = residual_income(book[..., None], roe, coe, growth, years, np.asarray(retention)[..., None],
+                               np.asarray(roe_now)[..., None], fade)
+    return BankValue(
+        book=book, roe=roe, price=price, coe=coe, growth=growth, years=years, roe_now=roe_now,
+        justified_pb=pb, gordon=book[..., None] * pb, residual=residual,
+        residual_pb=residual / book[..., None], residual_return=residual / price[..., None] - 1.0,
+        market_pb=price / book,
+        implied_roe=implied_roe(book, price, coe, growth, years, retention, roe_now, fade),
+    )
+
+
+def residual_grid(book, price, roe_axis=None, coe_axis=None, growth=GROWTH, years=YEARS, retention=1.0,
+                  roe_now=np.nan, fade=FADE, points=POINTS):
+    """Residual-income values on a ROE (rows) x cost of equity (columns) plane.
+
+    Leading axes of `book`, `price`, `retention` and `roe_now` are banks;
+    the result is a stocklib.sensitivity.Grid, so its tables and heatmap
+    helpers apply, with the cost of equity in place of the multiple.
+    """
+    roe_axis = np.linspace(*ROE_RANGE, points) if roe_axis is None else np.asarray(roe_axis, dtype=np.float64)
+    coe_axis = np.linspace(*COE_RANGE, points) if coe_axis is None else np.asarray(coe_axis, dtype=np.float64)
+    lead = lambda a: np.asarray(a, dtype=np.float64)[..., None, None]  # noqa: E731
+    target = residual_income(lead(book), roe_axis[:, None], coe_axis[None, :], lead(growth), years,
+                             lead(retention), lead(roe_now), fade)
+    return Grid(rows=roe_axis, roe=roe_axis, multiple=coe_axis, coe=coe_axis, target=target,
+                price=np.asarray(price, dtype=np.float64), book=np.asarray(book, dtype=np.float64),
+                justified_pb=justified_pb(roe_axis[:, None], coe_axis[None, :], lead(growth)),
+                growth=growth, years=years)
+
+
+# --- Store inputs ---
+
+def ticker_bank_inputs(data, price=None):
+    """bank_value() arguments for one bank from its scenario and bank_quarterly rows."""
+    args = ticker_inputs(data, price)
+    roe_now = np.nan
+    if len(data['bank_quarterly']):
+        roe_now = ticker_metrics(data).roe[-1] / 100.0
+    return dict(book=args['base'][1], roe=args['growth'][:, -1], price=args['price'],
+                retention=args['retention'][1], roe_now=roe_now)
+
+
+def universe_bank_inputs(store, prices=None):
+    """(tickers, bank_value() arguments) for every bank, banks on the first axis."""
+    tickers, args = universe_inputs(store, prices)
+    banks, m = universe_metrics(store)
+    rows = latest(m)
+    roe_now = dict(zip(m.ticker[rows], m.roe[rows] / 100.0))
+    keep = np.array([ticker in roe_now for ticker in tickers], dtype=bool)
+    return [t for t, k in zip(tickers, keep) if k], dict(
+        book=args['base'][keep, 1], roe=args['growth'][keep, :, -1], price=args['price'][keep],
+        retention=args['retention'][keep, 1], roe_now=np.array([roe_now[t] for t in np.asarray(tickers)[keep]]))
+
+
+def ticker_bank_value(data, price=None, **options):
+    """bank_value() for one bank; `options` as for bank_value() (coe, growth, years, fade)."""
+    return bank_value(**ticker_bank_inputs(data, price), **options)
+
+
+def universe_bank_value(store, prices=None, **options):
+    """(tickers, BankValue) for every bank in one broadcast call."""
+    tickers, args = universe_bank_inputs(store, prices)
+    return tickers, bank_value(**args, **options)
+
+
+def ticker_residual_grid(data, price=None, table=False, points=POINTS, **options):
+    """residual_grid() for one bank; table=True gives the rounded TABLE_ROE x TABLE_COE plane."""
+    args = ticker_bank_inputs(data, price)
+    args.pop('roe')
+    if table:
+        options = dict(options, roe_axis=TABLE_ROE, coe_axis=TABLE_COE)
+    return residual_grid(points=points, **args, **options)
+
+
+def universe_residual_grid(store, prices=None, points=POINTS, **options):
+    """(tickers, Grid) for every bank, banks on the first axis, in one broadcast pass."""
+    tickers, args = universe_bank_inputs(store, prices)
+    args.pop('roe')
+    return tickers, residual_grid(points=points, **args, **options)
+
+
+# --- Table cells ---
+
+def value_rows(v, currency, names=SCENARIOS):
+    """[scenario, ROE, justified P/B, Gordon value, residual-income value, return] per scenario.
+
+    Below growth (ROE < g) the Gordon multiple turns negative, and a low
+    enough ROE drives the residual-income value below zero; neither is a
+    target, so those cells read 'N/M' instead of a negative price.
+    """
+    rows = []
+    for name, roe, pb, gordon, ri, ret in zip(names, v.roe, v.justified_pb, v.gordon, v.residual,
+                                              v.residual_return):
+        gordon_cells = ([f'{pb:.2f}x', f'{currency}{gordon:,.1f}'] if pb > 0
+                        else ['N/M (ROE < g)'] * 2)
+        ri_cells = [f'{currency}{ri:,.1f}', f'{ret:+.0%}'] if ri > 0 else ['N/M'] * 2
+        rows.append([name, f'{roe:.0%}'] + gordon_cells + ri_cells)
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+    from stocklib.prices import PriceHistory
+
+    parser = argparse.ArgumentParser(description='Justified P/B and residual-income screen for every bank')
+    parser.add_argument('--points', type=int, default=POINTS, help=f'grid points per axis (default {POINTS})')
+    parser.add_argument('--coe', type=float, default=COE, help='cost of equity (default %(default)s)')
+    parser.add_argument('--growth', type=float, default=GROWTH, help='terminal growth (default %(default)s)')
+    parser.add_argument('--live', action='store_true',
+                        help='use the last close in the price store instead of the report price')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    prices = {}
+    if args.live:
+        for ticker in store.table('scenarios').tickers():
+            history = PriceHistory(ticker)
+            if len(history):
+                prices[ticker] = float(history.records['close'][-1])
+    start = time.perf_counter()
+    tickers, v = universe_bank_value(store, prices, coe=args.coe, growth=args.growth)
+    _, grid = universe_residual_grid(store, prices, args.points, growth=args.growth)
+    share = grid.upside_share()
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Ticker':<12}{'Price':>9}{'Book':>9}{'P/B':>7}{'ROE now':>9}{'Implied':>9}"
+          f"{'Bull':>9}{'Base':>9}{'Bear':>9}{'Upside':>9}")
+    for i, ticker in enumerate(tickers):
+        values = ''.join(f'{r:>9.1f}' if r > 0 else f"{'N/M':>9}" for r in v.residual[i])
+        print(f"{ticker:<12}{v.price[i]:>9.2f}{v.book[i]:>9.2f}{v.market_pb[i]:>6.2f}x{v.roe_now[i]:>9.1%}"
+              f"{v.implied_roe[i]:>9.1%}{values}{share[i]:>9.0%}")
+    print(f"{len(tickers)} bank(s) x {args.points}x{args.points} ROE x CoE grid in {elapsed * 1000:.2f} ms "
+          f"(CoE {args.coe:.0%}, terminal growth {args.growth:.0%}, {YEARS}-year horizon)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Batch driver: build several research reports in one warm interpreter.
+
+    python3 -m stocklib.batch                  # every report
+    python3 -m stocklib.batch ablbl abfrl      # a subset
+    python3 -m stocklib.batch --jobs 4         # fork 4 workers after warm-up
+    python3 -m stocklib.batch --in-memory      # no chart_*.png files; PNGs go straight to the PDF
+    python3 -m stocklib.batch --vector         # charts embedded as vector graphics
+
+Stale store tables are recompiled, and matplotlib, reportlab, the SFNS font
+and the sample stylesheet are imported, registered and built, once in the
+parent, and every report module is loaded
+before any worker is forked, so workers start with all of it already in
+memory instead of paying a cold interpreter start per report.
+"""
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPORTS = {
+    'abfrl': 'abfrl/abfrl_report.py',
+    'ablbl': 'ablbl/ablbl_report.py',
+    'bikaji': 'bikaji/bikaji_report.py',
+    'bikaji-foods': 'bikaji-foods/bikaji_report.py',
+    'cello-world': 'cello-world/cello_world_report.py',
+    'idfc-first-bank': 'idfc-first-bank/idfc_first_bank_report.py',
+    'sula-vineyards': 'sula-vineyards/sula_report.py',
+}
+
+
+def warm_up():
+    """Recompile stale store tables, import the rendering stack and build the shared PDF resources once."""
+    from stocklib.datastore import open_store
+    from stocklib.fonts import register_fonts
+    from stocklib.render import setup_matplotlib
+    from stocklib.styles import sample_stylesheet
+
+    open_store()  # before any worker is forked, so the workers only read the store
+    setup_matplotlib()
+    import matplotlib.pyplot  # noqa: F401  # preload before fork
+    import reportlab.platypus  # noqa: F401  # preload before fork
+    register_fonts()
+    sample_stylesheet()
+
+
+def load_report(name):
+    """Import a report script as a module (cached in sys.modules)."""
+    module_name = name.replace('-', '_') + '_report'
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, REPORTS[name]))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_report(name, cache=True, in_memory=False, vector=False):
+    """Render one report's charts and PDF; return (name, seconds)."""
+    from stocklib.render import render_charts
+
+    start = time.perf_counter()
+    module = load_report(name)
+    charts = render_charts(module.CHARTS, cache=cache, in_memory=in_memory, vector=vector)
+    module.build_pdf(charts)
+    return name, time.perf_counter() - start
+
+
+def _build_group(args):
+    names, cache, in_memory, vector = args
+    return [build_report(name, cache, in_memory, vector) for name in names]
+
+
+def _groups(names):
+    """Group reports that write the same PDF so they never run concurrently."""
+    groups = {}
+    for name in names:
+        groups.setdefault(load_report(name).FINAL_PDF, []).append(name)
+    return list(groups.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('reports', nargs='*', metavar='REPORT',
+                        help=f'reports to build (default: all of {", ".join(sorted(REPORTS))})')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='build reports in N forked workers (0 = one per CPU core)')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='re-render every chart instead of reusing cached PNGs')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='hand charts to the PDFs as in-memory PNGs instead of writing chart files')
+    parser.add_argument('--vector', action='store_true',
+                        help='embed charts as vector graphics instead of 150-dpi PNGs')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.reports) - set(REPORTS))
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}")
+    names = args.reports or list(REPORTS)
+
+    start = time.perf_counter()
+    warm_up()
+    groups = _groups(names)
+    print(f"Warm-up done in {time.perf_counter() - start:.2f}s ({len(names)} reports loaded)")
+
+    jobs = args.jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(groups))
+    work = [(group, args.cache, args.in_memory, args.vector) for group in groups]
+    if jobs <= 1:
+        results = map(_build_group, work)
+    else:
+        pool = multiprocessing.get_context('fork').Pool(jobs)
+        results = pool.imap_unordered(_build_group, work)
+    for group in results:
+        for name, seconds in group:
+            print(f"  {name}: {seconds:.2f}s")
+    if jobs > 1:
+        pool.close()
+        pool.join()
+    print(f"Built {len(names)} reports in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""
+Benchmarks: chart rendering, PDF assembly and valuation math, with regression checks.
+
+    python3 -m stocklib.bench                          # everything -> STOCK_ANALYSIS_CACHE/bench/
+    python3 -m stocklib.bench abfrl cello-world --only charts pdf
+    python3 -m stocklib.bench --only valuation --sizes 10 100 1000
+    python3 -m stocklib.bench --baseline base.json     # exit 1 if a stage regressed past --threshold
+
+Each report is benchmarked in a fresh interpreter (python -m stocklib.bench
+--worker REPORT) so the numbers do not depend on which report ran first:
+
+    import/<report>                  loading the script and its data (no matplotlib or reportlab)
+    chart/<report>/<chart>/cold      the chart's first render in that interpreter (the first
+                                     chart also pays for importing matplotlib)
+    chart/<report>/<chart>/warm      fastest of --repeat further renders
+    pdf/<report>/story               build_pdf() minus doc.build: assembling the story
+    pdf/<report>/layout              doc.build(): platypus layout and PDF writing
+
+Charts are rendered as in-memory PNGs straight from the chart functions,
+bypassing the chart cache. The valuation stages run on synthetic universes
+built from the store's scenario rows (SYN00000, SYN00001, ...; each a real
+ticker's scenarios with its price and base scaled):
+
+    valuation/<n>/universe           universe_valuation(), one broadcast call
+    valuation/<n>/per_ticker         ticker_valuation() for every ticker in turn
+    valuation/<n>/grid               universe_grid()
+    valuation/<n>/simulation         universe_simulation() at SIMULATION_PATHS paths
+
+Results are written as JSON, {stage: {'seconds', 'samples'}} plus the
+versions they were measured with; every stage but the cold ones is the
+fastest of its samples. With --baseline, a stage regresses when it is
+slower than the baseline by more than --threshold (relative) and by more
+than --min-delta seconds, which keeps millisecond stages from tripping on
+noise.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from stocklib.batch import REPORTS, ROOT
+from stocklib.chart_cache import CACHE_DIR
+from stocklib.datastore import Store, open_store, write_table
+
+BENCH_DIR = os.path.join(CACHE_DIR, 'bench')
+SIZES = (10, 100, 1000)
+REPEAT = 3
+SIMULATION_PATHS = 10_000
+THRESHOLD = 0.25
+MIN_DELTA = 0.02
+SEED = 20260201
+GROUPS = ('charts', 'pdf', 'valuation')
+
+
+def _best(fn, repeat):
+    """(fastest seconds of `repeat` calls, last result)."""
+    best, result = np.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _stage(results, name, seconds, samples=1):
+    results[name] = {'seconds': round(seconds, 6), 'samples': samples}
+
+
+# --- Reports (in a fresh interpreter each) ---
+
+def bench_report(name, repeat=REPEAT, pdf=True):
+    """{stage: result} for one report's import, charts and build_pdf(); run in a fresh interpreter."""
+    from stocklib import profiling
+    from stocklib.batch import load_report
+    from stocklib.render import render_charts
+
+    results = {}
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        start = time.perf_counter()
+        module = load_report(name)
+        _stage(results, f'import/{name}', time.perf_counter() - start)
+
+        charts = {}
+        for chart, fn in module.CHARTS.items():
+            render = lambda: render_charts({chart: fn}, in_memory=True)[chart].getvalue()  # noqa: E731
+            start = time.perf_counter()
+            charts[chart] = render()
+            _stage(results, f'chart/{name}/{chart}/cold', time.perf_counter() - start)
+            seconds, _ = _best(render, repeat)
+            _stage(results, f'chart/{name}/{chart}/warm', seconds, repeat)
+
+        if pdf:
+            story, layout = np.inf, np.inf
+            with tempfile.TemporaryDirectory() as tmp:
+                module.FINAL_PDF = os.path.join(tmp, 'report.pdf')
+                for _ in range(repeat):
+                    profiling.mark('bench')
+                    module.build_pdf({chart: io.BytesIO(png) for chart, png in charts.items()})
+                    phases = {phase['name']: phase['seconds'] for phase in profiling.phases()[-2:]}
+                    story, layout = min(story, phases['story']), min(layout, phases['doc.build'])
+            _stage(results, f'pdf/{name}/story', story, repeat)
+            _stage(results, f'pdf/{name}/layout', layout, repeat)
+    return results
+
+
+def _run_worker(name, repeat, pdf):
+    with tempfile.NamedTemporaryFile(suffix='.json') as fh:
+        command = [sys.executable, '-m', 'stocklib.bench', '--worker', name, '--repeat', str(repeat),
+                   '--result', fh.name] + ([] if pdf else ['--only', 'charts'])
+        subprocess.run(command, cwd=ROOT, check=True)
+        return json.load(fh)
+
+
+# --- Valuation on synthetic universes ---
+
+def synthetic_store(n, store_dir, seed=SEED, store=None):
+    """A store of `n` synthetic tickers whose scenarios are the real tickers' rows, price and base scaled."""
+    table = (store or open_store()).table('scenarios')
+    columns = {name: np.asarray(table.column(name)) for name in table.columns}
+    real = np.unique(columns['ticker'])
+    rows = [np.flatnonzero(columns['ticker'] == ticker) for ticker in real]
+    rng = np.random.default_rng(seed)
+    scale = rng.lognormal(0.0, 0.5, n)
+    picked = [rows[i % len(real)] for i in range(n)]
+    counts = [len(r) for r in picked]
+    out = {name: col[np.concatenate(picked)] for name, col in columns.items()}
+    out['ticker'] = np.repeat([f'SYN{i:05d}' for i in range(n)], counts)
+    for name in ('price', 'base'):
+        out[name] = out[name] * np.repeat(scale, counts)
+    write_table('scenarios', out, store_dir)
+    return Store(store_dir)
+
+
+def bench_valuation(sizes=SIZES, repeat=REPEAT):
+    """{stage: result} for the valuation arithmetic on synthetic universes of each size."""
+    from stocklib.montecarlo import universe_simulation
+    from stocklib.sensitivity import universe_grid
+    from stocklib.valuation import ticker_valuation, universe_valuation
+
+    results = {}
+    source = open_store()
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = synthetic_store(n, tmp, store=source)
+            names = store.table('scenarios').tickers()
+            stages = {
+                'universe': lambda: universe_valuation(store),
+                'per_ticker': lambda: [ticker_valuation(store.ticker(ticker)) for ticker in names],
+                'grid': lambda: universe_grid(store),
+                'simulation': lambda: universe_simulation(store, paths=SIMULATION_PATHS),
+            }
+            for stage, fn in stages.items():
+                seconds, _ = _best(fn, repeat)
+                _stage(results, f'valuation/{n}/{stage}', seconds, repeat)
+                print(f"  valuation/{n}/{stage}: {seconds:.4f}s")
+    return results
+
+
+# --- Comparing runs ---
+
+def compare(results, baseline, threshold=THRESHOLD, min_delta=MIN_DELTA):
+    """[(stage, baseline seconds, seconds)] for every stage that regressed past the limits."""
+    regressed = []
+    for stage, result in results.items():
+        if stage not in baseline:
+            continue
+        old, new = baseline[stage]['seconds'], result['seconds']
+        if new > old * (1 + threshold) and new - old > min_delta:
+            regressed.append((stage, old, new))
+    return regressed
+
+
+def _meta():
+    import matplotlib
+    import reportlab
+
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'argv': sys.argv,
+            'python': platform.python_version(), 'numpy': np.__version__, 'matplotlib': matplotlib.__version__,
+            'reportlab': reportlab.Version, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark chart rendering, PDF assembly and valuation math')
+    parser.add_argument('reports', nargs='*', metavar='REPORT',
+                        help=f'reports to benchmark (default: all of {", ".join(sorted(REPORTS))})')
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=GROUPS, help='stages to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES,
+                        help='synthetic universe sizes for the valuation stages (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='samples per warm stage (default: %(default)s)')
+    parser.add_argument('-o', '--output', help='results file (default: STOCK_ANALYSIS_CACHE/bench/bench-<time>.json)')
+    parser.add_argument('--baseline', help='results file to compare against; exit 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='relative slowdown that counts as a regression (default: %(default)s)')
+    parser.add_argument('--min-delta', type=float, default=MIN_DELTA,
+                        help='ignore slowdowns smaller than this many seconds (default: %(default)s)')
+    parser.add_argument('--worker', metavar='REPORT', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        results = bench_report(args.worker, args.repeat, pdf='pdf' in args.only)
+        with open(args.result, 'w') as fh:
+            json.dump(results, fh)
+        return 0
+
+    unknown = [name for name in args.reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)['results']
+
+    start = time.perf_counter()
+    results = {}
+    if 'charts' in args.only or 'pdf' in args.only:
+        for name in args.reports or sorted(REPORTS):
+            print(f"{name}...")
+            report = _run_worker(name, args.repeat, 'pdf' in args.only)
+            for stage, result in report.items():
+                print(f"  {stage}: {result['seconds']:.4f}s")
+            results.update(report)
+    if 'valuation' in args.only:
+        print("valuation...")
+        results.update(bench_valuation(args.sizes, args.repeat))
+
+    output = args.output or os.path.join(BENCH_DIR, f'bench-{datetime.datetime.now():%Y%m%d-%H%M%S}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as fh:
+        json.dump({'meta': _meta(), 'results': results}, fh, indent=1, sort_keys=True)
+    print(f"{len(results)} stage(s) in {time.perf_counter() - start:.1f}s -> {output}")
+
+    if baseline is None:
+        return 0
+    regressed = compare(results, baseline, args.threshold, args.min_delta)
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"{len(missing)} stage(s) not in the baseline: {', '.join(missing)}")
+    for stage, old, new in regressed:
+        print(f"REGRESSED {stage}: {old:.4f}s -> {new:.4f}s ({new / old - 1:+.0%})")
+    if regressed:
+        return 1
+    print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%}, min delta {args.min_delta}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
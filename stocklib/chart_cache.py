@@ -0,0 +1,169 @@
+"""
+Content-addressed cache for rendered chart PNGs.
+
+A chart's key hashes everything that can change its pixels: the chart
+function's source, the module-level values it references (series, colours,
+labels), the arguments bound by functools.partial, any extra inputs passed in, the active matplotlib rcParams and the
+matplotlib version. A hit returns the cached PNG without touching matplotlib.
+Objects other than arrays, scalars, containers and functions must have a
+fingerprint() method; anything else raises TypeError rather than hashing a
+repr that changes from run to run.
+The cache is capped in bytes and evicts least-recently-used entries first.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import re
+import shutil
+import types
+
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    'STOCK_ANALYSIS_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'stock-analysis'),
+)
+CHART_CACHE_DIR = os.path.join(CACHE_DIR, 'charts')
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# PNG charts, vector recordings (stocklib.vector) and report sections (stocklib.template)
+SUFFIXES = ('.png', '.rldraw', '.pdf')
+
+
+def _feed(h, value, seen):
+    """Fold `value` into hash `h` in a repr-stable way."""
+    if isinstance(value, np.ndarray):
+        h.update(f'ndarray:{value.dtype.str}:{value.shape}:'.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (str, bytes, int, float, complex, bool, type(None), np.generic)):
+        h.update(f'{type(value).__name__}:{value!r};'.encode())
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__}[{len(value)}]'.encode())
+        for item in value:
+            _feed(h, item, seen)
+    elif isinstance(value, dict):
+        h.update(f'dict[{len(value)}]'.encode())
+        for k in sorted(value, key=repr):
+            _feed(h, k, seen)
+            _feed(h, value[k], seen)
+    elif isinstance(value, (types.FunctionType, functools.partial)):
+        if value in seen:
+            return
+        seen.add(value)
+        _feed_callable(h, value, seen)
+    elif isinstance(value, (types.ModuleType, type)):
+        return
+    elif hasattr(value, '__wrapped__'):
+        # functools.lru_cache and other wrappers: their repr carries an address
+        _feed(h, value.__wrapped__, seen)
+    elif hasattr(value, 'fingerprint'):
+        h.update(f'fingerprint:{value.fingerprint()};'.encode())
+    elif isinstance(value, re.Pattern):
+        h.update(f'pattern:{value.pattern!r}:{value.flags};'.encode())
+    else:
+        # a default repr carries the object's address, so the key would change every run
+        raise TypeError(f"cannot hash {type(value).__module__}.{type(value).__qualname__} into a cache key; "
+                        "give it a fingerprint() method")
+
+
+def _referenced_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _referenced_names(const)
+    return names
+
+
+def _feed_function(h, fn, seen):
+    try:
+        h.update(inspect.getsource(fn).encode())
+    except (OSError, TypeError):
+        h.update(fn.__code__.co_code)
+    for name in sorted(_referenced_names(fn.__code__)):
+        if name in fn.__globals__:
+            h.update(f'global:{name}='.encode())
+            _feed(h, fn.__globals__[name], seen)
+
+
+def _feed_callable(h, fn, seen):
+    """A chart function, or a functools.partial of one with its bound arguments."""
+    if isinstance(fn, functools.partial):
+        h.update(b'partial:')
+        _feed_callable(h, fn.func, seen)
+        _feed(h, fn.args, seen)
+        _feed(h, fn.keywords, seen)
+    else:
+        _feed_function(h, fn, seen)
+
+
+def chart_key(fn, inputs=None):
+    """Return the content hash identifying the PNG that `fn` would render."""
+    import matplotlib
+
+    h = hashlib.sha256()
+    _feed_callable(h, fn, {fn})
+    if inputs is not None:
+        h.update(b'inputs=')
+        _feed(h, inputs, set())
+    h.update(f'matplotlib={matplotlib.__version__};'.encode())
+    rc = matplotlib.rcParams
+    for name in sorted(rc.keys()):
+        h.update(f'{name}={rc[name]!r};'.encode())
+    return h.hexdigest()
+
+
+def lookup(key, cache_dir=CHART_CACHE_DIR, suffix='.png'):
+    """Return the cached chart path for `key`, or None on a miss."""
+    entry = os.path.join(cache_dir, key + suffix)
+    try:
+        os.utime(entry)  # mark as most recently used
+    except FileNotFoundError:
+        return None
+    return entry
+
+
+def store(key, chart, cache_dir=CHART_CACHE_DIR, max_bytes=MAX_CACHE_BYTES, suffix='.png'):
+    """Copy a freshly rendered chart (a path, or its bytes) into the cache and enforce the size cap."""
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, key + suffix)
+    tmp = f'{entry}.{os.getpid()}.tmp'
+    if isinstance(chart, bytes):
+        with open(tmp, 'wb') as fh:
+            fh.write(chart)
+    else:
+        shutil.copyfile(chart, tmp)
+    os.replace(tmp, entry)
+    evict(cache_dir, max_bytes)
+    return entry
+
+
+def evict(cache_dir=CHART_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Drop least-recently-used entries until the cache fits in `max_bytes`."""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for e in it:
+            if e.name.endswith(SUFFIXES):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+
+def cached_chart(fn, inputs=None, cache_dir=CHART_CACHE_DIR):
+    """Call `fn` unless an identical chart is already cached; return its PNG path."""
+    key = chart_key(fn, inputs)
+    hit = lookup(key, cache_dir)
+    if hit is not None:
+        return hit
+    path = fn()
+    store(key, path, cache_dir)
+    return path
@@ -0,0 +1,274 @@
+"""
+Columnar per-ticker dataset store.
+
+Each statement type is one table stored column-by-column as .npy files:
+
+    data/raw/<table>.csv             hand-maintained source rows (in git)
+    data/store/<table>/<column>.npy  compiled columns (generated, memory-mapped)
+
+Rows are sorted by ticker, so a ticker's rows are one contiguous slice found
+with a binary search on the ticker column; columns are only loaded (mmap'd)
+when first read. Within a ticker, rows keep their source order, which is
+chronological for every table.
+
+    store = open_store()
+    q = store.ticker('ABLBL')['quarterly_pnl']
+    q.periods, q['revenue'], q.select(['Q2 FY26', 'Q3 FY26'])['pat']
+
+Raw CSVs are recompiled automatically when they are newer than the store.
+Large universes can skip the CSV step and call write_table() with arrays.
+"""
+
+import csv
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get('STOCK_ANALYSIS_DATA', os.path.join(ROOT, 'data'))
+
+KEYS = ['ticker', 'period']
+
+# table -> (label columns, numeric columns); a CSV may omit numeric columns (NaN)
+TABLES = {
+    'quarterly_pnl': (['basis'], ['revenue', 'ebitda', 'ebitda_margin', 'gross_margin', 'opm',
+                                  'pat', 'pat_margin', 'eps', 'nii', 'nim', 'cti']),
+    'annual_pnl': (['basis'], ['revenue', 'ebitda', 'pat', 'eps']),
+    'cashflow': (['note'], ['cfo', 'capex', 'pat']),
+    'working_capital': (['basis'], ['revenue', 'cogs', 'receivables', 'inventory', 'payables',
+                                    'net_working_capital']),
+    'shareholding': ([], ['promoter', 'fii', 'dii', 'public', 'government']),
+    'peers': (['peer'], ['pe', 'forward_pe', 'pb', 'ps', 'ev_sales', 'revenue', 'ebitda_margin',
+                         'pat_margin', 'revenue_growth', 'market_cap', 'roa', 'nim', 'gnpa', 'casa']),
+    'targets': (['broker', 'rating'], ['target_low', 'target_high']),
+    'bank_quarterly': (['basis'], ['advances', 'deposits', 'casa', 'gnpa', 'nnpa', 'provisions', 'nii',
+                                   'other_income', 'opex', 'pat', 'earning_assets', 'assets', 'equity',
+                                   'capital', 'rwa']),
+    'enterprise': (['basis'], ['price', 'shares', 'debt', 'cash', 'leases', 'revenue', 'ebitda']),
+    'cash_runway': (['basis'], ['cash', 'revenue', 'growth', 'growth_sd', 'margin', 'margin_sd', 'capex',
+                                'capex_sd', 'leases', 'leases_sd', 'other']),
+    'scenarios': (['scenario'], ['price', 'base', 'growth_1', 'growth_2', 'retention', 'shares',
+                                 'multiple_low', 'multiple_high', 'probability', 'adjustment', 'floor']),
+}
+
+
+def _parse_number(text):
+    text = text.strip().replace(',', '')
+    return float(text) if text else np.nan
+
+
+def write_table(name, columns, store_dir=None):
+    """Write a table from {column: sequence}; rows are stably sorted by ticker."""
+    store_dir = store_dir or os.path.join(DATA_DIR, 'store')
+    labels, values = TABLES[name]
+    tickers = np.asarray(columns['ticker'], dtype=str)
+    order = np.argsort(tickers, kind='stable')
+    n = len(tickers)
+
+    tmp_dir = os.path.join(store_dir, f'.{name}.{os.getpid()}.tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    for col in KEYS + labels:
+        data = np.asarray(columns.get(col, [''] * n), dtype=str)[order]
+        np.save(os.path.join(tmp_dir, col + '.npy'), data)
+    for col in values:
+        data = np.asarray(columns.get(col, np.full(n, np.nan)), dtype=np.float64)[order]
+        np.save(os.path.join(tmp_dir, col + '.npy'), data)
+    with open(os.path.join(tmp_dir, '_meta.json'), 'w') as fh:
+        json.dump({'rows': n, 'labels': labels, 'values': values}, fh)
+
+    # swap by rename so readers of the table never find it half-deleted; the
+    # old columns are removed afterwards (open memory maps keep their data)
+    table_dir = os.path.join(store_dir, name)
+    old_dir = os.path.join(store_dir, f'.{name}.{os.getpid()}.old')
+    try:
+        os.replace(table_dir, old_dir)
+    except FileNotFoundError:
+        old_dir = None
+    os.replace(tmp_dir, table_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return table_dir
+
+
+def compile_table(name, csv_path, store_dir=None):
+    """Compile one raw CSV into its columnar form."""
+    labels, values = TABLES[name]
+    with open(csv_path, newline='', encoding='utf-8') as fh:
+        reader = csv.DictReader(fh)
+        unknown = set(reader.fieldnames) - set(KEYS + labels + values)
+        if unknown:
+            raise ValueError(f"{csv_path}: unknown columns {sorted(unknown)}")
+        rows = list(reader)
+    columns = {col: [r[col] for r in rows] for col in KEYS + labels if col in reader.fieldnames}
+    for col in values:
+        if col in reader.fieldnames:
+            columns[col] = [_parse_number(r[col]) for r in rows]
+    return write_table(name, columns, store_dir)
+
+
+class Frame:
+    """A ticker's rows of one table; columns are zero-copy views until selected."""
+
+    def __init__(self, table, rows):
+        self.table = table
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __getitem__(self, column):
+        return np.asarray(self.table.column(column)[self.rows])
+
+    def __contains__(self, column):
+        return column in self.table.columns
+
+    @property
+    def periods(self):
+        return [str(p) for p in self.table.column('period')[self.rows]]
+
+    def select(self, periods):
+        """Restrict to the given period labels, in the order given."""
+        labels = self.table.column('period')[self.rows]
+        idx = []
+        for p in periods:
+            hits = np.flatnonzero(labels == p)
+            if not len(hits):
+                raise KeyError(f"{self.table.name}: no period {p!r}")
+            idx.append(hits[0])
+        rows = self.rows
+        positions = np.arange(rows.start, rows.stop) if isinstance(rows, slice) else rows
+        return Frame(self.table, positions[idx])
+
+    def last(self, n):
+        """The most recent `n` periods."""
+        return self.select(self.periods[-n:])
+
+    def to_dict(self):
+        return {col: self[col] for col in self.table.columns}
+
+
+class Table:
+    """One compiled table; columns are memory-mapped lazily."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self._columns = {}
+        labels, values = TABLES[name]
+        self.columns = KEYS + labels + values
+
+    def column(self, name):
+        if name not in self._columns:
+            if name not in self.columns:
+                raise KeyError(f"{self.name}: no column {name!r}")
+            path = os.path.join(self.path, name + '.npy')
+            try:
+                self._columns[name] = np.load(path, mmap_mode='r')
+            except FileNotFoundError:
+                # caught between the two renames of a concurrent write_table()
+                self._columns[name] = _locked(os.path.dirname(self.path), np.load, path, mmap_mode='r')
+        return self._columns[name]
+
+    def rows(self, ticker):
+        tickers = self.column('ticker')
+        lo = int(np.searchsorted(tickers, ticker, side='left'))
+        hi = int(np.searchsorted(tickers, ticker, side='right'))
+        return slice(lo, hi)
+
+    def frame(self, ticker):
+        return Frame(self, self.rows(ticker))
+
+    def tickers(self):
+        return [str(t) for t in np.unique(self.column('ticker'))]
+
+
+class TickerData:
+    """Lazy view of every table (or only of `tables`) for one ticker: data['quarterly_pnl']['revenue']."""
+
+    def __init__(self, store, ticker, tables=None):
+        self.store = store
+        self.ticker = ticker
+        self.tables = None if tables is None else tuple(tables)
+        self._fingerprint = None
+
+    def __getitem__(self, table):
+        if self.tables is not None and table not in self.tables:
+            raise KeyError(f"{self.ticker}: table {table!r} is outside this view")
+        return self.store.table(table).frame(self.ticker)
+
+    def fingerprint(self):
+        """Content hash of every row this ticker has (in the view's tables), for cache keys."""
+        if self._fingerprint is None:
+            h = hashlib.sha256(self.ticker.encode())
+            for name in sorted(self.store.tables()):
+                if self.tables is not None and name not in self.tables:
+                    continue
+                frame = self[name]
+                h.update(f'{name}:{len(frame)};'.encode())
+                for col in frame.table.columns:
+                    h.update(np.ascontiguousarray(frame[col]).tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+
+class Store:
+    """All compiled tables under one directory."""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._tables = {}
+
+    def tables(self):
+        return [name for name in TABLES if os.path.isdir(os.path.join(self.store_dir, name))]
+
+    def table(self, name):
+        if name not in self._tables:
+            path = os.path.join(self.store_dir, name)
+            if not os.path.isdir(path) and not _locked(self.store_dir, os.path.isdir, path):
+                raise KeyError(f"table {name!r} has not been built in {self.store_dir}")
+            self._tables[name] = Table(name, path)
+        return self._tables[name]
+
+    def ticker(self, ticker, tables=None):
+        return TickerData(self, ticker, tables)
+
+
+def open_store(data_dir=None):
+    """Open the store, recompiling any raw CSV that is newer than its table."""
+    data_dir = data_dir or DATA_DIR
+    raw_dir = os.path.join(data_dir, 'raw')
+    store_dir = os.path.join(data_dir, 'store')
+    if _stale_tables(raw_dir, store_dir):
+        # concurrent processes (batch and scheduler workers, parallel CLI runs)
+        # recompile one at a time; the ones that waited find the tables current
+        os.makedirs(store_dir, exist_ok=True)
+        with open(os.path.join(store_dir, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            for name in _stale_tables(raw_dir, store_dir):
+                compile_table(name, os.path.join(raw_dir, name + '.csv'), store_dir)
+    return Store(store_dir)
+
+
+def _locked(store_dir, fn, *args, **kwargs):
+    """Call `fn` once no open_store() is recompiling into `store_dir`."""
+    if not os.path.isdir(store_dir):
+        return fn(*args, **kwargs)
+    with open(os.path.join(store_dir, '.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        return fn(*args, **kwargs)
+
+
+def _stale_tables(raw_dir, store_dir):
+    """Tables whose raw CSV is newer than the compiled store (or was never compiled)."""
+    stale = []
+    for name in TABLES:
+        csv_path = os.path.join(raw_dir, name + '.csv')
+        meta = os.path.join(store_dir, name, '_meta.json')
+        if os.path.exists(csv_path) and (
+                not os.path.exists(meta) or os.path.getmtime(csv_path) > os.path.getmtime(meta)):
+            stale.append(name)
+    return stale
@@ -0,0 +1,183 @@
+"""
+Enterprise value bridge: market cap, debt, cash and lease liabilities to EV/Sales and EV/EBITDA.
+
+The reports used to type the bridge ("Market Cap + Net Debt = Rs 8,176 Cr +
+Rs 7,000 Cr") and the multiples derived from it. The store's enterprise
+table holds the pieces per ticker and date instead (Rs Cr; shares in Cr):
+
+    price                 the price the market cap is struck at
+    shares                shares outstanding
+    debt, cash            borrowings and gross cash / liquid investments
+    leases                Ind AS 116 lease liabilities (blank when not disclosed)
+    revenue, ebitda       trailing-twelve-month figures at that date
+
+and bridge() turns every row of every ticker into market cap, net debt
+(debt + leases - cash), EV and the multiples in one vectorised pass. EBITDA
+is as reported under Ind AS 116, i.e. before rent, so it pairs with an EV
+that carries the lease liabilities; where they are blank, EV/EBITDA is
+understated. A blank debt, cash or lease figure counts as zero; a blank
+revenue or EBITDA leaves its multiple NaN.
+
+A price update is one vectorised step over the latest rows:
+
+    b = ticker_bridge(open_store().ticker('ABFRL'))
+    b.ev[-1], b.ev_sales[-1]
+    reprice(b, 83.92).ev_sales                 # every row at one price
+    tickers, b = universe_bridge(store, {'ABFRL': 83.92})
+
+    python3 -m stocklib.enterprise [--live]    # latest bridge of every ticker
+"""
+
+import numpy as np
+
+from stocklib.datastore import TABLES
+
+COLUMNS = TABLES['enterprise'][1]
+
+
+class Bridge:
+    """Result arrays of bridge(), one entry per (ticker, date) row."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __len__(self):
+        return len(self.ev)
+
+    def __getitem__(self, index):
+        """The bridge of a subset of rows (a slice or an index array)."""
+        return Bridge(**{k: (v[index] if isinstance(v, np.ndarray) and v.ndim else v)
+                         for k, v in self.__dict__.items()})
+
+
+def _ratio(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b > 0, a / b, np.nan)
+
+
+def bridge(price, shares, debt=0.0, cash=0.0, leases=0.0, revenue=np.nan, ebitda=np.nan, ticker=(),
+           periods=()):
+    """EV, net debt and the multiples for arrays of rows (inputs broadcast)."""
+    price, shares, revenue, ebitda = (np.asarray(a, dtype=np.float64) for a in (price, shares, revenue, ebitda))
+    debt, cash, leases = (np.nan_to_num(np.asarray(a, dtype=np.float64)) for a in (debt, cash, leases))
+    market_cap = price * shares
+    net_debt = debt + leases - cash
+    ev = market_cap + net_debt
+    return Bridge(
+        ticker=np.asarray(ticker, dtype=str), periods=np.asarray(periods, dtype=str),
+        price=price, shares=shares, debt=debt, cash=cash, leases=leases, revenue=revenue, ebitda=ebitda,
+        market_cap=market_cap, net_debt=net_debt, ev=ev,
+        ev_sales=_ratio(ev, revenue), ev_ebitda=_ratio(ev, ebitda), ps=_ratio(market_cap, revenue),
+    )
+
+
+def reprice(b, prices):
+    """The bridge at new prices: an array (broadcast over rows) or {ticker: price} for the latest rows.
+
+    Only the market cap moves, so this is one vectorised pass whatever the
+    number of rows; rows without a new price keep theirs.
+    """
+    price = np.array(np.broadcast_to(b.price, np.shape(b.ev)), dtype=np.float64)
+    if isinstance(prices, dict):
+        rows = latest(b)
+        new = np.array([prices.get(str(t), np.nan) for t in b.ticker[rows]], dtype=np.float64)
+        price[rows] = np.where(np.isfinite(new), new, price[rows])
+    else:
+        price = np.broadcast_to(np.asarray(prices, dtype=np.float64), price.shape)
+    return bridge(price, b.shares, b.debt, b.cash, b.leases, b.revenue, b.ebitda, b.ticker, b.periods)
+
+
+def latest(b):
+    """Row index of each ticker's most recent date."""
+    last = np.ones(len(b.ticker), dtype=bool)
+    last[:-1] = b.ticker[1:] != b.ticker[:-1]
+    return np.flatnonzero(last)
+
+
+def per_share(b, ev):
+    """Equity value per share for enterprise value(s) `ev` against each row's net debt and shares."""
+    return (np.asarray(ev, dtype=np.float64) - b.net_debt) / b.shares
+
+
+# --- Store inputs ---
+
+def ticker_bridge(data, price=None):
+    """Bridge for every date of one ticker (a Store.ticker() view); `price` reprices every row."""
+    frame = data['enterprise']
+    b = bridge(*(frame[name] for name in COLUMNS), ticker=frame['ticker'], periods=frame.periods)
+    return b if price is None else reprice(b, price)
+
+
+def universe_bridge(store, prices=None):
+    """(tickers, Bridge over every row of every ticker), latest rows repriced from {ticker: price}."""
+    table = store.table('enterprise')
+    b = bridge(*(np.asarray(table.column(name)) for name in COLUMNS), ticker=table.column('ticker'),
+               periods=table.column('period'))
+    return table.tickers(), (reprice(b, prices) if prices else b)
+
+
+# --- Table cells ---
+
+def bridge_rows(b, i=-1, currency='₹'):
+    """[item, value, working] rows from market cap to EV and its multiples for row `i`."""
+    c = currency
+    i = i % len(b)
+    rows = [['Market Cap', f'{c}{b.market_cap[i]:,.0f} Cr',
+             f'{b.shares[i]:,.2f} Cr shares x {c}{b.price[i]:,.2f}']]
+    for name, label in (('debt', 'Debt'), ('leases', 'Lease Liabilities (Ind AS 116)'), ('cash', 'Cash')):
+        value = getattr(b, name)[i]
+        if value:
+            rows.append([f'{"Less: " if name == "cash" else "Add: "}{label}', f'{c}{value:,.0f} Cr', ''])
+    rows.append(['Enterprise Value', f'{c}{b.ev[i]:,.0f} Cr',
+                 f'{c}{b.market_cap[i]:,.0f} + {c}{b.net_debt[i]:,.0f} Cr net debt'])
+    if np.isfinite(b.ev_sales[i]):
+        rows.append(['EV/Sales (TTM)', f'{b.ev_sales[i]:.2f}x',
+                     f'{c}{b.ev[i]:,.0f} / {c}{b.revenue[i]:,.0f} Cr revenue'])
+    if np.isfinite(b.ev_ebitda[i]):
+        rows.append(['EV/EBITDA (TTM)', f'{b.ev_ebitda[i]:.1f}x',
+                     f'{c}{b.ev[i]:,.0f} / {c}{b.ebitda[i]:,.0f} Cr EBITDA'])
+    if np.isfinite(b.ps[i]):
+        rows.append(['P/S (TTM)', f'{b.ps[i]:.2f}x',
+                     f'{c}{b.market_cap[i]:,.0f} / {c}{b.revenue[i]:,.0f} Cr revenue'])
+    return rows
+
+
+def _cell(value, fmt, width):
+    return f'{value:>{width}{fmt}}' if np.isfinite(value) else f"{'-':>{width}}"
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+    from stocklib.prices import PriceHistory
+
+    parser = argparse.ArgumentParser(description='Enterprise value bridge and multiples for every ticker')
+    parser.add_argument('--live', action='store_true',
+                        help='reprice at the last close in the price store instead of the stored price')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    prices = {}
+    if args.live:
+        for ticker in store.table('enterprise').tickers():
+            history = PriceHistory(ticker)
+            if len(history):
+                prices[ticker] = float(history.records['close'][-1])
+    start = time.perf_counter()
+    tickers, b = universe_bridge(store, prices)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Ticker':<12}{'Date':>10}{'Price':>9}{'Mkt Cap':>10}{'Net Debt':>10}{'Leases':>9}{'EV':>10}"
+          f"{'EV/Sales':>10}{'EV/EBITDA':>11}{'P/S':>7}")
+    for i in latest(b):
+        print(f"{b.ticker[i]:<12}{b.periods[i]:>10}{b.price[i]:>9.2f}{b.market_cap[i]:>10,.0f}"
+              f"{b.net_debt[i]:>10,.0f}{b.leases[i]:>9,.0f}{b.ev[i]:>10,.0f}" + _cell(b.ev_sales[i], '.2f', 10)
+              + _cell(b.ev_ebitda[i], '.1f', 11) + _cell(b.ps[i], '.2f', 7))
+    print(f"{len(tickers)} ticker(s), {len(b)} row(s) in {elapsed * 1000:.2f} ms"
+          + (f" ({len(prices)} repriced at the last close)" if prices else ''))
+
+
+if __name__ == '__main__':
+    main()
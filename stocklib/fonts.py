@@ -0,0 +1,25 @@
+"""
+PDF font registration shared by the report scripts.
+
+reportlab is imported on the first call, so importing a report module
+that only computes numbers does not load it.
+"""
+
+from stocklib import profiling
+
+# SFNS (San Francisco) has proper INR symbol support
+FONTS = {
+    'SFNS': '/System/Library/Fonts/SFNS.ttf',
+}
+
+
+def register_fonts():
+    """Register the report fonts once per process; later calls are no-ops."""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    for name, path in FONTS.items():
+        if name not in registered:
+            with profiling.stage('fonts', name):
+                pdfmetrics.registerFont(TTFont(name, path))
@@ -0,0 +1,297 @@
+"""
+Resumable indicator state for end-of-day refreshes.
+
+Instead of recomputing a 200-day SMA or a 14-period RSI over full history,
+the state keeps what each indicator needs to take one more bar: running
+window sums, the last EMA / Wilder-smoothed values and the previous bar.
+push() applies one bar to every ticker in the state at once, so a nightly
+refresh is O(1) per ticker however long the history is.
+
+The state of a report ticker is saved next to its price files as
+<TICKER>.state.npz together with the number of bars it has absorbed;
+ticker_state() loads it and pushes only the bars appended since, building
+it from the full history the first time. Values match stocklib.indicators
+on the same history (to rounding).
+
+A bar dated after the benchmark's last day is pushed without a market
+return, as technicals.snapshot() leaves it. The state records how much of
+the benchmark it saw, and ticker_state() rebuilds it once the benchmark
+catches up with such bars (or is replaced), so beta never keeps a market
+return that the full history would not give.
+"""
+
+import os
+
+import numpy as np
+
+from stocklib.prices import PRICE_DIR
+
+VERSION = 2
+
+MA_WINDOWS = (20, 50, 100, 200)
+RSI_DAYS = ADX_DAYS = 14
+CCI_DAYS = BOLLINGER_DAYS = 20
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BETA_DAYS = 250
+CROSS_BARS = 6
+
+
+class Smoother:
+    """Seeded recursive smoother: mean of the first n inputs, then y += alpha * (x - y)."""
+
+    FIELDS = ('count', 'total', 'value')
+
+    def __init__(self, k, n, alpha):
+        self.n, self.alpha = n, alpha
+        self.count = np.zeros(k, dtype=np.int64)
+        self.total = np.zeros(k)
+        self.value = np.full(k, np.nan)
+
+    def push(self, x):
+        valid = ~np.isnan(x)
+        seeding = valid & (self.count < self.n)
+        running = valid & ~seeding
+        self.count += seeding
+        self.total += np.where(seeding, x, 0.0)
+        self.value = np.where(seeding & (self.count == self.n), self.total / self.n, self.value)
+        self.value = np.where(running, self.value + self.alpha * (x - self.value), self.value)
+        return self.value
+
+
+class Window:
+    """The last n inputs with a running sum, re-summed once per lap to shed rounding drift."""
+
+    FIELDS = ('buf', 'pos', 'count', 'total')
+
+    def __init__(self, k, n):
+        self.n = n
+        self.buf = np.zeros((k, n))
+        self.pos = np.zeros(k, dtype=np.int64)
+        self.count = np.zeros(k, dtype=np.int64)
+        self.total = np.zeros(k)
+
+    def push(self, x):
+        valid = ~np.isnan(x)
+        rows = np.flatnonzero(valid)
+        pos = self.pos[rows]
+        self.total[rows] += x[rows] - self.buf[rows, pos]
+        self.buf[rows, pos] = x[rows]
+        self.pos[rows] = (pos + 1) % self.n
+        self.count[rows] += 1
+        lap = rows[self.pos[rows] == 0]
+        self.total[lap] = self.buf[lap].sum(axis=-1)
+
+    @property
+    def mean(self):
+        return np.where(self.count >= self.n, self.total / self.n, np.nan)
+
+    def values(self):
+        """Window contents oldest first, NaN rows until the window is full."""
+        order = (self.pos[:, None] + np.arange(self.n)) % self.n
+        out = np.take_along_axis(self.buf, order, axis=-1)
+        out[self.count < self.n] = np.nan
+        return out
+
+
+class IndicatorState:
+    """Indicator state for k tickers; every array has one entry (or row) per ticker."""
+
+    SCALARS = ('rows', 'last_day', 'prev_close', 'prev_high', 'prev_low', 'prev_market',
+               'market_rows', 'market_day')
+
+    def __init__(self, tickers):
+        self.tickers = list(tickers)
+        k = len(self.tickers)
+        self.rows = np.zeros(k, dtype=np.int64)
+        self.last_day = np.zeros(k, dtype=np.int64)
+        self.prev_close = np.full(k, np.nan)
+        self.prev_high = np.full(k, np.nan)
+        self.prev_low = np.full(k, np.nan)
+        self.prev_market = np.full(k, np.nan)
+        # benchmark row count and last day when the ticker was last caught up
+        self.market_rows = np.zeros(k, dtype=np.int64)
+        self.market_day = np.zeros(k, dtype=np.int64)
+        self.macd_recent = np.full((k, CROSS_BARS), np.nan)
+
+        parts = {}
+        for n in MA_WINDOWS:
+            parts[f'sma{n}'] = Window(k, n)
+            parts[f'ema{n}'] = Smoother(k, n, 2.0 / (n + 1))
+        for n in (MACD_FAST, MACD_SLOW):
+            parts.setdefault(f'ema{n}', Smoother(k, n, 2.0 / (n + 1)))
+        parts['macd_signal'] = Smoother(k, MACD_SIGNAL, 2.0 / (MACD_SIGNAL + 1))
+        parts['bb_square'] = Window(k, BOLLINGER_DAYS)
+        parts['rsi_gain'] = Smoother(k, RSI_DAYS, 1.0 / RSI_DAYS)
+        parts['rsi_loss'] = Smoother(k, RSI_DAYS, 1.0 / RSI_DAYS)
+        for name in ('atr', 'plus_dm', 'minus_dm', 'adx'):
+            parts[name] = Smoother(k, ADX_DAYS, 1.0 / ADX_DAYS)
+        parts['typical'] = Window(k, CCI_DAYS)
+        for name in ('beta_r', 'beta_m', 'beta_rm', 'beta_mm'):
+            parts[name] = Window(k, BETA_DAYS)
+        self.parts = parts
+
+    def push(self, days, opens, highs, lows, closes, market=None):
+        """Apply one bar per ticker (NaN close = no bar for that ticker today)."""
+        p = self.parts
+        has_bar = ~np.isnan(closes)
+        market = np.full(len(self.tickers), np.nan) if market is None else market
+
+        for n in MA_WINDOWS:
+            p[f'sma{n}'].push(closes)
+            p[f'ema{n}'].push(closes)
+        line = p[f'ema{MACD_FAST}'].push(closes) - p[f'ema{MACD_SLOW}'].push(closes)
+        line = np.where(has_bar, line, np.nan)
+        hist = line - p['macd_signal'].push(line)
+        self.macd_recent[has_bar] = np.column_stack([self.macd_recent[:, 1:], hist])[has_bar]
+        p['bb_square'].push(closes * closes)
+
+        change = closes - self.prev_close
+        p['rsi_gain'].push(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)))
+        p['rsi_loss'].push(np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)))
+
+        up, down = highs - self.prev_high, self.prev_low - lows
+        missing = np.isnan(up) | np.isnan(down)
+        true_range = np.maximum(highs - lows, np.maximum(np.abs(highs - self.prev_close),
+                                                         np.abs(lows - self.prev_close)))
+        atr = p['atr'].push(true_range)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100.0 * p['plus_dm'].push(
+                np.where(missing, np.nan, np.where((up > down) & (up > 0), up, 0.0))) / atr
+            minus_di = 100.0 * p['minus_dm'].push(
+                np.where(missing, np.nan, np.where((down > up) & (down > 0), down, 0.0))) / atr
+            dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        p['adx'].push(np.where(has_bar, dx, np.nan))
+
+        p['typical'].push((highs + lows + closes) / 3.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = closes / self.prev_close - 1.0
+            m = market / self.prev_market - 1.0
+        paired = ~np.isnan(r) & ~np.isnan(m)
+        r, m = np.where(paired, r, np.nan), np.where(paired, m, np.nan)
+        for name, value in (('beta_r', r), ('beta_m', m), ('beta_rm', r * m), ('beta_mm', m * m)):
+            p[name].push(value)
+
+        self.prev_close = np.where(has_bar, closes, self.prev_close)
+        self.prev_high = np.where(has_bar, highs, self.prev_high)
+        self.prev_low = np.where(has_bar, lows, self.prev_low)
+        self.prev_market = np.where(has_bar, market, self.prev_market)
+        self.rows += has_bar
+        self.last_day = np.where(has_bar, days, self.last_day)
+
+    def values(self):
+        """Latest indicator values, keyed like technicals.snapshot()."""
+        p = self.parts
+        close = self.prev_close
+        out = {'close': close, 'last_day': self.last_day}
+        for n in MA_WINDOWS:
+            out[f'sma{n}'] = p[f'sma{n}'].mean
+            out[f'ema{n}'] = p[f'ema{n}'].value
+        out['macd'] = p[f'ema{MACD_FAST}'].value - p[f'ema{MACD_SLOW}'].value
+        out['macd_signal'] = p['macd_signal'].value
+        out['macd_hist'] = out['macd'] - out['macd_signal']
+        recent = self.macd_recent
+        out['macd_cross'] = np.where(np.nanmin(recent, axis=-1, initial=np.inf) < 0,
+                                     np.where(np.nanmax(recent, axis=-1, initial=-np.inf) > 0,
+                                              np.sign(out['macd_hist']), 0), 0)
+
+        gain, loss = p['rsi_gain'].value, p['rsi_loss'].value
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+            out['rsi'] = np.where((loss == 0) & (gain > 0), 100.0, rsi)
+            out['plus_di'] = 100.0 * p['plus_dm'].value / p['atr'].value
+            out['minus_di'] = 100.0 * p['minus_dm'].value / p['atr'].value
+        out['adx'] = p['adx'].value
+
+        typical = p['typical'].values()
+        mean = typical.mean(axis=-1)
+        deviation = np.abs(typical - mean[:, None]).mean(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['cci'] = (typical[:, -1] - mean) / (0.015 * deviation)
+
+        mid = p[f'sma{BOLLINGER_DAYS}'].mean
+        width = 2.0 * np.sqrt(np.maximum(p['bb_square'].mean - mid * mid, 0.0))
+        out['bb_mid'], out['bb_upper'], out['bb_lower'] = mid, mid + width, mid - width
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['bb_pct'] = (close - out['bb_lower']) / (2.0 * width)
+            mean_m = p['beta_m'].mean
+            cov = p['beta_rm'].mean - p['beta_r'].mean * mean_m
+            out['beta'] = cov / (p['beta_mm'].mean - mean_m * mean_m)
+        return out
+
+    def save(self, path):
+        arrays = {name: getattr(self, name) for name in self.SCALARS}
+        arrays['macd_recent'] = self.macd_recent
+        for name, part in self.parts.items():
+            for field in part.FIELDS:
+                arrays[f'{name}.{field}'] = getattr(part, field)
+        tmp = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp, version=VERSION, tickers=np.asarray(self.tickers), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """The saved state, or None if it is missing or from another VERSION."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['version']) != VERSION:
+                return None
+            state = cls([str(t) for t in data['tickers']])
+            for name in cls.SCALARS + ('macd_recent',):
+                setattr(state, name, data[name].copy())
+            for name, part in state.parts.items():
+                for field in part.FIELDS:
+                    setattr(part, field, data[f'{name}.{field}'].copy())
+        return state
+
+
+def _market_closes(benchmark, days):
+    """Benchmark close on (or last before) each day; NaN outside its history."""
+    if not len(benchmark):
+        return np.full(len(days), np.nan)
+    idx = np.searchsorted(benchmark.days, days, side='right') - 1
+    closes = np.asarray(benchmark.records['close'])[np.maximum(idx, 0)]
+    # a day the benchmark has not reached yet is not a flat market day
+    return np.where((idx >= 0) & (days <= benchmark.days[-1]), closes, np.nan)
+
+
+def catch_up(state, history, benchmark):
+    """Push the bars of a single-ticker `history` that `state` has not seen yet."""
+    start = int(state.rows[0])
+    if start > len(history):
+        raise ValueError(f"{history.ticker}: state has {start} bars but history only {len(history)}")
+    days = np.asarray(history.days[start:])
+    bars = history.records[start:]
+    market = _market_closes(benchmark, days)
+    for t in range(len(days)):
+        bar = bars[t]
+        state.push(days[t:t + 1], np.array([bar['open']]), np.array([bar['high']]),
+                   np.array([bar['low']]), np.array([bar['close']]), market[t:t + 1])
+    state.market_rows[0] = len(benchmark)
+    state.market_day[0] = benchmark.days[-1] if len(benchmark) else 0
+    return len(days)
+
+
+def _stale(state, history, benchmark):
+    """True if `state` cannot be caught up: history or benchmark rewritten, or
+    bars pushed without a market return that the benchmark now has."""
+    if state.rows[0] > len(history) or len(benchmark) < state.market_rows[0]:
+        return True
+    pending = state.last_day[0] > state.market_day[0]
+    return bool(pending and len(benchmark) > state.market_rows[0])
+
+
+def ticker_state(history, benchmark, price_dir=PRICE_DIR):
+    """Load (or build) the saved state of `history`'s ticker and bring it up to date.
+
+    `benchmark` is the market PriceHistory that beta is measured against.
+    """
+    path = os.path.join(price_dir, history.ticker + '.state.npz')
+    state = IndicatorState.load(path)
+    rebuilt = state is None or _stale(state, history, benchmark)
+    if rebuilt:
+        state = IndicatorState([history.ticker])
+    if catch_up(state, history, benchmark) or rebuilt:
+        state.save(path)
+    return state
@@ -0,0 +1,198 @@
+"""
+Technical indicators computed from price arrays.
+
+Every function works along the last axis, so the same call handles one
+ticker's series or a (tickers x days) universe matrix. Positions without
+enough history are NaN.
+"""
+
+import numpy as np
+
+# Largest exponent used when unrolling a recursive filter in closed form;
+# keeps decay**-k finite in float64 with plenty of headroom.
+_MAX_LOG_SCALE = 300.0
+
+
+def _as_float(values):
+    return np.array(values, dtype=np.float64, ndmin=1)
+
+
+def _fill_leading(x):
+    """Replace leading NaNs with each row's first valid value; return (x, first_valid)."""
+    valid = ~np.isnan(x)
+    if not x.shape[-1]:
+        return x, np.zeros(x.shape[:-1], dtype=np.intp)
+    first = np.where(valid.any(axis=-1), valid.argmax(axis=-1), x.shape[-1])
+    seed = np.take_along_axis(x, np.minimum(first, x.shape[-1] - 1)[..., None], axis=-1)
+    lead = np.arange(x.shape[-1]) < first[..., None]
+    return np.where(lead, seed, x), first
+
+
+def sma(values, n):
+    """Simple moving average over `n` periods (cumulative-sum difference)."""
+    x, first = _fill_leading(_as_float(values))
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] < n:
+        return out
+    c = np.cumsum(x, axis=-1)
+    out[..., n - 1] = c[..., n - 1]
+    out[..., n:] = c[..., n:] - c[..., :-n]
+    out[..., n - 1:] /= n
+    out[np.arange(x.shape[-1]) < (first + n - 1)[..., None]] = np.nan
+    return out
+
+
+def recursive_filter(values, alpha, initial=None):
+    """y[t] = (1 - alpha) * y[t-1] + alpha * x[t] along the last axis.
+
+    The recursion is unrolled in closed form over blocks, so there is no
+    per-element Python loop; y[-1] defaults to x[0].
+    """
+    x = _as_float(values)
+    decay = 1.0 - alpha
+    prev = x[..., 0].copy() if initial is None else np.asarray(initial, dtype=np.float64).copy()
+    out = np.empty_like(x)
+    if decay <= 0.0:
+        out[...] = x
+        return out
+    block = max(1, int(_MAX_LOG_SCALE / -np.log(decay)))
+    for start in range(0, x.shape[-1], block):
+        seg = x[..., start:start + block]
+        k = np.arange(1, seg.shape[-1] + 1)
+        acc = np.cumsum(seg * decay ** -k, axis=-1)
+        y = decay ** k * (prev[..., None] + alpha * acc)
+        out[..., start:start + block] = y
+        prev = y[..., -1]
+    return out
+
+
+def _smooth(values, n, alpha):
+    """Recursive smoothing seeded with the SMA of each row's first n valid values.
+
+    Up to the seed point the input is replaced by the seed itself, so the
+    filter holds the seed until then and every row, however late its history
+    starts, is processed by the same whole-matrix recursion.
+    """
+    x, first = _fill_leading(_as_float(values))
+    t = x.shape[-1]
+    if t < n:
+        return np.full_like(x, np.nan)
+    c = np.concatenate([np.zeros(x.shape[:-1] + (1,)), np.cumsum(x, axis=-1)], axis=-1)
+    start = np.minimum(first, t - n)[..., None]
+    seed = (np.take_along_axis(c, start + n, axis=-1) - np.take_along_axis(c, start, axis=-1)) / n
+    seeded = np.arange(t) <= (first + n - 1)[..., None]
+    out = recursive_filter(np.where(seeded, seed, x), alpha, seed[..., 0])
+    out[np.arange(t) < (first + n - 1)[..., None]] = np.nan
+    return out
+
+
+def ema(values, n):
+    """Exponential moving average with alpha = 2 / (n + 1), seeded by the first n-period SMA.
+
+    Rows whose history starts later (leading NaNs) are masked until they have
+    n real periods.
+    """
+    return _smooth(values, n, 2.0 / (n + 1))
+
+
+def wilder(values, n):
+    """Wilder's smoothing (alpha = 1 / n), as used by RSI, ATR and ADX."""
+    return _smooth(values, n, 1.0 / n)
+
+
+def _shift(x):
+    """x[t-1] along the last axis; the first position is NaN."""
+    out = np.empty_like(x)
+    out[..., 0] = np.nan
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+def rsi(close, n=14):
+    """Wilder's relative strength index."""
+    x = _as_float(close)
+    change = x - _shift(x)
+    gain = wilder(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), n)
+    loss = wilder(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.where((loss == 0) & (gain > 0), 100.0, out)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram."""
+    line = ema(close, fast) - ema(close, slow)
+    trigger = ema(line, signal)
+    return line, trigger, line - trigger
+
+
+def bollinger(close, n=20, k=2.0):
+    """Middle, upper and lower Bollinger bands (population standard deviation)."""
+    x = _as_float(close)
+    mid = sma(x, n)
+    var = np.maximum(sma(x * x, n) - mid * mid, 0.0)
+    width = k * np.sqrt(var)
+    return mid, mid + width, mid - width
+
+
+def true_range(high, low, close):
+    """max(high - low, |high - prev close|, |low - prev close|); NaN on the first bar."""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev = _shift(close)
+    return np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+
+
+def adx(high, low, close, n=14):
+    """Average directional index with the +DI / -DI lines it is built from."""
+    high, low = _as_float(high), _as_float(low)
+    up = high - _shift(high)
+    down = _shift(low) - low
+    missing = np.isnan(up) | np.isnan(down)
+    plus_dm = np.where(missing, np.nan, np.where((up > down) & (up > 0), up, 0.0))
+    minus_dm = np.where(missing, np.nan, np.where((down > up) & (down > 0), down, 0.0))
+    atr = wilder(true_range(high, low, close), n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * wilder(plus_dm, n) / atr
+        minus_di = 100.0 * wilder(minus_dm, n) / atr
+        dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return wilder(dx, n), plus_di, minus_di
+
+
+def cci(high, low, close, n=20):
+    """Commodity channel index on the typical price (constant 0.015).
+
+    The mean absolute deviation is accumulated one lag at a time, so the
+    loop runs n times over whole arrays rather than once per element.
+    """
+    typical = (_as_float(high) + _as_float(low) + _as_float(close)) / 3.0
+    mean = sma(typical, n)
+    deviation = np.zeros_like(typical)
+    for lag in range(n):
+        lagged = np.full_like(typical, np.nan)
+        lagged[..., lag:] = typical[..., :typical.shape[-1] - lag]
+        deviation += np.abs(lagged - mean)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (typical - mean) / (0.015 * deviation / n)
+
+
+def returns(close):
+    """Simple daily returns; the first position is NaN."""
+    x = _as_float(close)
+    return x / _shift(x) - 1.0
+
+
+def rolling_beta(asset_returns, market_returns, n=250):
+    """Rolling OLS beta of each row of `asset_returns` on `market_returns`.
+
+    Built from moving sums of r, m, r*m and m*m, so a whole universe is one
+    set of cumulative sums; `market_returns` broadcasts across the rows.
+    """
+    r = _as_float(asset_returns)
+    m = np.broadcast_to(_as_float(market_returns), r.shape)
+    m = np.where(np.isnan(r), np.nan, m)
+    r = np.where(np.isnan(m), np.nan, r)
+    mean_m = sma(m, n)
+    cov = sma(r * m, n) - sma(r, n) * mean_m
+    var = sma(m * m, n) - mean_m * mean_m
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return cov / var
@@ -0,0 +1,226 @@
+"""
+Monte Carlo distribution around the scenario valuation.
+
+The valuation section weights three discrete targets into one expected
+value. simulate() turns the same scenario inputs into a distribution: each
+path draws a scenario with the scenario probabilities, growth for each
+projection year from a normal centred on that scenario's growth (spread
+fitted to the gaps between scenarios), and an exit multiple uniformly from
+the scenario's multiple range. Paths are generated in fixed-size chunks
+into one float32 buffer, so memory is bounded by the path count rather
+than by the number of random draws per path.
+
+    sim = ticker_simulation(open_store().ticker('CELLO'))
+    sim.percentiles[50], sim.p_loss, sim.mean
+
+Seeds are per ticker (the batch seed combined with the ticker name), so a
+ticker's result does not depend on which other tickers are simulated.
+
+    python3 -m stocklib.montecarlo [--paths N] [--seed S] [--live]
+"""
+
+import hashlib
+import zlib
+
+import numpy as np
+
+from stocklib.render import save_figure
+from stocklib.valuation import ticker_inputs, universe_inputs
+
+PATHS = 1_000_000
+CHUNK = 1 << 16
+SEED = 20260201
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+BINS = 60
+# growth sd as a fraction of the average gap between adjacent scenarios
+GROWTH_SPREAD = 0.5
+
+PRIMARY = '#1a365d'
+
+
+class Simulation:
+    """Summary of one ticker's simulated per-share values."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def fingerprint(self):
+        """Content hash of the summary, for chart cache keys."""
+        h = hashlib.sha256(f'{self.paths}:{self.seed}:{self.price!r}'.encode())
+        for array in (self.counts, self.edges, np.array([self.mean, self.p_loss])):
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+
+def _growth_sd(growth):
+    """Per-year growth sd: GROWTH_SPREAD x the average gap between adjacent scenarios."""
+    filled = np.isfinite(growth)
+    high = np.where(filled, growth, -np.inf).max(axis=0)
+    low = np.where(filled, growth, np.inf).min(axis=0)
+    gaps = np.where(filled.any(axis=0), high - low, 0.0) / max(len(growth) - 1, 1)
+    # a blank growth step stays blank: no growth and no noise
+    return np.where(filled, GROWTH_SPREAD * gaps, 0.0)
+
+
+def simulate(base, growth, multiple_low, multiple_high, probability, price, retention=1.0,
+             shares=1.0, adjustment=0.0, floor=-np.inf, paths=PATHS, seed=SEED, chunk=CHUNK):
+    """Simulate `paths` per-share values for one ticker (value() arguments, one row per scenario).
+
+    `seed` is anything np.random.default_rng accepts.
+    """
+    base = np.asarray(base, dtype=np.float64)
+    growth = np.asarray(growth, dtype=np.float64)
+    probability = np.asarray(probability, dtype=np.float64)
+    multiple_low = np.asarray(multiple_low, dtype=np.float64)
+    multiple_high = np.asarray(multiple_high, dtype=np.float64)
+    retention = np.broadcast_to(np.asarray(retention, dtype=np.float64), base.shape)
+    shares = np.broadcast_to(np.asarray(shares, dtype=np.float64), base.shape)
+    adjustment = np.broadcast_to(np.asarray(adjustment, dtype=np.float64), base.shape)
+    floor = np.broadcast_to(np.asarray(floor, dtype=np.float64), base.shape)
+    price = float(price)
+    if not np.isclose(probability.sum(), 1.0):
+        raise ValueError(f"scenario probabilities sum to {probability.sum()}, not 1")
+
+    sd = _growth_sd(growth)
+    growth = np.nan_to_num(growth)
+
+    # Each chunk splits its paths between scenarios with one multinomial
+    # draw and fills a contiguous block per scenario, so every draw uses
+    # scalar parameters. Path order is irrelevant to the summary.
+    rng = np.random.default_rng(seed)
+    values = np.empty(paths, dtype=np.float32)
+    start = 0
+    while start < paths:
+        n = min(chunk, paths - start)
+        for s, m in enumerate(rng.multinomial(n, probability)):
+            total = np.full(m, base[s])
+            for year in range(growth.shape[1]):
+                g = growth[s, year] + sd[s, year] * rng.standard_normal(m)
+                total *= 1.0 + g * retention[s]
+            multiple = rng.uniform(multiple_low[s], multiple_high[s], m)
+            block = values[start:start + m]
+            np.maximum((total * multiple + adjustment[s]) / shares[s], floor[s], out=block, casting='unsafe')
+            start += m
+
+    # one partition pass for the reported percentiles and the histogram range
+    *quantiles, lo, hi = np.percentile(values, [*PERCENTILES, 0.5, 99.5]).tolist()
+    counts, edges = np.histogram(values, bins=BINS, range=(lo, hi) if hi > lo else None)
+    return Simulation(
+        paths=paths, seed=seed, price=price,
+        mean=float(values.mean(dtype=np.float64)), std=float(values.std(dtype=np.float64)),
+        percentiles=dict(zip(PERCENTILES, quantiles)),
+        p_loss=float(np.count_nonzero(values < price)) / paths,
+        counts=counts, edges=edges,
+    )
+
+
+def ticker_seed(ticker, seed=SEED):
+    """Seed sequence for one ticker: the run seed plus a stable hash of its name."""
+    return [seed, zlib.crc32(ticker.encode())]
+
+
+def ticker_simulation(data, price=None, paths=PATHS, seed=SEED, **overrides):
+    """Simulate one ticker from its `scenarios` rows; overrides as for ticker_valuation()."""
+    args = ticker_inputs(data, price, **overrides)
+    sim = simulate(paths=paths, seed=ticker_seed(data.ticker, seed), **args)
+    sim.seed = seed
+    return sim
+
+
+def universe_simulation(store, prices=None, paths=PATHS, seed=SEED):
+    """Simulate every ticker in the store; returns [(ticker, Simulation)]."""
+    tickers, args = universe_inputs(store, prices)
+    results = []
+    for i, ticker in enumerate(tickers):
+        sim = simulate(paths=paths, seed=ticker_seed(ticker, seed),
+                       **{name: (col[i] if np.ndim(col) else col) for name, col in args.items()})
+        sim.seed = seed
+        results.append((ticker, sim))
+    return results
+
+
+# --- Chart ---
+
+def histogram_chart(sim, title, path, currency='₹', expected=None, figsize=(8, 4)):
+    """Histogram of simulated values with CMP, the mean and the 5th-95th percentile band.
+
+    `expected` is the three-scenario expected value, drawn for comparison.
+    """
+    import matplotlib.pyplot as plt
+
+    centres = (sim.edges[:-1] + sim.edges[1:]) / 2
+    share = sim.counts / sim.paths * 100
+    p5, p95 = sim.percentiles[5], sim.percentiles[95]
+
+    fig, ax = plt.subplots(figsize=figsize)
+    colors = np.where(centres < sim.price, '#e53e3e', '#38a169')
+    ax.bar(centres, share, width=np.diff(sim.edges), color=colors, alpha=0.55, edgecolor='none')
+    ax.axvspan(p5, p95, color=PRIMARY, alpha=0.06,
+               label=f'5th-95th pct ({currency}{p5:,.0f}-{currency}{p95:,.0f})')
+    ax.axvline(sim.price, color='#e53e3e', linewidth=1.6, label=f'CMP ({currency}{sim.price:,.0f})')
+    ax.axvline(sim.mean, color=PRIMARY, linewidth=1.6, label=f'Simulated mean ({currency}{sim.mean:,.0f})')
+    if expected is not None:
+        ax.axvline(expected, color='#dd6b20', linewidth=1.4, linestyle='--',
+                   label=f'Scenario EV ({currency}{expected:,.0f})')
+
+    ax.text(0.98, 0.95, f'P(loss) = {sim.p_loss:.0%}', transform=ax.transAxes, ha='right', va='top',
+            fontsize=10, fontweight='bold', color='#e53e3e',
+            bbox=dict(boxstyle='round,pad=0.3', fc='white', ec='#e53e3e', alpha=0.9))
+    ax.set_xlabel(f'12-Month Value per Share ({currency.strip()})')
+    ax.set_ylabel('Share of Paths (%)')
+    ax.set_title(title, fontweight='bold', pad=15)
+    ax.text(0.5, -0.2, f'{sim.paths:,} simulated paths (seed {sim.seed}); scenario drawn by probability, '
+            'growth and exit multiple sampled within each scenario',
+            transform=ax.transAxes, fontsize=6, ha='center', color='#999999', style='italic')
+    ax.legend(fontsize=7, loc='upper left')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+def describe(sim, currency='₹'):
+    """One-sentence summary for the report text."""
+    p5, p50, p95 = sim.percentiles[5], sim.percentiles[50], sim.percentiles[95]
+    return (f'Across {sim.paths:,} simulated paths the median value is {currency}{p50:,.0f} '
+            f'(mean {currency}{sim.mean:,.0f}), the 5th-95th percentile range is '
+            f'{currency}{p5:,.0f}-{currency}{p95:,.0f}, and {sim.p_loss:.0%} of paths end below '
+            f'the current price of {currency}{sim.price:,.0f}.')
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+    from stocklib.prices import PriceHistory
+
+    parser = argparse.ArgumentParser(description='Monte Carlo value distribution for every ticker')
+    parser.add_argument('--paths', type=int, default=PATHS, help=f'paths per ticker (default {PATHS:,})')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--live', action='store_true',
+                        help='use the last close in the price store instead of the report price')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    prices = {}
+    if args.live:
+        for ticker in store.table('scenarios').tickers():
+            history = PriceHistory(ticker)
+            if len(history):
+                prices[ticker] = float(history.records['close'][-1])
+    start = time.perf_counter()
+    results = universe_simulation(store, prices, args.paths, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Ticker':<12}{'Price':>9}{'P5':>9}{'P50':>9}{'P95':>9}{'Mean':>9}{'P(loss)':>9}")
+    for ticker, sim in results:
+        q = sim.percentiles
+        print(f"{ticker:<12}{sim.price:>9.2f}{q[5]:>9.1f}{q[50]:>9.1f}{q[95]:>9.1f}"
+              f"{sim.mean:>9.1f}{sim.p_loss:>9.1%}")
+    print(f"{len(results)} tickers x {args.paths:,} paths in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Join reportlab-written PDFs into one document, pages in order.
+
+The incremental template build (stocklib.template) renders each report
+section to its own small PDF and caches it; join() stitches the cached
+sections back into the report without laying anything out again:
+
+    pdf = join([cover_pdf, snapshot_pdf, ...])
+
+It reads the plain layout reportlab writes (numbered objects with direct
+/Length values, a classic xref table, a flat page tree) rather than
+arbitrary PDFs. Every object except each part's catalog, page tree, info
+and outline is copied with its number shifted; pages are re-parented onto
+one page tree and font subset tags are re-lettered per part so the parts'
+subsets of the same font stay distinct.
+"""
+
+import hashlib
+import re
+
+_OBJECT = re.compile(rb'(\d+) 0 obj\r?\n')
+_REF = re.compile(rb'(\d+) 0 R\b')
+_LENGTH = re.compile(rb'/Length (\d+)')
+_SUBSET = re.compile(rb'/([A-Z]{6})\+')
+
+
+def _objects(pdf):
+    """{number: (dictionary bytes, stream bytes or None)} for every object in `pdf`."""
+    objects = {}
+    pos = 0
+    while True:
+        match = _OBJECT.search(pdf, pos)
+        if match is None:
+            return objects
+        start = match.end()
+        end = pdf.index(b'endobj', start)
+        body, stream = pdf[start:end], None
+        marker = body.find(b'\nstream\n')
+        if marker != -1:
+            length = int(_LENGTH.search(body[:marker]).group(1))
+            data = start + marker + len(b'\nstream\n')
+            stream = pdf[data:data + length]
+            body = body[:marker]
+            end = pdf.index(b'endobj', data + length)
+        objects[int(match.group(1))] = (body.strip(), stream)
+        pos = end + len(b'endobj')
+
+
+def _ref(body, key):
+    match = re.search(rb'/' + key + rb' (\d+) 0 R', body)
+    return int(match.group(1)) if match else None
+
+
+def _trailer_ref(pdf, key):
+    return _ref(pdf[pdf.rindex(b'trailer'):], key)
+
+
+def _subset_tag(part):
+    """Six capital letters unique to part number `part`."""
+    letters = []
+    for _ in range(6):
+        part, digit = divmod(part, 26)
+        letters.append(chr(ord('A') + digit))
+    return ''.join(reversed(letters)).encode('ascii')
+
+
+def join(documents):
+    """One PDF holding every page of `documents` (reportlab output bytes), in order."""
+    # 1 catalog, 2 page tree, 3 info; the parts' objects follow
+    out = {}
+    kids = []
+    info = None
+    number = 3
+    for part, pdf in enumerate(documents):
+        objects = _objects(pdf)
+        root, info_ref = _trailer_ref(pdf, b'Root'), _trailer_ref(pdf, b'Info')
+        catalog = objects[root][0]
+        pages = _ref(catalog, b'Pages')
+        dropped = {root, pages, info_ref, _ref(catalog, b'Outlines')}
+        if info is None and info_ref is not None:
+            info = objects[info_ref][0]
+        renumber = {}
+        for old in sorted(objects):
+            if old not in dropped:
+                number += 1
+                renumber[old] = number
+        tag = b'/' + _subset_tag(part) + b'+'
+
+        def rewrite(match):
+            old = int(match.group(1))
+            new = 2 if old == pages else renumber[old]
+            return b'%d 0 R' % new
+
+        for old, new in renumber.items():
+            body, stream = objects[old]
+            body = _SUBSET.sub(lambda _: tag, _REF.sub(rewrite, body))
+            out[new] = (body, stream)
+        page_refs = [int(n) for n in _REF.findall(objects[pages][0].split(b'/Kids', 1)[1].split(b']', 1)[0])]
+        for ref in page_refs:
+            if b'/Type /Pages' in objects[ref][0]:
+                raise ValueError('nested page trees are not supported')
+            kids.append(renumber[ref])
+
+    out[1] = (b'<<\n/PageMode /UseNone /Pages 2 0 R /Type /Catalog\n>>', None)
+    out[2] = (b'<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>'
+              % (len(kids), b' '.join(b'%d 0 R' % k for k in kids)), None)
+    out[3] = (info or b'<<\n>>', None)
+    return _write(out)
+
+
+def _write(objects):
+    chunks = [b'%PDF-1.4\n% ReportLab Generated PDF document (joined)\n']
+    size = len(chunks[0])
+    offsets = {}
+    for number in sorted(objects):
+        body, stream = objects[number]
+        offsets[number] = size
+        chunk = b'%d 0 obj\n' % number + body
+        if stream is not None:
+            chunk += b'\nstream\n' + stream + b'endstream'
+        chunk += b'\nendobj\n'
+        chunks.append(chunk)
+        size += len(chunk)
+    count = max(objects) + 1
+    xref = [b'xref\n0 %d\n0000000000 65535 f \n' % count]
+    xref += [b'%010d 00000 n \n' % offsets[n] for n in range(1, count)]
+    digest = hashlib.md5(b''.join(chunks)).hexdigest().encode()
+    chunks += xref
+    chunks.append(b'trailer\n<<\n/ID \n[<%s><%s>]\n/Info 3 0 R\n/Root 1 0 R\n/Size %d\n>>\nstartxref\n%d\n%%%%EOF\n'
+                  % (digest, digest, count, size))
+    return b''.join(chunks)
@@ -0,0 +1,67 @@
+"""
+Price-action chart drawn from the daily price store.
+
+The report scripts fall back to their approximated monthly closes when a
+ticker has no stored history; with history they call daily_price_chart()
+so the chart shows real closes and moving averages computed from them.
+"""
+
+import numpy as np
+
+from stocklib import indicators
+from stocklib.render import save_figure
+
+PRIMARY = '#1a365d'
+MA_COLORS = ['#38a169', '#e53e3e', '#dd6b20', '#805ad5']
+
+
+def daily_price_chart(history, title, path, days=365, sma=(), ema=(), zones=(),
+                      currency='₹', figsize=(8, 4.5), legend_loc='upper right'):
+    """Plot the last `days` calendar days of `history` with MAs and S/R zones.
+
+    `zones` is a list of (low, high, color, label) bands. Moving averages are
+    computed over the full stored history so they are warm at the left edge.
+    """
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    end = history.days[-1]
+    shown = history.window(start=np.datetime64(int(end - days), 'D'))
+    lookback = max([0, *sma, *ema]) * 3
+    bars = history.last(len(shown) + lookback)
+    close = bars.close
+    x = shown.dates
+
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.plot(x, shown.close, '-', color=PRIMARY, linewidth=1.6, label=f'Price ({currency.strip()})', zorder=3)
+
+    overlays = [(f'{n}-Day SMA', indicators.sma(close, n)) for n in sma]
+    overlays += [(f'{n}-Day EMA', indicators.ema(close, n)) for n in ema]
+    for (label, series), color in zip(overlays, MA_COLORS):
+        series = series[-len(shown):]
+        if np.isfinite(series[-1]):
+            label = f'{label} ({currency}{series[-1]:,.0f})'
+        ax.plot(x, series, '--', color=color, linewidth=1.4, label=label, alpha=0.85)
+
+    for low, high, color, label in zones:
+        ax.axhspan(low, high, alpha=0.1, color=color, label=label)
+
+    last = shown.close[-1]
+    ax.annotate(f'Current: {currency}{last:,.2f}', xy=(x[-1], last),
+                xytext=(-90, -40), textcoords='offset points',
+                arrowprops=dict(arrowstyle='->', color=PRIMARY),
+                fontsize=9, fontweight='bold', color=PRIMARY,
+                bbox=dict(boxstyle='round,pad=0.2', fc='white', ec='none', alpha=0.8))
+
+    ax.xaxis.set_major_locator(mdates.MonthLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b\n%Y'))
+    ax.tick_params(axis='x', labelsize=7)
+    ax.set_ylabel(f'Price ({currency.strip()})')
+    ax.set_title(title, fontweight='bold', pad=15)
+    ax.text(0.5, -0.16, f'Source: daily closes to {x[-1]} from the local price store; '
+            'moving averages computed from daily data',
+            transform=ax.transAxes, fontsize=6, ha='center', color='#999999', style='italic')
+    ax.legend(fontsize=7, loc=legend_loc)
+
+    plt.tight_layout()
+    return save_figure(path)
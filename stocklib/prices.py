@@ -0,0 +1,174 @@
+"""
+Memory-mapped daily price history store.
+
+One pair of flat files per ticker under data/prices/:
+
+    <TICKER>.dates   int64 trading dates (days since 1970-01-01), ascending
+    <TICKER>.ohlcv   one record per date: open/high/low/close float64, volume int64
+
+The dates file doubles as the date -> row index: a binary search on it gives
+the row range of any window, and the window is a view into the mapped files,
+so nothing is copied or read beyond the pages actually touched. New days are
+appended to the end of both files; history is never rewritten.
+
+    hist = PriceHistory('ABLBL')
+    bars = hist.window('2025-02-01', '2026-01-31')
+    bars.close, bars.dates
+"""
+
+import csv
+import os
+
+import numpy as np
+
+from stocklib.datastore import DATA_DIR
+
+PRICE_DIR = os.path.join(DATA_DIR, 'prices')
+
+BAR = np.dtype([('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                ('volume', '<i8')])
+DATE = np.dtype('<i8')
+
+
+def to_day(date):
+    """'2026-01-30', datetime.date or datetime64 -> int64 day number."""
+    return int(np.datetime64(date, 'D').astype(DATE))
+
+
+class Bars:
+    """A window of daily bars; every field is a view into the mapped files."""
+
+    def __init__(self, days, records):
+        self.days = days
+        self.records = records
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, field):
+        return self.records[field]
+
+    @property
+    def dates(self):
+        return self.days.view('datetime64[D]')
+
+    @property
+    def open(self):
+        return self.records['open']
+
+    @property
+    def high(self):
+        return self.records['high']
+
+    @property
+    def low(self):
+        return self.records['low']
+
+    @property
+    def close(self):
+        return self.records['close']
+
+    @property
+    def volume(self):
+        return self.records['volume']
+
+
+class PriceHistory:
+    """Read-only view of one ticker's daily history."""
+
+    def __init__(self, ticker, price_dir=PRICE_DIR):
+        self.ticker = ticker
+        self.dates_path = os.path.join(price_dir, ticker + '.dates')
+        self.bars_path = os.path.join(price_dir, ticker + '.ohlcv')
+        self.days = _map(self.dates_path, DATE)
+        self.records = _map(self.bars_path, BAR)
+        if len(self.days) != len(self.records):
+            raise ValueError(f"{ticker}: {len(self.days)} dates but {len(self.records)} bars")
+
+    def __len__(self):
+        return len(self.days)
+
+    def row(self, date):
+        """Row index of `date`, or of the last trading day before it."""
+        return int(np.searchsorted(self.days, to_day(date), side='right')) - 1
+
+    def window(self, start=None, end=None):
+        """Bars with start <= date <= end (either bound may be omitted)."""
+        lo = 0 if start is None else int(np.searchsorted(self.days, to_day(start), side='left'))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, to_day(end), side='right'))
+        return Bars(self.days[lo:hi], self.records[lo:hi])
+
+    def last(self, n):
+        """The most recent `n` bars."""
+        return Bars(self.days[-n:], self.records[-n:])
+
+    def fingerprint(self):
+        """Cheap change marker for cache keys: row count and last bar."""
+        if not len(self):
+            return f'{self.ticker}:empty'
+        return f'{self.ticker}:{len(self)}:{int(self.days[-1])}:{self.records[-1].tobytes().hex()}'
+
+
+def _map(path, dtype):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+def append_bars(ticker, dates, opens, highs, lows, closes, volumes, price_dir=PRICE_DIR):
+    """Append bars dated after the last stored day; returns the new row count."""
+    days = np.atleast_1d(np.asarray(dates, dtype='datetime64[D]')).astype(DATE)
+    if np.any(np.diff(days) <= 0):
+        raise ValueError(f"{ticker}: appended dates must be strictly increasing")
+
+    os.makedirs(price_dir, exist_ok=True)
+    existing = PriceHistory(ticker, price_dir)
+    if len(existing) and days[0] <= existing.days[-1]:
+        raise ValueError(f"{ticker}: {np.datetime64(int(days[0]), 'D')} is not after the last "
+                         f"stored day {np.datetime64(int(existing.days[-1]), 'D')}")
+
+    records = np.zeros(len(days), dtype=BAR)
+    records['open'], records['high'], records['low'] = opens, highs, lows
+    records['close'], records['volume'] = closes, volumes
+    # Bars first, then dates: a crash in between leaves an orphan bar that
+    # PriceHistory reports as a length mismatch rather than a misdated row.
+    with open(existing.bars_path, 'ab') as fh:
+        fh.write(records.tobytes())
+    with open(existing.dates_path, 'ab') as fh:
+        fh.write(days.tobytes())
+    return len(existing) + len(days)
+
+
+def append_bar(ticker, date, o, h, l, c, v, price_dir=PRICE_DIR):
+    """Append a single end-of-day bar."""
+    return append_bars(ticker, [date], [o], [h], [l], [c], [v], price_dir)
+
+
+def import_csv(ticker, path, price_dir=PRICE_DIR):
+    """Load a Date,Open,High,Low,Close,Volume export (NSE / Yahoo Finance).
+
+    Only rows newer than the stored history are appended, so re-importing a
+    longer export of the same ticker is safe.
+    """
+    with open(path, newline='') as fh:
+        rows = [r for r in csv.DictReader(fh) if r.get('Close') not in (None, '', 'null')]
+    rows.sort(key=lambda r: r['Date'])
+    existing = PriceHistory(ticker, price_dir)
+    if len(existing):
+        last = existing.days[-1]
+        rows = [r for r in rows if to_day(r['Date'][:10]) > last]
+    if not rows:
+        return len(existing)
+    col = lambda name: [float(r[name]) for r in rows]
+    return append_bars(ticker, [r['Date'][:10] for r in rows], col('Open'), col('High'),
+                       col('Low'), col('Close'), [int(float(r['Volume'] or 0)) for r in rows],
+                       price_dir)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python3 -m stocklib.prices TICKER EXPORT.csv")
+    rows = import_csv(sys.argv[1], sys.argv[2])
+    print(f"{sys.argv[1]}: {rows} daily bars in {PRICE_DIR}")
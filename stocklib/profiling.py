@@ -0,0 +1,313 @@
+"""
+Profiling hooks: where a report run spends its time and memory.
+
+    python3 abfrl/abfrl_report.py --profile                  # timings -> STOCK_ANALYSIS_CACHE/timing/
+    python3 abfrl/abfrl_report.py --profile run.json --profile-memory
+    python3 abfrl/abfrl_report.py --profile --cprofile abfrl.prof
+    python3 -m stocklib.template CELLO --no-cache --profile
+    python3 -m stocklib.profiling                            # slowest charts and sections, latest run per report
+
+A run is a timeline of phases closed by mark() -- imports, module setup,
+rendering charts, assembling the story, doc.build -- plus timed stages:
+one per chart function, one per report section (a script's sections are
+timed during layout, from heading to heading), and the lazy matplotlib
+import and font registration, which happen inside the charts and story
+phases. Marks cost a clock read and are always taken; stages are
+recorded only once --profile has switched profiling on.
+
+The JSON written at exit holds the phases, the stages, peak RSS and, with
+--profile-memory, tracemalloc's allocation peak per stage and the top
+allocation sites. --cprofile PATH also dumps a cProfile of the whole run
+for pstats or snakeviz, and lists its costliest functions in the JSON.
+
+Charts rendered in --jobs workers are timed in the worker; their memory
+is not traced.
+"""
+
+import argparse
+import atexit
+import contextlib
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+T0 = time.perf_counter()
+
+TIMING_DIR = os.path.join(
+    os.environ.get('STOCK_ANALYSIS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'stock-analysis')),
+    'timing',
+)
+TOP = 20
+# reportlab name of stocklib.styles' 'heading' style; a script section starts at each one
+HEADING_STYLE = 'CustomHeading'
+
+_last = T0
+_phases = []
+_stages = []
+_stack = []
+_run = None
+
+
+def mark(name):
+    """Close the phase running since the previous mark (or import) as `name`."""
+    global _last
+    now = time.perf_counter()
+    _phases.append({'name': name, 'seconds': round(now - _last, 6)})
+    _last = now
+
+
+def enabled():
+    return _run is not None
+
+
+def phases():
+    """[{'name', 'seconds'}] for every phase marked so far."""
+    return list(_phases)
+
+
+def record(kind, name, seconds, **fields):
+    """Add a stage timed elsewhere (e.g. in a pool worker)."""
+    if _run is None:
+        return
+    entry = {'kind': kind, 'name': name, 'seconds': round(seconds, 6), **fields}
+    if _stack:
+        entry['within'] = [frame[0] for frame in _stack]
+    _stages.append(entry)
+
+
+@contextlib.contextmanager
+def stage(kind, name, **fields):
+    """Time the block as a `kind` stage (chart, section, ...) when profiling is on.
+
+    Yields the stage's `fields`, so the block can add to what is recorded.
+    """
+    if _run is None:
+        yield fields
+        return
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    else:
+        current = None
+    frame = [f'{kind}:{name}', current, 0]
+    _stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        seconds = time.perf_counter() - start
+        _stack.pop()
+        if tracing:
+            # a nested stage resets the peak, so fold its peak back into ours
+            peak = max(tracemalloc.get_traced_memory()[1], frame[2])
+            fields['alloc_peak_mb'] = round((peak - current) / 2**20, 3)
+            if _stack:
+                _stack[-1][2] = max(_stack[-1][2], peak)
+            _run['traced_peak'] = max(_run['traced_peak'], peak)
+            tracemalloc.reset_peak()
+        record(kind, name, seconds, **fields)
+
+
+def build(doc, story):
+    """doc.build(story) between the 'story' and 'doc.build' marks, timing each section's layout."""
+    mark('story')
+    if _run is None:
+        doc.build(story)
+        mark('doc.build')
+        return
+
+    sections = []
+    current = {'name': 'cover', 'page': 1, 'start': time.perf_counter()}
+
+    def close(now):
+        sections.append(dict(current, seconds=now - current.pop('start')))
+
+    def after(flowable):
+        style = getattr(flowable, 'style', None)
+        if getattr(style, 'name', None) == HEADING_STYLE:
+            now = time.perf_counter()
+            close(now)
+            current.update(name=flowable.getPlainText(), page=doc.page, start=now)
+
+    doc.afterFlowable = after
+    try:
+        doc.build(story)
+    finally:
+        del doc.afterFlowable
+    close(time.perf_counter())
+    mark('doc.build')
+    for section in sections:
+        record('section', section['name'], section['seconds'], page=section['page'])
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+def _versions():
+    versions = {'python': platform.python_version()}
+    for module in ('matplotlib', 'reportlab', 'numpy'):
+        if module in sys.modules:
+            versions[module] = getattr(sys.modules[module], '__version__', getattr(sys.modules[module], 'Version', None))
+    return versions
+
+
+def _cprofile_top(profiler, path):
+    import pstats
+
+    profiler.disable()
+    profiler.dump_stats(path)
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: -item[1][3])[:TOP]
+    return [{'function': f'{os.path.relpath(file) if os.path.isabs(file) else file}:{line}({func})',
+             'calls': calls, 'own_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)}
+            for (file, line, func), (_, calls, own, cumulative, _) in rows]
+
+
+def summary():
+    """The run so far, as written to the timing file."""
+    result = {
+        'report': _run['name'],
+        'started': _run['started'],
+        'argv': sys.argv,
+        'versions': _versions(),
+        'total_seconds': round(time.perf_counter() - T0, 6),
+        'peak_rss_mb': _peak_rss_mb(),
+        'phases': _phases,
+        'stages': _stages,
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, _run['traced_peak'])
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap>')])
+        result['memory'] = {
+            'traced_mb': round(current / 2**20, 3),
+            'traced_peak_mb': round(peak / 2**20, 3),
+            'top': [{'where': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                     'size_mb': round(stat.size / 2**20, 3), 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:TOP]],
+        }
+    if _run['profiler'] is not None:
+        result['cprofile'] = {'path': _run['cprofile'], 'top': _cprofile_top(_run['profiler'], _run['cprofile'])}
+    return result
+
+
+def write():
+    """Write the timing file (registered with atexit by enable())."""
+    if _run is None or _run['pid'] != os.getpid():  # not from forked workers
+        return
+    result = summary()
+    os.makedirs(os.path.dirname(os.path.abspath(_run['path'])), exist_ok=True)
+    with open(_run['path'], 'w') as fh:
+        json.dump(result, fh, indent=1)
+    print(f"Timing written: {_run['path']} ({result['total_seconds']:.2f}s, peak RSS {result['peak_rss_mb']} MB)",
+          file=sys.stderr)
+
+
+def enable(path=None, memory=False, cprofile=None, name=None):
+    """Switch profiling on for the rest of the process; the timing file is written at exit."""
+    global _run
+    if _run is not None:
+        return
+    name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'python'
+    now = datetime.datetime.now()
+    if not path:
+        path = os.path.join(TIMING_DIR, f'{name}-{now:%Y%m%d-%H%M%S}-{os.getpid()}.json')
+    profiler = None
+    if cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    _run = {'name': name, 'path': path, 'started': now.isoformat(timespec='seconds'), 'pid': os.getpid(),
+            'cprofile': cprofile, 'profiler': profiler, 'traced_peak': 0}
+    if memory:
+        tracemalloc.start()
+    atexit.register(write)
+    if profiler is not None:
+        profiler.enable()
+
+
+def add_arguments(parser):
+    """The --profile, --profile-memory and --cprofile options."""
+    parser.add_argument('--profile', nargs='?', const='', metavar='PATH',
+                        help='write a JSON timing file for this run (default: STOCK_ANALYSIS_CACHE/timing/)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='with --profile, trace allocations per stage with tracemalloc (slows the run)')
+    parser.add_argument('--cprofile', metavar='PATH',
+                        help='with --profile, also dump a cProfile of the run to PATH')
+
+
+def start(args, name=None):
+    """Enable profiling if the options from add_arguments() ask for it."""
+    if args.profile is not None or args.profile_memory or args.cprofile:
+        enable(args.profile, args.profile_memory, args.cprofile, name)
+
+
+# --- Reading timing files ---
+
+def load(paths=None, latest=True):
+    """Timing files as dicts, newest last; with latest=True only each report's newest run."""
+    runs = []
+    for path in paths or glob.glob(os.path.join(TIMING_DIR, '*.json')):
+        with open(path) as fh:
+            run = json.load(fh)
+        run['path'] = path
+        runs.append(run)
+    runs.sort(key=lambda run: run['started'])
+    if latest:
+        runs = list({run['report']: run for run in runs}.values())
+    return runs
+
+
+def _slowest(runs, kind, top):
+    rows = [(stage['seconds'], run['report'], stage) for run in runs for stage in run['stages']
+            if stage['kind'] == kind]
+    return sorted(rows, key=lambda row: -row[0])[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarise profiling runs: phases, slowest charts and sections')
+    parser.add_argument('files', nargs='*', help='timing files (default: every file in the timing directory)')
+    parser.add_argument('--all-runs', dest='latest', action='store_false',
+                        help="include every run, not just each report's latest")
+    parser.add_argument('--top', type=int, default=10, help='how many charts and sections to list')
+    args = parser.parse_args(argv)
+    runs = load(args.files, args.latest)
+    if not runs:
+        parser.error(f'no timing files (run a report with --profile; they go to {TIMING_DIR})')
+
+    names = []
+    for run in runs:
+        names += [phase['name'] for phase in run['phases'] if phase['name'] not in names]
+    width = max(len(run['report']) for run in runs)
+    widths = [max(len(n), 8) for n in names]
+    print(f"{'report':<{width}}  {'total':>7}  {'RSS MB':>7}  " + '  '.join(f'{n:>{w}}' for n, w in zip(names, widths)))
+    for run in runs:
+        phases = {}
+        for phase in run['phases']:
+            phases[phase['name']] = phases.get(phase['name'], 0) + phase['seconds']
+        print(f"{run['report']:<{width}}  {run['total_seconds']:>6.2f}s  {run['peak_rss_mb'] or 0:>7.1f}  "
+              + '  '.join(f'{phases[n]:>{w - 1}.3f}s' if n in phases else f"{'-':>{w}}" for n, w in zip(names, widths)))
+    for kind in ('chart', 'section'):
+        rows = _slowest(runs, kind, args.top)
+        if rows:
+            print(f'\nSlowest {kind}s:')
+            for seconds, report, stage in rows:
+                memory = f"  {stage['alloc_peak_mb']:.1f} MB" if 'alloc_peak_mb' in stage else ''
+                print(f"  {seconds:>7.3f}s  {stage.get('report', report):<{width}}  {stage['name']}{memory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Chart rendering driver shared by the *_report.py scripts.
+
+Chart functions end with `return save_figure(path)` and build_pdf places
+each result with chart_image(). What a chart comes back as depends on the
+output mode of the render_charts() call:
+
+    'file'     the PNG is written to `path` (the default)
+    'memory'   PNG bytes handed to reportlab's Image as a BytesIO, so no
+               chart_*.png files are written (--in-memory)
+    'vector'   drawing operations replayed as vector graphics in the PDF
+               (stocklib.vector), also without files (--vector)
+"""
+
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from stocklib import chart_cache, profiling
+
+DPI = 150
+# set for the duration of a render_charts() call, in every worker
+MODE = 'file'
+# the reports' chart style, applied when matplotlib is first needed
+RC_PARAMS = {
+    'font.family': 'sans-serif',
+    'font.size': 10,
+    'axes.titlesize': 12,
+    'axes.labelsize': 10,
+    'figure.facecolor': 'white',
+    'axes.facecolor': '#f8f9fa',
+    'axes.grid': True,
+    'grid.alpha': 0.3,
+    'grid.color': '#cccccc',
+}
+_matplotlib = None
+
+
+def setup_matplotlib():
+    """Import matplotlib with the Agg backend and RC_PARAMS applied, once per process.
+
+    Nothing imports matplotlib until a chart is rendered or keyed, so runs
+    that only compute numbers never pay for it; chart keys hash the
+    rcParams, hence the style is applied before any key is taken.
+    """
+    global _matplotlib
+    if _matplotlib is None:
+        with profiling.stage('import', 'matplotlib'):
+            import matplotlib
+            matplotlib.use('Agg')
+            matplotlib.rcParams.update(RC_PARAMS)
+        _matplotlib = matplotlib
+    return _matplotlib
+
+
+def save_figure(path, dpi=DPI):
+    """Save and close the current figure; returns `path`, or bytes in the in-memory modes."""
+    import matplotlib.pyplot as plt
+
+    if MODE == 'file':
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+        plt.close()
+        return path
+    buffer = io.BytesIO()
+    if MODE == 'vector':
+        from stocklib import vector  # registers the format with matplotlib
+        plt.savefig(buffer, format=vector.FORMAT, dpi=dpi, bbox_inches='tight')
+    else:
+        plt.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    plt.close()
+    return buffer.getvalue()
+
+
+def chart_image(chart, width, height):
+    """Flowable for one render_charts() result, scaled to width x height."""
+    from reportlab.platypus import Image
+
+    if hasattr(chart, 'flowable'):
+        return chart.flowable(width, height)
+    return Image(chart, width=width, height=height)
+
+
+def parse_args(description=None):
+    """Command-line options common to every report script."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='render charts in N worker processes (0 = one per CPU core)')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='re-render every chart instead of reusing cached PNGs')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='hand charts to the PDF as in-memory PNGs instead of writing chart files')
+    parser.add_argument('--vector', action='store_true',
+                        help='embed charts as vector graphics instead of 150-dpi PNGs')
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args)
+    profiling.mark('module setup')
+    return args
+
+
+def output_mode(in_memory=False, vector=False):
+    return 'vector' if vector else 'memory' if in_memory else 'file'
+
+
+def _call(fn, mode):
+    """Run one chart function with the output mode set (also in pool workers)."""
+    global MODE
+    setup_matplotlib()
+    previous, MODE = MODE, mode
+    try:
+        return fn()
+    finally:
+        MODE = previous
+
+
+def _timed_call(fn, mode):
+    """_call() in a pool worker, also returning how long the chart took there."""
+    start = time.perf_counter()
+    return _call(fn, mode), time.perf_counter() - start
+
+
+def _run(chart_funcs, jobs, mode='file'):
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(chart_funcs))
+    results = {}
+    if jobs <= 1:
+        for name, fn in chart_funcs.items():
+            with profiling.stage('chart', name, mode=mode):
+                results[name] = _call(fn, mode)
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {name: pool.submit(_timed_call, fn, mode) for name, fn in chart_funcs.items()}
+        for name, future in futures.items():
+            results[name], seconds = future.result()
+            profiling.record('chart', name, seconds, mode=mode, worker=True)
+        return results
+
+
+def _chart(result, mode):
+    """What build_pdf receives: a PNG path, a buffer over PNG bytes, or a vector Recording."""
+    if mode == 'vector':
+        from stocklib.vector import Recording
+        if not isinstance(result, bytes):
+            with open(result, 'rb') as fh:
+                result = fh.read()
+        return Recording.from_bytes(result)
+    return io.BytesIO(result) if isinstance(result, bytes) else result
+
+
+def render_charts(chart_funcs, jobs=1, cache=False, in_memory=False, vector=False):
+    """Run every chart function in `chart_funcs` and return {name: chart} for chart_image().
+
+    With jobs > 1 the functions go to a process pool rather than threads --
+    matplotlib's Agg backend is not thread-safe, and each chart is independent,
+    so the total cost drops to roughly that of the slowest chart.
+
+    With cache=True, charts whose inputs are unchanged since a previous run are
+    served from stocklib.chart_cache and only the misses are rendered.
+
+    in_memory=True returns PNG buffers rather than files in the report's output
+    directory; vector=True returns vector recordings (cache hits are still read
+    from the cache directory).
+    """
+    setup_matplotlib()
+    mode = output_mode(in_memory, vector)
+    if not cache:
+        return {name: _chart(result, mode) for name, result in _run(chart_funcs, jobs, mode).items()}
+
+    # vector recordings and PNGs of the same chart are different cache entries
+    suffix, inputs = ('.rldraw', 'vector') if mode == 'vector' else ('.png', None)
+    charts, misses, keys = {}, {}, {}
+    for name, fn in chart_funcs.items():
+        with profiling.stage('cache', name) as fields:
+            keys[name] = chart_cache.chart_key(fn, inputs)
+            hit = chart_cache.lookup(keys[name], suffix=suffix)
+            fields['hit'] = hit is not None
+        if hit is not None:
+            charts[name] = _chart(hit, mode)
+        else:
+            misses[name] = fn
+    for name, result in _run(misses, jobs, mode).items():
+        chart_cache.store(keys[name], result, suffix=suffix)
+        charts[name] = _chart(result, mode)
+    return {name: charts[name] for name in chart_funcs}
@@ -0,0 +1,311 @@
+"""
+Cash runway: Monte Carlo of quarterly cash balances for loss-making companies.
+
+A loss-maker valued on sales is worth what its cash lets it reach, so the
+report needs how long the cash lasts, not one "burn rate" sentence. The
+store's cash_runway table holds the starting point and the scenario
+inputs (Rs Cr; flows per quarter, growth and margins as fractions):
+
+    cash                  gross cash and liquid investments at the period end
+    revenue               the latest quarter's revenue
+    growth, growth_sd     annual revenue growth: mean and spread
+    margin, margin_sd     EBITDA margin as reported (Ind AS 116, before rent)
+    capex, capex_sd       capital expenditure
+    leases, leases_sd     lease payments, principal and interest
+    other                 other cash costs: interest on borrowings, tax
+
+simulate() projects every path's quarterly balances at once. Each path
+draws a margin, a capex level and a lease level; revenue compounds on a
+fresh growth draw every quarter, lease payments scale with revenue (the
+store network drives both), capex and other costs do not. The runway is
+the months until the balance first goes negative, interpolated within the
+quarter; paths still solvent at the horizon have an infinite runway.
+Paths are generated in fixed-size chunks, so memory is bounded by the
+chunk, and seeds are per ticker as in stocklib.montecarlo.
+
+    run = ticker_runway(open_store().ticker('ABFRL'))
+    run.percentiles[50], run.p_out, run.waterfall
+
+    python3 -m stocklib.runway [--paths N] [--quarters Q] [--all]   # every loss-maker with runway inputs
+"""
+
+import hashlib
+
+import numpy as np
+
+from stocklib.montecarlo import SEED, ticker_seed
+from stocklib.render import save_figure
+
+PATHS = 100_000
+CHUNK = 1 << 14
+QUARTERS = 40
+PERCENTILES = (10, 25, 50, 75, 90)
+# the waterfall covers the next year
+WATERFALL_QUARTERS = 4
+
+PRIMARY = '#1a365d'
+GREEN = '#38a169'
+HIGHLIGHT = '#e53e3e'
+ORANGE = '#dd6b20'
+
+
+class Runway:
+    """Summary of one ticker's simulated cash balances."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def fingerprint(self):
+        """Content hash of the summary, for chart cache keys."""
+        h = hashlib.sha256(f'{self.paths}:{self.seed}:{self.period}:{self.cash!r}'.encode())
+        for array in (self.counts, self.balance, np.array(list(self.waterfall.values()))):
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+    def p_within(self, months):
+        """Share of paths whose cash runs out within `months`."""
+        quarters = min(int(months // 3), len(self.counts))
+        return float(self.counts[:quarters].sum()) / self.paths
+
+
+def _level(rng, mean, sd, n):
+    return mean + sd * rng.standard_normal(n, dtype=np.float32) if sd > 0 else np.full(n, mean, dtype=np.float32)
+
+
+def simulate(cash, revenue, growth, growth_sd, margin, margin_sd, capex, capex_sd, leases, leases_sd,
+             other=0.0, period='', quarters=QUARTERS, paths=PATHS, seed=SEED, chunk=CHUNK):
+    """Simulate `paths` quarterly cash balances over `quarters` for one ticker (one cash_runway row).
+
+    `seed` is anything np.random.default_rng accepts.
+    """
+    cash, revenue, other = float(cash), float(revenue), float(np.nan_to_num(other))
+    growth_sd, margin_sd, capex_sd, leases_sd = (float(np.nan_to_num(sd)) for sd in
+                                                 (growth_sd, margin_sd, capex_sd, leases_sd))
+    # annual growth and spread as quarterly steps
+    step, step_sd = (1.0 + growth) ** 0.25 - 1.0, growth_sd / 2.0
+
+    rng = np.random.default_rng(seed)
+    months = np.empty(paths, dtype=np.float32)
+    balance = np.zeros(quarters)
+    year = np.zeros(4)
+    start = 0
+    while start < paths:
+        n = min(chunk, paths - start)
+        scale = np.cumprod(1.0 + step + step_sd * rng.standard_normal((n, quarters), dtype=np.float32), axis=1)
+        np.maximum(scale, 0.0, out=scale)
+        # EBITDA and lease payments both move with revenue: one per-path coefficient on the revenue index
+        ebitda = revenue * _level(rng, margin, margin_sd, n)
+        rent = np.maximum(_level(rng, leases, leases_sd, n), 0.0)
+        spend = np.maximum(_level(rng, capex, capex_sd, n), 0.0)
+        flow = scale * (ebitda - rent)[:, None]
+        flow -= (spend + other)[:, None]
+        path = cash + np.cumsum(flow, axis=1)
+
+        # first quarter ending below zero; the crossing is interpolated within it
+        short = path < 0
+        out = short.any(axis=1)
+        k = short.argmax(axis=1)
+        rows = np.arange(n)
+        before = np.where(k > 0, path[rows, k - 1], cash)
+        fraction = np.clip(before / np.maximum(-flow[rows, k], 1e-9), 0.0, 1.0)
+        months[start:start + n] = np.where(out, 3.0 * (k + fraction), np.inf)
+
+        balance += path.sum(axis=0, dtype=np.float64)
+        first = min(WATERFALL_QUARTERS, quarters)
+        index = scale[:, :first].sum(axis=1, dtype=np.float64)
+        year += [index @ ebitda, index @ rent, spend.sum(dtype=np.float64) * first, other * n * first]
+        start += n
+
+    horizon = 3.0 * quarters
+    finite = np.isfinite(months)
+    # censored paths sort above every finite runway, so the percentiles past them come back infinite
+    quantiles = np.percentile(np.where(finite, months, horizon + 3.0), PERCENTILES)
+    quantiles = np.where(quantiles > horizon, np.inf, quantiles)
+    counts = np.bincount((months[finite] // 3).astype(np.int64), minlength=quarters)[:quarters]
+    ebitda, rent, spend, other_total = year / paths
+    operating = ebitda - other_total
+    burn = operating - rent - spend
+    return Runway(
+        paths=paths, seed=seed, period=str(period), cash=cash, revenue=revenue, quarters=quarters,
+        percentiles=dict(zip(PERCENTILES, quantiles.tolist())),
+        p_out=float(np.count_nonzero(finite)) / paths,
+        counts=counts, balance=balance / paths,
+        waterfall={'opening': cash, 'operating': operating, 'leases': -rent, 'capex': -spend,
+                   'net': burn, 'closing': cash + burn},
+        # months the opening cash lasts at the first year's average burn, for comparison
+        simple=cash / (-burn / 12.0) if burn < 0 else np.inf,
+    )
+
+
+# --- Store inputs ---
+
+COLUMNS = ('cash', 'revenue', 'growth', 'growth_sd', 'margin', 'margin_sd', 'capex', 'capex_sd',
+           'leases', 'leases_sd', 'other')
+
+
+def ticker_inputs(data):
+    """simulate() arguments from the ticker's latest cash_runway row."""
+    frame = data['cash_runway']
+    if not len(frame):
+        raise KeyError(f"{data.ticker}: no cash_runway rows")
+    return dict({name: float(frame[name][-1]) for name in COLUMNS}, period=frame.periods[-1])
+
+
+def ticker_runway(data, paths=PATHS, seed=SEED, quarters=QUARTERS):
+    """Simulate one ticker from its latest cash_runway row."""
+    run = simulate(paths=paths, seed=ticker_seed(data.ticker, seed), quarters=quarters, **ticker_inputs(data))
+    run.seed = seed
+    return run
+
+
+def loss_makers(store):
+    """Tickers whose latest quarterly net profit (or annual, without quarters) is negative."""
+    latest = {}
+    for name in ('annual_pnl', 'quarterly_pnl'):
+        if name not in store.tables():
+            continue
+        table = store.table(name)
+        ticker, pat = np.asarray(table.column('ticker')), np.asarray(table.column('pat'))
+        known = np.isfinite(pat)
+        ticker, pat = ticker[known], pat[known]
+        # rows are chronological within a ticker: keep each ticker's last known figure
+        last = np.ones(len(ticker), dtype=bool)
+        last[:-1] = ticker[1:] != ticker[:-1]
+        latest.update(zip(ticker[last].tolist(), pat[last].tolist()))
+    return sorted(ticker for ticker, pat in latest.items() if pat < 0)
+
+
+def universe_runway(store, tickers=None, paths=PATHS, seed=SEED, quarters=QUARTERS):
+    """Simulate every ticker with cash_runway rows (or those of `tickers` that have them); [(ticker, Runway)]."""
+    table = store.table('cash_runway')
+    ticker = np.asarray(table.column('ticker'))
+    last = np.ones(len(ticker), dtype=bool)
+    last[:-1] = ticker[1:] != ticker[:-1]
+    rows = np.flatnonzero(last)
+    if tickers is not None:
+        rows = rows[np.isin(ticker[rows], list(tickers))]
+    columns = {name: np.asarray(table.column(name))[rows] for name in COLUMNS}
+    periods = np.asarray(table.column('period'))[rows]
+    results = []
+    for i, name in enumerate(ticker[rows].tolist()):
+        run = simulate(paths=paths, seed=ticker_seed(name, seed), quarters=quarters, period=periods[i],
+                       **{column: values[i] for column, values in columns.items()})
+        run.seed = seed
+        results.append((name, run))
+    return results
+
+
+# --- Chart and text ---
+
+def months_text(value):
+    """'64 months', or 'beyond the horizon' for a path that never runs out."""
+    return 'beyond the horizon' if not np.isfinite(value) else f'{value:.0f} months'
+
+
+def runway_chart(run, title, path, currency='₹', figsize=(10, 4.2)):
+    """Next-year cash waterfall (left) and the share of paths running out of cash per year (right)."""
+    import matplotlib.pyplot as plt
+
+    unit = f'{currency.strip()} Cr'
+    w = run.waterfall
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize, gridspec_kw={'width_ratios': [3, 2]})
+
+    labels = ['Opening\ncash', 'Operating\n(EBITDA less\ninterest, tax)', 'Lease\npayments', 'Capex',
+              'Closing\ncash']
+    steps = [w['operating'], w['leases'], w['capex']]
+    bottoms = [0.0] + list(w['opening'] + np.cumsum([0.0] + steps[:-1])) + [0.0]
+    heights = [w['opening']] + steps + [w['closing']]
+    colors = [PRIMARY] + [GREEN if s >= 0 else HIGHLIGHT for s in steps] + [PRIMARY]
+    x = np.arange(len(labels))
+    ax1.bar(x, heights, bottom=bottoms, color=colors, alpha=0.85, width=0.6)
+    for i, (b, h) in enumerate(zip(bottoms, heights)):
+        ax1.annotate(f'{h:+,.0f}' if 0 < i < len(labels) - 1 else f'{h:,.0f}', (i, b + max(h, 0)),
+                     textcoords='offset points', xytext=(0, 3), ha='center', fontsize=7)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(labels, fontsize=7)
+    ends = np.concatenate([bottoms, np.add(bottoms, heights)])
+    ax1.set_ylim(min(ends.min(), 0.0) * 1.15, ends.max() * 1.15)
+    ax1.set_ylabel(unit)
+    ax1.set_title(f'Next 12 Months: Net {"Burn" if w["net"] < 0 else "Inflow"} {currency}{abs(w["net"]):,.0f} Cr',
+                  fontsize=10, fontweight='bold')
+
+    years = run.quarters // 4
+    share = run.counts[:years * 4].reshape(years, 4).sum(axis=1) / run.paths * 100
+    ax2.bar(np.arange(1, years + 1), share, color=HIGHLIGHT, alpha=0.6)
+    ax2.plot(np.arange(1, years + 1), np.cumsum(share), 'o-', color=ORANGE, linewidth=1.6, markersize=3,
+             label='Cumulative')
+    ax2.set_xticks(np.arange(1, years + 1))
+    ax2.set_xlabel('Year cash runs out')
+    ax2.set_ylabel('Share of paths (%)')
+    ax2.set_ylim(0, 100)
+    ax2.legend(fontsize=7, loc='upper left')
+    ax2.set_title(f'Median Runway: {months_text(run.percentiles[50])}', fontsize=10, fontweight='bold')
+
+    for ax in (ax1, ax2):
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+    fig.suptitle(title, fontweight='bold')
+    fig.text(0.5, 0.01, f'{run.paths:,} simulated paths (seed {run.seed}) from {run.period}; revenue growth, margin, '
+             'capex and lease payments sampled per path', fontsize=6, ha='center', color='#999999', style='italic')
+    plt.tight_layout(rect=(0, 0.03, 1, 1))
+    return save_figure(path)
+
+
+def waterfall_rows(run, currency='₹'):
+    """[item, next-12-month amount] rows of the cash burn waterfall, ending with the runway."""
+    w, c = run.waterfall, currency
+    q = run.percentiles
+    return [
+        [f'Opening cash ({run.period})', f'{c}{w["opening"]:,.0f} Cr'],
+        ['Operating cash (EBITDA less interest, tax)', f'{c}{w["operating"]:+,.0f} Cr'],
+        ['Lease payments', f'{c}{w["leases"]:+,.0f} Cr'],
+        ['Capex', f'{c}{w["capex"]:+,.0f} Cr'],
+        ['Net burn (next 12 months)', f'{c}{w["net"]:+,.0f} Cr'],
+        ['Closing cash (12 months out)', f'{c}{w["closing"]:,.0f} Cr'],
+        ['Runway at the first-year burn', months_text(run.simple)],
+        ['Simulated runway: median (10th-90th pct)', f'{months_text(q[50])} ({months_text(q[10])} - {months_text(q[90])})'],
+        [f'P(cash runs out within {run.quarters // 4} years)', f'{run.p_out:.0%}'],
+    ]
+
+
+def describe(run, currency='₹'):
+    """One-sentence summary for the report text."""
+    q = run.percentiles
+    return (f'Across {run.paths:,} simulated paths from {currency}{run.cash:,.0f} Cr of cash ({run.period}), '
+            f'the median runway is {months_text(q[50])} (10th percentile {months_text(q[10])}); '
+            f'{run.p_within(24):.0%} of paths run out of cash within two years and '
+            f'{run.p_out:.0%} within {run.quarters // 4} years.')
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+
+    parser = argparse.ArgumentParser(description='Cash runway simulation for every loss-making ticker')
+    parser.add_argument('--paths', type=int, default=PATHS, help=f'paths per ticker (default {PATHS:,})')
+    parser.add_argument('--quarters', type=int, default=QUARTERS, help='projection horizon (default %(default)s)')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--all', action='store_true', help='every ticker with runway inputs, profitable or not')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    start = time.perf_counter()
+    results = universe_runway(store, None if args.all else loss_makers(store), args.paths, args.seed,
+                              args.quarters)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Ticker':<12}{'From':>9}{'Cash':>9}{'Burn/yr':>9}{'Simple':>8}{'P10':>8}{'P50':>8}{'P90':>8}"
+          f"{'P(<2y)':>8}{'P(out)':>8}")
+    cell = lambda months: f'{months:>8.0f}' if np.isfinite(months) else f"{'>' + str(3 * args.quarters):>8}"  # noqa: E731
+    for ticker, run in results:
+        q = run.percentiles
+        print(f"{ticker:<12}{run.period:>9}{run.cash:>9,.0f}{run.waterfall['net']:>9,.0f}{cell(run.simple)}"
+              f"{cell(q[10])}{cell(q[50])}{cell(q[90])}{run.p_within(24):>8.0%}{run.p_out:>8.0%}")
+    print(f"{len(results)} ticker(s) x {args.paths:,} paths x {args.quarters} quarters in {elapsed:.2f}s "
+          "(runway in months)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+Report-farm scheduler: a prioritised, deduplicated, resumable queue of report builds.
+
+A job is a (report type, target) pair: 'template:ABLBL' renders the template
+report for a ticker (stocklib.template), 'script:ablbl' runs a hand-written
+report script (stocklib.batch).
+
+    python3 -m stocklib.scheduler --template ABLBL --priority 0    # post-results: ahead of the rest
+    python3 -m stocklib.scheduler --all-templates --all-scripts --jobs 8
+    python3 -m stocklib.scheduler --all-templates --queue-only     # queue now, run later
+    python3 -m stocklib.scheduler                                   # run what is queued / resume a crashed batch
+    python3 -m stocklib.scheduler --list
+
+Lower priorities run first; equal priorities run in the order queued.
+Queuing a job that is already pending keeps one copy, at the more urgent
+of the two priorities. A failed job goes back in the queue (behind the jobs
+already waiting at its priority) until it has been retried --retries times.
+
+Every queue change is appended to a journal (jobs.jsonl in
+STOCK_ANALYSIS_CACHE) and fsynced before the job moves on. One batch runs
+at a time. When it starts, it replays the journal, so jobs that were
+pending, or running when an earlier batch died, are queued again, and the
+journal is compacted to those jobs. While a batch runs, other invocations
+only append to its queue (--queue-only), and the batch picks those jobs up
+before its next dispatch.
+
+The parent warms up once (stocklib.batch.warm_up) and forks --jobs workers.
+It keeps exactly that many jobs in flight, handing the most urgent pending
+job to each worker as it frees up, so no worker idles while work is queued
+and throughput grows with workers up to the number of cores. Jobs that
+write the same PDF (bikaji and bikaji-foods) never run at the same time.
+"""
+
+import argparse
+import fcntl
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+from stocklib import batch, template
+from stocklib.chart_cache import CACHE_DIR
+
+JOURNAL = os.path.join(CACHE_DIR, 'jobs.jsonl')
+KINDS = ('template', 'script')
+PRIORITY = 10
+RETRIES = 2
+
+
+def job_name(kind, target):
+    if kind not in KINDS:
+        raise ValueError(f"unknown report type {kind!r} (expected one of {', '.join(KINDS)})")
+    if kind == 'script' and target not in batch.REPORTS:
+        raise ValueError(f"unknown report script {target!r}")
+    return f'{kind}:{target}'
+
+
+def output(job):
+    """The PDF a job writes; jobs sharing one never run concurrently."""
+    kind, target = job.split(':', 1)
+    if kind == 'script':
+        return batch.load_report(target).FINAL_PDF
+    return os.path.join(template.OUTPUT_DIR, f'{target}_Research_Report.pdf')
+
+
+class Journal:
+    """Append-only JSON-lines log of queue events, replayed to resume a batch."""
+
+    def __init__(self, path=JOURNAL):
+        self.path = path
+        self._fh = None
+        self._lock = None
+        self._offset = 0
+
+    def lock(self):
+        """Become the journal's one running batch; False when another process already is."""
+        if self._lock is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fh = open(self.path + '.lock', 'w')
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                fh.close()
+                return False
+            self._lock = fh
+        return True
+
+    def _events(self):
+        """Events appended since the last read."""
+        try:
+            fh = open(self.path, 'rb')
+        except FileNotFoundError:
+            return []
+        events = []
+        with fh:
+            fh.seek(self._offset)
+            for line in fh:
+                if not line.endswith(b'\n'):
+                    break  # still being written; read it next time
+                self._offset += len(line)
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue  # a line torn by a crash
+        return events
+
+    def follow(self):
+        """Jobs other processes queued since the last read: [(job, priority)]."""
+        return [(event['job'], event['priority']) for event in self._events()
+                if event['event'] == 'queued' and event.get('pid') != os.getpid()]
+
+    def replay(self, resume=True):
+        """{job: (priority, attempts)} for every job queued but not finished.
+
+        With resume=True, jobs left running (by a batch that died) are pending
+        again; otherwise the batch holding the lock is still running them.
+        """
+        pending, running = {}, {}
+        self._offset = 0
+        for event in self._events():
+            job, kind = event['job'], event['event']
+            if kind == 'queued':
+                priority = min(event['priority'], pending.get(job, (event['priority'],))[0])
+                pending[job] = (priority, event.get('attempts', 0))
+            elif kind == 'started' and job in pending:
+                running[job] = pending.pop(job)
+            elif kind in ('done', 'failed'):
+                running.pop(job, None)
+        if not resume:
+            return pending
+        # a job that was running when the batch died counts that attempt
+        for job, (priority, attempts) in running.items():
+            if job in pending:
+                priority = min(priority, pending[job][0])
+            pending[job] = (priority, attempts + 1)
+        return pending
+
+    def write(self, event, job, **fields):
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._fh = open(self.path, 'a')
+        record = dict(event=event, job=job, pid=os.getpid(), time=round(time.time(), 3), **fields)
+        self._fh.write(json.dumps(record) + '\n')
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def compact(self, pending):
+        """Rewrite the journal as just the `pending` jobs (the running batch only)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as fh:
+            for job, (priority, attempts) in pending.items():
+                fh.write(json.dumps(dict(event='queued', job=job, pid=os.getpid(), time=round(time.time(), 3),
+                                         priority=priority, attempts=attempts)) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+            self._offset = fh.tell()
+        os.replace(tmp, self.path)
+
+
+class Scheduler:
+    """Priority queue of report jobs backed by a Journal."""
+
+    def __init__(self, journal=None, retries=RETRIES):
+        self.journal = journal or Journal()
+        self.retries = retries
+        self._heap = []      # (priority, sequence, job); superseded entries are skipped on pop
+        self._pending = {}   # job -> (priority, attempts, sequence)
+        self._sequence = itertools.count()
+        # holding the lock makes this the running batch: resume, then compact
+        self.running = self.journal.lock()
+        pending = self.journal.replay(resume=self.running)
+        for job, (priority, attempts) in sorted(pending.items(), key=lambda item: item[1][0]):
+            self._push(job, priority, attempts)
+        if self.running:
+            self.journal.compact(pending)
+
+    def _push(self, job, priority, attempts):
+        sequence = next(self._sequence)
+        self._pending[job] = (priority, attempts, sequence)
+        heapq.heappush(self._heap, (priority, sequence, job))
+
+    def add(self, kind, target, priority=PRIORITY):
+        """Queue a job; returns False when an equally urgent copy is already pending."""
+        return self._queue(job_name(kind, target), priority, 0)
+
+    def _queue(self, job, priority, attempts, record=True):
+        if job in self._pending:
+            current, done, _ = self._pending[job]
+            if priority >= current:
+                return False
+            attempts = done
+        self._push(job, priority, attempts)
+        if record:
+            self.journal.write('queued', job, priority=priority, attempts=attempts)
+        return True
+
+    def pending(self):
+        """[(priority, job)] in the order they would run."""
+        return [(priority, job) for job, (priority, _, _) in
+                sorted(self._pending.items(), key=lambda item: item[1][::2])]
+
+    def _pop(self, busy):
+        """The most urgent pending job whose PDF is not being written, or None."""
+        skipped, found = [], None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            priority, sequence, job = entry
+            if self._pending.get(job, (None, None, None))[2] != sequence:
+                continue
+            if output(job) in busy:
+                skipped.append(entry)
+                continue
+            found = job
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def run(self, jobs=1, cache=True, in_memory=False, vector=False, live=False):
+        """Drain the queue with `jobs` forked workers; returns {job: error} for jobs that gave up."""
+        if not self.running:
+            raise RuntimeError(f'another batch is already running from {self.journal.path}')
+        batch.warm_up()
+        for job in self._pending:
+            output(job)  # load every report script before forking
+        results = queue.Queue()
+        pool = multiprocessing.get_context('fork').Pool(jobs) if jobs > 1 else None
+        running, failed = {}, {}
+        try:
+            while True:
+                for job, priority in self.journal.follow():
+                    self._queue(job, priority, 0, record=False)
+                while len(running) < jobs:
+                    job = self._pop({pdf for pdf, _, _ in running.values()})
+                    if job is None:
+                        break
+                    priority, attempts, _ = self._pending.pop(job)
+                    running[job] = (output(job), priority, attempts)
+                    self.journal.write('started', job, attempt=attempts + 1)
+                    work = (job, cache, in_memory, vector, live)
+                    if pool is None:
+                        results.put(_run(work))
+                    else:
+                        pool.apply_async(_run, (work,), callback=results.put,
+                                         error_callback=lambda exc, job=job: results.put(
+                                             (job, 0.0, f'{type(exc).__name__}: {exc}')))
+                if not running:
+                    break
+                job, seconds, error = results.get()
+                _, priority, attempts = running.pop(job)
+                if error is None:
+                    self.journal.write('done', job, seconds=round(seconds, 3))
+                    print(f"  {job}: {seconds:.2f}s")
+                    continue
+                self.journal.write('failed', job, error=error)
+                if attempts < self.retries:
+                    print(f"  {job}: FAILED ({error}), retrying")
+                    self._queue(job, priority, attempts + 1)
+                else:
+                    print(f"  {job}: FAILED ({error}), giving up after {attempts + 1} attempt(s)")
+                    failed[job] = error
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return failed
+
+
+def _run(args):
+    """Pool task: build one job's report, reporting a failure instead of raising."""
+    job, cache, in_memory, vector, live = args
+    kind, target = job.split(':', 1)
+    start = time.perf_counter()
+    try:
+        if kind == 'template':
+            template.build_report(target, cache, in_memory, vector, live)
+        else:
+            batch.build_report(target, cache, in_memory, vector)
+    except Exception as exc:
+        return job, time.perf_counter() - start, f'{type(exc).__name__}: {exc}'
+    return job, time.perf_counter() - start, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--template', nargs='+', default=[], metavar='TICKER',
+                        help='queue template reports for these tickers')
+    parser.add_argument('--script', nargs='+', default=[], metavar='REPORT',
+                        help=f'queue report scripts ({", ".join(sorted(batch.REPORTS))})')
+    parser.add_argument('--all-templates', action='store_true',
+                        help='queue a template report for every ticker in the store or with a document')
+    parser.add_argument('--all-scripts', action='store_true', help='queue every report script')
+    parser.add_argument('--priority', type=int, default=PRIORITY,
+                        help=f'priority of the jobs queued now; lower runs first (default {PRIORITY})')
+    parser.add_argument('--retries', type=int, default=RETRIES,
+                        help=f'times to retry a failed job (default {RETRIES})')
+    parser.add_argument('--journal', default=JOURNAL, help=f'job journal (default {JOURNAL})')
+    parser.add_argument('--list', action='store_true', help='print the pending queue and exit')
+    parser.add_argument('--queue-only', action='store_true', help='queue the jobs without running them')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='run jobs in N forked workers (0 = one per CPU core)')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='re-render every chart and section instead of reusing cached ones')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='hand charts to the PDFs as in-memory PNGs instead of writing chart files')
+    parser.add_argument('--vector', action='store_true',
+                        help='embed charts as vector graphics instead of 150-dpi PNGs')
+    parser.add_argument('--live', action='store_true',
+                        help='value template reports at the last close in the price store')
+    args = parser.parse_args(argv)
+
+    scheduler = Scheduler(Journal(args.journal), retries=args.retries)
+    work = [('template', t) for t in (template.tickers() if args.all_templates else args.template)]
+    work += [('script', r) for r in (list(batch.REPORTS) if args.all_scripts else args.script)]
+    try:
+        for kind, target in work:
+            job_name(kind, target)
+    except ValueError as exc:
+        parser.error(str(exc))
+    queued = sum(scheduler.add(kind, target, args.priority) for kind, target in work)
+    if work:
+        print(f"Queued {queued} job(s) ({len(work) - queued} already pending)")
+    if args.list:
+        for priority, job in scheduler.pending():
+            print(f"  {priority:>4}  {job}")
+        return 0
+    if args.queue_only:
+        return 0
+    if not scheduler.running:
+        print(f"Another batch is running from {args.journal}; it will pick up the queued jobs")
+        return 0
+
+    start = time.perf_counter()
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(scheduler.pending())))
+    failed = scheduler.run(jobs, args.cache, args.in_memory, args.vector, args.live)
+    print(f"Queue drained with {jobs} worker(s) in {time.perf_counter() - start:.2f}s"
+          + (f", {len(failed)} job(s) failed" if failed else ''))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
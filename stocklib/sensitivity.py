@@ -0,0 +1,244 @@
+"""
+Target-price sensitivity grids.
+
+The valuation sections test a handful of points by hand ("13x EV/EBITDA ->
+Rs 166-177"). target_grid() evaluates the whole plane at once: a metric
+axis (EBITDA, or a growth rate compounded onto a base) against a multiple
+axis, broadcast over any leading ticker axis:
+
+    g = target_grid(metric=[1600, 1700], multiple=[8, 10, 13],
+                    adjustment=-500, shares=122.03)
+    g.target          # (2, 3) per-share targets
+
+growth_grid() builds the growth x multiple plane from a ticker's scenario
+inputs (the same rows stocklib.valuation reads), spanning the bear-to-bull
+range with some margin, and universe_grid() does it for every ticker in
+one call for the screen:
+
+    python3 -m stocklib.sensitivity [--points N] [--live]
+"""
+
+import hashlib
+
+import numpy as np
+
+from stocklib.render import save_figure
+from stocklib.valuation import ticker_inputs, universe_inputs
+
+POINTS = 41
+TABLE_POINTS = 5
+# heatmap axes extend past the bear/bull assumptions by this share of the range
+MARGIN = 0.25
+
+PRIMARY = '#1a365d'
+
+
+class Grid:
+    """Per-share targets on a metric (rows) x multiple (columns) plane."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def fingerprint(self):
+        """Content hash of the grid, for chart cache keys."""
+        h = hashlib.sha256()
+        for array in (self.rows, self.multiple, self.target, np.asarray(self.price, dtype=np.float64)):
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+    def upside_share(self):
+        """Fraction of the plane priced above the current price."""
+        return (self.target > np.asarray(self.price)[..., None, None]).mean(axis=(-2, -1))
+
+
+def target_grid(metric, multiple, adjustment=0.0, shares=1.0, floor=-np.inf, price=np.nan):
+    """Targets for every (metric, multiple) pair: (metric x multiple + adjustment) / shares.
+
+    `metric` and `multiple` are axes (last dimension); leading dimensions
+    broadcast against `adjustment`, `shares`, `floor` and `price`.
+    """
+    metric = np.asarray(metric, dtype=np.float64)
+    multiple = np.asarray(multiple, dtype=np.float64)
+    adjustment = np.asarray(adjustment, dtype=np.float64)
+    shares = np.asarray(shares, dtype=np.float64)
+    floor = np.asarray(floor, dtype=np.float64)
+    target = (metric[..., :, None] * multiple[..., None, :] + adjustment[..., None, None]) / shares[..., None, None]
+    target = np.maximum(target, floor[..., None, None])
+    return Grid(rows=metric, metric=metric, multiple=multiple, target=target, price=price,
+                adjustment=adjustment, shares=shares)
+
+
+def _axis(low, high, points, margin=MARGIN, minimum=-np.inf):
+    """`points` evenly spaced values over [low, high] widened by `margin` x the range."""
+    pad = margin * (high - low)
+    return np.linspace(np.maximum(low - pad, minimum), high + pad, points, axis=-1)
+
+
+def _table_axis(low, high, points, percent=False):
+    """Evenly spaced values over [low, high] rounded to the precision of the step."""
+    scale = 100.0 if percent else 1.0
+    values = np.linspace(low, high, points) * scale
+    step = (high - low) * scale / max(points - 1, 1)
+    decimals = int(max(0, -np.floor(np.log10(step)))) if step > 0 else 0
+    return np.unique(np.round(values, decimals)) / scale
+
+
+def growth_grid(base, growth, multiple_low, multiple_high, probability, price, retention=1.0,
+                shares=1.0, adjustment=0.0, floor=-np.inf, points=POINTS, margin=MARGIN,
+                growth_axis=None, multiple_axis=None):
+    """Growth x multiple grid from value() arguments (scenarios on the last axis).
+
+    The metric compounds at a constant rate for as many years as the base
+    scenario projects; retention, shares, adjustment and floor are the base
+    scenario's. Axes span bear-to-bull growth and the lowest-to-highest
+    multiple, widened by `margin`, unless given explicitly.
+    """
+    base, growth = np.asarray(base, dtype=np.float64), np.asarray(growth, dtype=np.float64)
+    multiple_low = np.asarray(multiple_low, dtype=np.float64)
+    multiple_high = np.asarray(multiple_high, dtype=np.float64)
+    given = np.isfinite(growth)
+    years = given[..., 1, :].sum(axis=-1)
+    rates = np.where(given, growth, np.nan)
+    if growth_axis is None:
+        growth_axis = _axis(np.nanmin(rates, axis=(-2, -1)), np.nanmax(rates, axis=(-2, -1)), points, margin)
+    if multiple_axis is None:
+        multiple_axis = _axis(multiple_low.min(axis=-1), multiple_high.max(axis=-1), points, margin, 0.0)
+    growth_axis, multiple_axis = np.asarray(growth_axis), np.asarray(multiple_axis)
+
+    pick = lambda a: np.asarray(a, dtype=np.float64)[..., 1] if np.ndim(a) else np.float64(a)
+    retention = pick(np.broadcast_to(retention, base.shape))
+    years = np.asarray(years, dtype=np.float64)
+    steps = 1.0 + growth_axis * np.asarray(retention)[..., None]
+    metric = base[..., 1, None] * steps ** years[..., None]
+    grid = target_grid(metric, multiple_axis, pick(np.broadcast_to(adjustment, base.shape)),
+                       pick(np.broadcast_to(shares, base.shape)), pick(np.broadcast_to(floor, base.shape)),
+                       price)
+    grid.rows = growth_axis
+    grid.growth = growth_axis
+    grid.years = years
+    # the base scenario as a point on the plane: its compound rate and mid multiple
+    base_steps = np.prod(np.where(given[..., 1, :], 1.0 + rates[..., 1, :] * retention[..., None], 1.0),
+                         axis=-1)
+    grid.base_metric = base[..., 1] * base_steps
+    grid.base_growth = (base_steps ** (1.0 / np.maximum(years, 1)) - 1.0) / retention
+    grid.base_multiple = (multiple_low[..., 1] + multiple_high[..., 1]) / 2.0
+    return grid
+
+
+def ticker_grid(data, price=None, points=POINTS, table=False, **overrides):
+    """Growth x multiple grid for one ticker from its `scenarios` rows.
+
+    table=True gives the compact TABLE_POINTS x TABLE_POINTS grid on rounded
+    axes spanning exactly bear-to-bull, for the report tables.
+    """
+    args = ticker_inputs(data, price, **overrides)
+    if not table:
+        return growth_grid(points=points, **args)
+    rates = args['growth'][np.isfinite(args['growth'])]
+    return growth_grid(growth_axis=_table_axis(rates.min(), rates.max(), TABLE_POINTS, percent=True),
+                       multiple_axis=_table_axis(args['multiple_low'].min(), args['multiple_high'].max(),
+                                                 TABLE_POINTS),
+                       **args)
+
+
+def universe_grid(store, prices=None, points=POINTS):
+    """(tickers, Grid) for every ticker, tickers on the first axis, in one broadcast pass."""
+    tickers, args = universe_inputs(store, prices)
+    return tickers, growth_grid(points=points, **args)
+
+
+def break_even_multiple(grid):
+    """Multiple at which the base-case metric is worth exactly the current price."""
+    return (np.asarray(grid.price) * grid.shares - grid.adjustment) / grid.base_metric
+
+
+# --- Table and chart ---
+
+def table_rows(grid, currency, row_format='{:.0%}', multiple_format='{:g}x', corner=''):
+    """Header row of multiples, then one row per metric value; the report adds styling."""
+    rows = [[corner] + [multiple_format.format(m) for m in grid.multiple]]
+    for value, targets in zip(grid.rows, grid.target):
+        rows.append([row_format.format(value)] + [f'{currency}{t:,.0f}' for t in targets])
+    return rows
+
+
+def table_colors(grid, up='#f0fff4', down='#fff5f5'):
+    """(column, row) -> background for each target cell, green above the price, red below."""
+    return [((j + 1, i + 1), up if t >= grid.price else down)
+            for i, targets in enumerate(grid.target) for j, t in enumerate(targets)]
+
+
+def heatmap_chart(grid, title, path, currency='₹', row_label='EPS growth (CAGR)', multiple_label='P/E',
+                  percent_rows=True, marker=None, figsize=(8, 4.5), percent_columns=False):
+    """Heatmap of the target plane, diverging at the current price, with the CMP contour.
+
+    `marker` is an optional (row value, multiple, label) point, e.g. the base case.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import TwoSlopeNorm
+
+    rows = grid.rows * (100 if percent_rows else 1)
+    columns = grid.multiple * (100 if percent_columns else 1)
+    target, price = grid.target, float(grid.price)
+    low, high = float(target.min()), float(target.max())
+    norm = TwoSlopeNorm(vcenter=price, vmin=min(low, price * 0.99), vmax=max(high, price * 1.01))
+
+    fig, ax = plt.subplots(figsize=figsize)
+    image = ax.pcolormesh(columns, rows, target, cmap='RdYlGn', norm=norm, shading='nearest',
+                          rasterized=True)
+    bar = fig.colorbar(image, ax=ax, pad=0.02)
+    bar.set_label(f'Target per share ({currency.strip()})', fontsize=8)
+    bar.ax.tick_params(labelsize=7)
+    if low < price < high:
+        line = ax.contour(columns, rows, target, levels=[price], colors=PRIMARY, linewidths=1.6)
+        ax.clabel(line, fmt=lambda _: f'CMP {currency}{price:,.0f}', fontsize=7)
+    if marker is not None:
+        y, x, label = marker
+        ax.plot(x * (100 if percent_columns else 1), y * (100 if percent_rows else 1), marker='*', color='white', markersize=14,
+                markeredgecolor=PRIMARY, linestyle='none', label=label)
+        ax.legend(fontsize=7, loc='upper left')
+
+    ax.grid(False)
+    ax.set_xlabel(multiple_label + (' (%)' if percent_columns else ''))
+    ax.set_ylabel(row_label + (' (%)' if percent_rows else ''))
+    ax.set_title(title, fontweight='bold', pad=15)
+    ax.tick_params(labelsize=8)
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+    from stocklib.prices import PriceHistory
+
+    parser = argparse.ArgumentParser(description='Growth x multiple sensitivity screen for every ticker')
+    parser.add_argument('--points', type=int, default=POINTS, help=f'grid points per axis (default {POINTS})')
+    parser.add_argument('--live', action='store_true',
+                        help='use the last close in the price store instead of the report price')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    prices = {}
+    if args.live:
+        for ticker in store.table('scenarios').tickers():
+            history = PriceHistory(ticker)
+            if len(history):
+                prices[ticker] = float(history.records['close'][-1])
+    start = time.perf_counter()
+    tickers, grid = universe_grid(store, prices, args.points)
+    share, even = grid.upside_share(), break_even_multiple(grid)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Ticker':<12}{'Price':>9}{'Min':>9}{'Max':>9}{'Upside':>9}  Break-even multiple at base growth")
+    for i, ticker in enumerate(tickers):
+        t = grid.target[i]
+        print(f"{ticker:<12}{grid.price[i]:>9.2f}{t.min():>9.1f}{t.max():>9.1f}{share[i]:>9.0%}  {even[i]:.2f}x")
+    print(f"{len(tickers)} tickers x {args.points}x{args.points} grid in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Shared reportlab style objects for the report scripts.
+
+Every report draws the same paragraph and table styles, and each
+build_pdf() used to construct a dozen ParagraphStyles and a TableStyle per
+table on every run. paragraph_style() and table_style() build each style
+once per process, keyed by a semantic name plus any variant keywords, and
+hand out one shared, read-only object:
+
+    paragraph_style('heading')
+    paragraph_style('title', textColor=HexColor(WINE))            # a report's variant
+    table.setStyle(table_style('header_grid_table', align='LEFT'))
+    table.setStyle(TableStyle([('ALIGN', (2, 0), (2, -1), 'LEFT')]))  # table-specific extras
+
+Paragraph variants override ParagraphStyle attributes; table variants are
+the builder's parameters. Table-specific commands go in a second
+setStyle() call, which reportlab applies on top of the first.
+"""
+
+import functools
+
+from reportlab.lib.colors import HexColor, white
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import TableStyle
+
+FONT = 'SFNS'
+
+PRIMARY = HexColor('#1a365d')
+ACCENT = HexColor('#2b6cb0')
+HIGHLIGHT = HexColor('#e53e3e')
+GREEN = HexColor('#38a169')
+ORANGE = HexColor('#dd6b20')
+
+GRID = HexColor('#cbd5e0')
+BAND = HexColor('#f7fafc')
+SHADE = HexColor('#edf2f7')
+# Bull / Base / Bear row and column tints
+SCENARIO_TINTS = (HexColor('#f0fff4'), HexColor('#fffff0'), HexColor('#fff5f5'))
+
+
+@functools.lru_cache(maxsize=None)
+def sample_stylesheet():
+    """reportlab's sample stylesheet, built once per process.
+
+    The report styles only ever use its entries as `parent=`, so one shared
+    instance is safe.
+    """
+    return getSampleStyleSheet()
+
+
+# --- Paragraph styles ---
+
+# semantic name -> (reportlab style name, parent, attributes); a parent in
+# this table is the shared style of that name, otherwise a sample-sheet entry
+PARAGRAPH_STYLES = {
+    'title': ('CustomTitle', 'Title', dict(
+        fontSize=20, textColor=PRIMARY, spaceAfter=6, alignment=TA_CENTER, fontName=FONT)),
+    'subtitle': ('CustomSubtitle', 'Normal', dict(
+        fontSize=11, textColor=HexColor('#4a5568'), spaceAfter=12, alignment=TA_CENTER, fontName=FONT)),
+    'cover_subtitle': ('BigSub', 'subtitle', dict(fontSize=16, textColor=ACCENT, fontName=FONT)),
+    'heading': ('CustomHeading', 'Heading1', dict(
+        fontSize=14, textColor=PRIMARY, spaceBefore=16, spaceAfter=8, fontName=FONT,
+        borderWidth=0, borderPadding=0)),
+    'subheading': ('CustomSubheading', 'Heading2', dict(
+        fontSize=11, textColor=ACCENT, spaceBefore=10, spaceAfter=4, fontName=FONT)),
+    'body': ('CustomBody', 'Normal', dict(
+        fontSize=9, leading=13, textColor=HexColor('#2d3748'), spaceAfter=6, alignment=TA_JUSTIFY,
+        fontName=FONT)),
+    'bullet': ('CustomBullet', 'body', dict(leftIndent=15, bulletIndent=5, spaceAfter=3, fontSize=9)),
+    'source': ('SourceStyle', 'Normal', dict(
+        fontSize=7, textColor=HexColor('#718096'), spaceAfter=4, fontName=FONT)),
+    'disclaimer': ('DisclaimerStyle', 'Normal', dict(
+        fontSize=7, textColor=HexColor('#a0aec0'), spaceBefore=8, spaceAfter=4, fontName=FONT,
+        alignment=TA_CENTER)),
+    'callout_green': ('CalloutGreen', 'body', dict(
+        backColor=SCENARIO_TINTS[0], borderWidth=1, borderColor=GREEN, borderPadding=8,
+        leftIndent=10, spaceAfter=8)),
+    'callout_red': ('CalloutRed', 'body', dict(
+        backColor=SCENARIO_TINTS[2], borderWidth=1, borderColor=HIGHLIGHT, borderPadding=8,
+        leftIndent=10, spaceAfter=8)),
+    'callout_orange': ('CalloutOrange', 'body', dict(
+        backColor=SCENARIO_TINTS[1], borderWidth=1, borderColor=ORANGE, borderPadding=8,
+        leftIndent=10, spaceAfter=8)),
+}
+
+
+class SharedParagraphStyle(ParagraphStyle):
+    """A ParagraphStyle that refuses attribute changes once built.
+
+    deepcopy() (which reportlab uses before adjusting a style) returns an
+    ordinary, mutable ParagraphStyle.
+    """
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(f"shared style {self.name!r} is read-only; "
+                                 f"ask paragraph_style() for a variant instead")
+        super().__setattr__(name, value)
+
+    def __deepcopy__(self, memo):
+        style = ParagraphStyle(self.name)
+        style.__dict__.update((k, v) for k, v in self.__dict__.items() if k != '_frozen')
+        return style
+
+
+def _attributes(name):
+    """Resolved attributes of a registered paragraph style (parents applied)."""
+    label, parent, attrs = PARAGRAPH_STYLES[name]
+    if parent in PARAGRAPH_STYLES:
+        inherited = _attributes(parent)
+    else:
+        inherited = {k: v for k, v in sample_stylesheet()[parent].__dict__.items() if k not in ('name', 'parent')}
+    return {**inherited, **attrs}
+
+
+@functools.lru_cache(maxsize=None)
+def _paragraph_style(name, overrides):
+    style = SharedParagraphStyle(PARAGRAPH_STYLES[name][0], **{**_attributes(name), **dict(overrides)})
+    style._frozen = True
+    return style
+
+
+def paragraph_style(name, **overrides):
+    """The shared ParagraphStyle registered as `name`, with keyword overrides as a variant."""
+    return _paragraph_style(name, tuple(sorted(overrides.items())))
+
+
+# --- Table styles ---
+
+class SharedTableStyle(TableStyle):
+    """A TableStyle whose commands cannot be added to once built."""
+
+    def __init__(self, cmds):
+        super().__init__(cmds)
+        self._cmds = tuple(self._cmds)
+
+    def add(self, *cmd):
+        raise TypeError('shared table styles are read-only; apply extra commands with another setStyle()')
+
+    def getCommands(self):
+        return list(self._cmds)
+
+
+def _header(font_size, align, valign=True):
+    """Navy header row, one font over the table and grid lines."""
+    return ([('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
+             ('TEXTCOLOR', (0, 0), (-1, 0), white),
+             ('FONTNAME', (0, 0), (-1, -1), FONT),
+             ('FONTSIZE', (0, 0), (-1, -1), font_size),
+             ('ALIGN', (0, 0), (-1, -1), align)]
+            + ([('VALIGN', (0, 0), (-1, -1), 'MIDDLE')] if valign else [])
+            + [('GRID', (0, 0), (-1, -1), 0.5, GRID)])
+
+
+def _padding(padding):
+    return [('TOPPADDING', (0, 0), (-1, -1), padding),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), padding)]
+
+
+def header_grid_table(font_size=8, align='CENTER', padding=4, banded=True, valign=True):
+    """The workhorse data table: navy header, grid and (optionally) banded rows."""
+    cmds = _header(font_size, align, valign)
+    if banded:
+        cmds.append(('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, BAND]))
+    return cmds + _padding(padding)
+
+
+def scenario_table(font_size=7.5, padding=5, total=False, valign=True):
+    """Bull / Base / Bear rows tinted green / yellow / red; total=True shades the EV total row."""
+    cmds = [('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
+            ('TEXTCOLOR', (0, 0), (-1, 0), white)]
+    cmds += [('BACKGROUND', (0, row), (-1, row), tint) for row, tint in enumerate(SCENARIO_TINTS, 1)]
+    if total:
+        cmds.append(('BACKGROUND', (0, 4), (-1, 4), SHADE))
+    cmds += [('FONTNAME', (0, 0), (-1, -1), FONT),
+             ('FONTSIZE', (0, 0), (-1, -1), font_size),
+             ('ALIGN', (0, 0), (-1, -1), 'CENTER')]
+    if valign:
+        cmds.append(('VALIGN', (0, 0), (-1, -1), 'MIDDLE'))
+    return cmds + [('GRID', (0, 0), (-1, -1), 0.5, GRID)] + _padding(padding)
+
+
+def projection_table(font_size=7, padding=4):
+    """Bull / Base / Bear columns (1-3) tinted, below a navy header."""
+    cmds = [('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
+            ('TEXTCOLOR', (0, 0), (-1, 0), white)]
+    cmds += [('BACKGROUND', (col, 0), (col, -1), tint) for col, tint in enumerate(SCENARIO_TINTS, 1)]
+    cmds += [('TEXTCOLOR', (1, 0), (3, 0), white),
+             ('FONTNAME', (0, 0), (-1, -1), FONT),
+             ('FONTSIZE', (0, 0), (-1, -1), font_size),
+             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+             ('GRID', (0, 0), (-1, -1), 0.5, GRID)]
+    return cmds + _padding(padding)
+
+
+def metrics_table(font_size=9, padding=6):
+    """The cover page's key-metrics box: shaded cells in navy text."""
+    return [('BACKGROUND', (0, 0), (-1, -1), SHADE),
+            ('TEXTCOLOR', (0, 0), (-1, -1), PRIMARY),
+            ('FONTNAME', (0, 0), (-1, -1), FONT),
+            ('FONTSIZE', (0, 0), (-1, -1), font_size),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.5, GRID)] + _padding(padding)
+
+
+def sensitivity_table(font_size=8, padding=4):
+    """Target grid: navy header of multiples, shaded first column of growth rates."""
+    return ([('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
+             ('TEXTCOLOR', (0, 0), (-1, 0), white),
+             ('BACKGROUND', (0, 1), (0, -1), SHADE),
+             ('FONTNAME', (0, 0), (-1, -1), FONT),
+             ('FONTSIZE', (0, 0), (-1, -1), font_size),
+             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+             ('GRID', (0, 0), (-1, -1), 0.5, GRID)]
+            + _padding(padding))
+
+
+# verdict tone -> (border and headline colour, headline background)
+VERDICT_TONES = {
+    'green': (GREEN, HexColor('#d4edda')),
+    'orange': (ORANGE, HexColor('#fffaf0')),
+    'red': (HIGHLIGHT, HexColor('#fed7d7')),
+}
+
+
+def verdict_table(tone='green', font_size=8, padding=6):
+    """One-column verdict box: headline row, then a green bull row and a red bear row."""
+    color, background = VERDICT_TONES[tone]
+    return [('BACKGROUND', (0, 0), (-1, 0), background),
+            ('BACKGROUND', (0, 1), (-1, 1), SCENARIO_TINTS[0]),
+            ('BACKGROUND', (0, 2), (-1, 2), SCENARIO_TINTS[2]),
+            ('TEXTCOLOR', (0, 0), (-1, 0), color),
+            ('TEXTCOLOR', (0, 1), (-1, 1), HexColor('#155724')),
+            ('TEXTCOLOR', (0, 2), (-1, 2), HexColor('#721c24')),
+            ('FONTNAME', (0, 0), (-1, -1), FONT),
+            ('FONTSIZE', (0, 0), (0, 0), font_size + 2),
+            ('FONTSIZE', (0, 1), (-1, -1), font_size),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 1, color)] + _padding(padding)
+
+
+TABLE_STYLES = {
+    'header_grid_table': header_grid_table,
+    'scenario_table': scenario_table,
+    'projection_table': projection_table,
+    'metrics_table': metrics_table,
+    'sensitivity_table': sensitivity_table,
+    'verdict_table': verdict_table,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _table_style(name, params):
+    return SharedTableStyle(TABLE_STYLES[name](**dict(params)))
+
+
+def table_style(name, **params):
+    """The shared TableStyle registered as `name`, built with the given parameters."""
+    return _table_style(name, tuple(sorted(params.items())))
@@ -0,0 +1,246 @@
+"""
+WhatsApp summaries: every ticker's green/red flag digest, straight from the data.
+
+WHATSAPP_SUMMARIES.md was written by hand, re-typing figures the reports
+already hold. This module builds the same digest from the store and the
+valuation engine and writes it ticker by ticker as it goes, so a universe
+of thousands streams into one file without a chart or PDF being drawn:
+
+    python3 -m stocklib.summaries                      # every ticker -> STOCK_ANALYSIS_OUTPUT/WHATSAPP_SUMMARIES.md
+    python3 -m stocklib.summaries CELLO SULA -o -      # named tickers, to stdout
+    python3 -m stocklib.summaries --live               # valued at the last close in the price store
+
+The figures come from the store: results growth, cash flow, free cash
+flow and promoter holding become flags by the rules in data_flags(), the
+analyst block lists the targets table, and expected value and upside come
+from one vectorised universe_valuation() call. The ticker's document
+(data/reports/<TICKER>.json) adds what the data cannot say, in a
+"summary" block:
+
+    "summary": {"short_name": "BIKAJI FOODS", "green": [...], "red": [...],
+                "notes": {"EU-INDIA FTA UPDATE (Jan 27, 2026)": [...]}, "assumption": "..."}
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from stocklib.datastore import open_store
+from stocklib.prices import PriceHistory
+from stocklib.template import OUTPUT_DIR, load_document, tickers
+from stocklib.valuation import universe_valuation
+from stocklib.workingcapital import red_flags, ticker_metrics
+
+# WhatsApp renders the rupee sign unreliably in some fonts
+CURRENCY = 'Rs '
+BUY_RATINGS = ('buy', 'accumulate', 'overweight', 'outperform', 'add')
+DISCLAIMER = ('**DISCLAIMER: Not financial advice. For educational purposes only. Consult a SEBI-registered '
+              'advisor. Figures come from the research data set (Screener.in, BSE/NSE filings and named '
+              'brokerage reports); valuations are probability-weighted scenario values - see the full PDF '
+              'reports for methodology and limitations.**')
+
+_QUARTER = re.compile(r'Q([1-4]) FY(\d+)$')
+
+
+def _money(value, digits=0):
+    return f'{CURRENCY}{value:,.{digits}f}'
+
+
+def _upside(ret):
+    return f"~{abs(ret):.0%} {'upside' if ret >= 0 else 'downside'}"
+
+
+def _frame(data, table):
+    try:
+        frame = data[table]
+    except KeyError:
+        return None
+    return frame if len(frame) else None
+
+
+def _year_ago(periods, i):
+    """Index of the quarter a year before periods[i] ('Q3 FY26' -> 'Q3 FY25'), or None."""
+    match = _QUARTER.match(periods[i])
+    if not match:
+        return None
+    earlier = f'Q{match.group(1)} FY{int(match.group(2)) - 1:02d}'
+    return periods.index(earlier) if earlier in periods else None
+
+
+def data_flags(data):
+    """(green, red) flags the store's figures support on their own."""
+    green, red = [], []
+    q = _frame(data, 'quarterly_pnl')
+    if q is not None:
+        periods, basis, last = q.periods, q['basis'], len(q) - 1
+        before = _year_ago(periods, last)
+        if before is not None and basis[before] != basis[last]:
+            red.append(f'{periods[last]} results not comparable YoY ({basis[before]} vs {basis[last]} basis)')
+            before = None
+        for column, label in (('revenue', 'revenue'), ('nii', 'NII')):
+            values = q[column]
+            if np.isfinite(values[last]):
+                if before is not None and np.isfinite(values[before]) and values[before] > 0:
+                    growth = values[last] / values[before] - 1
+                    line = f'{periods[last]} {label} {_money(values[last])} Cr ({growth:+.0%} YoY)'
+                    (red if growth < 0 else green).append(line)
+                break
+        pat = q['pat']
+        if before is not None and np.isfinite(pat[last]) and np.isfinite(pat[before]) and pat[before] > 0:
+            change = pat[last] / pat[before] - 1
+            if change <= -0.2:
+                red.append(f'{periods[last]} PAT down {-change:.0%} YoY to {_money(pat[last], 1)} Cr')
+            elif change >= 0.2:
+                green.append(f'{periods[last]} PAT up {change:.0%} YoY to {_money(pat[last], 1)} Cr')
+        if np.isfinite(pat[last]) and pat[last] < 0:
+            red.append(f'Loss-making: {_money(-pat[last])} Cr net loss in {periods[last]}')
+
+    cf = _frame(data, 'cashflow')
+    if cf is not None:
+        periods, cfo = cf.periods, cf['cfo']
+        known = np.flatnonzero(np.isfinite(cfo))
+        if len(known) >= 2:
+            first, last = known[0], known[-1]
+            span = f'{_money(cfo[first])} Cr ({periods[first]}) -> {_money(cfo[last])} Cr ({periods[last]})'
+            if cfo[last] > cfo[first]:
+                green.append(f'CFO growing: {span}')
+            elif cfo[last] < cfo[first]:
+                red.append(f'CFO falling: {span}')
+        # cash conversion below the SOP's 70%, negative FCF, working-capital blow-outs
+        red += red_flags(ticker_metrics(data))
+
+    holding = _frame(data, 'shareholding')
+    if holding is not None:
+        promoter, period = holding['promoter'][-1], holding.periods[-1]
+        if np.isfinite(promoter):
+            if promoter >= 50:
+                green.append(f'{promoter:.1f}% promoter holding ({period})')
+            elif promoter < 1:
+                red.append(f'Promoter holding {promoter:.2f}% as of {period}')
+    return green, red
+
+
+def _is_buy(rating):
+    return any(word in rating.lower() for word in BUY_RATINGS)
+
+
+def target_lines(targets, price=None):
+    """'- Broker: Rating, Rs 900' per target, then a consensus line unless the table has one."""
+    if targets is None:
+        return []
+    low, high = targets['target_low'], targets['target_high']
+    brokers = [str(b) for b in targets['broker']]
+    lines = []
+    for broker, rating, period, lo, hi in zip(brokers, targets['rating'], targets.periods, low, high):
+        target = _money(lo) if lo == hi else f'{_money(lo)}-{hi:,.0f}'
+        lines.append(f'- {broker}: {rating}, {target}' + (f' — {period}' if period else ''))
+    # rows such as 'Consensus (6 analysts)' already summarise the street
+    single = np.array([not b.lower().startswith('consensus') for b in brokers])
+    if not single.all() or not single.any():
+        return lines
+    mid = (low + high)[single] / 2
+    buys = sum(_is_buy(str(r)) for r in targets['rating'][single])
+    consensus = f'- Consensus ({len(mid)} targets): {_money(np.mean(mid))}, {buys}/{len(mid)} Buy'
+    if len(mid) > 1:
+        consensus += f', range {_money(low[single].min())}-{high[single].max():,.0f}'
+    if price is not None:
+        consensus += f' ({_upside(np.mean(mid) / price - 1)} vs CMP)'
+    return lines + [consensus]
+
+
+def summary(ticker, data, doc, valuation=None):
+    """One ticker's WhatsApp text; `valuation` is (price, expected value) or None."""
+    block = doc.get('summary', {})
+    name = block.get('short_name', doc.get('name', ticker).upper())
+    rating = doc.get('verdict', {}).get('rating', 'NOT RATED')
+    price = valuation[0] if valuation is not None else None
+    head = f'### {name}' + (f' ({_money(price)})' if price is not None else '') + f' — {rating}'
+
+    green, red = data_flags(data)
+    green += block.get('green', [])
+    red += block.get('red', [])
+    if valuation is not None and valuation[1] < price:
+        red.append(f'Expected value {_money(valuation[1])} is BELOW CMP {_money(price)}')
+    lines = [head, '']
+    for title, sign, flags in (('GREEN FLAGS', '+', green), ('RED FLAGS', '-', red)):
+        if flags:
+            lines += [f'{title}:'] + [f'{sign} {flag}' for flag in flags] + ['']
+    for title, notes in block.get('notes', {}).items():
+        lines += [f'{title}:'] + [f'- {note}' for note in notes] + ['']
+    targets = target_lines(_frame(data, 'targets'), price)
+    if targets:
+        lines += ['ANALYST TARGETS:'] + targets + ['']
+
+    verdict = f'VERDICT: {rating}.'
+    if valuation is not None:
+        verdict += f' Expected value {_money(valuation[1])} ({_upside(valuation[1] / price - 1)}).'
+    if block.get('assumption'):
+        verdict += f" *Assumption: {block['assumption']}*"
+    return '\n'.join(lines + [verdict, '', '---', ''])
+
+
+def write_summaries(out, names=None, store=None, prices=None, date=None):
+    """Stream the digest for `names` (default: every ticker) to file object `out`; returns the count."""
+    store = store or open_store()
+    names = names or tickers(store)
+    valued, v = universe_valuation(store, prices) if 'scenarios' in store.tables() else ([], None)
+    index = {ticker: i for i, ticker in enumerate(valued)}
+
+    date = date or datetime.date.today()
+    out.write(f'# Stock Research Summaries — {date:%B} {date.day}, {date.year}\n'
+              '## WhatsApp-Ready Green/Red Flag Format\n\n'
+              '**Generated from the research data set; full reports have detailed methodology '
+              '& limitations sections.**\n\n---\n\n')
+    ranking = []
+    for n, ticker in enumerate(names, 1):
+        doc = load_document(ticker)
+        i = index.get(ticker)
+        valuation = None if i is None else (float(v.price[i]), float(v.expected[i]))
+        text = summary(ticker, store.ticker(ticker), doc, valuation)
+        out.write(text.replace('### ', f'### {n}. ', 1) + '\n')
+        if valuation is not None:
+            ranking.append((float(v.expected_return[i]), text.splitlines()[0][4:]))
+
+    if ranking:
+        out.write('RANKING (by expected return):\n')
+        for place, (ret, head) in enumerate(sorted(ranking, key=lambda r: -r[0]), 1):
+            out.write(f'{place}. {head}, {_upside(ret)}\n')
+        out.write('\n')
+    out.write(DISCLAIMER + '\n')
+    return len(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write WhatsApp summaries for every ticker from the data')
+    parser.add_argument('tickers', nargs='*', metavar='TICKER', help='tickers to summarise (default: all)')
+    parser.add_argument('-o', '--output', default=os.path.join(OUTPUT_DIR, 'WHATSAPP_SUMMARIES.md'),
+                        help="file to write ('-' for stdout)")
+    parser.add_argument('--live', action='store_true',
+                        help='value at the last close in the price store instead of the report price')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    prices = {}
+    if args.live:
+        for ticker in store.table('scenarios').tickers():
+            history = PriceHistory(ticker)
+            if len(history):
+                prices[ticker] = float(history.records['close'][-1])
+    start = time.perf_counter()
+    if args.output == '-':
+        count = write_summaries(sys.stdout, args.tickers, store, prices)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            count = write_summaries(fh, args.tickers, store, prices)
+    print(f"Summarised {count} ticker(s) in {time.perf_counter() - start:.2f}s -> {args.output}",
+          file=sys.stderr if args.output == '-' else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""
+Technical-analysis snapshot for the reports' "Technical Analysis" tables.
+
+A universe of tickers is aligned into (tickers x days) matrices and every
+indicator is computed for all of them in one pass:
+
+    universe = load_universe(['ABLBL', 'ABFRL', ...])
+    snap = snapshot(universe)            # {'rsi': array per ticker, ...}
+
+Report scripts keep their hand-typed rows as the fallback and let
+fill_rows() replace the value and signal of every row it can compute from
+the ticker's incremental indicator state (stocklib.indicator_state):
+
+    tech_data = fill_rows(tech_data, PRICES, currency='Rs ')
+
+Beta is measured against the BENCHMARK series in the price store; rows that
+need data the store does not have are left as typed.
+
+    python3 -m stocklib.technicals [TICKER ...]    # screen the price store
+"""
+
+import os
+import re
+
+import numpy as np
+
+from stocklib import indicators
+from stocklib.indicator_state import ticker_state
+from stocklib.prices import PRICE_DIR, PriceHistory
+
+BENCHMARK = 'NIFTY50'
+BETA_DAYS = 250
+YEAR_DAYS = 365
+
+FIELDS = ['open', 'high', 'low', 'close']
+SNAPSHOT_KEYS = (['close', 'last_day'] + [f'{kind}{n}' for n in (20, 50, 100, 200) for kind in ('sma', 'ema')]
+                 + ['rsi', 'macd', 'macd_signal', 'macd_hist', 'macd_cross', 'adx', 'plus_di', 'minus_di', 'cci',
+                    'bb_mid', 'bb_upper', 'bb_lower', 'bb_pct', 'high_52w', 'low_52w', 'high_52w_day',
+                    'low_52w_day', 'beta'])
+
+
+class Universe:
+    """Daily bars of several tickers aligned on the union of their trading dates."""
+
+    def __init__(self, tickers, days, fields):
+        self.tickers = list(tickers)
+        self.days = days
+        self.fields = fields
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    @property
+    def dates(self):
+        return self.days.view('datetime64[D]')
+
+    def index(self, ticker):
+        return self.tickers.index(ticker)
+
+
+def _forward_fill(matrix):
+    """Carry the last valid value over gaps (suspensions, holidays of one exchange)."""
+    valid = ~np.isnan(matrix)
+    idx = np.where(valid, np.arange(matrix.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(matrix, idx, axis=-1)
+    # positions before a row's first bar and after its last one stay NaN: a
+    # ticker that stopped trading is not flattened into a series of its last close
+    started = np.maximum.accumulate(valid, axis=-1)
+    ongoing = np.maximum.accumulate(valid[..., ::-1], axis=-1)[..., ::-1]
+    return np.where(started & ongoing, filled, np.nan)
+
+
+def align(histories, days=None):
+    """Build a Universe from PriceHistory objects (NaN where a ticker has no bar yet or any more)."""
+    histories = list(histories)
+    if days is None:
+        parts = [np.asarray(h.days) for h in histories if len(h)]
+        days = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+    fields = {name: np.full((len(histories), len(days)), np.nan) for name in FIELDS}
+    for row, history in enumerate(histories):
+        if not len(history):
+            continue
+        hist_days = np.asarray(history.days)
+        pos = np.searchsorted(days, hist_days)
+        keep = (pos < len(days)) & (days[np.minimum(pos, len(days) - 1)] == hist_days)
+        for name in FIELDS:
+            fields[name][row, pos[keep]] = history.records[name][keep]
+    for name in FIELDS:
+        fields[name] = _forward_fill(fields[name])
+    return Universe([h.ticker for h in histories], days, fields)
+
+
+def load_universe(tickers, price_dir=PRICE_DIR):
+    """Align the stored histories of `tickers`."""
+    return align(PriceHistory(t, price_dir) for t in tickers)
+
+
+def stored_tickers(price_dir=PRICE_DIR):
+    """Every ticker with a history in the price store."""
+    if not os.path.isdir(price_dir):
+        return []
+    return sorted(f[:-len('.dates')] for f in os.listdir(price_dir) if f.endswith('.dates'))
+
+
+def _last(matrix):
+    return matrix[..., -1] if matrix.shape[-1] else np.full(matrix.shape[:-1], np.nan)
+
+
+def _empty_snapshot(n):
+    """snapshot() of a universe with no bars (an empty or absent price store)."""
+    out = dict.fromkeys(SNAPSHOT_KEYS)
+    for name in out:
+        out[name] = np.zeros(n, dtype=np.int64) if name.endswith('day') else np.full(n, np.nan)
+    return out
+
+
+def snapshot(universe, benchmark=None, price_dir=PRICE_DIR):
+    """Latest value of every indicator for every ticker in `universe`.
+
+    Returns {name: array with one entry per ticker}. `benchmark` is a
+    PriceHistory for beta; by default BENCHMARK is read from the store.
+    """
+    close, high, low = universe['close'], universe['high'], universe['low']
+    days = universe.days
+    if not len(days):
+        return _empty_snapshot(len(universe))
+    # a ticker whose bars end early shows NaN indicators and the day of its last bar
+    has_bar = ~np.isnan(close)
+    last_bar = np.where(has_bar.any(axis=-1), close.shape[-1] - 1 - np.argmax(has_bar[..., ::-1], axis=-1), -1)
+    out = {'close': _last(close), 'last_day': np.where(last_bar >= 0, days[last_bar], 0)}
+    for n in (20, 50, 100, 200):
+        out[f'sma{n}'] = _last(indicators.sma(close, n))
+        out[f'ema{n}'] = _last(indicators.ema(close, n))
+    out['rsi'] = _last(indicators.rsi(close))
+    line, trigger, hist = indicators.macd(close)
+    out['macd'], out['macd_signal'], out['macd_hist'] = _last(line), _last(trigger), _last(hist)
+    # a histogram sign change within the last five sessions counts as a fresh crossover
+    recent = hist[..., -6:]
+    out['macd_cross'] = np.where(np.nanmin(recent, axis=-1, initial=np.inf) < 0,
+                                 np.where(np.nanmax(recent, axis=-1, initial=-np.inf) > 0,
+                                          np.sign(_last(hist)), 0), 0)
+    strength, plus_di, minus_di = indicators.adx(high, low, close)
+    out['adx'], out['plus_di'], out['minus_di'] = _last(strength), _last(plus_di), _last(minus_di)
+    out['cci'] = _last(indicators.cci(high, low, close))
+    mid, upper, lower = indicators.bollinger(close)
+    out['bb_mid'], out['bb_upper'], out['bb_lower'] = _last(mid), _last(upper), _last(lower)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['bb_pct'] = (out['close'] - out['bb_lower']) / (out['bb_upper'] - out['bb_lower'])
+
+    year = days >= (days[-1] - YEAR_DAYS)
+    year_high = np.where(year & ~np.isnan(high), high, -np.inf)
+    year_low = np.where(year & ~np.isnan(low), low, np.inf)
+    hi_idx, lo_idx = np.argmax(year_high, axis=-1), np.argmin(year_low, axis=-1)
+    rows = np.arange(len(universe))
+    out['high_52w'], out['low_52w'] = high[rows, hi_idx], low[rows, lo_idx]
+    out['high_52w_day'], out['low_52w_day'] = days[hi_idx], days[lo_idx]
+
+    if benchmark is None:
+        benchmark = PriceHistory(BENCHMARK, price_dir)
+    out['beta'] = np.full(len(universe), np.nan)
+    if len(benchmark):
+        market = align([benchmark], days)['close'][0]
+        beta = indicators.rolling_beta(indicators.returns(close), indicators.returns(market), BETA_DAYS)
+        out['beta'] = _last(beta)
+    return out
+
+
+# --- Table rows ---
+
+def _ma_signal(price, value):
+    gap = price / value - 1
+    if abs(gap) < 0.01:
+        return 'Price at MA level - Neutral'
+    if gap > 0:
+        return f'Price {gap:.0%} above - Bullish'
+    return f'Price {-gap:.0%} below - Bearish'
+
+
+def _rsi_signal(value):
+    if value >= 70:
+        return 'Overbought (above 70)'
+    if value >= 60:
+        return 'Bullish momentum (approaching overbought at 70)'
+    if value > 40:
+        return 'Neutral (neither oversold nor overbought)'
+    if value > 30:
+        return 'Neutral (approaching oversold at 30)'
+    return 'Oversold (below 30)'
+
+
+def _macd_signal(snap, i):
+    if snap['macd_cross'][i] > 0:
+        return 'Bullish crossover - Buy signal'
+    if snap['macd_cross'][i] < 0:
+        return 'Bearish crossover - Sell signal'
+    if snap['macd_hist'][i] > 0:
+        return 'Above signal line - Bullish'
+    return 'Below signal line - Bearish'
+
+
+def _adx_signal(snap, i):
+    direction = 'bullish' if snap['plus_di'][i] > snap['minus_di'][i] else 'bearish'
+    value = snap['adx'][i]
+    if value < 20:
+        return 'Weak trend strength'
+    if value < 25:
+        return f'Trend emerging ({direction})'
+    return f'Strong {direction} trend'
+
+
+def _cci_signal(value):
+    if value > 100:
+        return 'Overbought - Potential pullback'
+    if value < -100:
+        return 'Oversold - Potential reversal'
+    return 'Neutral range (-100 to +100)'
+
+
+def _beta_signal(value):
+    if value > 1.2:
+        return 'High volatility vs market'
+    if value > 1.0:
+        return 'Slightly above market volatility'
+    if value > 0.8:
+        return 'Slightly less volatile than market'
+    return 'Lower volatility than market'
+
+
+def _day(day):
+    return np.datetime64(int(day), 'D').item()
+
+
+def _short_date(day):
+    date = _day(day)
+    return f'{date:%b} {date.day}'
+
+
+_MA_LABEL = re.compile(r'(\d+)-Day (SMA|EMA|MA)$')
+
+
+def table_rows(rows, snap, i, currency='₹'):
+    """Replace the value/signal of every row in `rows` that `snap[..][i]` can compute.
+
+    Recognised labels: 'N-Day SMA/EMA/MA', 'RSI (14)', 'MACD', 'ADX', 'CCI',
+    'Beta', '52-Week High', '52-Week Low' and 'Price (...)'. Other rows, and
+    rows whose indicator is NaN, are returned unchanged.
+    """
+    price = snap['close'][i]
+    money = lambda v: f'{currency}{v:,.2f}'
+    out = []
+    for row in rows:
+        label = row[0]
+        computed = None
+        ma = _MA_LABEL.match(label)
+        if ma:
+            n, kind = int(ma.group(1)), 'ema' if ma.group(2) == 'EMA' else 'sma'
+            value = snap[f'{kind}{n}'][i] if f'{kind}{n}' in snap else np.nan
+            if np.isfinite(value):
+                computed = [label, money(value), _ma_signal(price, value)]
+        elif label == 'RSI (14)' and np.isfinite(snap['rsi'][i]):
+            computed = [label, f"{snap['rsi'][i]:.1f}", _rsi_signal(snap['rsi'][i])]
+        elif label == 'MACD' and np.isfinite(snap['macd_hist'][i]):
+            computed = [label, f"{snap['macd'][i]:.2f}", _macd_signal(snap, i)]
+        elif label == 'ADX' and np.isfinite(snap['adx'][i]):
+            computed = [label, f"{snap['adx'][i]:.1f}", _adx_signal(snap, i)]
+        elif label == 'CCI' and np.isfinite(snap['cci'][i]):
+            computed = [label, f"{snap['cci'][i]:.1f}", _cci_signal(snap['cci'][i])]
+        elif label == 'Beta' and np.isfinite(snap['beta'][i]):
+            computed = [label, f"{snap['beta'][i]:.2f}", _beta_signal(snap['beta'][i])]
+        elif label == '52-Week High' and np.isfinite(snap['high_52w'][i]):
+            high = snap['high_52w'][i]
+            computed = [label, f"{money(high)} ({_short_date(snap['high_52w_day'][i])})",
+                        f'{high / price - 1:.0%} above current']
+        elif label == '52-Week Low' and np.isfinite(snap['low_52w'][i]):
+            low = snap['low_52w'][i]
+            computed = [label, f"{money(low)} ({_short_date(snap['low_52w_day'][i])})",
+                        f'{price / low - 1:.0%} above the low']
+        elif label.startswith('Price (') and np.isfinite(price):
+            computed = [f"Price ({_short_date(snap['last_day'][i])})", money(price), row[2]]
+        out.append(computed or row)
+    return out
+
+
+def _year_range(history):
+    """52-week high/low of one ticker (and their dates) as one-element arrays."""
+    end = int(history.days[-1])
+    year = history.window(start=np.datetime64(end - YEAR_DAYS, 'D'))
+    hi, lo = int(np.argmax(year.high)), int(np.argmin(year.low))
+    return {'high_52w': year.high[hi:hi + 1], 'high_52w_day': year.days[hi:hi + 1],
+            'low_52w': year.low[lo:lo + 1], 'low_52w_day': year.days[lo:lo + 1]}
+
+
+def fill_rows(rows, history, currency='₹', price_dir=PRICE_DIR):
+    """table_rows() for a single report's PriceHistory; `rows` unchanged without history.
+
+    Indicator values come from the ticker's saved incremental state, so only
+    bars appended since the last run are processed.
+    """
+    if not len(history):
+        return rows
+    state = ticker_state(history, PriceHistory(BENCHMARK, price_dir), price_dir)
+    snap = state.values()
+    snap.update(_year_range(history))
+    return table_rows(rows, snap, 0, currency)
+
+
+def screen(tickers=None, price_dir=PRICE_DIR):
+    """Print one line of indicators per ticker for the whole price store."""
+    import time
+
+    tickers = tickers or stored_tickers(price_dir)
+    start = time.perf_counter()
+    universe = load_universe(tickers, price_dir)
+    loaded = time.perf_counter()
+    snap = snapshot(universe, price_dir=price_dir)
+    done = time.perf_counter()
+
+    print(f"{'Ticker':<12}{'Close':>10}{'RSI':>7}{'MACD':>9}{'ADX':>7}{'CCI':>8}{'%B':>7}{'Beta':>7}")
+    for i, ticker in enumerate(universe.tickers):
+        print(f"{ticker:<12}{snap['close'][i]:>10.2f}{snap['rsi'][i]:>7.1f}{snap['macd'][i]:>9.2f}"
+              f"{snap['adx'][i]:>7.1f}{snap['cci'][i]:>8.1f}{snap['bb_pct'][i]:>7.2f}{snap['beta'][i]:>7.2f}")
+    print(f"{len(universe)} tickers x {len(universe.days)} days: "
+          f"aligned in {loaded - start:.2f}s, indicators in {done - loaded:.2f}s")
+
+
+if __name__ == '__main__':
+    import sys
+
+    screen(sys.argv[1:] or None)
@@ -0,0 +1,1190 @@
+"""
+Declarative report templates: a research report rendered from data.
+
+The *_report.py scripts each spell out their story as a long run of
+story.append(Paragraph(...)) calls for the same sections. build_report()
+assembles those sections from two inputs instead:
+
+    data/reports/<TICKER>.json   the ticker's document: names, cover metrics,
+                                 verdict, per-section prose and sector data
+    data/store                   statements, cash flow, shareholding, peers,
+                                 targets and scenarios (stocklib.datastore)
+
+A layout is the ordered list of sections to render. The document picks one
+by name (`layout`, else its `sector`) from LAYOUTS, or lists the sections
+itself. Section renderers are registered with @section; each returns its
+flowables, or [] when the ticker has no data for it, so a ticker with
+nothing but store rows still renders:
+
+    @section('asset_quality', charts=asset_quality_charts)
+    def asset_quality(report, charts): ...
+
+The charts a section places are functools.partial()s of the chart functions
+below, so stocklib.render caches and parallelises them like the scripts'.
+
+Builds are incremental. Each section also declares the fields it reads
+(store tables, 'prices', 'benchmark', 'price', document keys; its own document entry,
+the name and the currency always count), and is laid out as its own PDF
+cached under a key of those fields, its renderer's code, its charts and
+its heading number. A rebuild lays out and charts only the sections whose
+key changed and joins the cached ones around them (stocklib.pdfjoin); with
+--live a new close re-renders the cover, technicals, analyst views,
+valuation and verdict and nothing else:
+
+    @section('analyst_targets', inputs=('targets', 'price'))
+
+    python3 -m stocklib.template CELLO IDFCFIRSTB     # named tickers
+    python3 -m stocklib.template --all --jobs 4       # every ticker in the store or with a document
+    python3 -m stocklib.template --live CELLO         # value at the last close in the price store
+    python3 -m stocklib.template CELLO --profile      # time each section, its story and layout (stocklib.profiling)
+
+PDFs and chart files go to STOCK_ANALYSIS_OUTPUT
+(default ~/Desktop/stock-analysis/generated).
+"""
+
+import argparse
+import functools
+import io
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from stocklib import chart_cache, profiling
+from stocklib.bankvalue import COE, GROWTH, ticker_bank_value, ticker_residual_grid, value_rows
+from stocklib.banks import metric_rows, ticker_metrics, year_ends
+from stocklib.datastore import DATA_DIR, open_store
+from stocklib.enterprise import bridge_rows, ticker_bridge
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pdfjoin import join
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, output_mode, render_charts, save_figure, setup_matplotlib
+from stocklib.runway import describe as describe_runway, runway_chart, ticker_runway, waterfall_rows
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, ticker_grid
+from stocklib.technicals import BENCHMARK, fill_rows
+from stocklib.valuation import (SCENARIOS, ev_rows, multiple_cells, return_cells, target_cells,
+                                ticker_valuation, upside)
+from stocklib.workingcapital import cash_flow_rows, days_rows, red_flags, ticker_metrics as cash_metrics
+
+REPORTS_DIR = os.path.join(DATA_DIR, 'reports')
+OUTPUT_DIR = os.environ.get(
+    'STOCK_ANALYSIS_OUTPUT',
+    os.path.join(os.path.expanduser('~'), 'Desktop', 'stock-analysis', 'generated'),
+)
+SECTION_CACHE_DIR = os.path.join(chart_cache.CACHE_DIR, 'sections')
+
+LAYOUTS = {
+    'default': ['cover', 'snapshot', 'fundamentals', 'cash_flow', 'cash_runway', 'shareholding', 'technicals',
+                'peers', 'analyst_targets', 'valuation', 'catalysts', 'verdict'],
+    # bank cash flow statements say little about the business; asset quality replaces them
+    'bank': ['cover', 'snapshot', 'fundamentals', 'asset_quality', 'shareholding', 'technicals', 'peers',
+             'analyst_targets', 'valuation', 'bank_valuation', 'catalysts', 'verdict'],
+    'retail': ['cover', 'snapshot', 'fundamentals', 'store_metrics', 'cash_flow', 'cash_runway',
+               'shareholding', 'technicals', 'peers', 'analyst_targets', 'valuation', 'catalysts', 'verdict'],
+}
+
+# indicator rows computed from the price store when a document has none of its own
+TECHNICAL_ROWS = [['Price (latest)', '-', '-'], ['50-Day EMA', '-', '-'], ['200-Day SMA', '-', '-'],
+                  ['RSI (14)', '-', '-'], ['MACD', '-', '-'], ['ADX', '-', '-'], ['Beta', '-', '-'],
+                  ['52-Week High', '-', '-'], ['52-Week Low', '-', '-']]
+
+# store column -> (row label, format); {c} is the report currency
+QUARTERLY_COLUMNS = [
+    ('revenue', 'Revenue ({c}Cr)', '{:,.0f}'),
+    ('nii', 'NII ({c}Cr)', '{:,.0f}'),
+    ('ebitda', 'EBITDA ({c}Cr)', '{:,.0f}'),
+    ('ebitda_margin', 'EBITDA Margin', '{:.1f}%'),
+    ('gross_margin', 'Gross Margin', '{:.1f}%'),
+    ('opm', 'OPM', '{:.1f}%'),
+    ('pat', 'Net Profit ({c}Cr)', '{:,.0f}'),
+    ('pat_margin', 'PAT Margin', '{:.1f}%'),
+    ('eps', 'EPS ({c})', '{:.2f}'),
+    ('nim', 'NIM', '{:.2f}%'),
+    ('cti', 'Cost-to-Income', '{:.1f}%'),
+]
+ANNUAL_COLUMNS = [
+    ('revenue', 'Revenue ({c}Cr)', '{:,.0f}'),
+    ('ebitda', 'EBITDA ({c}Cr)', '{:,.0f}'),
+    ('pat', 'Net Profit ({c}Cr)', '{:,.0f}'),
+    ('eps', 'EPS ({c})', '{:.2f}'),
+]
+PEER_COLUMNS = [
+    ('pe', 'P/E', '{:.1f}x'),
+    ('forward_pe', 'Fwd P/E', '{:.1f}x'),
+    ('pb', 'P/B', '{:.2f}x'),
+    ('ps', 'P/S', '{:.2f}x'),
+    ('ev_sales', 'EV/Sales', '{:.2f}x'),
+    ('revenue', 'Revenue ({c}Cr)', '{:,.0f}'),
+    ('ebitda_margin', 'EBITDA Mgn', '{:.1f}%'),
+    ('pat_margin', 'PAT Mgn', '{:.1f}%'),
+    ('revenue_growth', 'Rev Growth', '{:.1f}%'),
+    ('market_cap', 'M-Cap ({c}Cr)', '{:,.0f}'),
+    ('roa', 'ROA', '{:.2f}%'),
+    ('nim', 'NIM', '{:.2f}%'),
+    ('gnpa', 'GNPA', '{:.2f}%'),
+    ('casa', 'CASA', '{:.1f}%'),
+]
+SHAREHOLDERS = [('promoter', 'Promoters'), ('fii', 'FIIs'), ('dii', 'DIIs'), ('public', 'Public'),
+                ('government', 'Government')]
+
+PRIMARY = '#1a365d'
+ACCENT = '#2b6cb0'
+GREEN = '#38a169'
+HIGHLIGHT = '#e53e3e'
+ORANGE = '#dd6b20'
+PURPLE = '#805ad5'
+
+
+# --- Documents and layouts ---
+
+def load_document(ticker, reports_dir=None):
+    """The ticker's report document, or a bare one naming the ticker when it has none."""
+    path = os.path.join(reports_dir or REPORTS_DIR, ticker + '.json')
+    if not os.path.exists(path):
+        return {'name': ticker, 'listing': f'NSE: {ticker}'}
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def layout(doc):
+    """Section names for a document: its own list, a named layout, or its sector's."""
+    chosen = doc.get('layout', doc.get('sector', 'default'))
+    if isinstance(chosen, list):
+        sections = chosen
+    else:
+        sections = LAYOUTS.get(chosen, LAYOUTS['default'])
+    unknown = [name for name in sections if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"{doc.get('name')}: unknown section(s) {unknown}")
+    return sections
+
+
+def tickers(store=None, reports_dir=None):
+    """Every ticker with rows in the store or a report document."""
+    store = store or open_store()
+    names = set()
+    for table in store.tables():
+        names.update(store.table(table).tickers())
+    reports_dir = reports_dir or REPORTS_DIR
+    if os.path.isdir(reports_dir):
+        names.update(os.path.splitext(f)[0] for f in os.listdir(reports_dir) if f.endswith('.json'))
+    return sorted(names)
+
+
+class Report:
+    """One ticker's document, store data and valuation, as the section renderers see them."""
+
+    def __init__(self, ticker, doc=None, store=None, live=False):
+        self.ticker = ticker
+        self.doc = load_document(ticker) if doc is None else doc
+        self.store = store or open_store()
+        self.data = self.store.ticker(ticker)
+        self.prices = PriceHistory(ticker)
+        self.currency = self.doc.get('currency', '₹')
+        self.name = self.doc.get('name', ticker)
+        self.sections = layout(self.doc)
+        self.chart_dir = os.path.join(OUTPUT_DIR, ticker)
+        self.pdf = os.path.join(OUTPUT_DIR, f'{ticker}_Research_Report.pdf')
+        # None values at the reference price stored with the scenarios
+        self.price = float(self.prices.records['close'][-1]) if live and len(self.prices) else None
+        self.number = 0
+
+    # Model outputs are computed the first time a section renderer asks for
+    # them (None when the ticker has no inputs for them). The simulation
+    # charts bind the model instead of its result (modelled_chart), so chart
+    # and section keys never run it and a fully cached rebuild skips it.
+
+    @functools.cached_property
+    def valuation(self):
+        return ticker_valuation(self.data, self.price) if self.frame('scenarios') is not None else None
+
+    def simulation_model(self):
+        """ticker_simulation() bound to the rows it reads."""
+        return functools.partial(ticker_simulation, self.store.ticker(self.ticker, ('scenarios',)), self.price)
+
+    def runway_model(self):
+        """ticker_runway() bound to the rows it reads."""
+        return functools.partial(ticker_runway, self.store.ticker(self.ticker, ('cash_runway',)))
+
+    @functools.cached_property
+    def simulation(self):
+        return self.simulation_model()() if self.frame('scenarios') is not None else None
+
+    @functools.cached_property
+    def grid(self):
+        return ticker_grid(self.data, self.price) if self.frame('scenarios') is not None else None
+
+    @functools.cached_property
+    def grid_table(self):
+        return ticker_grid(self.data, self.price, table=True) if self.frame('scenarios') is not None else None
+
+    @functools.cached_property
+    def runway(self):
+        return self.runway_model()() if self.frame('cash_runway') is not None else None
+
+    def frame(self, table):
+        """The ticker's rows of `table`, or None when it has none (or the table is not built)."""
+        try:
+            frame = self.data[table]
+        except KeyError:
+            return None
+        return frame if len(frame) else None
+
+    def text(self, section):
+        """The document's entry for `section` ({} when it has none)."""
+        return self.doc.get('sections', {}).get(section, {})
+
+    def field(self, name):
+        """The value of input field `name`, in a form chart_cache can hash."""
+        if name == 'prices':
+            return self.prices
+        if name == 'benchmark':
+            # the market series fill_rows() measures beta against
+            return PriceHistory(BENCHMARK)
+        if name == 'price':
+            return float(self.valuation.price) if self.valuation is not None else self.price
+        if name in self.store.tables():
+            frame = self.data[name]
+            return [frame[column] for column in frame.table.columns]
+        return self.doc.get(name)
+
+    def chart_path(self, name):
+        return os.path.join(self.chart_dir, f'chart_{name}.png')
+
+    def charts(self, sections=None):
+        """{name: chart callable} for every section in the layout (or in `sections`), for render_charts()."""
+        charts = {}
+        for name in self.sections if sections is None else sections:
+            specs = SECTIONS[name].charts
+            if specs is not None:
+                charts.update(specs(self))
+        return charts
+
+    def section_key(self, name, mode='file'):
+        """Cache key of section `name` laid out from the current heading number."""
+        import reportlab
+
+        spec = SECTIONS[name]
+        inputs = {field: self.field(field) for field in ('name', 'currency') + spec.inputs}
+        inputs['text'] = self.text(name)
+        inputs['number'] = self.number
+        inputs['charts'] = self.charts([name])
+        inputs['mode'] = mode
+        inputs['reportlab'] = reportlab.Version
+        return chart_cache.chart_key(spec.render, inputs)
+
+
+# --- Chart functions ---
+# Module-level and argument-driven so functools.partial()s of them pickle to
+# worker processes and hash into stocklib.chart_cache keys.
+
+def modelled_chart(chart, model, *args, **kwargs):
+    """`chart` drawn from the result of model(), run where the chart renders.
+
+    The chart key then hashes the model and the rows it is bound to rather
+    than, say, a million simulated paths that would have to exist first.
+    """
+    return chart(model(), *args, **kwargs)
+
+
+def quarterly_chart(periods, top, pat, title, path, currency='₹', top_label='Revenue'):
+    """Top line and net profit per quarter as side-by-side bars on twin axes."""
+    import matplotlib.pyplot as plt
+
+    fig, ax1 = plt.subplots(figsize=(8, 4))
+    x = np.arange(len(periods))
+    width = 0.35
+    unit = f'{currency.strip()} Cr'
+    bars1 = ax1.bar(x - width/2, top, width, label=f'{top_label} ({unit})', color=ACCENT, alpha=0.85)
+    ax1.set_ylabel(f'{top_label} ({unit})')
+    ax1.set_ylim(min(0, np.nanmin(top) * 1.3), np.nanmax(top) * 1.35)
+    ax2 = ax1.twinx()
+    bars2 = ax2.bar(x + width/2, pat, width, label=f'Net Profit ({unit})', color=GREEN, alpha=0.85)
+    ax2.set_ylabel(f'Net Profit ({unit})')
+    ax2.set_ylim(min(0, np.nanmin(pat) * 1.3), max(np.nanmax(pat), 0) * 1.35 or 1)
+    ax2.axhline(0, color='#718096', linewidth=0.8)
+    ax2.grid(False)
+
+    for ax, bars in ((ax1, bars1), (ax2, bars2)):
+        for bar in bars:
+            height = bar.get_height()
+            if np.isfinite(height):
+                ax.annotate(f'{height:,.0f}', (bar.get_x() + bar.get_width()/2, height), ha='center',
+                            va='bottom' if height >= 0 else 'top', fontsize=7)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels([p.replace(' ', '\n') for p in periods], fontsize=8)
+    ax1.set_title(title, fontweight='bold', pad=15)
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+def cash_flow_chart(periods, cfo, capex, title, path, currency='₹'):
+    """Operating cash flow and capex bars with free cash flow as a line."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    x = np.arange(len(periods))
+    width = 0.35
+    unit = f'{currency.strip()} Cr'
+    ax.bar(x - width/2, cfo, width, label=f'Operating Cash Flow ({unit})', color=GREEN, alpha=0.85)
+    ax.bar(x + width/2, -np.asarray(capex), width, label=f'Capex ({unit})', color=HIGHLIGHT, alpha=0.7)
+    ax.plot(x, np.asarray(cfo) - np.asarray(capex), 'o-', color=PURPLE, linewidth=2,
+            label=f'Free Cash Flow ({unit})')
+    ax.axhline(0, color='#718096', linewidth=0.8)
+    ax.set_xticks(x)
+    ax.set_xticklabels(periods, fontsize=8)
+    ax.set_title(title, fontweight='bold', pad=15)
+    ax.legend(fontsize=8, loc='best')
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+def shareholding_chart(labels, values, title, path):
+    """Shareholding pattern as a pie."""
+    import matplotlib.pyplot as plt
+
+    colors = [PRIMARY, ACCENT, GREEN, ORANGE, PURPLE]
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors[:len(values)],
+           textprops={'fontsize': 8}, wedgeprops={'edgecolor': 'white'})
+    ax.set_title(title, fontweight='bold', pad=15)
+    ax.axis('equal')
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+def asset_quality_chart(periods, gnpa, nnpa, title, path, pcr=None):
+    """Gross and net NPA ratios (and provision coverage on a twin axis when given)."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    x = np.arange(len(periods))
+    ax.plot(x, gnpa, 'o-', color=HIGHLIGHT, linewidth=2, markersize=6, label='GNPA (%)')
+    ax.plot(x, nnpa, 's-', color=ORANGE, linewidth=2, markersize=6, label='NNPA (%)')
+    for i, (g, n) in enumerate(zip(gnpa, nnpa)):
+        ax.annotate(f'{g:.2f}%', (i, g), textcoords='offset points', xytext=(0, 6), ha='center', fontsize=7)
+        ax.annotate(f'{n:.2f}%', (i, n), textcoords='offset points', xytext=(0, -12), ha='center', fontsize=7)
+    ax.set_ylabel('% of advances')
+    ax.set_ylim(0, max(gnpa) * 1.3)
+    lines, labels = ax.get_legend_handles_labels()
+    if pcr is not None:
+        ax2 = ax.twinx()
+        ax2.plot(x, pcr, 'D--', color=GREEN, linewidth=1.5, label='PCR (%)')
+        ax2.set_ylabel('Provision coverage (%)')
+        ax2.set_ylim(0, 100)
+        ax2.grid(False)
+        more = ax2.get_legend_handles_labels()
+        lines, labels = lines + more[0], labels + more[1]
+    ax.set_xticks(x)
+    ax.set_xticklabels(periods, fontsize=8)
+    ax.set_title(title, fontweight='bold', pad=15)
+    ax.legend(lines, labels, fontsize=8, loc='upper right')
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+def store_chart(periods, stores, area, title, path):
+    """Store count bars with retail area (Mn sq ft) as a line on a twin axis."""
+    import matplotlib.pyplot as plt
+
+    fig, ax1 = plt.subplots(figsize=(8, 4))
+    x = np.arange(len(periods))
+    bars = ax1.bar(x, stores, 0.55, color=ACCENT, alpha=0.85, label='Stores')
+    for bar in bars:
+        ax1.annotate(f'{bar.get_height():,.0f}', (bar.get_x() + bar.get_width()/2, bar.get_height()),
+                     ha='center', va='bottom', fontsize=7)
+    ax1.set_ylabel('Stores')
+    ax1.set_ylim(0, max(stores) * 1.2)
+    ax2 = ax1.twinx()
+    ax2.plot(x, area, 'o-', color=ORANGE, linewidth=2, label='Retail area (Mn sq ft)')
+    ax2.set_ylabel('Retail area (Mn sq ft)')
+    ax2.set_ylim(0, max(area) * 1.3)
+    ax2.grid(False)
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(periods, fontsize=8)
+    ax1.set_title(title, fontweight='bold', pad=15)
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
+
+    plt.tight_layout()
+    return save_figure(path)
+
+
+# --- Sections ---
+
+SECTIONS = {}
+
+
+class Section:
+    """A registered section: its renderer, its chart list and the fields it reads."""
+
+    def __init__(self, render, charts, inputs, numbered):
+        self.render, self.charts, self.inputs, self.numbered = render, charts, inputs, numbered
+
+
+def section(name, charts=None, inputs=(), numbered=True):
+    """Register `render(report, charts)` as section `name`.
+
+    `charts(report)` lists the charts it places and `inputs` the fields it
+    reads (see Report.field); `numbered` sections open with a numbered heading.
+    """
+    def register(render):
+        SECTIONS[name] = Section(render, charts, tuple(inputs), numbered)
+        return render
+    return register
+
+
+def _fmt(value, fmt):
+    return fmt.format(value) if np.isfinite(value) else '-'
+
+
+def _heading(report, name, title):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import HRFlowable, Paragraph, Spacer
+
+    from stocklib import styles
+    from stocklib.styles import paragraph_style
+
+    report.number += 1
+    title = report.text(name).get('title', title)
+    return [Paragraph(f'{report.number}. {title}', paragraph_style('heading')),
+            HRFlowable(width='100%', thickness=1, color=styles.ACCENT), Spacer(1, 0.3*cm)]
+
+
+def _intro(report, name):
+    """The document's opening paragraphs for section `name`."""
+    from reportlab.platypus import Paragraph
+
+    from stocklib.styles import paragraph_style
+
+    return [Paragraph(text, paragraph_style('body')) for text in report.text(name).get('text', [])]
+
+
+def _notes(report, name):
+    """The document's points, callout and sources for section `name`, placed after its data."""
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    from stocklib.styles import paragraph_style
+
+    body = report.text(name)
+    out = []
+    if body.get('points'):
+        if body.get('points_title'):
+            out.append(Paragraph(body['points_title'], paragraph_style('subheading')))
+        out += [Paragraph(f'• {point}', paragraph_style('bullet')) for point in body['points']]
+    if body.get('callout'):
+        tone, text = body['callout']
+        out.append(Spacer(1, 0.2*cm))
+        out.append(Paragraph(text, paragraph_style(f'callout_{tone}')))
+    if body.get('sources'):
+        out.append(Spacer(1, 0.2*cm))
+        out.append(Paragraph(f"Sources: {body['sources']}", paragraph_style('source')))
+    return out
+
+
+def _table(rows, widths, style='header_grid_table', **params):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Table
+
+    from stocklib.styles import table_style
+
+    table = Table(rows, colWidths=[w*cm for w in widths], repeatRows=1)
+    table.setStyle(table_style(style, **params))
+    return table
+
+
+def _columns(frame, columns, currency):
+    """(label, format, values) for each of `columns` the frame has any value in."""
+    out = []
+    for column, label, fmt in columns:
+        if column in frame:
+            values = frame[column]
+            if np.isfinite(values).any():
+                out.append((label.format(c=currency), fmt, values))
+    return out
+
+
+def _period_table(frame, columns, currency, label_width=3.6):
+    """Metrics down, periods across."""
+    periods = frame.periods
+    rows = [['Metric'] + periods]
+    rows += [[label] + [_fmt(v, fmt) for v in values] for label, fmt, values in _columns(frame, columns, currency)]
+    width = min(2.2, 13.4 / max(len(periods), 1))
+    return _table(rows, [label_width] + [width] * len(periods), font_size=7.5)
+
+
+def _verdict_box(report):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Table
+
+    from stocklib.styles import table_style
+
+    verdict = report.doc.get('verdict', {})
+    rating = verdict.get('rating', 'NOT RATED')
+    headline = f'VERDICT: {rating}'
+    v = report.valuation
+    if v is not None:
+        headline += (f' | Expected Value: {report.currency}{v.expected:,.0f} '
+                     f'({upside(v.expected_return, 0)} from CMP {report.currency}{v.price:,.0f})')
+    rows = [[headline], [f"Key Bull: {verdict.get('bull', '-')}"], [f"Key Bear: {verdict.get('bear', '-')}"]]
+    tone = ('green' if rating in ('BUY', 'ACCUMULATE') else
+            'red' if rating in ('SELL', 'REDUCE', 'AVOID') else 'orange')
+    table = Table(rows, colWidths=[14.5*cm])
+    table.setStyle(table_style('verdict_table', tone=tone))
+    return table
+
+
+def _cover_metrics(report):
+    """The document's cover metrics, else what the store can say."""
+    metrics = report.doc.get('metrics')
+    if metrics:
+        return metrics
+    c, v, metrics = report.currency, report.valuation, []
+    if v is not None:
+        metrics += [['Reference Price', f'{c}{v.price:,.2f}'], ['Expected Value', f'{c}{v.expected:,.0f}']]
+    holding = report.frame('shareholding')
+    if holding is not None:
+        metrics.append(['Promoter Holding', _fmt(holding['promoter'][-1], '{:.1f}%')])
+    targets = report.frame('targets')
+    if targets is not None:
+        metrics.append(['Analyst Targets', f'{len(targets)}'])
+    return metrics
+
+
+@section('cover', inputs=('listing', 'outlook', 'cover_note', 'metrics', 'cover_sources', 'report_date',
+                         'verdict', 'scenarios', 'price', 'shareholding', 'targets'), numbered=False)
+def cover(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import HRFlowable, Paragraph, Spacer, Table
+
+    from stocklib import styles
+    from stocklib.styles import paragraph_style, table_style
+
+    doc = report.doc
+    out = [Spacer(1, 2*cm),
+           Paragraph(report.name.upper(), paragraph_style('title')),
+           Paragraph(doc.get('listing', f'NSE: {report.ticker}'), paragraph_style('subtitle')),
+           Spacer(1, 0.5*cm),
+           HRFlowable(width='80%', thickness=2, color=styles.PRIMARY),
+           Spacer(1, 0.5*cm),
+           Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle'))]
+    if doc.get('outlook'):
+        out.append(Paragraph(f"Outlook: {doc['outlook']}", paragraph_style('subtitle')))
+    out.append(Spacer(1, 0.6*cm))
+    if doc.get('cover_note'):
+        out += [Paragraph(doc['cover_note'], paragraph_style('callout_orange')), Spacer(1, 0.3*cm)]
+
+    metrics = _cover_metrics(report)
+    if metrics:
+        pairs = metrics + [['', '']] * (len(metrics) % 2)
+        rows = [pairs[i] + pairs[i + 1] for i in range(0, len(pairs), 2)]
+        table = Table(rows, colWidths=[3.5*cm] * 4)
+        table.setStyle(table_style('metrics_table'))
+        out += [table, Spacer(1, 0.5*cm)]
+    out += [_verdict_box(report), Spacer(1, 0.5*cm)]
+    out += [Paragraph(note, paragraph_style('source')) for note in doc.get('cover_sources', [])]
+    if doc.get('report_date'):
+        out.append(Paragraph(f"Report Date: {doc['report_date']}", paragraph_style('source')))
+    out.append(Paragraph(
+        'DISCLAIMER: This report is for informational and educational purposes only. '
+        'It does not constitute financial advice, a recommendation to buy or sell securities, '
+        'or an offer to transact. Stock investments are subject to market risks. '
+        'Consult a SEBI-registered financial advisor before making investment decisions.',
+        paragraph_style('disclaimer')))
+    return out
+
+
+@section('snapshot')
+def snapshot(report, charts):
+    if not report.text('snapshot'):
+        return []
+    return _heading(report, 'snapshot', 'Company Snapshot') + _intro(report, 'snapshot') + _notes(report, 'snapshot')
+
+
+def fundamentals_charts(report):
+    q = report.frame('quarterly_pnl')
+    if q is None or 'pat' not in q or not np.isfinite(q['pat']).any():
+        return {}
+    top = 'revenue' if np.isfinite(q['revenue']).any() else 'nii'
+    if not np.isfinite(q[top]).any():
+        return {}
+    title = f"{report.name} — Quarterly {'Revenue' if top == 'revenue' else 'NII'} & Net Profit"
+    return {'quarterly': functools.partial(
+        quarterly_chart, q.periods, q[top], q['pat'], title, report.chart_path('quarterly'),
+        report.currency, 'Revenue' if top == 'revenue' else 'NII')}
+
+
+@section('fundamentals', charts=fundamentals_charts, inputs=('quarterly_pnl', 'annual_pnl'))
+def fundamentals(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    from stocklib.styles import paragraph_style
+
+    q, a = report.frame('quarterly_pnl'), report.frame('annual_pnl')
+    if q is None and a is None:
+        return []
+    out = _heading(report, 'fundamentals', 'Fundamental Analysis') + _intro(report, 'fundamentals')
+    if q is not None:
+        basis = sorted({str(b) for b in q['basis'] if str(b)})
+        out.append(Paragraph('Quarterly Results' + (f" ({', '.join(basis)})" if basis else ''),
+                             paragraph_style('subheading')))
+        out += [_period_table(q, QUARTERLY_COLUMNS, report.currency), Spacer(1, 0.3*cm)]
+    if 'quarterly' in charts:
+        out += [chart_image(charts['quarterly'], width=16*cm, height=8*cm), Spacer(1, 0.3*cm)]
+    if a is not None:
+        out.append(Paragraph('Annual Results', paragraph_style('subheading')))
+        out += [_period_table(a, ANNUAL_COLUMNS, report.currency), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'fundamentals')
+
+
+def cash_flow_charts(report):
+    cf = report.frame('cashflow')
+    if cf is None or not np.isfinite(cf['cfo']).any():
+        return {}
+    return {'cash_flow': functools.partial(
+        cash_flow_chart, cf.periods, np.nan_to_num(cf['cfo']), np.nan_to_num(cf['capex']),
+        f'{report.name} — Operating Cash Flow vs Capex', report.chart_path('cash_flow'), report.currency)}
+
+
+@section('cash_flow', charts=cash_flow_charts, inputs=('cashflow', 'annual_pnl', 'working_capital'))
+def cash_flow(report, charts):
+    """Cash flow, CFO/PAT and working-capital days (stocklib.workingcapital), with its red flags."""
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    from stocklib.styles import paragraph_style
+
+    cf = report.frame('cashflow')
+    if cf is None:
+        return []
+    c = report.currency
+    m = cash_metrics(report.data)
+    notes = dict(zip(cf.periods, (str(note) for note in cf['note'])))
+    rows = [['Period', f'CFO ({c}Cr)', f'Capex ({c}Cr)', f'FCF ({c}Cr)', 'CFO / PAT', 'Note']]
+    rows += [row + [notes.get(row[0], '')] for row in cash_flow_rows(m)]
+    out = _heading(report, 'cash_flow', 'Cash Flow Analysis') + _intro(report, 'cash_flow')
+    out += [_table(rows, [2.2, 2.4, 2.4, 2.4, 2.0, 4.6], font_size=7.5), Spacer(1, 0.3*cm)]
+    days = np.flatnonzero(np.isfinite(m.ccc) | np.isfinite(m.wc_days))
+    if len(days):
+        rows = [['Metric', str(m.periods[days[-1]]), 'Trend']] + days_rows(m, days[-1])
+        out += [_table(rows, [4, 3, 8.5], align='LEFT'), Spacer(1, 0.3*cm)]
+    flags = red_flags(m)
+    if flags:
+        out += [Paragraph('<b>Cash conversion red flags:</b><br/>' + '<br/>'.join(f'• {flag}' for flag in flags),
+                          paragraph_style('callout_red')), Spacer(1, 0.3*cm)]
+    if 'cash_flow' in charts:
+        out += [chart_image(charts['cash_flow'], width=16*cm, height=8*cm), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'cash_flow')
+
+
+def cash_runway_charts(report):
+    if report.frame('cash_runway') is None:
+        return {}
+    return {'runway': functools.partial(
+        modelled_chart, runway_chart, report.runway_model(), f'{report.name} — Cash Burn Waterfall and Runway',
+        report.chart_path('runway'), report.currency)}
+
+
+@section('cash_runway', charts=cash_runway_charts, inputs=('cash_runway',))
+def cash_runway(report, charts):
+    """Next-year cash burn waterfall and the simulated runway (stocklib.runway), for tickers with runway inputs."""
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    from stocklib.styles import paragraph_style
+
+    if report.runway is None:
+        return []
+    rows = [['Next 12 Months (mean of simulated paths)', 'Amount']] + waterfall_rows(report.runway, report.currency)
+    out = _heading(report, 'cash_runway', 'Cash Burn and Runway') + _intro(report, 'cash_runway')
+    out += [_table(rows, [8.5, 6], align='LEFT'), Spacer(1, 0.3*cm)]
+    if 'runway' in charts:
+        out += [chart_image(charts['runway'], width=16*cm, height=6.7*cm)]
+    out += [Paragraph(describe_runway(report.runway, report.currency), paragraph_style('source')),
+            Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'cash_runway')
+
+
+def _holders(report):
+    holding = report.frame('shareholding')
+    if holding is None:
+        return None, []
+    return holding, [(label, float(holding[column][-1])) for column, label in SHAREHOLDERS
+                     if np.isfinite(holding[column][-1]) and holding[column][-1] > 0]
+
+
+def shareholding_charts(report):
+    holding, holders = _holders(report)
+    if not holders:
+        return {}
+    labels, values = zip(*holders)
+    return {'shareholding': functools.partial(
+        shareholding_chart, list(labels), list(values),
+        f'{report.name} — Shareholding ({holding.periods[-1]})', report.chart_path('shareholding'))}
+
+
+@section('shareholding', charts=shareholding_charts, inputs=('shareholding',))
+def shareholding(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Spacer
+
+    holding, holders = _holders(report)
+    if not holders:
+        return []
+    rows = [['Category', f'Holding ({holding.periods[-1]})']] + [[label, f'{value:.2f}%'] for label, value in holders]
+    out = _heading(report, 'shareholding', 'Shareholding Pattern') + _intro(report, 'shareholding')
+    out += [_table(rows, [5, 4], font_size=8.5), Spacer(1, 0.3*cm)]
+    if 'shareholding' in charts:
+        out += [chart_image(charts['shareholding'], width=12*cm, height=8*cm), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'shareholding')
+
+
+def technicals_charts(report):
+    if not len(report.prices):
+        return {}
+    return {'price': functools.partial(
+        daily_price_chart, report.prices, f'{report.name} — Daily Price (1 Year)', report.chart_path('price'),
+        sma=(200,), ema=(50,), currency=report.currency)}
+
+
+@section('technicals', charts=technicals_charts, inputs=('prices', 'benchmark'))
+def technicals(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Spacer
+
+    rows = report.text('technicals').get('rows')
+    if not rows and not len(report.prices):
+        return []
+    rows = fill_rows(rows or TECHNICAL_ROWS, report.prices, currency=report.currency)
+    out = _heading(report, 'technicals', 'Technical Analysis') + _intro(report, 'technicals')
+    if 'price' in charts:
+        out += [chart_image(charts['price'], width=16*cm, height=9*cm), Spacer(1, 0.3*cm)]
+    out += [_table([['Indicator', 'Value', 'Signal']] + rows, [3.5, 3.5, 8.5], align='LEFT'), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'technicals')
+
+
+@section('peers', inputs=('peers',))
+def peers(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Spacer
+
+    frame = report.frame('peers')
+    if frame is None:
+        return []
+    columns = _columns(frame, PEER_COLUMNS, report.currency)
+    rows = [['Company'] + [label for label, _, _ in columns]]
+    for i, peer in enumerate(frame['peer']):
+        rows.append([str(peer)] + [_fmt(values[i], fmt) for _, fmt, values in columns])
+    width = min(2.2, 12.5 / max(len(columns), 1))
+    out = _heading(report, 'peers', 'Sector & Competitive Context') + _intro(report, 'peers')
+    out += [_table(rows, [4] + [width] * len(columns), font_size=7.5), Spacer(1, 0.2*cm)]
+    return out + _notes(report, 'peers')
+
+
+@section('analyst_targets', inputs=('targets', 'price'))
+def analyst_targets(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    from stocklib.styles import paragraph_style
+
+    frame = report.frame('targets')
+    if frame is None:
+        return []
+    c = report.currency
+    price = report.valuation.price if report.valuation is not None else np.nan
+    low, high = frame['target_low'], frame['target_high']
+    mid = (low + high) / 2
+    rows = [['Broker', 'Date', 'Rating', 'Target', f'vs CMP {c}{_fmt(price, "{:,.0f}")}']]
+    for i, period in enumerate(frame.periods):
+        target = f'{c}{low[i]:,.0f}' if low[i] == high[i] else f'{c}{low[i]:,.0f}-{high[i]:,.0f}'
+        rows.append([str(frame['broker'][i]), period, str(frame['rating'][i]), target,
+                     _fmt(mid[i] / price - 1, '{:+.0%}')])
+    out = _heading(report, 'analyst_targets', 'Analyst Views') + _intro(report, 'analyst_targets')
+    out += [_table(rows, [4, 2.5, 2.5, 3, 3], font_size=8), Spacer(1, 0.2*cm)]
+    out.append(Paragraph(
+        f'Consensus of {len(mid)} target(s): mean {c}{np.mean(mid):,.0f}, range {c}{low.min():,.0f}'
+        f'-{c}{high.max():,.0f}' + (f' ({upside(np.mean(mid) / price - 1, 0)} from CMP).'
+                                    if np.isfinite(price) else '.'),
+        paragraph_style('body')))
+    return out + _notes(report, 'analyst_targets')
+
+
+def _valuation_labels(report):
+    labels = {'metric': 'Year-2 value / share', 'row_label': 'Growth (CAGR)', 'multiple_label': 'Multiple'}
+    labels.update(report.doc.get('valuation', {}))
+    return labels
+
+
+def valuation_charts(report):
+    if report.valuation is None:
+        return {}
+    labels, c = _valuation_labels(report), report.currency
+    grid = report.grid
+    return {
+        'simulation': functools.partial(
+            modelled_chart, histogram_chart, report.simulation_model(),
+            f'{report.name} — Monte Carlo Value Distribution', report.chart_path('simulation'),
+            currency=c, expected=report.valuation.expected),
+        'sensitivity': functools.partial(
+            heatmap_chart, grid,
+            f"{report.name} — Target Sensitivity: {labels['row_label']} x {labels['multiple_label']}",
+            report.chart_path('sensitivity'), currency=c, row_label=labels['row_label'],
+            multiple_label=labels['multiple_label'],
+            marker=(grid.base_growth, grid.base_multiple, 'Base case')),
+    }
+
+
+@section('valuation', charts=valuation_charts, inputs=('scenarios', 'enterprise', 'price', 'valuation'))
+def valuation(report, charts):
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+    from stocklib.styles import paragraph_style, table_style
+
+    v = report.valuation
+    if v is None:
+        return []
+    c, labels = report.currency, _valuation_labels(report)
+    body, source = paragraph_style('body'), paragraph_style('source')
+    out = _heading(report, 'valuation', 'Valuation') + _intro(report, 'valuation')
+
+    if report.frame('enterprise') is not None:
+        # the enterprise value bridge at the price the targets are measured against
+        b = ticker_bridge(report.data, v.price)
+        out.append(Paragraph(f'<b>Enterprise Value Bridge ({b.periods[-1]})</b>', body))
+        out += [_table([['Item', 'Value', 'Working']] + bridge_rows(b, currency=c), [5, 3, 7], align='LEFT'),
+                Spacer(1, 0.3*cm)]
+
+    out.append(Paragraph('<b>Scenario Targets</b>', body))
+    rows = [['Scenario', labels['metric'], labels['multiple_label'], 'Price Target',
+             f'Return from {c}{v.price:,.0f}', 'Probability']]
+    rows += [[name, f'{c}{metric:,.2f}', multiple, target, ret, f'{p:.0%}']
+             for name, metric, multiple, target, ret, p in zip(
+                 SCENARIOS, v.per_share[:, -1], multiple_cells(v, '–'), target_cells(v, c, '–'),
+                 return_cells(v), v.probability)]
+    out += [_table(rows, [1.8, 2.6, 2.2, 2.8, 3.3, 2.2], style='scenario_table'), Spacer(1, 0.3*cm)]
+
+    out.append(Paragraph('<b>Probability-Weighted Expected Value</b>', body))
+    ev = [['Scenario', 'Midpoint Price', 'Probability', 'Weighted Value']] + ev_rows(v, c, 'Expected Value →')
+    out += [_table(ev, [3, 3.5, 3.5, 3.5], style='scenario_table', font_size=9, total=True), Spacer(1, 0.3*cm)]
+
+    out.append(Paragraph('<b>Monte Carlo Value Distribution</b>', body))
+    out += [chart_image(charts['simulation'], width=16*cm, height=8*cm),
+            Paragraph(describe(report.simulation, c), source), Spacer(1, 0.3*cm)]
+
+    grid, table_grid = report.grid, report.grid_table
+    out.append(Paragraph(f"<b>Sensitivity: {labels['row_label']} x {labels['multiple_label']}</b>", body))
+    out.append(chart_image(charts['sensitivity'], width=15*cm, height=8.4*cm))
+    sens = table_rows(table_grid, c, corner=f"{labels['row_label']} / {labels['multiple_label']}")
+    table = Table(sens, colWidths=[3*cm] + [2.4*cm] * (len(sens[0]) - 1))
+    table.setStyle(table_style('sensitivity_table'))
+    table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(table_grid)]))
+    out.append(table)
+    out.append(Paragraph(
+        f'Green cells are above the current price of {c}{v.price:,.0f}. Rows compound growth for '
+        f'{grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.', source))
+    out += [Spacer(1, 0.3*cm), Paragraph(
+        f'<b>Probability-weighted expected price: {c}{v.expected:,.0f}</b> — '
+        f'{upside(v.expected_return)} from the current {c}{v.price:,.0f}.', body)]
+    return out + _notes(report, 'valuation')
+
+
+@section('catalysts')
+def catalysts(report, charts):
+    from reportlab.platypus import Paragraph
+
+    from stocklib.styles import paragraph_style
+
+    body = report.text('catalysts')
+    if not (body.get('catalysts') or body.get('risks')):
+        return []
+    out = _heading(report, 'catalysts', 'Growth Catalysts & Risks') + _intro(report, 'catalysts')
+    for key, title in (('catalysts', 'Growth Catalysts'), ('risks', 'Key Risks')):
+        if body.get(key):
+            out.append(Paragraph(title, paragraph_style('subheading')))
+            out += [Paragraph(f'• {point}', paragraph_style('bullet')) for point in body[key]]
+    return out + _notes(report, 'catalysts')
+
+
+@section('verdict', inputs=('verdict', 'scenarios', 'price'))
+def verdict(report, charts):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Spacer
+
+    out = _heading(report, 'verdict', 'Conclusion') + [_verdict_box(report), Spacer(1, 0.4*cm)]
+    return out + _intro(report, 'verdict') + _notes(report, 'verdict')
+
+
+# --- Sector sections ---
+
+def _bank_metrics(report):
+    """The ticker's BankMetrics from the bank_quarterly table, or None."""
+    if report.frame('bank_quarterly') is None:
+        return None
+    return ticker_metrics(report.data)
+
+
+def asset_quality_charts(report):
+    bank, m = report.doc.get('bank', {}), _bank_metrics(report)
+    if m is not None:
+        periods, rows = year_ends(m)
+        pcr = m.pcr[rows]
+        return {'asset_quality': functools.partial(
+            asset_quality_chart, periods, m.gnpa[rows], m.nnpa[rows], f'{report.name} — Asset Quality Trend',
+            report.chart_path('asset_quality'), pcr if np.isfinite(pcr).all() else None)}
+    if not bank.get('periods'):
+        return {}
+    return {'asset_quality': functools.partial(
+        asset_quality_chart, bank['periods'], bank['gnpa'], bank['nnpa'],
+        f'{report.name} — Asset Quality Trend', report.chart_path('asset_quality'), bank.get('pcr'))}
+
+
+@section('asset_quality', charts=asset_quality_charts, inputs=('bank', 'bank_quarterly'))
+def asset_quality(report, charts):
+    """Bank variant: NPA trend chart and the bank quality metrics table.
+
+    Ratios come from the bank_quarterly table when the ticker has rows there
+    (the document's `bank.assessments` then replace the computed QoQ trends),
+    else from the document's hand-entered `bank` block.
+    """
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Spacer
+
+    bank, m = report.doc.get('bank', {}), _bank_metrics(report)
+    rows = bank.get('rows')
+    if m is not None:
+        assessments = bank.get('assessments', {})
+        rows = [[label, value, assessments.get(label, trend)] for label, value, trend in metric_rows(m, suffix='')]
+    if not (rows or 'asset_quality' in charts):
+        return []
+    out = _heading(report, 'asset_quality', 'Banking Quality Metrics') + _intro(report, 'asset_quality')
+    if rows:
+        out += [_table([['Metric', 'Value', 'Assessment']] + rows, [4, 3, 8.5], align='LEFT'),
+                Spacer(1, 0.3*cm)]
+    if 'asset_quality' in charts:
+        out += [chart_image(charts['asset_quality'], width=16*cm, height=8*cm), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'asset_quality')
+
+
+def _bank_value(report):
+    """(BankValue, residual-income Grid) for a bank with scenario and bank_quarterly rows, else (None, None)."""
+    if report.valuation is None or report.frame('bank_quarterly') is None:
+        return None, None
+    return ticker_bank_value(report.data, report.price), ticker_residual_grid(report.data, report.price)
+
+
+def bank_valuation_charts(report):
+    v, grid = _bank_value(report)
+    if v is None:
+        return {}
+    return {'residual_income': functools.partial(
+        heatmap_chart, grid, f'{report.name} — Residual-Income Value: ROE x Cost of Equity',
+        report.chart_path('residual_income'), currency=report.currency, row_label='Sustainable ROE',
+        multiple_label='Cost of equity', percent_columns=True, marker=(v.roe[1], COE, 'Base case'))}
+
+
+@section('bank_valuation', charts=bank_valuation_charts, inputs=('scenarios', 'bank_quarterly', 'price'))
+def bank_valuation(report, charts):
+    """Bank variant: Gordon-growth justified P/B and residual-income value of each scenario's ROE."""
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    from stocklib.styles import paragraph_style
+
+    v, _ = _bank_value(report)
+    if v is None:
+        return []
+    c = report.currency
+    out = _heading(report, 'bank_valuation', 'Justified P/B & Residual Income') + _intro(report, 'bank_valuation')
+    rows = [['Scenario', 'ROE', 'Justified P/B', 'Gordon Value', 'Residual Income', 'vs CMP']] + value_rows(v, c)
+    out += [_table(rows, [1.8, 1.8, 2.6, 2.8, 3.2, 2.2], style='scenario_table'), Spacer(1, 0.3*cm),
+            chart_image(charts['residual_income'], width=15*cm, height=8.4*cm),
+            Paragraph(f'Cost of equity {COE:.0%}, terminal growth {GROWTH:.0%}, {v.years}-year horizon with ROE '
+                      f'moving from {v.roe_now:.1%} to each scenario\'s level. At {c}{v.price:,.0f} '
+                      f'({v.market_pb:.2f}x book) the market implies a sustainable ROE of {v.implied_roe:.1%}.',
+                      paragraph_style('source')), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'bank_valuation')
+
+
+def store_metrics_charts(report):
+    retail = report.doc.get('retail', {})
+    if not retail.get('periods'):
+        return {}
+    return {'stores': functools.partial(
+        store_chart, retail['periods'], retail['stores'], retail['area'],
+        f'{report.name} — Store Network & Retail Area', report.chart_path('stores'))}
+
+
+@section('store_metrics', charts=store_metrics_charts, inputs=('retail',))
+def store_metrics(report, charts):
+    """Retail variant: store count, net additions, area and area per store."""
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Spacer
+
+    retail = report.doc.get('retail', {})
+    if not retail.get('periods'):
+        return []
+    stores, area = np.asarray(retail['stores'], dtype=float), np.asarray(retail['area'], dtype=float)
+    adds = np.diff(stores, prepend=np.nan)
+    rows = [['Period', 'Stores', 'Net Additions', 'Area (Mn sq ft)', 'Sq ft / Store']]
+    rows += [[period, f'{s:,.0f}', _fmt(a, '{:+,.0f}'), f'{sq:.1f}', f'{sq * 1e6 / s:,.0f}']
+             for period, s, a, sq in zip(retail['periods'], stores, adds, area)]
+    out = _heading(report, 'store_metrics', 'Retail Store Metrics') + _intro(report, 'store_metrics')
+    out += [_table(rows, [3, 2.5, 3, 3, 3]), Spacer(1, 0.3*cm)]
+    if retail.get('rows'):
+        out += [_table([['Metric', 'Value', 'Comment']] + retail['rows'], [4, 3, 8.5], align='LEFT'),
+                Spacer(1, 0.3*cm)]
+    if 'stores' in charts:
+        out += [chart_image(charts['stores'], width=16*cm, height=8*cm), Spacer(1, 0.3*cm)]
+    return out + _notes(report, 'store_metrics')
+
+
+# --- Building ---
+
+def _document(report, target):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    return SimpleDocTemplate(target, pagesize=A4, topMargin=1.5*cm, bottomMargin=1.5*cm,
+                             leftMargin=2*cm, rightMargin=2*cm, title=f'{report.name} Research Report')
+
+
+def build_section(report, name, charts):
+    """Section `name` laid out as a PDF of its own pages (b'' when it has nothing to show)."""
+    from stocklib.fonts import register_fonts
+
+    register_fonts()
+    with profiling.stage('story', name, report=report.ticker):
+        flowables = SECTIONS[name].render(report, charts)
+    if not flowables:
+        return b''
+    buffer = io.BytesIO()
+    with profiling.stage('layout', name, report=report.ticker):
+        _document(report, buffer).build(flowables)
+    return buffer.getvalue()
+
+
+def build_sections(report, cache=True, in_memory=False, vector=False):
+    """Every section's PDF in layout order, reusing cached ones; returns (pdfs, names laid out).
+
+    Sections start on a fresh page and the pages carry no running numbers,
+    so a section's pages depend only on its own key. Charts are rendered
+    only for the sections that miss.
+    """
+    # section keys hash the chart style along with everything else
+    setup_matplotlib()
+    mode = output_mode(in_memory, vector)
+    report.number = 0
+    pdfs, built = [], []
+    for name in report.sections:
+        with profiling.stage('section', name, report=report.ticker) as fields:
+            key = report.section_key(name, mode)
+            entry = chart_cache.lookup(key, SECTION_CACHE_DIR, suffix='.pdf') if cache else None
+            fields['cached'] = entry is not None
+            if entry is not None:
+                with open(entry, 'rb') as fh:
+                    pdf = fh.read()
+                if pdf and SECTIONS[name].numbered:
+                    report.number += 1
+            else:
+                charts = render_charts(report.charts([name]), cache=cache, in_memory=in_memory, vector=vector)
+                pdf = build_section(report, name, charts)
+                chart_cache.store(key, pdf, SECTION_CACHE_DIR, suffix='.pdf')
+                built.append(name)
+        if pdf:
+            pdfs.append(pdf)
+    return pdfs, built
+
+
+def build_report(ticker, cache=True, in_memory=False, vector=False, live=False):
+    """Render one ticker's PDF from its document; return (ticker, seconds, sections laid out)."""
+    start = time.perf_counter()
+    report = Report(ticker, live=live)
+    os.makedirs(report.chart_dir if not (in_memory or vector) else OUTPUT_DIR, exist_ok=True)
+    pdfs, built = build_sections(report, cache, in_memory, vector)
+    with open(report.pdf, 'wb') as fh:
+        fh.write(join(pdfs))
+    return ticker, time.perf_counter() - start, built
+
+
+def _build(args):
+    """Pool task: build one report, reporting a failure instead of stopping the batch."""
+    ticker, cache, in_memory, vector, live = args
+    try:
+        return build_report(ticker, cache, in_memory, vector, live) + (None,)
+    except Exception as exc:
+        return ticker, 0.0, [], f'{type(exc).__name__}: {exc}'
+
+
+def main(argv=None):
+    from stocklib.batch import warm_up
+
+    parser = argparse.ArgumentParser(description='Render research reports from report documents and the store')
+    parser.add_argument('tickers', nargs='*', metavar='TICKER', help='tickers to render')
+    parser.add_argument('--all', action='store_true',
+                        help='every ticker in the store or with a document in data/reports')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='build reports in N forked workers (0 = one per CPU core)')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='re-render every chart and section instead of reusing cached ones')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='hand charts to the PDFs as in-memory PNGs instead of writing chart files')
+    parser.add_argument('--vector', action='store_true',
+                        help='embed charts as vector graphics instead of 150-dpi PNGs')
+    parser.add_argument('--live', action='store_true',
+                        help='value at the last close in the price store instead of the report price')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    names = tickers() if args.all else args.tickers
+    if not names:
+        parser.error('name one or more tickers, or pass --all')
+    profiling.start(args, 'template')
+
+    start = time.perf_counter()
+    warm_up()
+    profiling.mark('warm up')
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    jobs = min(args.jobs or os.cpu_count() or 1, len(names))
+    work = [(name, args.cache, args.in_memory, args.vector, args.live) for name in names]
+    if jobs <= 1:
+        results = map(_build, work)
+    else:
+        pool = multiprocessing.get_context('fork').Pool(jobs)
+        results = pool.imap_unordered(_build, work)
+    failed = []
+    for ticker, seconds, built, error in results:
+        if error:
+            failed.append(ticker)
+            print(f"  {ticker}: FAILED ({error})")
+        else:
+            print(f"  {ticker}: {seconds:.2f}s ({len(built)} section(s) laid out)")
+            profiling.record('report', ticker, seconds, sections_built=built)
+    if jobs > 1:
+        pool.close()
+        pool.join()
+    profiling.mark('reports')
+    print(f"Built {len(names) - len(failed)} of {len(names)} reports in {time.perf_counter() - start:.2f}s "
+          f"-> {OUTPUT_DIR}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
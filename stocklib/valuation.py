@@ -0,0 +1,241 @@
+"""
+Probability-weighted scenario valuation.
+
+Every report values the stock the same way: project a per-share metric (EPS,
+BV/share, revenue/share) two years forward along a growth path per
+scenario, apply a multiple range, and weight the target midpoints by
+scenario probability. value() does this for any number of tickers at once;
+inputs broadcast, with scenarios on the last axis:
+
+    v = value(base=[9.50] * 3, growth=[[.43, .27], [.27, .27], [.10, .10]],
+              multiple_low=[55, 50, 35], multiple_high=[60, 55, 45],
+              probability=[.20, .55, .25], price=660)
+    v.low, v.high, v.mid, v.expected, v.expected_return
+
+Scenario assumptions live in the `scenarios` table of the dataset store
+(one row per ticker and scenario). A NaN growth step leaves the metric
+unchanged, `retention` scales growth (BV grows by ROE x (1 - payout)),
+`shares` turns a total (PAT, revenue) into a per-share figure,
+`adjustment` is added to the total before dividing (e.g. minus net debt for
+EV multiples) and `floor` is a minimum per-share value.
+
+    python3 -m stocklib.valuation [--live]    # value the whole universe
+"""
+
+import hashlib
+
+import numpy as np
+
+SCENARIOS = ['Bull', 'Base', 'Bear']
+INPUTS = ['base', 'growth_1', 'growth_2', 'retention', 'shares', 'multiple_low',
+          'multiple_high', 'probability', 'adjustment', 'floor']
+# value used when a scenario row leaves an optional column blank
+DEFAULTS = {'retention': 1.0, 'shares': 1.0, 'adjustment': 0.0, 'floor': -np.inf}
+
+
+class Valuation:
+    """Result arrays of value(); the last axis of every per-scenario array is the scenario."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __getitem__(self, index):
+        """The valuation of one ticker (or a slice) of a universe result."""
+        return Valuation(**{k: (v[index] if isinstance(v, np.ndarray) and v.ndim else v)
+                            for k, v in self.__dict__.items()})
+
+    def fingerprint(self):
+        """Content hash of every result array, for chart cache keys."""
+        h = hashlib.sha256()
+        for name in sorted(self.__dict__):
+            array = np.asarray(self.__dict__[name])
+            h.update(f'{name}:{array.dtype.str}:{array.shape};'.encode())
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+
+def value(base, growth, multiple_low, multiple_high, probability, price,
+          retention=1.0, shares=1.0, adjustment=0.0, floor=-np.inf):
+    """Scenario targets, returns vs `price` and the probability-weighted value.
+
+    `growth` has one extra trailing axis (the projection years); `price` has
+    one fewer (no scenario axis). Probabilities must sum to 1 per ticker.
+    """
+    base = np.asarray(base, dtype=np.float64)
+    growth = np.asarray(growth, dtype=np.float64)
+    probability = np.asarray(probability, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    retention, shares = np.asarray(retention, dtype=np.float64), np.asarray(shares, dtype=np.float64)
+    if not np.allclose(probability.sum(axis=-1), 1.0):
+        raise ValueError(f"scenario probabilities sum to {probability.sum(axis=-1)}, not 1")
+
+    steps = 1.0 + np.nan_to_num(growth * retention[..., None])
+    path = base[..., None] * np.cumprod(np.concatenate([np.ones_like(steps[..., :1]), steps], axis=-1),
+                                        axis=-1)
+    total = path[..., -1]
+    multiple_low = np.asarray(multiple_low, dtype=np.float64)
+    multiple_high = np.asarray(multiple_high, dtype=np.float64)
+    value_low, value_high = total * multiple_low, total * multiple_high
+    equity_low, equity_high = value_low + adjustment, value_high + adjustment
+    raw_low, raw_high = equity_low / shares, equity_high / shares
+    low, high = np.maximum(raw_low, floor), np.maximum(raw_high, floor)
+    mid = (low + high) / 2.0
+    weighted = probability * mid
+    expected = weighted.sum(axis=-1)
+    return Valuation(
+        path=path, per_share=path / shares[..., None], growth=growth, steps=steps,
+        multiple_low=multiple_low, multiple_high=multiple_high,
+        value_low=value_low, value_high=value_high, equity_low=equity_low, equity_high=equity_high,
+        low=low, high=high, mid=mid, floored=raw_low < floor,
+        probability=probability, weighted=weighted, expected=expected, price=price,
+        return_low=low / price[..., None] - 1.0, return_high=high / price[..., None] - 1.0,
+        expected_return=expected / price - 1.0,
+    )
+
+
+def _inputs(columns, overrides):
+    """Turn scenario-table columns into value() arguments (blank optionals -> DEFAULTS)."""
+    args = {}
+    for name in INPUTS:
+        col = np.array(overrides.get(name, columns[name]), dtype=np.float64)
+        if name in DEFAULTS:
+            col = np.where(np.isnan(col), DEFAULTS[name], col)
+        args[name] = col
+    args['growth'] = np.stack([args.pop('growth_1'), args.pop('growth_2')], axis=-1)
+    return args
+
+
+def ticker_inputs(data, price=None, **overrides):
+    """value() arguments for one ticker from its `scenarios` rows (Bull, Base, Bear in that order).
+
+    `price` defaults to the reference price stored with the scenarios;
+    keyword overrides replace a column for what-if runs, one value per
+    scenario (e.g. multiple_low=(55, 50, 40)).
+    """
+    frame = data['scenarios']
+    columns = {name: frame[name] for name in INPUTS + ['price']}
+    labels = [str(s) for s in frame['scenario']]
+    if labels != SCENARIOS:
+        raise ValueError(f"{data.ticker}: scenarios {labels}, expected {SCENARIOS}")
+    if price is None:
+        price = columns['price'][0]
+    return dict(price=price, **_inputs(columns, overrides))
+
+
+def ticker_valuation(data, price=None, **overrides):
+    """Value one ticker; arguments as for ticker_inputs()."""
+    return value(**ticker_inputs(data, price, **overrides))
+
+
+def universe_inputs(store, prices=None):
+    """(tickers, value() arguments) for every ticker in the store, tickers on the first axis.
+
+    `prices` maps ticker -> current price; tickers not in it use the
+    reference price stored with their scenarios. Each ticker's rows are
+    put in SCENARIOS order whatever order they are stored in.
+    """
+    table = store.table('scenarios')
+    tickers = np.asarray(table.column('ticker'))
+    names, counts = np.unique(tickers, return_counts=True)
+    if np.any(counts != len(SCENARIOS)):
+        bad = names[counts != len(SCENARIOS)]
+        raise ValueError(f"tickers without exactly {len(SCENARIOS)} scenarios: {', '.join(bad)}")
+    shape = (len(names), len(SCENARIOS))
+    labels = np.array([str(s) for s in table.column('scenario')])
+    rank = np.array([SCENARIOS.index(s) if s in SCENARIOS else len(SCENARIOS) for s in labels])
+    order = np.lexsort((rank, tickers))
+    bad = names[np.any(labels[order].reshape(shape) != SCENARIOS, axis=1)]
+    if len(bad):
+        raise ValueError(f"tickers whose scenarios are not {', '.join(SCENARIOS)}: {', '.join(bad)}")
+    columns = {name: np.asarray(table.column(name))[order].reshape(shape) for name in INPUTS + ['price']}
+    price = columns['price'][:, 0].copy()
+    for i, ticker in enumerate(names):
+        if prices and ticker in prices:
+            price[i] = prices[ticker]
+    return [str(t) for t in names], dict(price=price, **_inputs(columns, {}))
+
+
+def universe_valuation(store, prices=None):
+    """Value every ticker in the store in one broadcast call; returns (tickers, Valuation)."""
+    tickers, args = universe_inputs(store, prices)
+    return tickers, value(**args)
+
+
+# --- Table cells ---
+# One string per scenario, for the reports' projection / scenario / EV tables.
+
+def growth_cells(v, year, notes=()):
+    """'43% (Trendlyne est.)' for projection year `year` (0 = first step)."""
+    notes = list(notes) or [''] * len(SCENARIOS)
+    return [f'{g:.0%} ({n})' if n else f'{g:.0%}' for g, n in zip(v.growth[:, year], notes)]
+
+
+def step_cells(values, steps, year, currency='', times='x', digits=2, step_digits=2):
+    """'Rs 9.50 x 1.43 = Rs 13.59': `values` (v.path or v.per_share) compounding through `year`."""
+    return [f'{currency}{a:,.{digits}f} {times} {s:.{step_digits}f} = {currency}{b:,.{digits}f}'
+            for a, s, b in zip(values[:, year], steps[:, year], values[:, year + 1])]
+
+
+def multiple_cells(v, dash='-', digits=None):
+    """'55-60x', or '2.5x' when the range is a single multiple; `digits` fixes the decimals."""
+    fmt = 'g' if digits is None else f'.{digits}f'
+    return [f'{lo:{fmt}}x' if lo == hi else f'{lo:{fmt}}{dash}{hi:{fmt}}x'
+            for lo, hi in zip(v.multiple_low, v.multiple_high)]
+
+
+def target_cells(v, currency, dash='-'):
+    """'Rs 948-1,034', or one target when the range collapses to a single price."""
+    return [f'{currency}{lo:,.0f}' if round(lo) == round(hi) else f'{currency}{lo:,.0f}{dash}{hi:,.0f}'
+            for lo, hi in zip(v.low, v.high)]
+
+
+def return_cells(v):
+    """'+44% to +57%' (or one return when the range collapses) against v.price."""
+    return [f'{lo:+.0%}' if round(lo, 2) == round(hi, 2) else f'{lo:+.0%} to {hi:+.0%}'
+            for lo, hi in zip(v.return_low, v.return_high)]
+
+
+def upside(r, digits=1):
+    """'14.5% upside' / '21.4% downside' for the verdict text."""
+    return f'{abs(r):.{digits}%} {"upside" if r >= 0 else "downside"}'
+
+
+def ev_rows(v, currency, total_label='Expected Value', digits=0):
+    """Rows of the probability-weighted EV table (after its header); `digits` for the weights."""
+    rows = [[name, f'{currency}{mid:,.0f}', f'{p:.0%}', f'{currency}{w:,.{digits}f}']
+            for name, mid, p, w in zip(SCENARIOS, v.mid, v.probability, v.weighted)]
+    return rows + [['', '', total_label, f'{currency}{v.expected:,.0f}']]
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+    from stocklib.prices import PriceHistory
+
+    parser = argparse.ArgumentParser(description='Probability-weighted scenario values for every ticker')
+    parser.add_argument('--live', action='store_true',
+                        help='use the last close in the price store instead of the report price')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    prices = {}
+    if args.live:
+        for ticker in store.table('scenarios').tickers():
+            history = PriceHistory(ticker)
+            if len(history):
+                prices[ticker] = float(history.records['close'][-1])
+    start = time.perf_counter()
+    tickers, v = universe_valuation(store, prices)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Ticker':<12}{'Price':>9}{'Bull':>9}{'Base':>9}{'Bear':>9}{'EV':>9}{'Return':>9}")
+    for i, ticker in enumerate(tickers):
+        mids = ''.join(f'{m:>9.1f}' for m in v.mid[i])
+        print(f"{ticker:<12}{v.price[i]:>9.2f}{mids}{v.expected[i]:>9.1f}{v.expected_return[i]:>+9.1%}")
+    print(f"{len(tickers)} tickers valued in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""
+Vector chart embedding: matplotlib figures replayed as reportlab drawing ops.
+
+A PNG chart is rasterised at 150 dpi, PNG-encoded, decoded again by
+reportlab and re-compressed into the PDF. This module registers a
+matplotlib output format, 'rldraw', whose renderer records every path,
+string and (rasterized-artist) image as a compact list of drawing
+operations instead. VectorChart replays the list on the reportlab canvas,
+so charts stay sharp at any zoom and text stays selectable:
+
+    plt.savefig(buffer, format='rldraw', bbox_inches='tight')
+    Recording.from_bytes(buffer.getvalue()).flowable(16*cm, 8*cm)
+
+Text is drawn with the same TrueType file matplotlib laid it out with
+(registered with reportlab on first use); strings reportlab cannot draw
+that way (mathtext, collection fonts) are recorded as glyph outlines.
+Dense artists such as heatmap meshes can set rasterized=True and are
+embedded as an image at the savefig dpi.
+"""
+
+import base64
+import io
+import json
+import os
+import zlib
+
+import numpy as np
+from matplotlib.backend_bases import FigureCanvasBase, RendererBase, register_backend
+from matplotlib.backends.backend_mixed import MixedModeRenderer
+from matplotlib.path import Path
+from reportlab.platypus import Flowable
+
+FORMAT = 'rldraw'
+# coordinates are rounded to this many decimals of a point
+PRECISION = 2
+
+# replay font for a recorded TrueType file this machine cannot open (a cache copied from elsewhere)
+FALLBACK_FONT = 'Helvetica'
+
+CAPS = {'butt': 0, 'round': 1, 'projecting': 2}
+JOINS = {'miter': 0, 'round': 1, 'bevel': 2}
+
+_fonts = {}
+
+
+def _font(path):
+    """reportlab name for a TrueType file, registering it on first use (None if missing or unreadable)."""
+    if path not in _fonts:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+        name = 'mpl-' + os.path.splitext(os.path.basename(path))[0]
+        try:
+            if name not in pdfmetrics.getRegisteredFontNames():
+                pdfmetrics.registerFont(TTFont(name, path))
+            _fonts[path] = name
+        except TTFError:
+            _fonts[path] = None
+    return _fonts[path]
+
+
+def _rgba(rgb, alpha):
+    return [round(float(c), 4) for c in rgb[:3]] + [round(float(alpha), 4)]
+
+
+def _segments(path, transform):
+    """Flat [code, x0, y0, ...] list of a transformed path (quadratics raised to cubics)."""
+    out = []
+    last = (0.0, 0.0)
+    for points, code in path.iter_segments(transform, remove_nans=True, simplify=False, curves=True):
+        points = np.round(points, PRECISION).tolist()
+        if code == Path.CURVE3:
+            (cx, cy), (x, y) = points[:2], points[2:]
+            lx, ly = last
+            points = [lx + 2 / 3 * (cx - lx), ly + 2 / 3 * (cy - ly),
+                      x + 2 / 3 * (cx - x), y + 2 / 3 * (cy - y), x, y]
+            code = Path.CURVE4
+        out.append([int(code)] + points)
+        if len(points) >= 2:
+            last = tuple(points[-2:])
+    return out
+
+
+class RecordingRenderer(RendererBase):
+    """Renderer that appends drawing operations to `self.ops` (units: points)."""
+
+    def __init__(self, width, height, image_dpi=72):
+        super().__init__()
+        self.width, self.height = width, height
+        self.image_dpi = image_dpi
+        self.ops = []
+
+    def flipy(self):
+        return False
+
+    def get_canvas_width_height(self):
+        return self.width, self.height
+
+    def get_image_magnification(self):
+        return self.image_dpi / 72.0
+
+    def option_scale_image(self):
+        return False
+
+    def _state(self, gc):
+        """Clip region and stroke style shared by every op."""
+        clip = None
+        rect = gc.get_clip_rectangle()
+        if rect is not None:
+            clip = [round(float(v), PRECISION) for v in rect.bounds]
+        clip_path, affine = gc.get_clip_path()
+        if clip_path is not None:
+            clip = {'rect': clip, 'path': _segments(clip_path, affine)}
+        return clip
+
+    def _alpha(self, gc, rgb):
+        if gc.get_forced_alpha() or len(rgb) < 4:
+            return gc.get_alpha()
+        return rgb[3]
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        line_width, rgb = gc.get_linewidth(), gc.get_rgb()
+        stroke = None
+        if line_width > 0 and self._alpha(gc, rgb) > 0:
+            offset, dashes = gc.get_dashes()
+            stroke = {
+                'color': _rgba(rgb, self._alpha(gc, rgb)),
+                'width': round(float(line_width), 3),
+                'dash': [round(float(d), 3) for d in dashes] if dashes else None,
+                'offset': float(offset or 0),
+                'cap': CAPS.get(gc.get_capstyle(), 0),
+                'join': JOINS.get(gc.get_joinstyle(), 0),
+            }
+        fill = None
+        if rgbFace is not None:
+            fill = _rgba(rgbFace, self._alpha(gc, rgbFace))
+        if stroke is None and fill is None:
+            return
+        self.ops.append({'op': 'path', 'segments': _segments(path, transform), 'stroke': stroke,
+                         'fill': fill, 'clip': self._state(gc)})
+
+    def draw_text(self, gc, x, y, s, prop, angle, ismath=False, mtext=None):
+        from matplotlib import font_manager
+
+        path = font_manager.findfont(prop)
+        name = None if ismath or path.lower().endswith(('.ttc', '.otf')) else _font(path)
+        if name is None:
+            return self._draw_text_as_path(gc, x, y, s, prop, angle, ismath)
+        self.ops.append({'op': 'text', 'x': round(float(x), PRECISION), 'y': round(float(y), PRECISION),
+                         'text': s, 'font': path, 'size': float(prop.get_size_in_points()),
+                         'angle': float(angle), 'color': _rgba(gc.get_rgb(), self._alpha(gc, gc.get_rgb())),
+                         'clip': self._state(gc)})
+
+    def draw_image(self, gc, x, y, im, transform=None):
+        from PIL import Image
+
+        height, width = im.shape[:2]
+        if not height or not width:
+            return
+        buffer = io.BytesIO()
+        # with flipy() False matplotlib hands over the bottom row first
+        Image.fromarray(np.ascontiguousarray(np.asarray(im)[::-1]), 'RGBA').save(buffer, format='PNG')
+        scale = 72.0 / self.image_dpi
+        self.ops.append({'op': 'image', 'x': float(x), 'y': float(y),
+                         'width': width * scale, 'height': height * scale,
+                         'png': base64.b64encode(buffer.getvalue()).decode('ascii'),
+                         'clip': self._state(gc)})
+
+
+class Recording:
+    """A recorded figure: its size in points and the drawing operations."""
+
+    def __init__(self, width, height, ops):
+        self.width, self.height, self.ops = width, height, ops
+
+    def to_bytes(self):
+        doc = {'width': self.width, 'height': self.height, 'ops': self.ops}
+        return zlib.compress(json.dumps(doc, separators=(',', ':')).encode())
+
+    @classmethod
+    def from_bytes(cls, data):
+        doc = json.loads(zlib.decompress(data))
+        return cls(doc['width'], doc['height'], doc['ops'])
+
+    def flowable(self, width, height):
+        """A reportlab flowable drawing the chart scaled into width x height points."""
+        return VectorChart(self, width, height)
+
+
+class FigureCanvasRecorder(FigureCanvasBase):
+    """Canvas providing savefig(format='rldraw')."""
+
+    filetypes = {FORMAT: 'reportlab drawing operations'}
+
+    def print_rldraw(self, filename, *, bbox_inches_restore=None, **kwargs):
+        dpi = self.figure.dpi
+        self.figure.dpi = 72
+        width, height = self.figure.get_size_inches()
+        recorder = RecordingRenderer(width * 72, height * 72, image_dpi=dpi)
+        renderer = MixedModeRenderer(self.figure, width, height, dpi, recorder,
+                                     bbox_inches_restore=bbox_inches_restore)
+        self.figure.draw(renderer)
+        data = Recording(width * 72, height * 72, recorder.ops).to_bytes()
+        if hasattr(filename, 'write'):
+            filename.write(data)
+        else:
+            with open(filename, 'wb') as fh:
+                fh.write(data)
+
+    def get_default_filetype(self):
+        return FORMAT
+
+
+FigureCanvas = FigureCanvasRecorder
+register_backend(FORMAT, __name__, 'reportlab drawing operations')
+
+
+# --- Replay ---
+
+def _path(canv, segments):
+    p = canv.beginPath()
+    for segment in segments:
+        code, points = segment[0], segment[1:]
+        if code == Path.MOVETO:
+            p.moveTo(*points)
+        elif code == Path.LINETO:
+            p.lineTo(*points)
+        elif code == Path.CURVE4:
+            p.curveTo(*points)
+        elif code == Path.CLOSEPOLY:
+            p.close()
+    return p
+
+
+def _clip(canv, clip):
+    if clip is None:
+        return
+    if isinstance(clip, dict):
+        if clip['rect'] is not None:
+            _clip(canv, clip['rect'])
+        canv.clipPath(_path(canv, clip['path']), stroke=0, fill=0)
+        return
+    x, y, w, h = clip
+    p = canv.beginPath()
+    p.rect(x, y, w, h)
+    canv.clipPath(p, stroke=0, fill=0)
+
+
+def _color(rgba):
+    from reportlab.lib.colors import Color
+
+    r, g, b, a = rgba
+    return Color(r, g, b, alpha=a)
+
+
+def replay(canv, ops):
+    """Draw recorded operations on a reportlab canvas (origin at the figure's bottom left)."""
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen.canvas import FILL_NON_ZERO
+
+    for op in ops:
+        canv.saveState()
+        _clip(canv, op['clip'])
+        kind = op['op']
+        if kind == 'path':
+            stroke, fill = op['stroke'], op['fill']
+            if stroke:
+                canv.setStrokeColor(_color(stroke['color']))
+                canv.setLineWidth(stroke['width'])
+                canv.setLineCap(stroke['cap'])
+                canv.setLineJoin(stroke['join'])
+                if stroke['dash']:
+                    canv.setDash(stroke['dash'], stroke['offset'])
+            if fill:
+                canv.setFillColor(_color(fill))
+            canv.drawPath(_path(canv, op['segments']), stroke=1 if stroke else 0, fill=1 if fill else 0,
+                          fillMode=FILL_NON_ZERO)
+        elif kind == 'text':
+            canv.setFillColor(_color(op['color']))
+            canv.setFont(_font(op['font']) or FALLBACK_FONT, op['size'])
+            canv.translate(op['x'], op['y'])
+            canv.rotate(op['angle'])
+            canv.drawString(0, 0, op['text'])
+        elif kind == 'image':
+            image = ImageReader(io.BytesIO(base64.b64decode(op['png'])))
+            canv.drawImage(image, op['x'], op['y'], op['width'], op['height'], mask='auto')
+        canv.restoreState()
+
+
+class VectorChart(Flowable):
+    """Flowable replaying a Recording, scaled to the requested box like platypus Image."""
+
+    def __init__(self, recording, width, height):
+        super().__init__()
+        self.recording = recording
+        self.drawWidth, self.drawHeight = width, height
+        self.hAlign = 'CENTER'
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        canv = self.canv
+        canv.saveState()
+        canv.scale(self.drawWidth / self.recording.width, self.drawHeight / self.recording.height)
+        replay(canv, self.recording.ops)
+        canv.restoreState()
@@ -0,0 +1,245 @@
+"""
+Working capital and cash conversion: days, cycle, FCF and CFO/PAT from the statements.
+
+The reports hand-compute these ("112+186-53 = ~245 days") and type the
+cash flow tables' FCF and conversion columns. metrics() derives them for
+every year of every ticker in one vectorised pass over three tables:
+
+    cashflow          cfo, capex (and pat, when the cash flow source gives it)
+    annual_pnl        revenue and pat, used where the rows above lack them
+    working_capital   year-end receivables, inventory, payables and net working
+                      capital, with the year's revenue and cost of goods sold
+
+Debtor days are on revenue; inventory and payable days on cost of goods
+sold, or on revenue where it is not split out (Screener.in's convention).
+Rows are joined on (ticker, period); annual labels ('FY25') sort in order.
+
+ANALYSIS_SOP.md (1.4) flags cash conversion below 70%; red_flags() adds
+free cash flow negative in every year and a jump in the cash conversion
+cycle or working-capital days, and the screen lists every ticker that
+breaches one:
+
+    m = ticker_metrics(store.ticker('CELLO'))
+    m.periods, m.ccc, m.fcf, m.cash_conversion
+    red_flags(m)
+
+    python3 -m stocklib.workingcapital         # tickers breaching the thresholds
+    python3 -m stocklib.workingcapital --all   # every ticker, flagged or not
+"""
+
+import numpy as np
+
+from stocklib.datastore import TABLES
+
+DAYS = 365
+# ANALYSIS_SOP.md 1.4: "If cash conversion ratio < 70%, flag it"
+CASH_CONVERSION = 0.70
+# a year-on-year rise of this many days in the cycle or working-capital days is flagged
+DAYS_RISE = 30
+
+SOURCES = {
+    'cashflow': ('cfo', 'capex', 'pat'),
+    'annual_pnl': ('revenue', 'pat'),
+    'working_capital': TABLES['working_capital'][1],
+}
+
+
+class CashMetrics:
+    """Result arrays of metrics(), one entry per (ticker, period) row."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __getitem__(self, index):
+        """The metrics of a subset of rows (a slice or an index array)."""
+        return CashMetrics(**{k: (v[index] if isinstance(v, np.ndarray) else v)
+                              for k, v in self.__dict__.items()})
+
+
+def _keys(ticker, period):
+    return np.char.add(np.char.add(np.asarray(ticker, dtype=str), '|'), np.asarray(period, dtype=str))
+
+
+def _take(keys, source_keys, values):
+    """values[j] where source_keys[j] == keys[i], NaN where a key has no source row."""
+    if not len(source_keys):
+        return np.full(len(keys), np.nan)
+    order = np.argsort(source_keys, kind='stable')
+    ordered = source_keys[order]
+    pos = np.minimum(np.searchsorted(ordered, keys), len(ordered) - 1)
+    return np.where(ordered[pos] == keys, np.asarray(values, dtype=np.float64)[order][pos], np.nan)
+
+
+def _ratio(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b != 0, a / b, np.nan)
+
+
+def metrics(tables):
+    """Every metric for {table: (ticker, period, {column: values})}; rows are the union of the keys."""
+    source_keys = {name: _keys(ticker, period) for name, (ticker, period, _) in tables.items()}
+    keys = np.unique(np.concatenate([source_keys[name] for name in ('cashflow', 'working_capital')
+                                     if name in tables] or [np.array([], dtype=str)]))
+    ticker, _, period = np.char.partition(keys, '|').T
+
+    def column(name, table):
+        if table not in tables or name not in tables[table][2]:
+            return np.full(len(keys), np.nan)
+        return _take(keys, source_keys[table], tables[table][2][name])
+
+    def first(name, *sources):
+        out = np.full(len(keys), np.nan)
+        for table in sources:
+            out = np.where(np.isfinite(out), out, column(name, table))
+        return out
+
+    cfo, capex = column('cfo', 'cashflow'), column('capex', 'cashflow')
+    pat = first('pat', 'cashflow', 'annual_pnl')
+    revenue = first('revenue', 'working_capital', 'annual_pnl')
+    cogs = column('cogs', 'working_capital')
+    cost = np.where(np.isfinite(cogs), cogs, revenue)
+    debtor = _ratio(column('receivables', 'working_capital'), revenue) * DAYS
+    inventory = _ratio(column('inventory', 'working_capital'), cost) * DAYS
+    payable = _ratio(column('payables', 'working_capital'), cost) * DAYS
+    ccc = debtor + inventory - payable
+    wc_days = _ratio(column('net_working_capital', 'working_capital'), revenue) * DAYS
+
+    # the same ticker's previous row, for year-on-year changes
+    follows = np.zeros(len(keys), dtype=bool)
+    follows[1:] = ticker[1:] == ticker[:-1]
+
+    def change(values):
+        return np.where(follows, values - np.concatenate([[np.nan], values[:-1]]), np.nan)
+
+    conversion = np.where(pat > 0, _ratio(cfo, pat), np.nan)
+    return CashMetrics(
+        ticker=ticker, periods=period, cfo=cfo, capex=capex, fcf=cfo - capex, pat=pat, revenue=revenue,
+        cash_conversion=conversion, low_conversion=conversion < CASH_CONVERSION,
+        debtor_days=debtor, inventory_days=inventory, payable_days=payable, ccc=ccc, wc_days=wc_days,
+        ccc_change=change(ccc), wc_days_change=change(wc_days),
+    )
+
+
+def _frame_source(data, table):
+    try:
+        frame = data[table]
+    except KeyError:
+        return None
+    return frame['ticker'], frame.periods, {name: frame[name] for name in SOURCES[table]}
+
+
+def ticker_metrics(data):
+    """CashMetrics for every year of one ticker (a Store.ticker() view)."""
+    tables = {table: _frame_source(data, table) for table in SOURCES}
+    return metrics({name: source for name, source in tables.items() if source is not None})
+
+
+def universe_metrics(store):
+    """CashMetrics for every year of every ticker, in one pass over the three tables."""
+    tables = {}
+    for name in SOURCES:
+        if name in store.tables():
+            table = store.table(name)
+            tables[name] = (table.column('ticker'), table.column('period'),
+                            {column: table.column(column) for column in SOURCES[name]})
+    return metrics(tables)
+
+
+# --- Flags and table cells ---
+
+def red_flags(m):
+    """SOP breaches in one ticker's CashMetrics, as callout text."""
+    flags = []
+    low = np.flatnonzero(m.low_conversion)
+    if len(low):
+        years = ', '.join(f'{m.periods[i]} ({m.cash_conversion[i]:.0%})' for i in low)
+        flags.append(f'Cash conversion (CFO/PAT) below {CASH_CONVERSION:.0%}: {years}')
+    known = np.flatnonzero(np.isfinite(m.fcf))
+    if len(known) >= 2 and (m.fcf[known] < 0).all():
+        flags.append(f'FCF negative every year {m.periods[known[0]]}-{m.periods[known[-1]]} (capex above CFO)')
+    for values, changes, label in ((m.ccc, m.ccc_change, 'Cash conversion cycle'),
+                                   (m.wc_days, m.wc_days_change, 'Working-capital days')):
+        for i in np.flatnonzero(changes >= DAYS_RISE):
+            flags.append(f'{label} up {changes[i]:.0f} days to {values[i]:.0f} in {m.periods[i]}')
+    return flags
+
+
+def cash_flow_rows(m, currency='', capex_prefix=''):
+    """[year, CFO, capex, FCF, CFO/PAT] per year with a CFO figure; 'N/M' where PAT is not positive."""
+    rows = []
+    for i in np.flatnonzero(np.isfinite(m.cfo)):
+        conversion = f'{m.cash_conversion[i]:.0%}' if np.isfinite(m.cash_conversion[i]) else \
+            'N/M' if np.isfinite(m.pat[i]) else '-'
+        capex = f'{capex_prefix}{currency}{m.capex[i]:,.0f}' if np.isfinite(m.capex[i]) else '-'
+        fcf = f'{currency}{m.fcf[i]:,.0f}' if np.isfinite(m.fcf[i]) else '-'
+        rows.append([str(m.periods[i]), f'{currency}{m.cfo[i]:,.0f}', capex, fcf, conversion])
+    return rows
+
+
+def days_rows(m, i=-1, notes=None):
+    """[label, days, comment] for the working-capital decomposition at row `i`.
+
+    The comment is the year-on-year change where the previous year is known,
+    else notes[label] (or the cycle's arithmetic for its row).
+    """
+    notes = notes or {}
+    i = i % len(m)
+    rows = []
+    for attr, label in (('debtor_days', 'Debtor Days'), ('inventory_days', 'Inventory Days'),
+                        ('payable_days', 'Days Payable'), ('ccc', 'Cash Conversion Cycle'),
+                        ('wc_days', 'Working Capital Days')):
+        value = getattr(m, attr)[i]
+        if not np.isfinite(value):
+            continue
+        comment = notes.get(label, '')
+        if attr == 'ccc' and not comment:
+            comment = f'{m.debtor_days[i]:.0f} + {m.inventory_days[i]:.0f} - {m.payable_days[i]:.0f}'
+        if i and m.ticker[i - 1] == m.ticker[i] and np.isfinite(getattr(m, attr)[i - 1]):
+            before = getattr(m, attr)[i - 1]
+            direction = 'Up' if value >= before else 'Down'
+            comment = f'{direction} from {before:.0f} in {m.periods[i - 1]} ({value - before:+.0f} days)'
+        rows.append([label, f'{value:.0f}', comment])
+    return rows
+
+
+def _cell(value, fmt, width):
+    return f'{value:>{width}{fmt}}' if np.isfinite(value) else f"{'-':>{width}}"
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from stocklib.datastore import open_store
+
+    parser = argparse.ArgumentParser(description='Working-capital and cash conversion screen for every ticker')
+    parser.add_argument('--all', action='store_true', help='list every ticker, not just those with red flags')
+    args = parser.parse_args(argv)
+
+    store = open_store()
+    start = time.perf_counter()
+    m = universe_metrics(store)
+    tickers = list(dict.fromkeys(m.ticker))
+    flags = {ticker: red_flags(m[m.ticker == ticker]) for ticker in tickers}
+    elapsed = time.perf_counter() - start
+
+    flagged = [ticker for ticker in tickers if flags[ticker]]
+    print(f"{'Ticker':<12}{'Year':>9}{'CFO':>9}{'FCF':>9}{'CFO/PAT':>9}{'CCC':>7}{'WC days':>9}")
+    for ticker in tickers if args.all else flagged:
+        rows = np.flatnonzero(m.ticker == ticker)
+        cf = rows[np.isfinite(m.cfo[rows])]
+        i = cf[-1] if len(cf) else rows[-1]
+        wc = rows[np.isfinite(m.ccc[rows]) | np.isfinite(m.wc_days[rows])]
+        j = wc[-1] if len(wc) else i
+        print(f"{ticker:<12}{m.periods[i]:>9}" + _cell(m.cfo[i], ',.0f', 9) + _cell(m.fcf[i], ',.0f', 9)
+              + _cell(m.cash_conversion[i], '.0%', 9) + _cell(m.ccc[j], '.0f', 7) + _cell(m.wc_days[j], '.0f', 9))
+        for flag in flags[ticker]:
+            print(f"    - {flag}")
+    print(f"{len(flagged)} of {len(tickers)} ticker(s) breach a threshold ({len(m)} rows in {elapsed * 1000:.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,33 +4,34 @@ Sula Vineyards Limited -- 1-Year Stock Research Report
 Generated: February 4, 2026
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import numpy as np
+import functools
 import os
+import sys
 import textwrap
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch, cm
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle,
-    PageBreak, KeepTogether, HRFlowable
-)
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# Register SFNS (San Francisco) for rupee symbol support
-pdfmetrics.registerFont(TTFont('SFNS', '/System/Library/Fonts/SFNS.ttf'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stocklib import profiling
+
+import numpy as np
+
+from stocklib.datastore import open_store
+from stocklib.montecarlo import describe, histogram_chart, ticker_simulation
+from stocklib.pricechart import daily_price_chart
+from stocklib.prices import PriceHistory
+from stocklib.render import chart_image, parse_args, render_charts, save_figure
+from stocklib.sensitivity import heatmap_chart, table_colors, table_rows, ticker_grid
+from stocklib.technicals import fill_rows
+from stocklib.valuation import (ev_rows, growth_cells, multiple_cells, return_cells, step_cells,
+                                target_cells, ticker_valuation, upside)
+profiling.mark('imports')
 
 # --- Configuration ---
 OUTPUT_DIR = "/Users/arpitvyas/Desktop/stock-analysis/sula-vineyards"
 FINAL_PDF = "/Users/arpitvyas/Desktop/stock-analysis/sula-vineyards/Sula_Vineyards_Research_Report_Feb2026.pdf"
+TICKER = 'SULA'
+DATA = open_store().ticker(TICKER)
+PRICES = PriceHistory(TICKER)
+VALUATION = ticker_valuation(DATA)
 
 # Colors
 PRIMARY = '#1a365d'      # Dark navy
@@ -41,17 +42,20 @@ LIGHT_BG = '#f7fafc'     # Light background
 ORANGE = '#dd6b20'
 WINE = '#722f37'         # Wine/burgundy color for Sula brand
 
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 10,
-    'axes.titlesize': 12,
-    'axes.labelsize': 10,
-    'figure.facecolor': 'white',
-    'axes.facecolor': '#f8f9fa',
-    'axes.grid': True,
-    'grid.alpha': 0.3,
-    'grid.color': '#cccccc',
-})
+# --- Model Outputs ---
+# Computed on first use and cached, so importing the script for its data
+# (batch, bench, template) runs no simulation or grid
+@functools.lru_cache(maxsize=None)
+def simulation():
+    """Monte Carlo value distribution (stocklib.montecarlo)."""
+    return ticker_simulation(DATA)
+
+
+@functools.lru_cache(maxsize=None)
+def sensitivity(table=False):
+    """Target grid for the heatmap, or the coarse one for the table (stocklib.sensitivity)."""
+    return ticker_grid(DATA, table=table)
+
 
 # --- Chart 1: Quarterly Revenue & PAT Trend ---
 def create_revenue_chart():
@@ -66,9 +70,12 @@ def create_revenue_chart():
     Q2 FY26: Rev 131.74 Cr, PAT 6.02 Cr (MarketsMojo Nov 2025)
     Q3 FY26: Results pending (Feb 6, 2026)
     """
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26']
-    revenue = [120.9, 141.8, 217.5, 132.6, 118.3, 131.7]
-    pat = [14.6, 14.5, 28.1, 13.0, 1.9, 6.0]
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
+    revenue = q['revenue']
+    pat = q['pat']
 
     fig, ax1 = plt.subplots(figsize=(8, 4))
     x = np.arange(len(quarters))
@@ -101,10 +108,7 @@ def create_revenue_chart():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=8)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_revenue.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_revenue.png'))
 
 
 # --- Chart 2: Margin Trend Lines ---
@@ -116,9 +120,12 @@ def create_margin_chart():
     Q2 FY26: EBITDA margin ~19.9% (EBITDA 26.29 / Rev 131.74), NPM 4.6%
     Q1 FY26: EBITDA margin 15.5% (BS), NPM ~1.6%
     """
-    quarters = ['Q1\nFY25', 'Q2\nFY25', 'Q3\nFY25', 'Q4\nFY25', 'Q1\nFY26', 'Q2\nFY26']
-    ebitda_margin = [26.4, 20.5, 24.8, 17.5, 15.5, 19.9]
-    npm = [12.1, 10.2, 12.9, 9.8, 1.6, 4.6]
+    import matplotlib.pyplot as plt
+
+    q = DATA['quarterly_pnl']
+    quarters = [p.replace(' ', '\n') for p in q.periods]
+    ebitda_margin = q['ebitda_margin']
+    npm = q['pat_margin']
 
     fig, ax = plt.subplots(figsize=(7, 3.5))
     x = np.arange(len(quarters))
@@ -142,10 +149,7 @@ def create_margin_chart():
                     fontsize=7, ha='center', color=GREEN)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_margins.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_margins.png'))
 
 
 # --- Chart 3: Segment Revenue Pie ---
@@ -156,6 +160,8 @@ def create_segment_chart():
     Wine Business: Own Brands (~75%), Distribution/Third-party (~15%)
     Wine Tourism: (~10%)
     """
+    import matplotlib.pyplot as plt
+
     labels = ['Own Brands\nWine (~75%)', 'Distribution /\nThird-Party (~15%)', 'Wine Tourism\n(~10%)']
     sizes = [75, 15, 10]
     colors_pie = [WINE, ACCENT, GREEN]
@@ -169,10 +175,7 @@ def create_segment_chart():
     ax.set_title('Sula Vineyards - FY25 Revenue Mix by Segment', fontweight='bold', pad=15)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_segments.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_segments.png'))
 
 
 # --- Chart 4: Price Action with Moving Averages ---
@@ -185,6 +188,16 @@ def create_price_chart():
     200-day SMA: ~283.39 (Investing.com)
     50-day MA: ~253.40 (Investing.com)
     """
+    import matplotlib.pyplot as plt
+
+    if len(PRICES):
+        return daily_price_chart(
+            PRICES, 'Sula Vineyards - 1-Year Price Action & Key Moving Averages',
+            os.path.join(OUTPUT_DIR, 'chart_price.png'), currency='Rs ',
+            sma=(200,), ema=(50,),
+            zones=[(175, 195, 'green', 'Support Zone (Rs 180-195)'),
+                   (370, 433, 'red', 'Resistance Zone (Rs 370-433)')])
+
     months = ['Feb\n2025', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan\n2026']
     prices = [370, 380, 350, 330, 310, 295, 280, 265, 260, 240, 220, 185]
 
@@ -216,10 +229,7 @@ def create_price_chart():
                 fontsize=9, fontweight='bold', color=WINE)
 
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_price.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_price.png'))
 
 
 # --- Chart 5: Peer Comparison ---
@@ -230,6 +240,8 @@ def create_peer_chart():
     P/E data: United Spirits 57.74x, Radico Khaitan 97.31x,
     United Breweries 117.31x, Sula 32.5x
     """
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(1, 3, figsize=(9, 3.5))
 
     # P/E comparison
@@ -265,14 +277,42 @@ def create_peer_chart():
 
     fig.suptitle('Sula Vineyards vs AlcoBev Peers', fontweight='bold', fontsize=11, y=1.02)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, 'chart_peers.png')
-    plt.savefig(path, dpi=150, bbox_inches='tight')
-    plt.close()
-    return path
+    return save_figure(os.path.join(OUTPUT_DIR, 'chart_peers.png'))
+
+
+# --- Chart 6: Monte Carlo Value Distribution ---
+def create_simulation_chart():
+    """Distribution of 12-month values around the scenario EV (stocklib.montecarlo)."""
+    return histogram_chart(simulation(), 'Sula Vineyards - Monte Carlo Value Distribution',
+                           os.path.join(OUTPUT_DIR, 'chart_simulation.png'), currency='Rs ',
+                           expected=VALUATION.expected)
+
+
+# --- Chart 7: Sensitivity Grid ---
+def create_sensitivity_chart():
+    """Target price over the EPS growth x P/E plane (stocklib.sensitivity)."""
+    grid = sensitivity()
+    return heatmap_chart(grid, 'Sula Vineyards - Target Sensitivity: EPS Growth x P/E',
+                         os.path.join(OUTPUT_DIR, 'chart_sensitivity.png'), currency='Rs ',
+                         row_label='EPS growth (CAGR)', multiple_label='P/E',
+                         marker=(grid.base_growth, grid.base_multiple, 'Base case'))
 
 
 # --- PDF Generation ---
 def build_pdf(chart_paths):
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+
+    from stocklib.fonts import register_fonts
+    from stocklib.styles import paragraph_style, table_style
+
+    # Register SFNS (San Francisco) for rupee symbol support
+    register_fonts()
+
     doc = SimpleDocTemplate(
         FINAL_PDF,
         pagesize=A4,
@@ -282,69 +322,17 @@ def build_pdf(chart_paths):
         rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Title'],
-        fontSize=20, textColor=HexColor(WINE),
-        spaceAfter=6, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle', parent=styles['Normal'],
-        fontSize=11, textColor=HexColor('#4a5568'),
-        spaceAfter=12, alignment=TA_CENTER,
-        fontName='SFNS'
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading', parent=styles['Heading1'],
-        fontSize=14, textColor=HexColor(PRIMARY),
-        spaceBefore=16, spaceAfter=8,
-        fontName='SFNS',
-        borderWidth=0, borderPadding=0,
-    )
-    subheading_style = ParagraphStyle(
-        'CustomSubheading', parent=styles['Heading2'],
-        fontSize=11, textColor=HexColor(ACCENT),
-        spaceBefore=10, spaceAfter=4,
-        fontName='SFNS'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=9, leading=13,
-        textColor=HexColor('#2d3748'),
-        spaceAfter=6, alignment=TA_JUSTIFY,
-        fontName='SFNS'
-    )
-    bullet_style = ParagraphStyle(
-        'CustomBullet', parent=body_style,
-        leftIndent=15, bulletIndent=5,
-        spaceAfter=3, fontSize=9
-    )
-    source_style = ParagraphStyle(
-        'SourceStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#718096'),
-        spaceAfter=4, fontName='SFNS'
-    )
-    disclaimer_style = ParagraphStyle(
-        'DisclaimerStyle', parent=styles['Normal'],
-        fontSize=7, textColor=HexColor('#a0aec0'),
-        spaceBefore=8, spaceAfter=4,
-        fontName='SFNS', alignment=TA_CENTER
-    )
-    callout_green = ParagraphStyle(
-        'CalloutGreen', parent=body_style,
-        backColor=HexColor('#f0fff4'), borderWidth=1,
-        borderColor=HexColor(GREEN), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
-    callout_red = ParagraphStyle(
-        'CalloutRed', parent=body_style,
-        backColor=HexColor('#fff5f5'), borderWidth=1,
-        borderColor=HexColor(HIGHLIGHT), borderPadding=8,
-        leftIndent=10, spaceAfter=8
-    )
+    # Shared styles (stocklib.styles)
+    title_style = paragraph_style('title', textColor=HexColor(WINE))
+    subtitle_style = paragraph_style('subtitle')
+    heading_style = paragraph_style('heading')
+    subheading_style = paragraph_style('subheading')
+    body_style = paragraph_style('body')
+    bullet_style = paragraph_style('bullet')
+    source_style = paragraph_style('source')
+    disclaimer_style = paragraph_style('disclaimer')
+    callout_green = paragraph_style('callout_green')
+    callout_red = paragraph_style('callout_red')
 
     story = []
 
@@ -355,10 +343,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.5*cm))
     story.append(HRFlowable(width="80%", thickness=2, color=HexColor(WINE)))
     story.append(Spacer(1, 0.5*cm))
-    story.append(Paragraph('1-Year Stock Research Report', ParagraphStyle(
-        'BigSub', parent=subtitle_style, fontSize=16, textColor=HexColor(ACCENT),
-        fontName='SFNS'
-    )))
+    story.append(Paragraph('1-Year Stock Research Report', paragraph_style('cover_subtitle')))
     story.append(Paragraph('Outlook: February 2026 - February 2027', subtitle_style))
     story.append(Spacer(1, 1*cm))
 
@@ -371,23 +356,14 @@ def build_pdf(chart_paths):
         ['Net Debt (Sep 25)', '\u20b9350 Cr', 'Promoter Holding', '24.4%'],
     ]
     metrics_table = Table(metrics_data, colWidths=[3.5*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#edf2f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor(PRIMARY)),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    metrics_table.setStyle(table_style('metrics_table'))
     story.append(metrics_table)
     story.append(Spacer(1, 0.5*cm))
 
     # Executive Summary Verdict Box
     verdict_data = [
-        ['VERDICT: HOLD | Expected Value: Rs 261 (41% upside from CMP Rs 185)'],
+        [f'VERDICT: HOLD | Expected Value: Rs {VALUATION.expected:,.0f} '
+         f'({upside(VALUATION.expected_return, 0)} from CMP Rs {VALUATION.price:,.0f})'],
         ['Key Bull: Wine market structural growth (14-16% CAGR) + brand moat'],
         ['Key Bear: Market share erosion (5Y CAGR 3.6% vs market 14-16%), working capital deterioration']
     ]
@@ -493,18 +469,7 @@ def build_pdf(chart_paths):
         ['ROE', '~14%', '~12%', '11.97%'],
     ]
     growth_table = Table(growth_data, colWidths=[3.5*cm, 3*cm, 3*cm, 4*cm])
-    growth_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    growth_table.setStyle(table_style('header_grid_table'))
     story.append(growth_table)
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
@@ -533,18 +498,7 @@ def build_pdf(chart_paths):
         ['H1 FY26', '250.0', '~8.0', '~0.95', '~3.2%'],
     ]
     annual_table = Table(annual_data, colWidths=[2.5*cm, 3.3*cm, 3.3*cm, 2.2*cm, 2.2*cm])
-    annual_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    annual_table.setStyle(table_style('header_grid_table'))
     story.append(annual_table)
     story.append(Paragraph(
         'Sources: Screener.in (consolidated), Business Standard, Equitymaster. '
@@ -554,7 +508,7 @@ def build_pdf(chart_paths):
     story.append(Spacer(1, 0.2*cm))
 
     story.append(Paragraph('Quarterly Revenue & Profit Trend', subheading_style))
-    story.append(Image(chart_paths['revenue'], width=16*cm, height=8*cm))
+    story.append(chart_image(chart_paths['revenue'], width=16*cm, height=8*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Margin Trend', subheading_style))
@@ -566,7 +520,7 @@ def build_pdf(chart_paths):
         'festive season) means margins fluctuate significantly across quarters.',
         body_style
     ))
-    story.append(Image(chart_paths['margins'], width=14*cm, height=7*cm))
+    story.append(chart_image(chart_paths['margins'], width=14*cm, height=7*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Segment Performance', subheading_style))
@@ -585,7 +539,7 @@ def build_pdf(chart_paths):
         'disruption, own brand sales grew mid-single digits YoY.',
         body_style
     ))
-    story.append(Image(chart_paths['segments'], width=12*cm, height=9*cm))
+    story.append(chart_image(chart_paths['segments'], width=12*cm, height=9*cm))
 
     story.append(Paragraph('Balance Sheet, Cash Flow & Working Capital', subheading_style))
     story.append(Paragraph(
@@ -614,18 +568,7 @@ def build_pdf(chart_paths):
         ['FY25', '58.4', 'Est. 30-40', 'Est. 20-28', '~55%'],
     ]
     cf_table = Table(cf_data, colWidths=[2.2*cm, 2.8*cm, 2.8*cm, 2.8*cm, 4*cm])
-    cf_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    cf_table.setStyle(table_style('header_grid_table'))
     story.append(cf_table)
     story.append(Paragraph(
         'Source: Screener.in, Equitymaster. FY25 CFO halved YoY -- a major red flag. '
@@ -651,18 +594,9 @@ def build_pdf(chart_paths):
         ['Public / Retail', '53.6%', 'Retail dominates holding; high free float'],
     ]
     sh_table = Table(sh_data, colWidths=[3.5*cm, 2.5*cm, 9.5*cm])
+    sh_table.setStyle(table_style('header_grid_table'))
     sh_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (1, -1), 'CENTER'),
         ('ALIGN', (2, 0), (2, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(sh_table)
     story.append(Spacer(1, 0.3*cm))
@@ -712,7 +646,7 @@ def build_pdf(chart_paths):
         body_style
     ))
 
-    story.append(Image(chart_paths['price'], width=16*cm, height=9*cm))
+    story.append(chart_image(chart_paths['price'], width=16*cm, height=9*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph('Key Technical Signals', subheading_style))
@@ -727,19 +661,9 @@ def build_pdf(chart_paths):
         ['Support Zone', 'Rs 180-195', '52-week low area, critical floor'],
         ['Resistance', 'Rs 224 / Rs 242', 'Needs breakout above for reversal signal'],
     ]
+    tech_data = fill_rows(tech_data, PRICES, currency='Rs ')
     tech_table = Table(tech_data, colWidths=[3.5*cm, 3*cm, 9*cm])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    tech_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(tech_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -811,23 +735,14 @@ def build_pdf(chart_paths):
         ['AlcoBev Sector Median', '~96x', '--', '--', 'Sula trades at 66% discount'],
     ]
     pe_table = Table(peer_data, colWidths=[3*cm, 2.2*cm, 2.5*cm, 2*cm, 5.5*cm])
+    pe_table.setStyle(table_style('header_grid_table', font_size=7.5))
     pe_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
         ('BACKGROUND', (0, 1), (-1, 1), HexColor('#edf2f7')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
     ]))
     story.append(pe_table)
     story.append(Spacer(1, 0.3*cm))
 
-    story.append(Image(chart_paths['peers'], width=16*cm, height=6.5*cm))
+    story.append(chart_image(chart_paths['peers'], width=16*cm, height=6.5*cm))
     story.append(Spacer(1, 0.3*cm))
 
     story.append(Paragraph(
@@ -882,17 +797,7 @@ def build_pdf(chart_paths):
         ['WalletInvestor (algo)', '297-351', 'Positive', 'Algorithmic 1-year forecast'],
     ]
     analyst_table = Table(analyst_data, colWidths=[3.5*cm, 2.5*cm, 2.2*cm, 7*cm])
-    analyst_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    analyst_table.setStyle(table_style('header_grid_table', font_size=8.5, padding=5, valign=False))
     story.append(analyst_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1059,18 +964,7 @@ def build_pdf(chart_paths):
         ['Sanity Check: P/E', '185 / 5.8 = 31.9x', 'Close to Screener.in reported 32.5x; diff due to TTM date'],
     ]
     eps_table = Table(eps_data, colWidths=[3.5*cm, 4*cm, 7*cm])
-    eps_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [white, HexColor('#f7fafc')]),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    eps_table.setStyle(table_style('header_grid_table', align='LEFT'))
     story.append(eps_table)
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
@@ -1088,29 +982,16 @@ def build_pdf(chart_paths):
         body_style
     ))
 
+    v = VALUATION
     proj_data = [
         ['', 'Bull', 'Base', 'Bear'],
-        ['FY26E Profit Growth', '15% (margin recovery)', '0% (flat, weak H1)', '-15% (continued decline)'],
-        ['FY26E EPS', 'Rs 8.3 x 1.15 = Rs 9.55', 'Rs 8.3 x 1.0 = Rs 8.30', 'Rs 8.3 x 0.85 = Rs 7.06'],
-        ['FY27E Profit Growth', '20% (CLSA thesis)', '13% (consensus CAGR)', '-15% (further deterioration)'],
-        ['FY27E EPS', 'Rs 9.55 x 1.20 = Rs 11.46', 'Rs 8.30 x 1.13 = Rs 9.38', 'Rs 7.06 x 0.85 = Rs 6.00'],
+        ['FY26E Profit Growth'] + growth_cells(v, 0, ['margin recovery', 'flat, weak H1', 'continued decline']),
+        ['FY26E EPS'] + step_cells(v.per_share, v.steps, 0, 'Rs '),
+        ['FY27E Profit Growth'] + growth_cells(v, 1, ['CLSA thesis', 'consensus CAGR', 'further deterioration']),
+        ['FY27E EPS'] + step_cells(v.per_share, v.steps, 1, 'Rs '),
     ]
     proj_table = Table(proj_data, colWidths=[3.5*cm, 4.2*cm, 4.2*cm, 4.2*cm])
-    proj_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (1, 0), (1, -1), HexColor('#f0fff4')),
-        ('BACKGROUND', (2, 0), (2, -1), HexColor('#fffff0')),
-        ('BACKGROUND', (3, 0), (3, -1), HexColor('#fff5f5')),
-        ('TEXTCOLOR', (1, 0), (3, 0), white),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    proj_table.setStyle(table_style('projection_table', font_size=7.5))
     story.append(proj_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1123,29 +1004,13 @@ def build_pdf(chart_paths):
     ))
 
     scenario_data = [
-        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', 'Return from Rs 185', 'Probability'],
-        ['Bull', 'Rs 11.46', '40-45x',
-         'Rs 458-516', '+148% to +179%', '20%'],
-        ['Base', 'Rs 9.38', '30-35x',
-         'Rs 281-328', '+52% to +77%', '40%'],
-        ['Bear', 'Rs 6.00', '15-20x',
-         'Rs 90-120', '-35% to -51%', '40%'],
-    ]
+        ['Scenario', 'FY27E EPS', 'P/E Assumed', 'Price Target', f'Return from Rs {v.price:,.0f}', 'Probability'],
+    ] + [[name, f'Rs {eps:.2f}', multiple, target, ret, f'{p:.0%}']
+         for name, eps, multiple, target, ret, p in zip(
+             ['Bull', 'Base', 'Bear'], v.per_share[:, -1], multiple_cells(v, '-'),
+             target_cells(v, 'Rs ', '-'), return_cells(v), v.probability)]
     scenario_table = Table(scenario_data, colWidths=[1.8*cm, 2.2*cm, 2.3*cm, 2.8*cm, 3.3*cm, 2.5*cm])
-    scenario_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    scenario_table.setStyle(table_style('scenario_table'))
     story.append(scenario_table)
     story.append(Spacer(1, 0.3*cm))
 
@@ -1177,34 +1042,38 @@ def build_pdf(chart_paths):
 
     ev_data = [
         ['Scenario', 'Midpoint Price', 'Probability', 'Weighted Value'],
-        ['Bull', 'Rs 487', '20%', 'Rs 97'],
-        ['Base', 'Rs 305', '40%', 'Rs 122'],
-        ['Bear', 'Rs 105', '40%', 'Rs 42'],
-        ['', '', 'Expected Value -->', 'Rs 261'],
-    ]
+    ] + ev_rows(v, 'Rs ', 'Expected Value -->')
     ev_table = Table(ev_data, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-    ev_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor(PRIMARY)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), white),
-        ('BACKGROUND', (0, 1), (-1, 1), HexColor('#f0fff4')),
-        ('BACKGROUND', (0, 2), (-1, 2), HexColor('#fffff0')),
-        ('BACKGROUND', (0, 3), (-1, 3), HexColor('#fff5f5')),
-        ('BACKGROUND', (0, 4), (-1, 4), HexColor('#edf2f7')),
-        ('FONTNAME', (0, 0), (-1, -1), 'SFNS'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, HexColor('#cbd5e0')),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
+    ev_table.setStyle(table_style('scenario_table', font_size=9, total=True))
     story.append(ev_table)
     story.append(Spacer(1, 0.3*cm))
+    story.append(chart_image(chart_paths['simulation'], width=16*cm, height=8*cm))
+    story.append(Paragraph(describe(simulation(), 'Rs '), source_style))
+    story.append(Spacer(1, 0.3*cm))
 
+    # Sensitivity grid
+    grid, coarse = sensitivity(), sensitivity(table=True)
+    story.append(Paragraph('<b>Sensitivity: EPS Growth x P/E</b>', body_style))
+    story.append(chart_image(chart_paths['sensitivity'], width=15*cm, height=8.4*cm))
+    sens_data = table_rows(coarse, 'Rs ', corner='EPS growth / P/E')
+    sens_table = Table(sens_data, colWidths=[3*cm] + [2.4*cm] * (len(sens_data[0]) - 1))
+    sens_table.setStyle(table_style('sensitivity_table'))
+    sens_table.setStyle(TableStyle(
+        [('BACKGROUND', cell, cell, HexColor(color)) for cell, color in table_colors(coarse)]))
+    story.append(sens_table)
     story.append(Paragraph(
-        '<b>Probability-weighted expected price: Rs 261</b> -- implying ~41% upside from Rs 185. '
-        'However, this masks extreme variance: the bull case offers 148-179% upside while the bear case '
-        'implies -35% to -51% downside. The bear case at 40% probability (equal to base) reflects the '
+        f'Green cells are above the current price of Rs {v.price:,.0f}. Rows compound EPS growth '
+        f'for {grid.years:.0f} year(s) from the base-case starting point; the base case sits at '
+        f'{grid.base_growth:.0%} and {grid.base_multiple:g}x.',
+        source_style
+    ))
+    story.append(Spacer(1, 0.3*cm))
+
+    story.append(Paragraph(
+        f'<b>Probability-weighted expected price: Rs {v.expected:,.0f}</b> -- implying '
+        f'~{upside(v.expected_return, 0)} from Rs {v.price:,.0f}. '
+        f'However, this masks extreme variance: the bull case offers {return_cells(v)[0]} while the bear case '
+        f'implies {return_cells(v)[2]}. The bear case at 40% probability (equal to base) reflects the '
         'severity of current deterioration: CFO halved, debtor days surging, FIIs fleeing. '
         'Investors should be aware of the wide dispersion of outcomes and the real possibility of '
         'further significant downside.',
@@ -1252,9 +1121,11 @@ def build_pdf(chart_paths):
         body_style
     ))
     story.append(Paragraph(
-        'The <b>probability-weighted expected value of Rs 261 implies ~41% upside</b> over 12 months. '
+        f'The <b>probability-weighted expected value of Rs {VALUATION.expected:,.0f} implies '
+        f'~{upside(VALUATION.expected_return, 0)}</b> over 12 months. '
         'However, this is heavily skewed by the bull case; the bear case alone (40% probability) implies '
-        'Rs 90-120, which is -35% to -51% downside. The consensus analyst target of Rs 265-290 is more '
+        f'{target_cells(VALUATION, "Rs ")[2]}, which is {return_cells(VALUATION)[2]}. '
+        'The consensus analyst target of Rs 265-290 is more '
         'optimistic than our expected value, reflecting their lower bear-case weighting.',
         body_style
     ))
@@ -1301,20 +1172,27 @@ def build_pdf(chart_paths):
         source_style
     ))
 
-    doc.build(story)
+    profiling.build(doc, story)
     print(f"PDF generated successfully: {FINAL_PDF}")
 
 
 # --- Main ---
+CHARTS = {
+    'revenue': create_revenue_chart,
+    'segments': create_segment_chart,
+    'price': create_price_chart,
+    'peers': create_peer_chart,
+    'margins': create_margin_chart,
+    'simulation': create_simulation_chart,
+    'sensitivity': create_sensitivity_chart,
+}
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Generating charts...")
-    charts = {
-        'revenue': create_revenue_chart(),
-        'segments': create_segment_chart(),
-        'price': create_price_chart(),
-        'peers': create_peer_chart(),
-        'margins': create_margin_chart(),
-    }
+    charts = render_charts(CHARTS, jobs=args.jobs, cache=args.cache, in_memory=args.in_memory,
+                           vector=args.vector)
+    profiling.mark('charts')
     print("Charts created. Building PDF...")
     build_pdf(charts)
     print("Done!")
@@ -0,0 +1,8 @@
+import pytest
+
+from stocklib.datastore import open_store
+
+
+@pytest.fixture(scope='session')
+def store():
+    return open_store()
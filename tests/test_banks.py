@@ -0,0 +1,31 @@
+import pytest
+
+from stocklib.banks import ticker_metrics, year_ends
+
+
+def test_metrics_match_idfc_published_ratios(store):
+    # IDFC First Bank, Q3 FY26 results: GNPA 1.69%, NNPA 0.53%, NIM 5.76%, CASA 51.64%, CAR 16.22%
+    m = ticker_metrics(store.ticker('IDFCFIRSTB'))
+    assert m.periods[-1] == 'Q3 FY26'
+    assert m.gnpa[-1] == pytest.approx(1.69, abs=0.01)
+    assert m.nnpa[-1] == pytest.approx(0.53, abs=0.01)
+    assert m.nim[-1] == pytest.approx(5.76, abs=0.01)
+    assert m.casa[-1] == pytest.approx(51.64, abs=0.01)
+    assert m.car[-1] == pytest.approx(16.22, abs=0.05)
+
+
+def test_metrics_match_idfc_history(store):
+    m = ticker_metrics(store.ticker('IDFCFIRSTB'))
+    nim = dict(zip(m.periods, m.nim))
+    assert nim['Q1 FY25'] == pytest.approx(6.20, abs=0.01)
+    assert nim['Q2 FY26'] == pytest.approx(5.59, abs=0.01)
+    # year-end GNPA, FY22 to FY25: 3.70%, 2.50%, 1.90%, 1.90%
+    labels, rows = year_ends(m)
+    assert labels[:4] == ['FY22', 'FY23', 'FY24', 'FY25']
+    assert m.gnpa[rows[:4]] == pytest.approx([3.70, 2.50, 1.90, 1.90], abs=0.01)
+
+
+def test_fingerprint_follows_content(store):
+    m = ticker_metrics(store.ticker('IDFCFIRSTB'))
+    assert m.fingerprint() == ticker_metrics(store.ticker('IDFCFIRSTB')).fingerprint()
+    assert m[:-1].fingerprint() != m.fingerprint()
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from stocklib.bankvalue import justified_pb, residual_income, ticker_bank_value, value_rows
+
+
+@pytest.mark.parametrize('roe', [0.04, 0.08, 0.12, 0.20])
+@pytest.mark.parametrize('coe', [0.10, 0.12, 0.14])
+def test_residual_income_without_explicit_years_is_gordon(roe, coe):
+    assert residual_income(54.5, roe, coe, years=0) == pytest.approx(54.5 * justified_pb(roe, coe))
+
+
+def test_residual_income_at_roe_equal_to_coe_is_book():
+    # no residual income in any year, so the value is book whatever the horizon
+    assert residual_income(54.5, 0.12, 0.12, years=10) == pytest.approx(54.5)
+    assert justified_pb(0.12, 0.12) == pytest.approx(1.0)
+
+
+def test_justified_pb_nan_when_growth_reaches_coe():
+    assert np.isnan(justified_pb(0.10, coe=0.05, growth=0.05))
+
+
+def test_value_rows_do_not_print_negative_targets(store):
+    rows = value_rows(ticker_bank_value(store.ticker('IDFCFIRSTB')), 'Rs ')
+    bear = rows[-1]
+    assert bear[0] == 'Bear'
+    assert bear[2:4] == ['N/M (ROE < g)'] * 2
+    assert not any(cell.startswith(('-', 'Rs -')) for row in rows for cell in row[2:5])
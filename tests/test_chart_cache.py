@@ -0,0 +1,70 @@
+import functools
+
+import numpy as np
+import pytest
+
+from stocklib.chart_cache import chart_key
+from stocklib.datastore import Store, write_table
+
+SERIES = np.array([1.0, 2.0, 3.0])
+DATA = None
+
+
+def chart():
+    return SERIES.sum() + len(DATA.fingerprint())
+
+
+@functools.lru_cache(maxsize=None)
+def model():
+    return DATA.fingerprint()
+
+
+def model_chart():
+    return model()
+
+
+def _store(path, revenue):
+    write_table('annual_pnl', {'ticker': ['AAA', 'AAA'], 'period': ['FY24', 'FY25'], 'revenue': revenue},
+                str(path))
+    return Store(str(path))
+
+
+def test_chart_key_follows_referenced_data(monkeypatch):
+    monkeypatch.setattr(f'{__name__}.DATA', _Fixed('a'))
+    key = chart_key(chart)
+    assert chart_key(chart) == key
+    monkeypatch.setattr(f'{__name__}.SERIES', np.array([1.0, 2.0, 4.0]))
+    assert chart_key(chart) != key
+
+
+def test_chart_key_follows_fingerprint(tmp_path, monkeypatch):
+    monkeypatch.setattr(f'{__name__}.DATA', _store(tmp_path / 'one', [100.0, 110.0]).ticker('AAA'))
+    keys = {chart_key(chart), chart_key(model_chart)}
+    monkeypatch.setattr(f'{__name__}.DATA', _store(tmp_path / 'two', [100.0, 120.0]).ticker('AAA'))
+    assert chart_key(chart) not in keys
+    assert chart_key(model_chart) not in keys
+
+
+def test_chart_key_follows_inputs():
+    assert chart_key(chart, inputs={'price': 1.0}) != chart_key(chart, inputs={'price': 2.0})
+
+
+def test_fingerprint_changes_with_any_row(tmp_path):
+    one = _store(tmp_path / 'one', [100.0, 110.0]).ticker('AAA')
+    same = _store(tmp_path / 'same', [100.0, 110.0]).ticker('AAA')
+    two = _store(tmp_path / 'two', [100.0, 111.0]).ticker('AAA')
+    assert one.fingerprint() == same.fingerprint() != two.fingerprint()
+
+
+class _Fixed:
+    def __init__(self, value):
+        self.value = value
+
+    def fingerprint(self):
+        return self.value
+
+
+def test_chart_key_rejects_objects_without_fingerprint(monkeypatch):
+    monkeypatch.setattr(f'{__name__}.DATA', object())
+    with pytest.raises(TypeError, match='fingerprint'):
+        chart_key(chart)
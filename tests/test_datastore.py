@@ -0,0 +1,34 @@
+import multiprocessing
+import os
+import shutil
+
+from stocklib.datastore import DATA_DIR, TABLES, Store, open_store, write_table
+
+
+def _reopen(data_dir):
+    for _ in range(5):
+        for name in TABLES:
+            csv_path = os.path.join(data_dir, 'raw', name + '.csv')
+            if os.path.exists(csv_path):
+                os.utime(csv_path)
+        store = open_store(data_dir)
+        for ticker in store.table('scenarios').tickers():
+            store.ticker(ticker)['scenarios']['price']
+            store.ticker(ticker)['quarterly_pnl']['revenue']
+    return True
+
+
+def test_concurrent_recompile(tmp_path):
+    shutil.copytree(os.path.join(DATA_DIR, 'raw'), tmp_path / 'raw')
+    with multiprocessing.get_context('fork').Pool(4) as pool:
+        assert all(pool.map(_reopen, [str(tmp_path)] * 8))
+    assert not [name for name in os.listdir(tmp_path / 'store') if name.startswith('.') and name != '.lock']
+
+
+def test_rewrite_keeps_open_columns(tmp_path):
+    write_table('annual_pnl', {'ticker': ['AAA'], 'period': ['FY25'], 'revenue': [1.0]}, str(tmp_path))
+    revenue = Store(str(tmp_path)).table('annual_pnl').column('revenue')
+    write_table('annual_pnl', {'ticker': ['AAA'], 'period': ['FY25'], 'revenue': [2.0]}, str(tmp_path))
+    assert revenue[0] == 1.0
+    assert Store(str(tmp_path)).table('annual_pnl').column('revenue')[0] == 2.0
+    assert os.listdir(tmp_path) == ['annual_pnl']
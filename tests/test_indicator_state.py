@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from stocklib import technicals
+from stocklib.indicator_state import IndicatorState, catch_up, ticker_state
+from stocklib.prices import PriceHistory, append_bars
+
+DAYS = 400
+NAMES = ('close', 'last_day', 'sma20', 'sma50', 'sma200', 'ema20', 'ema200', 'rsi', 'macd', 'macd_signal',
+         'macd_hist', 'macd_cross', 'adx', 'plus_di', 'minus_di', 'cci', 'bb_mid', 'bb_upper', 'bb_lower',
+         'bb_pct', 'beta')
+
+
+def _bars(seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + 0.015 * rng.standard_normal(DAYS))
+    spread = np.abs(rng.standard_normal(DAYS)) * 0.01 * close
+    return close, close + spread, close - spread, close, np.full(DAYS, 1000)
+
+
+def _append(ticker, bars, days, rows, price_dir):
+    append_bars(ticker, days[rows], *(field[rows] for field in bars), price_dir=price_dir)
+
+
+def test_catch_up_matches_indicators(tmp_path):
+    price_dir = str(tmp_path)
+    days = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-01') + DAYS)
+    stock, market = _bars(1), _bars(2)
+    half = slice(0, DAYS // 2)
+    _append('AAA', stock, days, half, price_dir)
+    _append(technicals.BENCHMARK, market, days, half, price_dir)
+
+    # a first build, then a refresh that pushes only the bars appended since
+    state = IndicatorState(['AAA'])
+    assert catch_up(state, PriceHistory('AAA', price_dir), PriceHistory(technicals.BENCHMARK, price_dir)) == DAYS // 2
+    rest = slice(DAYS // 2, DAYS)
+    _append('AAA', stock, days, rest, price_dir)
+    _append(technicals.BENCHMARK, market, days, rest, price_dir)
+    history, benchmark = PriceHistory('AAA', price_dir), PriceHistory(technicals.BENCHMARK, price_dir)
+    assert catch_up(state, history, benchmark) == DAYS - DAYS // 2
+
+    expected = technicals.snapshot(technicals.load_universe(['AAA'], price_dir), benchmark)
+    values = state.values()
+    for name in NAMES:
+        assert values[name] == pytest.approx(expected[name], rel=1e-7, abs=1e-9), name
+
+
+def test_ticker_ahead_of_benchmark_is_rebuilt(tmp_path):
+    price_dir = str(tmp_path)
+    days = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-01') + DAYS)
+    stock, market = _bars(1), _bars(2)
+    # the ticker's last bar lands before the benchmark's bar for the same day
+    _append('AAA', stock, days, slice(None), price_dir)
+    _append(technicals.BENCHMARK, market, days, slice(0, DAYS - 1), price_dir)
+    early = ticker_state(PriceHistory('AAA', price_dir), PriceHistory(technicals.BENCHMARK, price_dir), price_dir)
+    assert early.market_day[0] < early.last_day[0]
+
+    _append(technicals.BENCHMARK, market, days, slice(DAYS - 1, DAYS), price_dir)
+    benchmark = PriceHistory(technicals.BENCHMARK, price_dir)
+    state = ticker_state(PriceHistory('AAA', price_dir), benchmark, price_dir)
+    expected = technicals.snapshot(technicals.load_universe(['AAA'], price_dir), benchmark)
+    assert state.values()['beta'] == pytest.approx(expected['beta'], rel=1e-7)
+
+
+def test_saved_state_resumes(tmp_path):
+    price_dir = str(tmp_path)
+    days = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-01') + DAYS)
+    _append('AAA', _bars(1), days, slice(None), price_dir)
+    history, benchmark = PriceHistory('AAA', price_dir), PriceHistory(technicals.BENCHMARK, price_dir)
+    state = IndicatorState(['AAA'])
+    catch_up(state, history, benchmark)
+    path = str(tmp_path / 'AAA.state.npz')
+    state.save(path)
+    loaded = IndicatorState.load(path)
+    assert catch_up(loaded, history, benchmark) == 0
+    for name, value in state.values().items():
+        np.testing.assert_array_equal(loaded.values()[name], value)
@@ -0,0 +1,33 @@
+import functools
+import os
+
+from stocklib import render
+
+
+def _bar_chart(path, heights):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(3, 2))
+    plt.bar(range(len(heights)), heights)
+    return render.save_figure(path)
+
+
+def _charts(tmp_path):
+    return {name: functools.partial(_bar_chart, str(tmp_path / f'chart_{name}.png'), heights)
+            for name, heights in (('a', [1, 2, 3]), ('b', [3, 1]), ('c', [2, 2, 5, 1]))}
+
+
+def test_pool_returns_every_chart_in_order(tmp_path):
+    charts = render.render_charts(_charts(tmp_path), jobs=2)
+    assert list(charts) == ['a', 'b', 'c']
+    for name, path in charts.items():
+        assert path == str(tmp_path / f'chart_{name}.png')
+        assert os.path.getsize(path) > 0
+
+
+def test_pool_matches_a_single_process(tmp_path):
+    pooled = render.render_charts(_charts(tmp_path), jobs=0, in_memory=True)
+    serial = render.render_charts(_charts(tmp_path), jobs=1, in_memory=True)
+    assert {name: chart.getvalue() for name, chart in pooled.items()} == \
+        {name: chart.getvalue() for name, chart in serial.items()}
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,31 @@
+import numpy as np
+
+from stocklib import technicals
+from stocklib.prices import append_bars
+
+
+def test_screen_of_an_empty_store(tmp_path, capsys):
+    technicals.screen(price_dir=str(tmp_path / 'missing'))
+    assert '0 tickers x 0 days' in capsys.readouterr().out
+
+
+def test_snapshot_without_bars_is_nan(tmp_path):
+    snap = technicals.snapshot(technicals.load_universe(['AAA'], str(tmp_path)), price_dir=str(tmp_path))
+    assert list(snap) == technicals.SNAPSHOT_KEYS
+    assert np.isnan(snap['rsi'][0]) and snap['last_day'][0] == 0
+
+
+def test_no_fill_past_a_tickers_last_bar(tmp_path):
+    days = np.arange(np.datetime64('2025-01-01'), np.datetime64('2025-03-01'))
+    close = np.linspace(100, 120, len(days))
+    ones = np.ones(len(days), dtype=np.int64)
+    append_bars('LIVE', days, close, close, close, close, ones, price_dir=str(tmp_path))
+    append_bars('STALE', days[:30], close[:30], close[:30], close[:30], close[:30], ones[:30],
+                price_dir=str(tmp_path))
+    universe = technicals.load_universe(['LIVE', 'STALE'], str(tmp_path))
+    stale = universe['close'][universe.index('STALE')]
+    assert not np.isnan(stale[:30]).any() and np.isnan(stale[30:]).all()
+
+    snap = technicals.snapshot(universe, price_dir=str(tmp_path))
+    assert np.isnan(snap['bb_pct'][1]) and np.isnan(snap['macd'][1])
+    assert snap['last_day'][1] == days[29].astype(np.int64)
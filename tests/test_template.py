@@ -0,0 +1,28 @@
+import functools
+
+import numpy as np
+
+from stocklib import template
+from stocklib.prices import PriceHistory, append_bars
+from stocklib.technicals import BENCHMARK
+
+
+def test_technicals_key_follows_the_benchmark(tmp_path, monkeypatch, store):
+    monkeypatch.setattr(template, 'PriceHistory', functools.partial(PriceHistory, price_dir=str(tmp_path)))
+    report = template.Report('CELLO', store=store)
+    empty, peers = report.section_key('technicals'), report.section_key('peers')
+
+    day = np.array(['2026-01-30'], dtype='datetime64[D]')
+    append_bars(BENCHMARK, day, [25000.0], [25100.0], [24900.0], [25050.0], [1], price_dir=str(tmp_path))
+    one_bar = report.section_key('technicals')
+    append_bars(BENCHMARK, day + 1, [25050.0], [25200.0], [25000.0], [25150.0], [1], price_dir=str(tmp_path))
+    assert len({empty, one_bar, report.section_key('technicals')}) == 3
+    assert report.section_key('peers') == peers
+
+
+def test_section_keys_do_not_run_the_simulations(store):
+    report = template.Report('ABFRL', store=store)
+    keys = [report.section_key(name) for name in ('valuation', 'cash_runway')]
+    assert 'simulation' not in vars(report) and 'runway' not in vars(report)
+    assert keys == [template.Report('ABFRL', store=store).section_key(name) for name in ('valuation', 'cash_runway')]
+    assert report.simulation.paths > 0 and report.runway is not None
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from stocklib.datastore import Store, write_table
+from stocklib.valuation import SCENARIOS, ticker_valuation, universe_inputs, universe_valuation, value
+
+
+def test_value_matches_bikaji_hand_computed_targets(store):
+    # Bikaji report: FY27E EPS 17.23 / 15.33 / 11.50 at 55-60x, 50-55x, 35-45x; expected value Rs 756.
+    # The report rounds EPS to the paisa at each step and targets to the rupee, hence the tolerances.
+    v = ticker_valuation(store.ticker('BIKAJI'))
+    assert v.path[:, -1] == pytest.approx([17.23, 15.33, 11.50], rel=2e-3)
+    assert v.low == pytest.approx([948, 767, 403], abs=1.5)
+    assert v.high == pytest.approx([1034, 843, 518], abs=1.5)
+    assert v.mid == pytest.approx([991, 805, 461], abs=1.5)
+    assert v.expected == pytest.approx(756, abs=1.5)
+
+
+def test_value_matches_abfrl_ev_sales_targets(store):
+    # ABFRL report: FY27E revenue x EV/Sales, less Rs 7,000 Cr net debt, over 122.03 Cr shares;
+    # the Bear equity value is negative and floored at Rs 27
+    v = ticker_valuation(store.ticker('ABFRL'))
+    assert v.path[:, -1] == pytest.approx([9474, 9062, 8341], abs=1)
+    assert v.value_low == pytest.approx([23685, 16312, 3336], abs=2)
+    assert v.equity_low == pytest.approx([16685, 9312, -3664], abs=2)
+    assert v.mid == pytest.approx([137, 76, 27], abs=0.5)
+    assert list(v.floored) == [False, False, True]
+    assert v.expected == pytest.approx(66, abs=0.5)
+
+
+def test_value_rejects_probabilities_not_summing_to_one():
+    with pytest.raises(ValueError):
+        value(base=[1.0] * 3, growth=[[0.1, 0.1]] * 3, multiple_low=[10] * 3, multiple_high=[10] * 3,
+              probability=[0.5, 0.5, 0.5], price=10)
+
+
+def test_universe_matches_ticker_valuation(store):
+    tickers, v = universe_valuation(store)
+    for i, ticker in enumerate(tickers):
+        assert v.expected[i] == pytest.approx(ticker_valuation(store.ticker(ticker)).expected)
+
+
+def _scenario_columns(order):
+    rows = {'Bull': (0.3, 30, 0.2), 'Base': (0.2, 20, 0.5), 'Bear': (0.1, 10, 0.3)}
+    return {
+        'ticker': ['AAA'] * 3, 'period': ['FY27E'] * 3, 'scenario': list(order), 'price': [100.0] * 3,
+        'base': [10.0] * 3, 'growth_1': [rows[s][0] for s in order], 'growth_2': [rows[s][0] for s in order],
+        'multiple_low': [rows[s][1] for s in order], 'multiple_high': [rows[s][1] for s in order],
+        'probability': [rows[s][2] for s in order],
+    }
+
+
+def test_universe_inputs_orders_scenarios(tmp_path):
+    write_table('scenarios', _scenario_columns(['Base', 'Bear', 'Bull']), str(tmp_path))
+    _, args = universe_inputs(Store(str(tmp_path)))
+    assert args['multiple_low'][0] == pytest.approx([30, 20, 10])
+    assert args['probability'][0] == pytest.approx([0.2, 0.5, 0.3])
+    assert np.all(np.diff(args['growth'][0, :, 0]) < 0)
+
+
+def test_universe_inputs_rejects_unknown_scenarios(tmp_path):
+    write_table('scenarios', _scenario_columns(['Bull', 'Base', 'Base']), str(tmp_path))
+    with pytest.raises(ValueError, match=', '.join(SCENARIOS)):
+        universe_inputs(Store(str(tmp_path)))
+
+
+def test_fingerprint_follows_content(store):
+    data = store.ticker('BIKAJI')
+    one, two = ticker_valuation(data), ticker_valuation(data)
+    assert one.fingerprint() == two.fingerprint()
+    assert ticker_valuation(data, price=700).fingerprint() != one.fingerprint()
@@ -0,0 +1,21 @@
+import io
+
+from reportlab.pdfgen.canvas import Canvas
+
+from stocklib import vector
+
+
+def test_font_missing_file_is_none(tmp_path):
+    assert vector._font(str(tmp_path / 'missing.ttf')) is None
+    (tmp_path / 'bogus.ttf').write_bytes(b'not a font')
+    assert vector._font(str(tmp_path / 'bogus.ttf')) is None
+
+
+def test_replay_falls_back_when_recorded_font_is_missing(tmp_path):
+    op = {'op': 'text', 'x': 10.0, 'y': 10.0, 'text': 'Revenue', 'font': str(tmp_path / 'missing.ttf'),
+          'size': 9.0, 'angle': 0.0, 'color': [0, 0, 0, 1], 'clip': None}
+    buffer = io.BytesIO()
+    canv = Canvas(buffer)
+    vector.replay(canv, [op])
+    canv.save()
+    assert b'Helvetica' in buffer.getvalue()
@@ -0,0 +1,23 @@
+import pytest
+
+from stocklib.workingcapital import red_flags, ticker_metrics
+
+
+def test_cello_cash_conversion_cycle(store):
+    # Cello World report: "112+186-53 = ~245 days" for FY25
+    m = ticker_metrics(store.ticker('CELLO'))
+    i = list(m.periods).index('FY25')
+    assert round(m.debtor_days[i]) == 112
+    assert round(m.inventory_days[i]) == 186
+    assert round(m.payable_days[i]) == 53
+    assert m.ccc[i] == pytest.approx(m.debtor_days[i] + m.inventory_days[i] - m.payable_days[i])
+    assert m.ccc[i] == pytest.approx(245, abs=0.5)
+
+
+def test_cello_free_cash_flow(store):
+    m = ticker_metrics(store.ticker('CELLO'))
+    assert list(m.fcf) == pytest.approx(list(m.cfo - m.capex))
+    assert m.cash_conversion == pytest.approx(m.cfo / m.pat)
+    flags = red_flags(m)
+    assert any(flag.endswith('FY24 (65%)') for flag in flags)
+    assert any(flag.startswith('FCF negative every year FY22-FY25') for flag in flags)